@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Benchmarks for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import getopt
+import sys
+
+#Global vars.
+Version = "1.7.1"
+
+#Import benchmark modules. These don't need wx or root privileges.
+import Benchmarks
+
+from Benchmarks import OutputReaderBenchmarks
+from Benchmarks import ParserBenchmarks
+from Benchmarks import PipelineBenchmarks
+from Benchmarks import TerminalBenchmarks
+from Benchmarks import MapfileBenchmarks
+
+def usage():
+    print("\nUsage: Benchmarks.py [OPTION]\n\n")
+    print("Options:\n")
+    print("       -h, --help:                   Display this help text.")
+    print("       -r, --reader:                 Run benchmarks for the ddrescue output reader.")
+    print("       -p, --parser:                 Run benchmarks for the ddrescue output parser, and check for regressions against the baseline.")
+    print("       -t, --terminal:               Run benchmarks for the terminal model behind the output box.")
+    print("       -e, --endtoend:               Run benchmarks for the whole output pipeline, using the fake ddrescue.")
+    print("       -m, --mapfile:                Run benchmarks for the mapfile parser.")
+    print("       -b, --baseline:               Save the parser benchmark results as the new baseline for this version of python, instead of checking them.")
+    print("       -a, --all:                    Run all the benchmarks. The default.\n")
+    print("DDRescue-GUI "+Version+" is released under the GNU GPL Version 3")
+    print("Copyright (C) Hamish McIntyre-Bhatty 2013-2017")
+
+#Check all cmdline options are valid.
+try:
+    opts, args = getopt.getopt(sys.argv[1:], "hrptemba", ["help", "reader", "parser", "terminal", "endtoend", "mapfile", "baseline", "all"])
+
+except getopt.GetoptError as err:
+    #Invalid option. Show the help message and then exit.
+    #Show the error.
+    print(err)
+    usage()
+    sys.exit(2)
+
+#Set up which benchmarks to run based on options given.
+BenchmarkModules = [OutputReaderBenchmarks, ParserBenchmarks, TerminalBenchmarks, PipelineBenchmarks, MapfileBenchmarks]
+
+for o, a in opts:
+    if o in ["-r", "--reader"]:
+        BenchmarkModules = [OutputReaderBenchmarks]
+    elif o in ["-p", "--parser"]:
+        BenchmarkModules = [ParserBenchmarks]
+    elif o in ["-t", "--terminal"]:
+        BenchmarkModules = [TerminalBenchmarks]
+    elif o in ["-e", "--endtoend"]:
+        BenchmarkModules = [PipelineBenchmarks]
+    elif o in ["-m", "--mapfile"]:
+        BenchmarkModules = [MapfileBenchmarks]
+    elif o in ["-b", "--baseline"]:
+        ParserBenchmarks.UpdateBaseline = True
+    elif o in ["-a", "--all"]:
+        BenchmarkModules = [OutputReaderBenchmarks, ParserBenchmarks, TerminalBenchmarks, PipelineBenchmarks, MapfileBenchmarks]
+    elif o in ["-h", "--help"]:
+        usage()
+        sys.exit()
+    else:
+        assert False, "unhandled option"
+
+if __name__ == "__main__":
+    Failed = False
+
+    for BenchmarkModule in BenchmarkModules:
+        print("\n\n---------------------------- Benchmarks for "+BenchmarkModule.__name__+" ----------------------------\n\n")
+
+        #Benchmarks that check for regressions return False if they find any.
+        if BenchmarkModule.Run() is False:
+            Failed = True
+
+    if Failed:
+        sys.exit(1)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Benchmark data for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import random
+
+#Functions to return benchmark data.
+def ReturnFakeDDRescueOutput(Updates):
+    """Return what ddrescue v1.22 writes to its standard output with -v over a recovery with the given number of status updates"""
+    Output = ["GNU ddrescue 1.22\n", "About to copy 500 MBytes from /dev/sdb to /tmp/out.img\n", "    Starting positions: ipos = 0 B, opos = 0 B\n",
+              "    Copy block size: 128 sectors       Initial skip size: 128 sectors\n", "Sector size: 512 Bytes\n\n", "Press Ctrl-C to interrupt\n"]
+
+    for Update in range(1, Updates+1):
+        Rescued = Update * 65536 // 1000
+
+        if Update != 1:
+            #Go back to the start of the status block, to overwrite it.
+            Output.append("\r"+"\x1b[A"*6)
+
+        Output.append("     ipos: %8d kB, non-trimmed:        0 B,  current rate:   65536 B/s\n" % Rescued)
+        Output.append("     opos: %8d kB, non-scraped:        0 B,  average rate:   65536 B/s\n" % Rescued)
+        Output.append("non-tried:   500000 kB,  bad-sector:        0 B,    error rate:       0 B/s\n")
+        Output.append("  rescued: %8d kB,   bad areas:        0,        run time: %9ds\n" % (Rescued, Update))
+        Output.append("pct rescued:    0.01%, read errors:        0,  remaining time:         n/a\n")
+        Output.append("                              time since last successful read:         n/a\n")
+        Output.append("Copying non-tried blocks... Pass 1 (forwards)")
+
+    Output.append("\n\nFinished\n")
+
+    return ''.join(Output)
+
+#The versions of ddrescue we can generate transcripts for.
+TranscriptVersions = ("1.14", "1.15", "1.16", "1.17", "1.18", "1.19", "1.20", "1.21", "1.22")
+
+#The recovery phases ddrescue goes through, and the fraction of the disk that must be rescued before each one starts.
+Phases = ((0, "Copying non-tried blocks... Pass 1 (forwards)"), (0.97, "Trimming failed blocks... (forwards)"), (0.98, "Scraping failed blocks... (forwards)"), (0.99, "Retrying bad sectors... Retry 1 (backwards)"))
+
+def FormatNum(Bytes, Limit=100000, Unit="B"):
+    """Format a number of bytes like ddrescue does: a whole number, with the largest SI prefix that keeps it below Limit"""
+    Prefixes = ["", "k", "M", "G", "T", "P"]
+
+    while Bytes >= Limit and len(Prefixes) > 1:
+        Bytes //= 1000
+        Prefixes.pop(0)
+
+    return "%d %s%s" % (Bytes, Prefixes[0], Unit)
+
+def ReturnFakeStatusBlock(Version, Stats):
+    """Return the lines of the status block ddrescue prints with -v, for the given version and statistics.
+    The 1.22 block uses the format strings in the ddrescue 1.22 binary bundled for OS X."""
+    Rescued = FormatNum(Stats["Rescued"])
+    Pos = FormatNum(Stats["Pos"])
+    ErrorSize = FormatNum(Stats["ErrorSize"])
+    CurrentRate = FormatNum(Stats["CurrentRate"])+"/s"
+    AverageRate = FormatNum(Stats["AverageRate"])+"/s"
+    Percent = Stats["Rescued"] * 100 / Stats["Capacity"]
+
+    if Stats["SinceLastRead"] == 0:
+        LastRead = "n/a"
+
+    else:
+        LastRead = "%ds" % Stats["SinceLastRead"]
+
+    MinorVersion = int(Version.split(".")[1])
+
+    if MinorVersion <= 20:
+        Block = ["rescued: %10s,  errsize:%10s,  current rate: %10s" % (Rescued, ErrorSize, CurrentRate),
+                 "   ipos: %10s,   errors: %7d,    average rate: %10s" % (Pos, Stats["Errors"], AverageRate)]
+
+        if MinorVersion <= 17:
+            Block.append("   opos: %10s,     time since last successful read: %9s" % (Pos, "%d s" % Stats["SinceLastRead"]))
+
+        else:
+            Block.append("   opos: %10s, run time: %9s,  successful read: %9s ago" % (Pos, "%d s" % Stats["RunTime"], "%d s" % Stats["SinceLastRead"]))
+
+        if MinorVersion == 20:
+            Block.append("percent rescued: %6.2f%%      time since last successful read: %9s" % (Percent, LastRead))
+
+        return Block
+
+    if MinorVersion == 21:
+        Errors = "     errors: %7d," % Stats["Errors"]
+
+    else:
+        return ["     ipos: %9s, non-trimmed:        0 B,  current rate: %9s" % (Pos, CurrentRate),
+                "     opos: %9s, non-scraped:        0 B,  average rate: %9s" % (Pos, AverageRate),
+                "non-tried: %9s,  bad-sector: %9s,    error rate:       0 B/s" % (FormatNum(Stats["Capacity"] - Stats["Pos"]), ErrorSize),
+                "  rescued: %9s,   bad areas: %8d,        run time: %11s" % (Rescued, Stats["Errors"], "%ds" % Stats["RunTime"]),
+                "pct rescued:  %6.2f%%, read errors:%9d,  remaining time: %11s" % (Percent, Stats["Errors"], "n/a"),
+                "        time since last successful read: %11s" % LastRead]
+
+    return ["     ipos: %9s, non-trimmed:        0 B,  current rate: %9s" % (Pos, CurrentRate),
+            "     opos: %9s, non-scraped:        0 B,  average rate: %9s" % (Pos, AverageRate),
+            "non-tried: %9s,  bad-sector: %9s,    error rate:       0 B/s" % (FormatNum(Stats["Capacity"] - Stats["Pos"]), ErrorSize),
+            "  rescued: %9s,%s        run time: %9s" % (Rescued, Errors, "%ds" % Stats["RunTime"]),
+            "pct rescued: %6.2f%%, read errors: %7d,  remaining time: %9s" % (Percent, Stats["Errors"], "n/a"),
+            "                              time since last successful read: %9s" % LastRead]
+
+def ReturnFakeHeader(Version, Capacity, InputFile="/dev/sdb", OutputFile="/mnt/backup/sdb.img"):
+    """Return what the given version of ddrescue writes to its standard output with -v before its first status update"""
+    #ddrescue 1.22 quotes the file names.
+    if int(Version.split(".")[1]) >= 22:
+        InputFile = "'"+InputFile+"'"
+        OutputFile = "'"+OutputFile+"'"
+
+    return ("GNU ddrescue "+Version+"\nAbout to copy "+FormatNum(Capacity, 10000, "Bytes")+" from "+InputFile+" to "+OutputFile+"\n"
+            "    Starting positions: infile = 0 B,  outfile = 0 B\n    Copy block size: 128 sectors       Initial skip size: 128 sectors\n"
+            "Sector size: 512 Bytes\n\nPress Ctrl-C to interrupt\n")
+
+def GenerateFakeUpdates(Version, Updates, Capacity=2000398934016, Seed=0, ErrorRate=0.02):
+    """Generate the output of the given number of ddrescue status updates (one a second, as ddrescue does), starting with the first.
+    Yields the text of each update, and the statistics it shows. The statistics include "BadAreas", a list of the (position, size) of
+    each bad area found so far. Stops early if the whole disk has been read. Uses a fixed random seed, so the output is the same every time."""
+    Random = random.Random(Seed)
+
+    Stats = {"Capacity": Capacity, "Rescued": 0, "Pos": 0, "ErrorSize": 0, "Errors": 0, "CurrentRate": 0, "AverageRate": 0, "RunTime": 0, "SinceLastRead": 0, "BadAreas": [], "Status": ""}
+    BlockLength = 0
+
+    for Second in range(1, Updates+1):
+        if Stats["Pos"] >= Capacity:
+            return
+
+        Stats["RunTime"] = Second
+
+        #Now and again, we hit a bad area, which slows everything down.
+        if Random.random() < ErrorRate:
+            BadArea = min(512 * Random.randint(1, 4096), Capacity - Stats["Pos"])
+            Stats["BadAreas"].append((Stats["Pos"], BadArea))
+            Stats["Errors"] += 1
+            Stats["ErrorSize"] += BadArea
+            Stats["CurrentRate"] = Random.randint(0, 1000000)
+            Stats["SinceLastRead"] += 1
+
+        else:
+            Stats["CurrentRate"] = Random.randint(40000000, 160000000)
+            Stats["SinceLastRead"] = 0
+
+        Stats["Rescued"] = min(Stats["Rescued"] + Stats["CurrentRate"], Capacity - Stats["ErrorSize"])
+        Stats["Pos"] = min(Stats["Rescued"] + Stats["ErrorSize"], Capacity)
+        Stats["AverageRate"] = Stats["Rescued"] // Second
+
+        Stats["Status"] = [Message for Fraction, Message in Phases if Stats["Rescued"] >= Fraction * Capacity][-1]
+
+        if BlockLength != 0:
+            #Go back to the start of the status block, to overwrite it.
+            Text = "\r"+"\x1b[A"*BlockLength
+
+        else:
+            Text = ""
+
+        Block = ReturnFakeStatusBlock(Version, Stats)
+        BlockLength = len(Block)
+
+        yield Text+'\n'.join(Block)+"\n"+Stats["Status"], Stats
+
+def ReturnFakeTranscript(Version, Hours, Capacity=2000398934016, Seed=0):
+    """Return a synthetic transcript of what the given version of ddrescue writes to its standard output with -v, over a recovery of the given
+    number of hours. Uses a fixed random seed, so the transcript is the same every time."""
+    Output = [ReturnFakeHeader(Version, Capacity)]
+
+    for Text, Stats in GenerateFakeUpdates(Version, Hours*3600, Capacity, Seed):
+        Output.append(Text)
+
+    Output.append("\n\nFinished\n")
+
+    return ''.join(Output)
+
+def GenerateFakeMapfileBlocks(Fragments, Capacity=16000900661248, Seed=0):
+    """Yield the (position, size, status) of each block in a mapfile from a badly damaged disk, with the given number of fragments.
+    Uses a fixed random seed, so the blocks are the same every time."""
+    Random = random.Random(Seed)
+
+    #Mostly finished blocks, separated by small areas that ddrescue couldn't read (yet).
+    Pos = 0
+    Status = "+"
+
+    #Half the fragments are finished, and they take up most of the disk.
+    AverageSize = Capacity // (Fragments // 2 + 1) - 65536
+
+    for Fragment in range(Fragments):
+        if Fragment == Fragments - 1:
+            Size = Capacity - Pos
+
+        elif Status == "+":
+            Size = max(min(Random.randint(512, 2 * AverageSize) // 512 * 512, Capacity - Pos - 65536 * (Fragments - Fragment)), 512)
+
+        else:
+            Size = Random.choice((512, 1024, 4096, 65536))
+
+        yield Pos, Size, Status
+
+        Pos += Size
+
+        if Status == "+":
+            Status = Random.choice("?*/-")
+
+        else:
+            Status = "+"
+
+def ReturnFakeMapfile(Fragments, Capacity=16000900661248, Seed=0):
+    """Return the text of a ddrescue 1.22 mapfile with the given number of fragments"""
+    Lines = ["# Mapfile. Created by GNU ddrescue version 1.22", "# Command line: ddrescue /dev/sdb /mnt/backup/sdb.img /mnt/backup/sdb.map",
+             "# current_pos  current_status  current_pass", "0x%08X     %s               %d" % (Capacity // 2, "/", 1), "#      pos        size  status"]
+
+    for Pos, Size, Status in GenerateFakeMapfileBlocks(Fragments, Capacity, Seed):
+        Lines.append("0x%08X  0x%08X  %s" % (Pos, Size, Status))
+
+    return '\n'.join(Lines)+"\n"
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Fake ddrescue for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#A stand-in for ddrescue, for testing the whole output pipeline without a real ddrescue or a failing disk.
+#It takes the same command line as ddrescue (infile outfile mapfile, plus options, which are ignored), and never touches infile or outfile.
+#Link it into a directory as "ddrescue", and put that directory first in $PATH, to use it with DDRescue-GUI.
+#
+#It's configured with these environment variables:
+#    FAKEDDRESCUE_VERSION:          The version of ddrescue to mimic. Default: 1.22.
+#    FAKEDDRESCUE_RATE:             Status updates per second, or 0 for as fast as possible. Default: 1, like ddrescue.
+#    FAKEDDRESCUE_UPDATES:          The maximum number of status updates. Default: 3600.
+#    FAKEDDRESCUE_SIZE:             The size of the input in bytes. Default: infile's size, if it can be read, otherwise 2 TB.
+#    FAKEDDRESCUE_ERRORRATE:        The chance of each update finding a bad area. Default: 0.02.
+#    FAKEDDRESCUE_STALLS:           Stall (output nothing) before some updates, eg "10:5,20:60" stalls 5 seconds before update 10, and 60 before update 20.
+#    FAKEDDRESCUE_EXITCODE:         The exit code. If it isn't 0, an error message is printed instead of "Finished". Default: 0.
+#    FAKEDDRESCUE_IGNORESIGINT:     If 1, ignore SIGINT, like a ddrescue stuck in the kernel. Default: 0.
+#    FAKEDDRESCUE_MAPFILEINTERVAL:  Write the mapfile every this many updates. It's always written at exit. Default: 30.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import sys
+import time
+import signal
+
+#Make sure we can import DDRescue-GUI's modules, even if we're run through a link in another directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from Benchmarks import BenchmarkData as Data
+from Tools.DDRescueTools.processor import GetExactSize
+
+#The status ddrescue's mapfile shows for each phase of the recovery.
+PhaseStatuses = {"Copying": "?", "Trimming": "*", "Scraping": "/", "Retrying": "-"}
+
+#Set by the SIGINT handler.
+Interrupted = False
+
+def OnSIGINT(Signal, Frame):
+    """Note that we've been interrupted, so we can stop at the end of the current update, like ddrescue"""
+    global Interrupted
+    Interrupted = True
+
+def Write(Text):
+    """Write Text to standard output straight away"""
+    getattr(sys.stdout, "buffer", sys.stdout).write(Text.encode("UTF-8"))
+    sys.stdout.flush()
+
+def ReturnBlocks(Stats):
+    """Return the (position, size, status) of each block of the disk, like ddrescue's mapfile"""
+    Blocks = []
+    Pos = 0
+
+    for BadPos, BadSize in Stats["BadAreas"]:
+        Blocks.append((Pos, BadPos - Pos, "+"))
+        Blocks.append((BadPos, BadSize, "-"))
+        Pos = BadPos + BadSize
+
+    Blocks.append((Pos, Stats["Pos"] - Pos, "+"))
+    Blocks.append((Stats["Pos"], Stats["Capacity"] - Stats["Pos"], "?"))
+
+    #ddrescue never has empty blocks, or two blocks next to each other with the same status.
+    Merged = []
+
+    for Block in Blocks:
+        if Block[1] == 0:
+            continue
+
+        if Merged != [] and Merged[-1][2] == Block[2]:
+            Merged[-1] = (Merged[-1][0], Merged[-1][1] + Block[1], Block[2])
+
+        else:
+            Merged.append(Block)
+
+    return Merged
+
+def ReturnMapfile(Version, Stats, CommandLine, StartTime):
+    """Return a mapfile (called a logfile before ddrescue 1.20) matching Stats"""
+    MinorVersion = int(Version.split(".")[1])
+
+    if Stats["Pos"] >= Stats["Capacity"]:
+        CurrentStatus = "+"
+
+    else:
+        CurrentStatus = PhaseStatuses[Stats["Status"].split()[0]]
+
+    if MinorVersion >= 20:
+        Lines = ["# Mapfile. Created by GNU ddrescue version "+Version]
+
+    else:
+        Lines = ["# Rescue Logfile. Created by GNU ddrescue version "+Version]
+
+    Lines += ["# Command line: "+CommandLine, "# Start time:   "+time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(StartTime)),
+              "# Current time: "+time.strftime("%Y-%m-%d %H:%M:%S"), "# "+Stats["Status"]]
+
+    if MinorVersion >= 20:
+        Lines += ["# current_pos  current_status  current_pass", "0x%08X     %s               1" % (Stats["Pos"], CurrentStatus)]
+
+    else:
+        Lines += ["# current_pos  current_status", "0x%08X     %s" % (Stats["Pos"], CurrentStatus)]
+
+    Lines.append("#      pos        size  status")
+
+    for Pos, Size, Status in ReturnBlocks(Stats):
+        Lines.append("0x%08X  0x%08X  %s" % (Pos, Size, Status))
+
+    return '\n'.join(Lines)+"\n"
+
+def WriteMapfile(MapFile, Text):
+    """Replace MapFile with Text in one step, so readers never see half a mapfile"""
+    with open(MapFile+".tmp", "wb") as File:
+        File.write(Text.encode("UTF-8"))
+
+    os.rename(MapFile+".tmp", MapFile)
+
+def ReturnStalls(Text):
+    """Turn the value of FAKEDDRESCUE_STALLS into a dictionary of update numbers and the number of seconds to stall before them"""
+    Stalls = {}
+
+    for Stall in Text.split(","):
+        if Stall.strip() != "":
+            Update, Seconds = Stall.split(":")
+            Stalls[int(Update)] = float(Seconds)
+
+    return Stalls
+
+def Sleep(Seconds):
+    """Sleep for the given time, stopping early if we're interrupted"""
+    EndTime = time.time() + Seconds
+
+    while not Interrupted and time.time() < EndTime:
+        time.sleep(min(0.05, max(EndTime - time.time(), 0)))
+
+def Main(Arguments):
+    """Pretend to be ddrescue, and return the exit code"""
+    Version = os.environ.get("FAKEDDRESCUE_VERSION", "1.22")
+
+    if "--version" in Arguments or "-V" in Arguments:
+        Write("GNU ddrescue "+Version+"\nCopyright (C) 2017 Antonio Diaz Diaz.\nLicense GPLv2+: GNU GPL version 2 or later <http://gnu.org/licenses/gpl.html>\n"
+              "This is free software: you are free to change and redistribute it.\nThere is NO WARRANTY, to the extent permitted by law.\n")
+        return 0
+
+    Files = [Argument for Argument in Arguments if not Argument.startswith("-")]
+
+    if len(Files) != 3:
+        Write("ddrescue: Fake ddrescue needs an infile, an outfile and a mapfile.\n")
+        return 1
+
+    InputFile, OutputFile, MapFile = Files
+
+    Rate = float(os.environ.get("FAKEDDRESCUE_RATE", "1"))
+    Updates = int(os.environ.get("FAKEDDRESCUE_UPDATES", "3600"))
+    ErrorRate = float(os.environ.get("FAKEDDRESCUE_ERRORRATE", "0.02"))
+    Stalls = ReturnStalls(os.environ.get("FAKEDDRESCUE_STALLS", ""))
+    ExitCode = int(os.environ.get("FAKEDDRESCUE_EXITCODE", "0"))
+    MapfileInterval = int(os.environ.get("FAKEDDRESCUE_MAPFILEINTERVAL", "30"))
+
+    if "FAKEDDRESCUE_SIZE" in os.environ:
+        Capacity = int(os.environ["FAKEDDRESCUE_SIZE"])
+
+    else:
+        Capacity = GetExactSize(InputFile, 2000398934016)
+
+    if os.environ.get("FAKEDDRESCUE_IGNORESIGINT", "0") == "1":
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    else:
+        signal.signal(signal.SIGINT, OnSIGINT)
+
+    CommandLine = ' '.join(["ddrescue"]+Arguments)
+    StartTime = time.time()
+    Stats = None
+
+    Write(Data.ReturnFakeHeader(Version, Capacity, InputFile, OutputFile))
+
+    for Update, (Text, Stats) in enumerate(Data.GenerateFakeUpdates(Version, Updates, Capacity, ErrorRate=ErrorRate), 1):
+        if Update in Stalls:
+            Sleep(Stalls[Update])
+
+        if Interrupted:
+            break
+
+        #Keep to the requested rate.
+        if Rate != 0:
+            Sleep(StartTime + (Update - 1) / Rate - time.time())
+
+        Write(Text)
+
+        if Update % MapfileInterval == 0:
+            WriteMapfile(MapFile, ReturnMapfile(Version, Stats, CommandLine, StartTime))
+
+    if Stats != None:
+        WriteMapfile(MapFile, ReturnMapfile(Version, Stats, CommandLine, StartTime))
+
+    if Interrupted:
+        Write("\n\nInterrupted by user\n")
+
+        #Die from SIGINT, like ddrescue.
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        os.kill(os.getpid(), signal.SIGINT)
+
+    elif ExitCode != 0:
+        Write("\n\nddrescue: Fake error, exiting with status %d\n" % ExitCode)
+
+    else:
+        Write("\n\nFinished\n")
+
+    return ExitCode
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile benchmarks for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import io
+import os
+import random
+import hashlib
+import shutil
+import tempfile
+import time
+
+#tracemalloc is only available on python 3.
+try:
+    import tracemalloc
+
+except ImportError:
+    tracemalloc = None
+
+from Tools.MapfileTools import mapfile as Mapfile
+from Tools.MapfileTools.blockmap import BlockMap
+from Tools.MapfileTools.index import IntervalIndex
+from Tools.MapfileTools import merge as Merge
+from Tools.MapfileTools.hashing import ImageHasher
+from Tools.MapfileTools.snapshots import SnapshotWriter
+
+#Import benchmark data.
+from . import BenchmarkData as Data
+
+def TimeRead(FileName, Repeats=3):
+    """Return the best time taken to read and parse FileName, and the parsed mapfile"""
+    Times = []
+
+    for Repeat in range(Repeats):
+        StartTime = time.time()
+        Map = Mapfile.Read(FileName)
+        Times.append(time.time() - StartTime)
+
+    return min(Times), Map
+
+def MeasurePeakMemory(FileName):
+    """Return the peak memory allocated while reading and parsing FileName, in bytes, or None if it can't be measured"""
+    if tracemalloc == None:
+        return None
+
+    tracemalloc.start()
+    Mapfile.Read(FileName)
+    Peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return Peak
+
+def TimeBlockMap(Map, Cells=4000):
+    """Return the time taken to work out the cells of a block map of Map from scratch, and to update it when nothing has changed"""
+    Cells = BlockMap(Cells)
+
+    StartTime = time.time()
+    Cells.Update(Map)
+    FirstTime = time.time() - StartTime
+
+    StartTime = time.time()
+    Cells.Update(Map)
+
+    return FirstTime, time.time() - StartTime
+
+def TimeIndex(Map, Queries=100000):
+    """Return the time taken to build an IntervalIndex of Map, and to answer the given number of random range queries with it"""
+    Random = random.Random(0)
+    Ranges = []
+
+    for Query in range(Queries):
+        Start = Random.randint(0, Map.GetEnd())
+        Ranges.append((Start, Start + Random.randint(0, 1000000000)))
+
+    StartTime = time.time()
+    Index = IntervalIndex(Map)
+    BuildTime = time.time() - StartTime
+
+    StartTime = time.time()
+
+    for Start, End in Ranges:
+        Index.GetBytes(Start, End)
+
+    return BuildTime, time.time() - StartTime
+
+def TimeMerge(FileName, Count, Directory):
+    """Return the time taken to merge FileName with another mapfile with Count different fragments, and the peak memory used, if it can be measured"""
+    OtherFileName = os.path.join(Directory, "%d-other.map" % Count)
+
+    with io.open(OtherFileName, "w", encoding="UTF-8") as File:
+        File.write(Data.ReturnFakeMapfile(Count, Seed=1))
+
+    StartTime = time.time()
+    Merge.MergeFiles([FileName, OtherFileName], os.path.join(Directory, "merged.map"), "or")
+    Elapsed = time.time() - StartTime
+
+    #Measure the memory separately, as tracing it slows everything down.
+    if tracemalloc == None:
+        return Elapsed, None
+
+    tracemalloc.start()
+    Merge.MergeFiles([FileName, OtherFileName], os.path.join(Directory, "merged.map"), "or")
+    Peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return Elapsed, Peak
+
+def TimeSnapshots(Map, Directory, Snapshots=100):
+    """Return the average time taken to add a snapshot after one block of Map changes, and the average size of each snapshot, after the first (which holds the whole mapfile)"""
+    FileName = os.path.join(Directory, "%d.map.snapshots" % len(Map))
+    Writer = SnapshotWriter(FileName)
+    Writer.Add(Map, 0)
+    FirstSize = os.path.getsize(FileName)
+    Random = random.Random(0)
+
+    StartTime = time.time()
+
+    for Snapshot in range(Snapshots):
+        Map.Codes[Random.randrange(len(Map))] = ord(Random.choice("?*/-+"))
+        Writer.Add(Map, Snapshot + 1)
+
+    Elapsed = time.time() - StartTime
+    Size = os.path.getsize(FileName)
+    os.remove(FileName)
+
+    return Elapsed / Snapshots, (Size - FirstSize) / Snapshots
+
+def TimeHash(Directory, Size=256*1024*1024, Fragments=10000):
+    """Return the time taken to hash an image of Size bytes with a plain sha256 of the whole file, and with ImageHasher using 1 and 4 threads,
+    with about half of it rescued in Fragments blocks"""
+    FileName = os.path.join(Directory, "image.img")
+
+    with open(FileName, "wb") as File:
+        for Position in range(0, Size, 1024*1024):
+            File.write(os.urandom(1024*1024))
+
+    Map = Mapfile.Mapfile()
+    Random = random.Random(0)
+    Boundaries = sorted(set([0, Size] + [Random.randrange(0, Size, 512) for Fragment in range(Fragments)]))
+    Map.AddBlocks(Boundaries[:-1], [End - Start for Start, End in zip(Boundaries, Boundaries[1:])], ["+-"[Block % 2] for Block in range(len(Boundaries) - 1)])
+
+    Results = {}
+    StartTime = time.time()
+
+    with open(FileName, "rb") as File:
+        Hash = hashlib.sha256()
+
+        for Chunk in iter(lambda: File.read(4*1024*1024), b""):
+            Hash.update(Chunk)
+
+    Results["sha256 of the whole file"] = time.time() - StartTime
+
+    for Threads in (1, 4):
+        StartTime = time.time()
+        ImageHasher(FileName, Map, Threads=Threads).Run()
+        Results["ImageHasher, %d threads" % Threads] = time.time() - StartTime
+
+    os.remove(FileName)
+    return Results
+
+def Run(Fragments=(10000, 100000, 1000000)):
+    """Measure how long it takes to parse mapfiles from badly damaged disks with different numbers of fragments, how much memory it takes, and how long block maps, range queries, merges, snapshots and image hashes using them take"""
+    Directory = tempfile.mkdtemp(prefix="ddrescue-gui-benchmark-")
+    Results = {}
+
+    try:
+        for Count in Fragments:
+            FileName = os.path.join(Directory, "%d.map" % Count)
+
+            with io.open(FileName, "w", encoding="UTF-8") as File:
+                File.write(Data.ReturnFakeMapfile(Count))
+
+            Elapsed, Map = TimeRead(FileName)
+            Results[Count] = Elapsed
+
+            ArrayBytes = sum(Array.itemsize * len(Array) for Array in (Map.Positions, Map.Sizes, Map.Codes))
+            Peak = MeasurePeakMemory(FileName)
+
+            print("%8d fragments (%5.1f MB file) in %7.3f s: %10.0f fragments/s, %5.1f MB of arrays, peak memory %s" % (Count, os.path.getsize(FileName) / 1000000, Elapsed,
+                  Count / Elapsed, ArrayBytes / 1000000, "unknown" if Peak == None else "%.1f MB" % (Peak / 1000000)))
+
+            FirstTime, UpdateTime = TimeBlockMap(Map)
+            print("%8d fragments: block map of 4000 cells drawn in %5.1f ms, updated in %5.1f ms" % (Count, FirstTime * 1000, UpdateTime * 1000))
+
+            BuildTime, QueryTime = TimeIndex(Map)
+            print("%8d fragments: interval index built in %7.3f s, 100000 range queries in %7.3f s" % (Count, BuildTime, QueryTime))
+
+            Elapsed, Peak = TimeMerge(FileName, Count, Directory)
+            print("%8d fragments: merged with another mapfile in %7.3f s, peak memory %s" % (Count, Elapsed, "unknown" if Peak == None else "%.1f MB" % (Peak / 1000000)))
+
+            Elapsed, Size = TimeSnapshots(Map, Directory)
+            print("%8d fragments: snapshot after one block changed taken in %5.1f ms, %5.1f bytes" % (Count, Elapsed * 1000, Size))
+
+        for Name, Elapsed in sorted(TimeHash(Directory).items()):
+            print("%-36s 256 MB image hashed in %7.3f s: %7.1f MB/s" % (Name, Elapsed, 256 / Elapsed))
+
+    finally:
+        shutil.rmtree(Directory)
+
+    return Results
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Output reader benchmarks for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import io
+import subprocess
+import tempfile
+import time
+
+from Tools.DDRescueTools import outputreader as OutputReader
+
+#Import benchmark data.
+from . import BenchmarkData as Data
+
+def LegacyReader(cmd):
+    """The loop BackendThread used before the chunked reader: one byte per read, and a string concatenation per byte. Returns the number of lines read."""
+    Line = ""
+    Char = " "
+    Lines = 0
+
+    while cmd.poll() == None or Char != "":
+        Char = cmd.stdout.read(1).decode("UTF-8", "ignore")
+        Line += Char
+
+        if Char == "\n":
+            TidyLine = Line.replace("\n", "").replace("\r", "").replace("\x1b[A", "")
+            Lines += 1
+            Line = ""
+
+    return Lines
+
+def ChunkedReader(cmd):
+    """Read using OutputReader.ReadRecords(). Returns the number of records read."""
+    Records = 0
+
+    for Text, Terminator in OutputReader.ReadRecords(cmd.stdout.fileno()):
+        Records += 1
+
+    cmd.wait()
+    return Records
+
+def TimeReader(Reader, FileName):
+    """Pipe FileName through cat into Reader, like ddrescue's output, and return the time taken in seconds and the number of records read"""
+    cmd = subprocess.Popen(["cat", FileName], stdout=subprocess.PIPE)
+
+    StartTime = time.time()
+    Records = Reader(cmd)
+
+    return time.time() - StartTime, Records
+
+def Run(Updates=2000):
+    """Compare the throughput of the legacy and the chunked reader, and return the results"""
+    Output = Data.ReturnFakeDDRescueOutput(Updates).encode("UTF-8")
+
+    FileDescriptor, FileName = tempfile.mkstemp(prefix="ddrescue-gui-benchmark-")
+
+    try:
+        with io.open(FileDescriptor, "wb") as File:
+            File.write(Output)
+
+        Results = {}
+
+        for Name, Reader in (("Legacy (1 byte per read)", LegacyReader), ("Chunked (OutputReader.ReadRecords)", ChunkedReader)):
+            Elapsed, Records = TimeReader(Reader, FileName)
+            Results[Name] = len(Output) / Elapsed
+
+            print("%-36s %10d bytes in %7.3f s: %12.0f bytes/s (%d records)" % (Name, len(Output), Elapsed, Results[Name], Records))
+
+    finally:
+        os.remove(FileName)
+
+    print("Speedup: %.1fx" % (Results["Chunked (OutputReader.ReadRecords)"] / Results["Legacy (1 byte per read)"]))
+
+    return Results
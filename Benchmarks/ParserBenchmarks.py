@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Output parser benchmarks for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import io
+import json
+import sys
+import time
+
+#tracemalloc is only available on python 3.
+try:
+    import tracemalloc
+
+except ImportError:
+    tracemalloc = None
+
+from Tools.DDRescueTools import outputreader as OutputReader
+from Tools.DDRescueTools.processor import OutputProcessor
+from Tools.DDRescueTools.status import StatusSnapshot
+
+#Import benchmark data.
+from . import BenchmarkData as Data
+
+#The stored baselines, and how much worse than them (as a fraction) a result can be before it's a regression.
+#There's a baseline for each major version of python, as timings from different versions aren't comparable.
+BaselineFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ParserBaseline.json")
+Tolerance = 0.5
+
+#Transcripts captured from real versions of ddrescue, named after the version (eg 1.22.txt). They're replayed as well as the generated ones.
+#To capture one, run eg "ddrescue -v /dev/sdb /mnt/backup/sdb.img /mnt/backup/sdb.map > 1.22.txt", and let it get past its first few status updates.
+TranscriptDirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Transcripts")
+
+#Set to True (eg by Benchmarks.py -b) to save the results as the new baseline, instead of checking against it.
+UpdateBaseline = False
+
+#Measure allocations for this many lines of each transcript, as tracing them is slow.
+AllocationSampleLines = 20000
+
+#Use the most accurate clock available.
+Timer = getattr(time, "perf_counter", time.time)
+
+def ReturnLines(Transcript):
+    """Split a transcript into the lines BackendThread would pass to ProcessLine()"""
+    Records, Remainder = OutputReader.SplitRecords(Transcript)
+    return [Text for Text, Terminator in Records+[(Remainder, "")] if Text.strip() != ""]
+
+def TimeLines(Lines, Version):
+    """Replay Lines through a new OutputProcessor, and return the latency of each line in seconds, the number of lines that failed to parse, and the processor"""
+    Processor = OutputProcessor(Version, StatusSnapshot())
+    Latencies = []
+    ParseErrors = 0
+
+    for Line in Lines:
+        StartTime = Timer()
+
+        try:
+            Processor.ProcessLine(Line)
+
+        except (IndexError, ValueError):
+            ParseErrors += 1
+
+        Latencies.append(Timer() - StartTime)
+
+    return Latencies, ParseErrors, Processor
+
+def MeasureAllocations(Lines, Version):
+    """Return the average number of bytes allocated while processing each line, or None if it can't be measured with this version of python"""
+    if tracemalloc == None or not hasattr(tracemalloc, "reset_peak"):
+        return None
+
+    Processor = OutputProcessor(Version, StatusSnapshot())
+    Total = 0
+
+    tracemalloc.start()
+
+    try:
+        for Line in Lines:
+            Before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+            try:
+                Processor.ProcessLine(Line)
+
+            except (IndexError, ValueError):
+                pass
+
+            Total += tracemalloc.get_traced_memory()[1] - Before
+
+    finally:
+        tracemalloc.stop()
+
+    return Total / len(Lines)
+
+def ReturnCapturedTranscripts():
+    """Return the captured transcripts in TranscriptDirectory, by ddrescue version"""
+    Transcripts = {}
+
+    if not os.path.isdir(TranscriptDirectory):
+        return Transcripts
+
+    for FileName in sorted(os.listdir(TranscriptDirectory)):
+        if FileName.endswith(".txt"):
+            with io.open(os.path.join(TranscriptDirectory, FileName), "rb") as File:
+                Transcripts[FileName[:-4]] = File.read().decode("UTF-8", "replace")
+
+    return Transcripts
+
+def BenchmarkTranscript(Version, Transcript):
+    """Replay Transcript, from the given version of ddrescue, through the output processor, and return the results"""
+    Lines = ReturnLines(Transcript)
+
+    StartTime = Timer()
+    Latencies, ParseErrors, Processor = TimeLines(Lines, Version)
+    Elapsed = Timer() - StartTime
+
+    Latencies.sort()
+
+    return {"LinesPerSecond": len(Lines) / Elapsed,
+            "P99LatencyMicroseconds": Latencies[int(len(Latencies) * 0.99)] * 1000000,
+            "AllocatedBytesPerLine": MeasureAllocations(Lines[:AllocationSampleLines], Version),
+            "ParseErrors": ParseErrors,
+            "GotInitialStatus": Processor.GotInitialStatus,
+            "Lines": len(Lines)}
+
+def FindRegressions(Results, Baseline):
+    """Compare Results with Baseline, and return a list of descriptions of any regressions"""
+    Regressions = []
+
+    for Version in sorted(Results):
+        Result = Results[Version]
+
+        #These are never acceptable.
+        if Result["ParseErrors"] != 0:
+            Regressions.append("ddrescue "+Version+": "+"%d lines failed to parse" % Result["ParseErrors"])
+
+        if not Result["GotInitialStatus"]:
+            Regressions.append("ddrescue "+Version+": didn't get the initial status")
+
+        if Version not in Baseline:
+            continue
+
+        if Result["LinesPerSecond"] < Baseline[Version]["LinesPerSecond"] * (1 - Tolerance):
+            Regressions.append("ddrescue "+Version+": %.0f lines/s, baseline %.0f lines/s" % (Result["LinesPerSecond"], Baseline[Version]["LinesPerSecond"]))
+
+        for Key in ("P99LatencyMicroseconds", "AllocatedBytesPerLine"):
+            if None in (Result[Key], Baseline[Version][Key]):
+                continue
+
+            if Result[Key] > Baseline[Version][Key] * (1 + Tolerance):
+                Regressions.append("ddrescue "+Version+": "+Key+" is %.1f, baseline %.1f" % (Result[Key], Baseline[Version][Key]))
+
+    return Regressions
+
+def Run(Hours=4):
+    """Replay transcripts of every supported version of ddrescue, and any captured ones, through the output processor, and check the results against
+    the baseline for this version of python. Returns False if there were any regressions."""
+    Transcripts = [(Version, Version, Data.ReturnFakeTranscript(Version, Hours)) for Version in Data.TranscriptVersions]
+    Transcripts += [(Version+" (captured)", Version, Transcript) for Version, Transcript in sorted(ReturnCapturedTranscripts().items())]
+    Results = {}
+
+    print("%-16s %9s %12s %14s %16s %7s" % ("Version", "Lines", "Lines/s", "p99 latency", "Alloc bytes/line", "Errors"))
+
+    for Name, Version, Transcript in Transcripts:
+        Result = BenchmarkTranscript(Version, Transcript)
+        Results[Name] = Result
+
+        if Result["AllocatedBytesPerLine"] == None:
+            Allocations = "n/a"
+
+        else:
+            Allocations = "%.1f" % Result["AllocatedBytesPerLine"]
+
+        print("%-16s %9d %12.0f %11.1f us %16s %7d" % (Name, Result["Lines"], Result["LinesPerSecond"], Result["P99LatencyMicroseconds"], Allocations, Result["ParseErrors"]))
+
+    PythonVersion = "%d" % sys.version_info[0]
+
+    with io.open(BaselineFile, encoding="UTF-8") as File:
+        Baselines = json.loads(File.read())
+
+    if UpdateBaseline:
+        #Only replace the baseline for this version of python.
+        Baselines[PythonVersion] = Results
+
+        with io.open(BaselineFile, "w", encoding="UTF-8") as File:
+            File.write("%s" % json.dumps(Baselines, indent=4, separators=(",", ": "), sort_keys=True)+"\n")
+
+        print("\nSaved the results as the new baseline for python "+PythonVersion+".")
+        return True
+
+    if PythonVersion in Baselines:
+        Baseline = Baselines[PythonVersion]
+
+    else:
+        print("\nThere's no baseline for python "+PythonVersion+" (record one with -b), so only checking for parse errors.")
+        Baseline = {}
+
+    Regressions = FindRegressions(Results, Baseline)
+
+    if Regressions != []:
+        print("\nRegressions against the baseline:\n")
+
+        for Regression in Regressions:
+            print("    "+Regression)
+
+        return False
+
+    print("\nNo regressions against the baseline.")
+    return True
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# End-to-end output pipeline benchmarks for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import sys
+import subprocess
+import tempfile
+import shutil
+import time
+
+from Tools.DDRescueTools import outputreader as OutputReader
+from Tools.DDRescueTools.processor import OutputProcessor
+from Tools.DDRescueTools.status import StatusSnapshot
+from Tools.DDRescueTools.outputbuffer import OutputBuffer, OutputHistory
+
+#The fake ddrescue.
+FakeDDRescue = os.path.join(os.path.dirname(os.path.abspath(__file__)), "FakeDDRescue.py")
+
+def RunPipeline(Version, Updates, Directory):
+    """Run the fake ddrescue as fast as it can go, and process its output the way BackendThread does. Returns the time taken, and the final status."""
+    Environment = dict(os.environ, FAKEDDRESCUE_VERSION=Version, FAKEDDRESCUE_RATE="0", FAKEDDRESCUE_UPDATES="%d" % Updates)
+
+    Status = StatusSnapshot()
+    Processor = OutputProcessor(Version, Status)
+    Output = OutputBuffer(History=OutputHistory(os.path.join(Directory, "output.log")))
+
+    StartTime = time.time()
+
+    cmd = subprocess.Popen([sys.executable, FakeDDRescue, "-v", "/dev/null", os.path.join(Directory, "out.img"), os.path.join(Directory, "map")],
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=Environment)
+
+    for Text, Terminator in OutputReader.ReadRecords(cmd.stdout.fileno()):
+        if Text.strip() != "":
+            Processor.ProcessLine(Text)
+
+        Output.Write(Text, Terminator)
+
+    Output.Close()
+    cmd.wait()
+
+    return time.time() - StartTime, Status.Collect()[0]
+
+def Run(Updates=20000):
+    """Measure how many status updates a second the whole output pipeline can handle, for the oldest and newest supported versions of ddrescue"""
+    Directory = tempfile.mkdtemp(prefix="ddrescue-gui-benchmark-")
+    Results = {}
+
+    try:
+        for Version in ("1.14", "1.22"):
+            Elapsed, Status = RunPipeline(Version, Updates, Directory)
+            Results[Version] = Updates / Elapsed
+
+            print("ddrescue %-6s %8d updates in %7.3f s: %10.0f updates/s (recovered %d bytes, %d errors)" % (Version, Updates, Elapsed, Results[Version], Status.RecoveredData, Status.NumErrors))
+
+    finally:
+        shutil.rmtree(Directory)
+
+    return Results
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Terminal model benchmarks for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import time
+
+from Tools.DDRescueTools.terminal import Screen, LineIndex
+
+#Import benchmark data.
+from . import BenchmarkData as Data
+
+class LegacyTextCtrl():
+    """The cursor emulation CustomTextCtrl and MainWindow.UpdateOutputBox() used before the terminal model, on a plain string instead of a wx.TextCtrl"""
+    def __init__(self):
+        self.Value = ""
+        self.InsertionPoint = 0
+
+    def Replace(self, Start, End, Text):
+        self.Value = self.Value[:Start]+Text+self.Value[End:]
+        self.InsertionPoint = Start+len(Text)
+
+    def CustomPositionToXY(self, InsertionPoint):
+        Text = self.Value[0:InsertionPoint]
+
+        NewLines = [0]
+        Counter = 0
+        for Char in Text:
+            Counter += 1
+
+            if Char == "\n":
+                NewLines.append(Counter)
+
+        for NewLine in NewLines:
+            if NewLines.index(NewLine)+1 == len(NewLines) or NewLine == InsertionPoint:
+                LastNewLine = NewLine
+                break
+
+            elif NewLine < InsertionPoint:
+                pass
+
+            else:
+                index = NewLines.index(NewLine)
+                LastNewLine = NewLines[index-1]
+                break
+
+        return (InsertionPoint - LastNewLine, NewLines.index(LastNewLine))
+
+    def CustomXYToPosition(self, Column, Row):
+        NewLines = [0]
+        Counter = 0
+        for Char in self.Value:
+            Counter += 1
+
+            if Char == "\n":
+                NewLines.append(Counter)
+
+        return NewLines[Row] + Column
+
+    def CarriageReturn(self):
+        Text = self.Value[0:self.InsertionPoint]
+
+        NewlineNos = []
+        Counter = 0
+
+        for Char in Text:
+            if Char == "\n":
+                NewlineNos.append(Counter)
+
+            Counter += 1
+
+        if NewlineNos != []:
+            LastNewline = NewlineNos[-1]
+
+        else:
+            LastNewline = -1
+
+        self.InsertionPoint = LastNewline + 1
+
+    def UpOneLine(self):
+        Column, Line = self.CustomPositionToXY(self.InsertionPoint)
+        self.InsertionPoint = self.CustomXYToPosition(Column, Line-1)
+
+    def UpdateOutputBox(self, Line):
+        CRs = []
+        UOLs = []
+        CharNo = 0
+
+        for Char in Line:
+            CharNo += 1
+
+            if Char == "\r":
+                CRs.append(CharNo)
+
+            elif Char == "¬":
+                UOLs.append(CharNo)
+
+        CharNo = 0
+        TempLine = ""
+        for Char in Line:
+            CharNo += 1
+
+            if CharNo not in CRs and CharNo not in UOLs:
+                TempLine += Char
+                if Char == "\n":
+                    self.AddLineToOutputBox(TempLine, CRs, UOLs, CharNo)
+                    TempLine = ""
+
+            else:
+                self.AddLineToOutputBox(TempLine, CRs, UOLs, CharNo)
+                TempLine = ""
+
+    def AddLineToOutputBox(self, Line, CRs, UOLs, CharNo):
+        self.Replace(self.InsertionPoint, self.InsertionPoint+len(Line), Line)
+
+        if CharNo in CRs:
+            self.CarriageReturn()
+
+        elif CharNo in UOLs:
+            self.UpOneLine()
+
+def TimeLegacy(Chunks):
+    """Time the legacy emulation, which was sent ddrescue's output a line at a time with "¬" standing in for cursor-up"""
+    TextCtrl = LegacyTextCtrl()
+    Lines = ''.join(Chunks).replace("\x1b[A", "¬").split("\n")
+
+    StartTime = time.time()
+
+    for Line in Lines:
+        TextCtrl.UpdateOutputBox(Line+"\n")
+
+    return time.time() - StartTime
+
+def TimeScreen(Chunks):
+    """Time the terminal model, including collecting the changed lines after each chunk, as the display would"""
+    Model = Screen()
+
+    StartTime = time.time()
+
+    for Chunk in Chunks:
+        Model.Feed(Chunk)
+        Model.Collect()
+
+    return time.time() - StartTime
+
+def TimeConversions(Text, Lookups, Function):
+    """Time converting Lookups evenly spaced positions to (column, row) and back with Function, which returns an object with the two conversion methods"""
+    Converter = Function(Text)
+    Step = max(len(Text) // Lookups, 1)
+
+    StartTime = time.time()
+
+    for Position in range(0, len(Text), Step):
+        Column, Row = Converter.CustomPositionToXY(Position)
+        Converter.CustomXYToPosition(Column, Row)
+
+    return time.time() - StartTime
+
+class IndexedTextCtrl():
+    """The position conversions CustomTextCtrl does now, on a plain string instead of a wx.TextCtrl"""
+    def __init__(self, Text):
+        self.LineIndex = LineIndex(Text)
+
+    def CustomPositionToXY(self, InsertionPoint):
+        return self.LineIndex.PositionToXY(InsertionPoint)
+
+    def CustomXYToPosition(self, Column, Row):
+        return self.LineIndex.XYToPosition(Column, Row)
+
+def ReturnLegacyTextCtrl(Text):
+    """Return a LegacyTextCtrl holding Text"""
+    TextCtrl = LegacyTextCtrl()
+    TextCtrl.Value = Text
+    return TextCtrl
+
+def Run(Updates=2000, Lookups=200):
+    """Compare how long the legacy cursor emulation and the terminal model take to handle the same output"""
+    Chunks = [Data.ReturnFakeHeader("1.22", 2000398934016)]
+
+    for Text, Stats in Data.GenerateFakeUpdates("1.22", Updates):
+        Chunks.append(Text)
+
+    Results = {}
+
+    for Name, Function in (("Legacy (CustomTextCtrl emulation)", TimeLegacy), ("Terminal model (Screen)", TimeScreen)):
+        Results[Name] = Function(Chunks)
+        print("%-36s %8d updates in %7.3f s: %10.0f updates/s" % (Name, Updates, Results[Name], Updates / Results[Name]))
+
+    print("Speedup: %.1fx" % (Results["Legacy (CustomTextCtrl emulation)"] / Results["Terminal model (Screen)"]))
+
+    #Position conversions on a full output box (1000 lines, the default for the output buffer).
+    Model = Screen()
+
+    for Chunk in Chunks:
+        Model.Feed(Chunk)
+
+    Text = Model.GetText()
+
+    for Name, Function in (("Legacy position conversions", ReturnLegacyTextCtrl), ("Indexed position conversions", IndexedTextCtrl)):
+        Results[Name] = TimeConversions(Text, Lookups, Function)
+        print("%-36s %8d lookups in %7.3f s: %10.0f lookups/s" % (Name, Lookups, Results[Name], Lookups / Results[Name]))
+
+    print("Speedup: %.1fx" % (Results["Legacy position conversions"] / Results["Indexed position conversions"]))
+
+    return Results
@@ -37,6 +37,8 @@ import os
 import sys
 import plistlib
 import traceback
+import tempfile
+import shutil
 from bs4 import BeautifulSoup
 
 #Define the version number and the release date as global variables.
@@ -142,7 +144,25 @@ import Tools
 
 from GetDevInfo.getdevinfo import Main as DevInfoTools
 from Tools.tools import Main as BackendTools
-import Tools.DDRescueTools.setup as DDRescueTools
+from Tools.DDRescueTools.outputbuffer import OutputBuffer, OutputHistory
+from Tools.DDRescueTools.terminal import LineIndex
+from Tools.DDRescueTools.status import StatusSnapshot, FormatSize, FormatTime
+from Tools.DDRescueTools.processor import OutputProcessor
+from Tools.DDRescueTools.process import DDRescueProcess
+from Tools.DDRescueTools.phases import PhaseEngine, ReturnDefaultPlan, EndReasons
+from Tools.DDRescueTools.slowregions import SlowRegionController
+from Tools.DDRescueTools import slowregions as SlowRegions
+from Tools.DDRescueTools.tuning import ClusterSizeTuner, ClusterSizeStore, ChooseClusterSize
+from Tools.DDRescueTools.sessions import Session, SessionScheduler, ReturnControllerKey, ReturnDestinationKey
+from Tools.DDRescueTools.parallel import ParallelImager, ReturnInputSize
+from Tools.MapfileTools.tailer import MapfileTailer
+from Tools.MapfileTools.blockmap import BlockMap
+from Tools.MapfileTools import mapfile as Mapfile
+from Tools.MapfileTools.hashing import ImageHasher
+from Tools.MapfileTools import partitions as Partitions
+from Tools.MapfileTools import allocation as Allocation
+from Tools.MapfileTools.snapshots import SnapshotWriter, PhaseNames
+from Tools.MapfileTools import badregions as BadRegions
 
 #Setup custom-made modules (make global variables accessible inside the packages).
 GetDevInfo.getdevinfo.subprocess = subprocess
@@ -162,6 +182,8 @@ Tools.tools.time = time
 Tools.tools.Linux = Linux
 Tools.tools.ResourcePath = ResourcePath
 
+Tools.DDRescueTools.sessions.logger = logger
+
 #Begin Disk Information Handler thread.
 class GetDiskInformation(threading.Thread):
     def __init__(self, ParentWindow):
@@ -223,116 +245,175 @@ class ShowSplash(wx.SplashScreen):
 class CustomTextCtrl(wx.TextCtrl):
     def __init__(self, parent, id, value, style):
         """Initialise the custom wx.TextCtrl"""
+        #The positions of the newlines in the text, so we don't have to search the whole text to convert between positions and lines.
+        self.LineIndex = LineIndex(value)
+
         wx.TextCtrl.__init__(self, parent, id, value=value, style=style)
 
+        #The number of the first line of the terminal.Screen we're showing, and how many of its lines we're showing.
+        self.FirstLine = 0
+        self.LineCount = 0
+
     def CustomPositionToXY(self, InsertionPoint):
         """A custom version of wx.TextCtrl.PositionToXY() that works on OS X (the built-in one isn't implemented on OS X)."""
-        #Count the number and position of newline characters.
-        Text = self.GetRange(0, InsertionPoint)
-
-        NewLines = [0] #Count the start of the text as a newline.
-        Counter = 0
-        for Char in Text:
-            Counter += 1
-
-            if Char == "\n":
-                NewLines.append(Counter)
-
-        #Find the last newline before our insertion point.
-        for NewLine in NewLines:
-            if NewLines.index(NewLine)+1 == len(NewLines) or NewLine == InsertionPoint:
-                #This is the last newline in the text, or the newline at our insertion point, and therefore the one we want.
-                LastNewLine = NewLine
-                break
+        return self.LineIndex.PositionToXY(InsertionPoint)
 
-            elif NewLine < InsertionPoint:
-                pass
+    def CustomXYToPosition(self, Column, Row):
+        """A custom version of wx.TextCtrl.XYToPosition() that works on OS X (the built-in one isn't implemented on OS X).
+        This is also helpful for Linux because the built-in one has a quirk when you're at the end of the text and it always returns -1"""
+        return self.LineIndex.XYToPosition(Column, Row)
 
-            else:
-                #When this is triggered, the previous newline (last iteration of the loop) is the one we want.
-                index = NewLines.index(NewLine)
-                LastNewLine = NewLines[index-1]
-                break
+    #Keep the newline index up to date whenever the text changes.
+    def ChangeValue(self, Value):
+        wx.TextCtrl.ChangeValue(self, Value)
+        self.LineIndex = LineIndex(Value)
 
-        #Figure out what column we're in (how many chars after the last newline).
-        Column = InsertionPoint - LastNewLine
+    def SetValue(self, Value):
+        wx.TextCtrl.SetValue(self, Value)
+        self.LineIndex = LineIndex(Value)
 
-        #Figure out which line we're on (the number of the last newline).
-        Row = NewLines.index(LastNewLine)
+    def Clear(self):
+        wx.TextCtrl.Clear(self)
+        self.LineIndex = LineIndex()
 
-        return (Column,Row)
+    def Replace(self, Start, End, Text):
+        wx.TextCtrl.Replace(self, Start, End, Text)
+        self.LineIndex.Replace(Start, End, Text)
 
-    def CustomXYToPosition(self, Column, Row):
-        """A custom version of wx.TextCtrl.XYToPosition() that works on OS X (the built-in one isn't implemented on OS X).
-        This is also helpful for Linux because the built-in one has a quirk when you're at the end of the text and it always returns -1"""
-        #Count the number and position of newline characters.
-        Text = self.GetValue()
+    def Remove(self, Start, End):
+        wx.TextCtrl.Remove(self, Start, End)
+        self.LineIndex.Replace(Start, End, "")
 
-        NewLines = [0] #Count the start of the text as a newline.
-        Counter = 0
-        for Char in Text:
-            Counter += 1
+    def AppendText(self, Text):
+        wx.TextCtrl.AppendText(self, Text)
+        self.LineIndex.Replace(self.LineIndex.Length, self.LineIndex.Length, Text)
 
-            if Char == "\n":
-                NewLines.append(Counter)
+    def Reset(self):
+        """Clear the text, ready to show a new terminal.Screen"""
+        self.ChangeValue("")
+        self.FirstLine = 0
+        self.LineCount = 0
 
-        #Get the last newline.
-        LastNewLine = NewLines[Row]
+    def ReplaceLine(self, Row, Text):
+        """Replace the text of the given line (not including its newline)"""
+        Start = self.CustomXYToPosition(0, Row)
 
-        #Our position should be that number plus our column.
-        Position = LastNewLine + Column
+        if Row+1 < self.LineCount:
+            End = self.CustomXYToPosition(0, Row+1) - 1
 
-        return Position
+        else:
+            End = self.LineIndex.Length
 
-    def CarriageReturn(self):
-        """Handles carriage returns in output"""
-        #Go back until the last newline character, and overwrite anything in the way on the next write.
-        #Get the current insertion point.
-        CurrentInsertionPoint = self.GetInsertionPoint()
+        self.Replace(Start, End, Text)
 
-        #Get the text up to the current insertion point.
-        Text = self.GetRange(0, CurrentInsertionPoint)
+    def UpdateLines(self, FirstLine, Lines):
+        """Update the text to match a terminal.Screen, given the number of its first line, and the lines that have changed since the last update"""
+        #Remove lines that have dropped off the start of the screen.
+        Dropped = FirstLine - self.FirstLine
 
-        #Find the last newline char in the text.
-        NewlineNos = []
-        Counter = 0
+        if Dropped >= self.LineCount:
+            self.ChangeValue("")
+            self.LineCount = 0
 
-        for Char in Text:
-            if Char == "\n":
-                NewlineNos.append(Counter)
+        elif Dropped > 0:
+            self.Remove(0, self.CustomXYToPosition(0, Dropped))
+            self.LineCount -= Dropped
 
-            Counter += 1
+        self.FirstLine = FirstLine
 
-        if NewlineNos != []:
-            LastNewline = NewlineNos[-1]
+        #Replace changed lines, and add new ones.
+        for Line in sorted(Lines):
+            Row = Line - FirstLine
 
-        else:
-            #Hacky bit to make the new insertion point 0 :)
-            LastNewline = -1
+            if Row < self.LineCount:
+                self.ReplaceLine(Row, Lines[Line])
 
-        #Set the insertion point to just after that newline, unless we're already there, and in that case set the insertion point just after the previous newline.
-        NewInsertionPoint = LastNewline + 1
+            else:
+                if self.LineCount > 0:
+                    self.AppendText("\n")
 
-        self.SetInsertionPoint(NewInsertionPoint)
+                self.AppendText(Lines[Line])
+                self.LineCount += 1
 
-    def UpOneLine(self):
-        """Handles '\x1b[A' (up one line) in output"""
-        #Go up one line.
-        #Get our Column and Line numbers.
-        Column, Line = self.CustomPositionToXY(self.GetInsertionPoint())
+#End Custom wx.TextCtrl Class.
+#Begin Block Map Panel Class.
+class BlockMapPanel(wx.Panel):
+    #The size of each cell in pixels (including a 1 pixel gap), and the colour of each status, like ddrescueview.
+    CellSize = 6
+    Colours = {"+": (32, 224, 32), "?": (64, 64, 64), "*": (224, 224, 32), "/": (32, 64, 224), "-": (224, 32, 32)}
+
+    def __init__(self, parent):
+        """Initialise the block map panel"""
+        wx.Panel.__init__(self, parent, -1, style=wx.BORDER_SUNKEN)
+        self.SetMinSize(wx.Size(50, 60))
+
+        self.Brushes = dict((ord(Status), wx.Brush(wx.Colour(*Colour))) for Status, Colour in self.Colours.items())
+        self.Brushes[0] = wx.Brush(self.GetBackgroundColour())
+
+        #The latest mapfile, the cells showing it, and the bitmap they're drawn on.
+        self.Map = None
+        self.BlockMap = None
+        self.Bitmap = None
+        self.Columns = 1
+
+        self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_SIZE, self.OnSize)
 
-        #We go up one line, but stay in the same column, so find the integer position of the new insertion point.
-        NewInsertionPoint = self.CustomXYToPosition(Column, Line-1)
+    def SetMapfile(self, Map):
+        """Show a new mapfile, only drawing the cells that have changed"""
+        self.Map = Map
 
-        if NewInsertionPoint == -1:
-            #Invalid Column/Line! Maybe we reached the start of the text in self.OutputBox? Do nothing but log the error.
-            logger.warning("CustomTextCtrl().UpOneLine(): Invalid new insertion point when trying to move up one line! This might mean we've reached that start of the text in the output box.")
+        if self.BlockMap != None:
+            self.DrawCells(self.BlockMap.Update(Map))
+            self.Refresh(False)
 
-        else:
-            #Set the new insertion point.
-            self.SetInsertionPoint(NewInsertionPoint)
+    def Reset(self):
+        """Clear the map, ready for a new recovery"""
+        self.Map = None
+        self.OnSize()
 
-#End Custom wx.TextCtrl Class.
+    def OnSize(self, Event=None):
+        """Work out how many cells fit in the panel, and draw them all"""
+        Width, Height = self.GetClientSizeTuple()
+
+        if Width > 0 and Height > 0:
+            self.Columns = max(Width // self.CellSize, 1)
+            self.BlockMap = BlockMap(self.Columns * max(Height // self.CellSize, 1))
+            self.Bitmap = wx.EmptyBitmap(Width, Height)
+
+            DC = wx.MemoryDC(self.Bitmap)
+            DC.SetBackground(self.Brushes[0])
+            DC.Clear()
+            DC.SelectObject(wx.NullBitmap)
+
+            if self.Map != None:
+                self.DrawCells(self.BlockMap.Update(self.Map))
+
+            self.Refresh(False)
+
+        if Event != None:
+            Event.Skip()
+
+    def DrawCells(self, Cells):
+        """Draw the given cells on the bitmap, all at once"""
+        if Cells == []:
+            return
+
+        Rectangles = [((Cell % self.Columns) * self.CellSize, (Cell // self.Columns) * self.CellSize, self.CellSize - 1, self.CellSize - 1) for Cell in Cells]
+        Brushes = [self.Brushes[self.BlockMap.Statuses[Cell]] for Cell in Cells]
+
+        DC = wx.MemoryDC(self.Bitmap)
+        DC.DrawRectangleList(Rectangles, wx.TRANSPARENT_PEN, Brushes)
+        DC.SelectObject(wx.NullBitmap)
+
+    def OnPaint(self, Event=None):
+        """Copy the bitmap to the screen"""
+        DC = wx.PaintDC(self)
+
+        if self.Bitmap != None:
+            DC.DrawBitmap(self.Bitmap, 0, 0)
+
+#End Block Map Panel Class.
 #Begin Main Window   
 class MainWindow(wx.Frame):
     def __init__(self):
@@ -394,6 +475,9 @@ class MainWindow(wx.Frame):
         AppIcon = wx.Icon(ResourcePath+"/images/Logo.png", wx.BITMAP_TYPE_PNG)
         wx.Frame.SetIcon(self, AppIcon)
 
+        #Keep ddrescue's output in a directory only we can use. We run as root, so a fixed name in /tmp could be replaced with a symlink to any file by anyone.
+        self.OutputHistoryDirectory = tempfile.mkdtemp(prefix="ddrescue-gui-")
+
         #Set some variables
         logger.debug("MainWindow().__init__(): Setting some essential variables...")
         self.SetVars(DDRescueVersion)
@@ -470,8 +554,42 @@ class MainWindow(wx.Frame):
         Settings["MaxErrors"] = ""
         Settings["ClusterSize"] = "-c 128"
 
+        #The input file's partition table, and the partitions to limit the recovery to (with a domain mapfile), or None to recover the whole input file.
+        #DomainAllocations holds the used space of the filesystems in any of those partitions, by partition number, if only that is to be recovered.
+        Settings["PartitionTable"] = None
+        Settings["DomainPartitions"] = None
+        Settings["DomainAllocations"] = {}
+
+        #Whether to run ddrescue once for each phase of a plan (a fast copy first, then the harder parts), rather than once with the options above.
+        Settings["UsePhases"] = False
+
+        #The longest each phase can run for, in seconds, or None to use each phase's default.
+        Settings["PhaseTimeBudget"] = None
+
+        #Whether to skip slow regions while copying, and go back for them later. SlowRegionSettings are the thresholds and backoff for the SlowRegionController, if they aren't the defaults.
+        Settings["SkipSlowRegions"] = False
+        Settings["SlowRegionSettings"] = {}
+
+        #How many ddrescue processes to copy the input with at once, each on its own part of it. More than one is only for healthy, fast disks.
+        Settings["ParallelCopies"] = 1
+
+        #How many times a second to update the display while recovering data.
+        Settings["DisplayRefreshRate"] = 10
+
+        #How many lines of ddrescue's output to keep in the output box, and where to keep all of it.
+        Settings["OutputBufferLines"] = 1000
+        Settings["OutputHistoryFile"] = os.path.join(self.OutputHistoryDirectory, "output.log")
+
+        #Where to keep the best cluster size measured for each model of disk.
+        Settings["ClusterSizeFile"] = os.path.expanduser("~/.ddrescue-gui/clustersizes.json")
+
         #Local to this function.
         self.AbortedRecovery = False
+        self.Backend = None
+
+        #Runs any extra recoveries the user adds in the sessions window, alongside each other. The main recovery counts towards its limits while it's running.
+        self.Scheduler = SessionScheduler()
+        self.MainSession = None
         self.RunTimeSecs = 0
 
         #Set the wildcards and make it easy for the user to find his/her home directory (helps make DDRescue-GUI more user friendly).
@@ -556,8 +674,12 @@ class MainWindow(wx.Frame):
         self.Arrow1 = wx.lib.statbmp.GenStaticBitmap(self.Panel, -1, self.DownArrowImage)
         self.Arrow2 = wx.lib.statbmp.GenStaticBitmap(self.Panel, -1, self.DownArrowImage)
 
-        #Create the progress bar.
+        #Create the progress bar, and the map of the disk from the mapfile.
         self.ProgressBar = wx.Gauge(self.Panel, -1, 5000)
+        self.BlockMapPanel = BlockMapPanel(self.Panel)
+
+        #Create the timer that updates the display with the latest status from the backend thread.
+        self.StatusTimer = wx.Timer(self)
 
     def SetupSizers(self):
         """Setup sizers for MainWindow"""
@@ -638,9 +760,13 @@ class MainWindow(wx.Frame):
 
         #Make the progress sizer.
         self.ProgressSizer = wx.BoxSizer(wx.HORIZONTAL)
+        ProgressBarSizer = wx.BoxSizer(wx.VERTICAL)
 
-        #Add items to the progress sizer.
-        self.ProgressSizer.Add(self.ProgressBar, 1, wx.ALL|wx.ALIGN_CENTER, 10)
+        #Add items to the progress sizers.
+        ProgressBarSizer.Add(self.BlockMapPanel, 1, wx.ALL|wx.EXPAND, 10)
+        ProgressBarSizer.Add(self.ProgressBar, 0, wx.ALL ^ wx.TOP|wx.EXPAND, 10)
+
+        self.ProgressSizer.Add(ProgressBarSizer, 1, wx.ALIGN_CENTER|wx.EXPAND)
         self.ProgressSizer.Add(self.ControlButton, 0, wx.ALL|wx.ALIGN_RIGHT, 10)
 
         #Add items to the main sizer.
@@ -670,6 +796,7 @@ class MainWindow(wx.Frame):
         #Add Menu Items.
         self.MenuExit = FileMenu.Append(wx.ID_ANY, "&Quit", "Close DDRescue-GUI")
         self.MenuSettings = EditMenu.Append(wx.ID_ANY, "&Settings", "Recovery settings")
+        self.MenuSessions = EditMenu.Append(wx.ID_ANY, "Recovery Se&ssions", "Run several recoveries at once")
         self.MenuDiskInfo = ViewMenu.Append(wx.ID_ANY,"&Disk Information", "Information about all detected Disks")
         self.MenuPrivacyPolicy = ViewMenu.Append(wx.ID_ANY,"&Privacy Policy", "View DDRescue-GUI's privacy policy")
         self.MenuAbout = HelpMenu.Append(wx.ID_ANY, "&About DDRescue-GUI", "Information about DDRescue-GUI")
@@ -690,6 +817,7 @@ class MainWindow(wx.Frame):
         """Bind all events for MainWindow"""
         #Menus.
         self.Bind(wx.EVT_MENU, self.ShowSettings, self.MenuSettings)
+        self.Bind(wx.EVT_MENU, self.ShowSessions, self.MenuSessions)
         self.Bind(wx.EVT_MENU, self.OnAbout, self.MenuAbout)
         self.Bind(wx.EVT_MENU, self.ShowDevInfo, self.MenuDiskInfo)
         self.Bind(wx.EVT_MENU, self.ShowPrivacyPolicy, self.MenuPrivacyPolicy)
@@ -719,6 +847,9 @@ class MainWindow(wx.Frame):
         #Size events.
         self.Bind(wx.EVT_SIZE, self.OnSize)
 
+        #Timers.
+        self.Bind(wx.EVT_TIMER, self.DisplayStatus, self.StatusTimer)
+
         #OnExit events.
         self.Bind(wx.EVT_QUERY_END_SESSION, self.SessionEnding)
         self.Bind(wx.EVT_MENU, self.OnExit, self.MenuExit)
@@ -914,6 +1045,11 @@ class MainWindow(wx.Frame):
             Paths = self.CustomInputPathsList
             Others = ["OutputFile", "LogFile"]
 
+            #Any partitions chosen were on the old input file.
+            Settings["PartitionTable"] = None
+            Settings["DomainPartitions"] = None
+            Settings["DomainAllocations"] = {}
+
         elif Type == "Output":
             ChoiceBox = self.OutputChoiceBox
             Paths = self.CustomOutputPathsList
@@ -1102,6 +1238,10 @@ class MainWindow(wx.Frame):
             dlg.ShowModal()
             dlg.Destroy()
 
+    def ShowSessions(self, Event=None):
+        """Show the Recovery Sessions Window"""
+        SessionsWindow(self).Show()
+
     def ShowDevInfo(self, Event=None):
         """Show the Disk Information Window"""
         DevInfoWindow(self).Show()
@@ -1130,6 +1270,9 @@ class MainWindow(wx.Frame):
             dlg.Destroy()
             self.UpdateStatusBar("Ready.")
 
+        elif None not in [Settings["InputFile"], Settings["LogFile"], Settings["OutputFile"]] and not self.ReserveMainRecovery():
+            self.UpdateStatusBar("Ready.")
+
         elif None not in [Settings["InputFile"], Settings["LogFile"], Settings["OutputFile"]]:
             #Attempt to unmount input/output Disks now, if needed.
             logger.info("MainWindow().OnStart(): Unmounting input and output files if needed...")
@@ -1174,6 +1317,8 @@ class MainWindow(wx.Frame):
                         dlg = wx.MessageDialog(self.Panel, "Could not unmount disk "+Disk+"! Please close all other programs and anything that may be accessing this disk (or any of its partitions), like the file manager perhaps, and try again.", "DDRescue-GUI - Error!", wx.OK | wx.ICON_ERROR)
                         dlg.ShowModal()
                         dlg.Destroy()
+                        self.Scheduler.RemoveExternal(self.MainSession)
+                        self.MainSession = None
                         self.UpdateStatusBar("Ready.")
                         return 0
 
@@ -1195,6 +1340,10 @@ class MainWindow(wx.Frame):
             self.ListCtrl.InsertStringItem(index=5, label="Input Position")
             self.ListCtrl.InsertStringItem(index=6, label="Output Position")
             self.ListCtrl.InsertStringItem(index=7, label="Time Since Last Read")
+            self.ListCtrl.InsertStringItem(index=8, label="Non-tried Data")
+            self.ListCtrl.InsertStringItem(index=9, label="Non-trimmed Data")
+            self.ListCtrl.InsertStringItem(index=10, label="Non-scraped Data")
+            self.ListCtrl.InsertStringItem(index=11, label="Bad-sector Data")
             self.ListCtrl.SetColumnWidth(0, 150)
 
             #Second column.
@@ -1206,6 +1355,10 @@ class MainWindow(wx.Frame):
             self.ListCtrl.SetStringItem(index=5, col=1, label="Unknown")
             self.ListCtrl.SetStringItem(index=6, col=1, label="Unknown")
             self.ListCtrl.SetStringItem(index=7, col=1, label="Unknown")
+            self.ListCtrl.SetStringItem(index=8, col=1, label="Unknown")
+            self.ListCtrl.SetStringItem(index=9, col=1, label="Unknown")
+            self.ListCtrl.SetStringItem(index=10, col=1, label="Unknown")
+            self.ListCtrl.SetStringItem(index=11, col=1, label="Unknown")
             self.ListCtrl.SetColumnWidth(1, Width - 150)
 
             logger.info("MainWindow().OnStart(): Settings check complete. Starting BackendThread()...")
@@ -1227,10 +1380,16 @@ class MainWindow(wx.Frame):
             self.MenuSettings.Enable(False)
             self.ControlButton.SetLabel("Abort")
 
+            #Set up the status snapshot and the output buffer, and display them at the configured rate.
+            self.Status = StatusSnapshot()
+            self.Output = OutputBuffer(Settings["OutputBufferLines"], OutputHistory(Settings["OutputHistoryFile"]))
+            self.OutputBox.Reset()
+            self.StatusTimer.Start(1000 // Settings["DisplayRefreshRate"])
+
             #Handle any unexpected errors.
             try:
                 #Start the backend thread.
-                BackendThread(self)
+                self.Backend = BackendThread(self)
 
             except:
                 logger.critical("Unexpected error \n\n"+unicode(traceback.format_exc())+"\n\n while recovering data. Warning user and exiting.")
@@ -1244,81 +1403,81 @@ class MainWindow(wx.Frame):
             self.UpdateStatusBar("Ready.")
 
     #The next functions are to update the display with info from the backend.
-    def SetProgressBarRange(self, Message):
-        """Set the progressbar's range""" 
-        logger.debug("MainWindow().SetProgressBarRange(): Setting range "+unicode(Message)+" for self.ProgressBar...")
-        self.ProgressBar.SetRange(Message)
+    def DisplayStatus(self, Event=None):
+        """Display everything that has changed in the status snapshot since it was last displayed. Called by self.StatusTimer."""
+        Status, Changed = self.Status.Collect()
+
+        if "RecoveredData" in Changed or "DiskCapacity" in Changed:
+            self.UpdateProgress(Status.RecoveredData, Status.DiskCapacity)
+
+        #The disk capacity is only shown as part of the progress.
+        Changed.discard("DiskCapacity")
+
+        #Every other field has a function of the same name to display it.
+        for Field in Changed:
+            getattr(self, "Update"+Field)(getattr(Status, Field))
+
+        Output = self.Output.Collect()
+
+        if Output != None:
+            self.UpdateOutputBox(Output)
 
-    def UpdateTimeElapsed(self, Line):
+    def UpdateTimeElapsed(self, Seconds):
         """Update the time elapsed text"""
-        self.TimeElapsedText.SetLabel(Line)
+        self.TimeElapsedText.SetLabel("Time Elapsed: "+FormatTime(Seconds))
 
-    def UpdateTimeRemaining(self, TimeLeft):
-        self.TimeRemainingText.SetLabel("Time Remaining: "+TimeLeft)
+    def UpdateTimeRemaining(self, Seconds):
+        self.TimeRemainingText.SetLabel("Time Remaining: "+FormatTime(Seconds))
 
     def UpdateRecoveredData(self, RecoveredData):
-        self.ListCtrl.SetStringItem(index=0, col=1, label=RecoveredData)
+        self.ListCtrl.SetStringItem(index=0, col=1, label=FormatSize(RecoveredData))
 
     def UpdateErrorSize(self, ErrorSize):
-        self.ListCtrl.SetStringItem(index=1, col=1, label=ErrorSize)
+        self.ListCtrl.SetStringItem(index=1, col=1, label=FormatSize(ErrorSize))
 
     def UpdateCurrentReadRate(self, CurrentReadRate):
-        self.ListCtrl.SetStringItem(index=2, col=1, label=CurrentReadRate)
+        self.ListCtrl.SetStringItem(index=2, col=1, label=FormatSize(CurrentReadRate, "B/s"))
 
     def UpdateAverageReadRate(self, AverageReadRate):
-        self.ListCtrl.SetStringItem(index=3, col=1, label=AverageReadRate)
+        self.ListCtrl.SetStringItem(index=3, col=1, label=FormatSize(AverageReadRate, "B/s"))
 
     def UpdateNumErrors(self, NumErrors):
-        self.ListCtrl.SetStringItem(index=4, col=1, label=NumErrors)
+        self.ListCtrl.SetStringItem(index=4, col=1, label=unicode(NumErrors))
 
-    def UpdateIpos(self, Ipos):
-        self.ListCtrl.SetStringItem(index=5, col=1, label=Ipos)
+    def UpdateInputPos(self, InputPos):
+        self.ListCtrl.SetStringItem(index=5, col=1, label=FormatSize(InputPos))
 
-    def UpdateOpos(self, Opos):
-        self.ListCtrl.SetStringItem(index=6, col=1, label=Opos)
+    def UpdateOutputPos(self, OutputPos):
+        self.ListCtrl.SetStringItem(index=6, col=1, label=FormatSize(OutputPos))
 
     def UpdateTimeSinceLastRead(self, LastRead):
         self.ListCtrl.SetStringItem(index=7, col=1, label=LastRead)
 
-    def UpdateOutputBox(self, Line):
-        """Update the output box"""
-        CRs = []
-        UOLs = []
-        CharNo = 0
+    def UpdateNonTried(self, NonTried):
+        self.ListCtrl.SetStringItem(index=8, col=1, label=FormatSize(NonTried))
 
-        for Char in Line:
-            CharNo += 1
+    def UpdateNonTrimmed(self, NonTrimmed):
+        self.ListCtrl.SetStringItem(index=9, col=1, label=FormatSize(NonTrimmed))
 
-            if Char == "\r":
-                CRs.append(CharNo)
+    def UpdateNonScraped(self, NonScraped):
+        self.ListCtrl.SetStringItem(index=10, col=1, label=FormatSize(NonScraped))
 
-            elif Char == "¬":
-                UOLs.append(CharNo)
+    def UpdateBadSectorSize(self, BadSectorSize):
+        self.ListCtrl.SetStringItem(index=11, col=1, label=FormatSize(BadSectorSize))
 
-        CharNo = 0
-        TempLine = ""
-        for Char in Line:
-            CharNo += 1
+    def UpdateMapfile(self, Map):
+        """Update the map of the disk"""
+        self.BlockMapPanel.SetMapfile(Map)
 
-            if CharNo not in CRs and CharNo not in UOLs:
-                TempLine += Char
-                if Char == "\n":
-                    self.AddLineToOutputBox(TempLine, CRs, UOLs, CharNo)
-                    TempLine = ""
+    def UpdateStatus(self, Status):
+        """Update the statusbar with ddrescue's latest status message"""
+        self.UpdateStatusBar(Status)
 
-            else:
-                self.AddLineToOutputBox(TempLine, CRs, UOLs, CharNo)
-                TempLine = ""
-
-    def AddLineToOutputBox(self, Line, CRs, UOLs, CharNo):
-        InsertionPoint = self.OutputBox.GetInsertionPoint()
-        self.OutputBox.Replace(InsertionPoint, InsertionPoint+len(Line), Line)
-
-        if CharNo in CRs:
-            self.OutputBox.CarriageReturn()
-
-        elif CharNo in UOLs:
-            self.OutputBox.UpOneLine()
+    def UpdateOutputBox(self, Update):
+        """Update the lines in the output box that have changed, and scroll to the end"""
+        self.OutputBox.UpdateLines(*Update)
+        self.OutputBox.SetInsertionPointEnd()
+        self.OutputBox.ShowPosition(self.OutputBox.GetLastPosition())
 
     def UpdateStatusBar(self, Message):
         """Update the statusbar with a new message"""
@@ -1327,16 +1486,23 @@ class MainWindow(wx.Frame):
 
     def UpdateProgress(self, RecoveredData, DiskCapacity):
         """Update the progressbar and the title"""
-        self.ProgressBar.SetValue(RecoveredData)
-        self.SetTitle("DDRescue-GUI - "+unicode(int(RecoveredData * 100 // DiskCapacity))+"%")
+        #Nothing recovered yet still counts, but the size (and so the percentage) isn't known until ddrescue reports it.
+        if RecoveredData == None or DiskCapacity in (None, 0):
+            return
+
+        #The progressbar has a fixed range, so scale the exact sizes to fit it.
+        self.ProgressBar.SetValue(min(RecoveredData * self.ProgressBar.GetRange() // DiskCapacity, self.ProgressBar.GetRange()))
+        self.SetTitle("DDRescue-GUI - "+unicode(RecoveredData * 100 // DiskCapacity)+"%")
 
     def OnAbort(self):
         """Abort the recovery"""
-        #Ask ddrescue to exit.
-        logger.info("MainWindow().OnAbort(): Attempting to kill ddrescue...")
-        BackendTools().StartProcess("killall ddrescue")
+        #Ask ddrescue to exit. The backend thread escalates if it doesn't, and tells us as soon as it has.
+        logger.info("MainWindow().OnAbort(): Asking ddrescue to exit...")
         self.AbortedRecovery = True
 
+        if self.Backend != None:
+            self.Backend.Abort()
+
         #Disable control button.
         self.ControlButton.Disable()
 
@@ -1344,36 +1510,42 @@ class MainWindow(wx.Frame):
             #Notify user with throbber.
             self.Throbber.Play()
 
-            #Prompt user to try again in 5 seconds time.
-            wx.CallLater(5000, self.PromptToKillDdrescue)
-
-    def PromptToKillDdrescue(self):
-        """Prompts the user to try killing ddrescue again if it's not exiting"""
-        #If we're still recovering data, prompt the user to try killing ddrescue again.
-        if Settings["RecoveringData"]:
-            logger.warning("MainWindow().PromptToKillDdrescue(): ddrescue is still running 5 seconds after attempted abort! Asking user whether to wait or trying killing it again...")
-            dlg = wx.MessageDialog(self.Panel, "Do you want to try to stop ddrescue again, or wait for five more seconds? Click yes to stop ddrescue and no to wait.", "DDRescue is still running!", wx.YES_NO|wx.ICON_QUESTION)
-
-            #Catch errors on wxpython < 2.9.
-            try:
-                if dlg.SetYesNoLabels("Stop DDRescue", "Wait"):
-                    dlg.SetMessage("Do you want to try to stop ddrescue again, or wait for five more seconds?")
+    def ReserveMainRecovery(self):
+        """Tell the recovery sessions' scheduler about the main recovery, so it counts towards the limits on its disk controller and destination, and no session can use the same files.
+        Returns False if a session is using them already."""
+        try:
+            Controller = ReturnControllerKey(Settings["InputFile"])
+            Destination = ReturnDestinationKey(Settings["OutputFile"])
 
-            except AttributeError: pass
+        except (IOError, OSError) as Error:
+            #Only the limits need these, so don't stop the recovery.
+            logger.warning("MainWindow().ReserveMainRecovery(): Couldn't find the controller or destination of the main recovery: "+unicode(Error)+". Continuing without them...")
+            Controller = "device:"+Settings["InputFile"]
+            Destination = "device:"+Settings["OutputFile"]
 
-            if dlg.ShowModal() == wx.ID_YES:
-                logger.warning("MainWindow().PromptToKillDdrescue(): Trying to kill ddrescue again...")
-                self.OnAbort()
+        MainSession = Session("The main recovery", None, Settings["InputFile"], Settings["OutputFile"], Settings["LogFile"], Settings["DDRescueVersion"], Controller, Destination)
 
-            else:
-                #Prompt user to try again in 5 seconds time.
-                logger.warning("MainWindow().PromptToKillDdrescue(): Ask user again in 5 sconds time if ddrescue hasn't stopped...")
-                wx.CallLater(5000, self.PromptToKillDdrescue)
+        try:
+            self.Scheduler.AddExternal(MainSession)
 
+        except ValueError as Error:
+            logger.error("MainWindow().ReserveMainRecovery(): A recovery session is using the same files: "+unicode(Error)+". Aborting recovery...")
+            dlg = wx.MessageDialog(self.Panel, "A recovery session in the Recovery Sessions window is using the same files: "+unicode(Error)+". Please wait for it to finish, or abort it, first.", "DDRescue-GUI - Error!", wx.OK | wx.ICON_ERROR)
+            dlg.ShowModal()
             dlg.Destroy()
+            return False
+
+        self.MainSession = MainSession
+        return True
 
     def RecoveryEnded(self, Result, DiskCapacity, RecoveredData, ReturnCode=None):
         """Called to show FinishedWindow when a recovery is completed or aborted by the user"""
+        #Let queued recovery sessions use the main recovery's disk controller and destination.
+        if self.MainSession != None:
+            self.MainSession.State = "Finished"
+            self.Scheduler.RemoveExternal(self.MainSession)
+            self.MainSession = None
+
         #Return immediately if session is ending.
         if SessionEnding:
             return True
@@ -1381,11 +1553,15 @@ class MainWindow(wx.Frame):
         self.DiskCapacity = DiskCapacity
         self.RecoveredData = RecoveredData
 
+        #Stop updating the display, and show the final status.
+        self.StatusTimer.Stop()
+        self.DisplayStatus()
+
         #Stop the throbber.
         self.Throbber.Stop()
 
         #Set time remaining to 0s (sometimes doesn't happen).
-        self.UpdateTimeRemaining("0 seconds")
+        self.UpdateTimeRemaining(0)
 
         #Handle any errors.
         if self.AbortedRecovery:
@@ -1422,7 +1598,7 @@ class MainWindow(wx.Frame):
             logger.info("MainWindow().RecoveryEnded(): Recovery finished!")
 
             #Check if we got all the data.
-            if self.ProgressBar.GetValue() >= self.ProgressBar.GetRange():
+            if None not in (DiskCapacity, RecoveredData) and RecoveredData >= DiskCapacity:
                 Message = "Your recovery is complete, with all data recovered from your source disk/file.\n\nNote: If you wish to, you may now use DDRescue-GUI to mount your destination drive/file so you can access your data."
 
                 #Notify the user.
@@ -1462,7 +1638,7 @@ class MainWindow(wx.Frame):
         self.MenuSettings.Enable(True)
 
         #Reset recovery information.
-        self.OutputBox.Clear()
+        self.OutputBox.Reset()
         self.ListCtrl.ClearAll()
         self.ListCtrl.InsertColumn(col=0, heading="Category", format=wx.LIST_FORMAT_CENTRE, width=-1)
         self.ListCtrl.InsertColumn(col=1, heading="Value", format=wx.LIST_FORMAT_CENTRE, width=-1)
@@ -1470,8 +1646,9 @@ class MainWindow(wx.Frame):
         self.TimeRemainingText.SetLabel("Time Remaining:")
         self.TimeElapsedText.SetLabel("Time Elapsed:")
 
-        #Reset the ProgressBar
+        #Reset the ProgressBar and the map of the disk.
         self.ProgressBar.SetValue(0)
+        self.BlockMapPanel.Reset()
 
         #Reset essential variables.
         self.SetVars(DDRescueVersion)
@@ -1516,10 +1693,12 @@ class MainWindow(wx.Frame):
 
         #Check if the session is ending.
         if SessionEnding:
-            #Stop the backend thread, delete the log file and exit ASAP.
+            #Stop the backend thread and any other sessions, delete the log file and exit ASAP.
             self.OnAbort()
+            self.Scheduler.AbortAll()
             logging.shutdown()
             os.remove("/tmp/ddrescue-gui.log")
+            shutil.rmtree(self.OutputHistoryDirectory, ignore_errors=True)
             self.Destroy()
 
         #Check if DDRescue-GUI is recovering data.
@@ -1530,6 +1709,13 @@ class MainWindow(wx.Frame):
             dlg.Destroy()
             return True
 
+        if self.Scheduler.IsBusy():
+            logger.error("MainWindow().OnExit(): Can't exit while recovery sessions are running or queued! Aborting exit attempt...")
+            dlg = wx.MessageDialog(self.Panel, "You can't exit DDRescue-GUI while recovery sessions are running or queued! Abort them in the Recovery Sessions window first.", "DDRescue-GUI - Error!", wx.OK | wx.ICON_ERROR)
+            dlg.ShowModal()
+            dlg.Destroy()
+            return True
+
         logger.info("MainWindow().OnExit(): Double-checking the exit attempt with the user...")
         dlg = wx.MessageDialog(self.Panel, 'Are you sure you want to exit?', 'DDRescue-GUI - Question!', wx.YES_NO | wx.ICON_QUESTION)
         Answer = dlg.ShowModal()
@@ -1582,8 +1768,9 @@ class MainWindow(wx.Frame):
                 dlg.ShowModal()
                 dlg.Destroy()
 
-            #Delete the log file, and don't bother handling any errors, because this is run as root.
+            #Delete the log file and ddrescue's output, and don't bother handling any errors, because this is run as root.
             os.remove('/tmp/ddrescue-gui.log')
+            shutil.rmtree(self.OutputHistoryDirectory, ignore_errors=True)
 
             #If we're running on linux and using wayland, remove the workaround we have to use to make this work.
             #XXX Fix for running on Wayland until we get policy kit stuff done.
@@ -1819,6 +2006,8 @@ class SettingsWindow(wx.Frame):
         self.FastRecButton = wx.Button(self.Panel, -1, "Set to fastest recovery")
         self.BestRecButton = wx.Button(self.Panel, -1, "Set to best recovery")
         self.DefaultRecButton = wx.Button(self.Panel, -1, "Balanced (default)")
+        self.PartitionsButton = wx.Button(self.Panel, -1, "Choose partitions to recover")
+        self.TuneButton = wx.Button(self.Panel, -1, "Measure")
         self.ExitButton = wx.Button(self.Panel, -1, "Save settings and close") 
 
     def CreateText(self):
@@ -1827,6 +2016,9 @@ class SettingsWindow(wx.Frame):
         self.BadSectText = wx.StaticText(self.Panel, -1, "No. of times to retry bad sectors:")
         self.MaxErrorsText = wx.StaticText(self.Panel, -1, "Maximum number of errors before exiting:")
         self.ClustSizeText = wx.StaticText(self.Panel, -1, "Number of clusters to copy at a time:")
+        self.MinReadRateText = wx.StaticText(self.Panel, -1, "Skip regions slower than:")
+        self.PhaseBudgetText = wx.StaticText(self.Panel, -1, "Longest time for each phase:")
+        self.ParallelText = wx.StaticText(self.Panel, -1, "Copies to run at once (for healthy, fast disks only):")
 
     def CreateCheckBoxes(self):
         """Create all CheckBoxes for SettingsWindow, and set their default states (all unchecked)"""
@@ -1835,12 +2027,17 @@ class SettingsWindow(wx.Frame):
         self.ReverseCB = wx.CheckBox(self.Panel, -1, "Read the input file/disk backwards")
         self.PreallocCB = wx.CheckBox(self.Panel, -1, "Preallocate space on disc for output file/disk")
         self.NoSplitCB = wx.CheckBox(self.Panel, -1, "Do a soft run (don't attempt to read bad sectors)")
+        self.PhasesCB = wx.CheckBox(self.Panel, -1, "Recover in phases (copy the easy parts first, then go back for the rest)")
+        self.SkipSlowCB = wx.CheckBox(self.Panel, -1, "Skip slow regions while copying, and go back for them later")
 
     def CreateChoiceBoxes(self):
         """Create all ChoiceBoxes for SettingsWindow, and call self.SetDefaultRec()"""
         self.BadSectChoice = wx.Choice(self.Panel, -1, choices=['0', '1', 'Default (2)', '3', '5', 'Forever'])  
         self.MaxErrorsChoice = wx.Choice(self.Panel, -1, choices=['Default (Infinite)', '1000', '500', '100', '50', '10'])
         self.ClustSizeChoice = wx.Choice(self.Panel, -1, choices=['256', 'Default (128)', '64', '32']) 
+        self.MinReadRateChoice = wx.Choice(self.Panel, -1, choices=['64 kB/s', '256 kB/s', 'Default (1 MB/s)', '4 MB/s', '16 MB/s'])
+        self.PhaseBudgetChoice = wx.Choice(self.Panel, -1, choices=['30 minutes', '1 hour', '4 hours', 'Default (2 to 12 hours)', '24 hours', '48 hours'])
+        self.ParallelChoice = wx.Choice(self.Panel, -1, choices=['Default (1)', '2', '4', '8'])
 
         #Set default settings.
         self.SetDefaultRec()
@@ -1862,6 +2059,22 @@ class SettingsWindow(wx.Frame):
         ClustSizeSizer = wx.BoxSizer(wx.HORIZONTAL)
         ClustSizeSizer.Add(self.ClustSizeText, 1, wx.LEFT|wx.RIGHT|wx.ALIGN_CENTER, 10)
         ClustSizeSizer.Add(self.ClustSizeChoice, 1, wx.RIGHT|wx.ALIGN_CENTER, 10)
+        ClustSizeSizer.Add(self.TuneButton, 0, wx.RIGHT|wx.ALIGN_CENTER, 10)
+
+        #Phase time budget sizer.
+        PhaseBudgetSizer = wx.BoxSizer(wx.HORIZONTAL)
+        PhaseBudgetSizer.Add(self.PhaseBudgetText, 1, wx.LEFT|wx.RIGHT|wx.ALIGN_CENTER, 10)
+        PhaseBudgetSizer.Add(self.PhaseBudgetChoice, 1, wx.RIGHT|wx.ALIGN_CENTER, 10)
+
+        #Minimum read rate sizer.
+        MinReadRateSizer = wx.BoxSizer(wx.HORIZONTAL)
+        MinReadRateSizer.Add(self.MinReadRateText, 1, wx.LEFT|wx.RIGHT|wx.ALIGN_CENTER, 10)
+        MinReadRateSizer.Add(self.MinReadRateChoice, 1, wx.RIGHT|wx.ALIGN_CENTER, 10)
+
+        #Parallel copies sizer.
+        ParallelSizer = wx.BoxSizer(wx.HORIZONTAL)
+        ParallelSizer.Add(self.ParallelText, 1, wx.LEFT|wx.RIGHT|wx.ALIGN_CENTER, 10)
+        ParallelSizer.Add(self.ParallelChoice, 1, wx.RIGHT|wx.ALIGN_CENTER, 10)
 
         #Make a sizer for the best and fastest recovery buttons now, and add the objects.
         ButtonSizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -1878,14 +2091,20 @@ class SettingsWindow(wx.Frame):
         MainSizer.Add(self.ReverseCB, 3, wx.CENTER|wx.ALL, 5)
         MainSizer.Add(self.PreallocCB, 3, wx.CENTER|wx.ALL, 5)
         MainSizer.Add(self.NoSplitCB, 3, wx.CENTER|wx.ALL, 5)
+        MainSizer.Add(self.PhasesCB, 3, wx.CENTER|wx.ALL, 5)
+        MainSizer.Add(self.SkipSlowCB, 3, wx.CENTER|wx.ALL, 5)
         MainSizer.Add(self.OverwriteCB, 3, wx.CENTER|wx.ALL, 5)
 
         #Choice box sizers.
         MainSizer.Add(RetryBSSizer, 4, wx.CENTER|wx.EXPAND|wx.ALL, 10)
         MainSizer.Add(MaxErrorsSizer, 4, wx.CENTER|wx.EXPAND|wx.ALL, 10)
         MainSizer.Add(ClustSizeSizer, 4, wx.CENTER|wx.EXPAND|wx.ALL, 10)
+        MainSizer.Add(PhaseBudgetSizer, 4, wx.CENTER|wx.EXPAND|wx.ALL, 10)
+        MainSizer.Add(MinReadRateSizer, 4, wx.CENTER|wx.EXPAND|wx.ALL, 10)
+        MainSizer.Add(ParallelSizer, 4, wx.CENTER|wx.EXPAND|wx.ALL, 10)
 
         #Add the buttons, and the button sizer.
+        MainSizer.Add(self.PartitionsButton, 4, wx.CENTER|wx.ALL, 10)
         MainSizer.Add(self.DefaultRecButton, 4, wx.CENTER|wx.ALL, 10)
         MainSizer.Add(ButtonSizer, 4, wx.CENTER|wx.EXPAND|wx.ALL, 10)
         MainSizer.Add(self.ExitButton, 4, wx.CENTER|wx.ALL, 10)
@@ -1898,9 +2117,14 @@ class SettingsWindow(wx.Frame):
     def BindEvents(self):
         """Bind all events for SettingsWindow"""
         self.Bind(wx.EVT_CHECKBOX, self.SetSoftRun, self.NoSplitCB)
+        self.Bind(wx.EVT_CHECKBOX, self.SetPhases, self.PhasesCB)
+        self.Bind(wx.EVT_CHECKBOX, self.SetSkipSlow, self.SkipSlowCB)
+        self.Bind(wx.EVT_CHOICE, self.SetParallel, self.ParallelChoice)
         self.Bind(wx.EVT_BUTTON, self.SetDefaultRec, self.DefaultRecButton)
         self.Bind(wx.EVT_BUTTON, self.SetFastRec, self.FastRecButton)
         self.Bind(wx.EVT_BUTTON, self.SetBestRec, self.BestRecButton)
+        self.Bind(wx.EVT_BUTTON, self.ChoosePartitions, self.PartitionsButton)
+        self.Bind(wx.EVT_BUTTON, self.MeasureClusterSize, self.TuneButton)
         self.Bind(wx.EVT_BUTTON, self.SaveOptions, self.ExitButton)
         self.Bind(wx.EVT_CLOSE, self.SaveOptions)
 
@@ -1947,6 +2171,41 @@ class SettingsWindow(wx.Frame):
             #Enable self.BadSectChoice.
             self.BadSectChoice.Enable()
 
+        #Recover in phases option.
+        self.PhasesCB.SetValue(Settings["UsePhases"])
+
+        if Settings["PhaseTimeBudget"] == None:
+            self.PhaseBudgetChoice.SetStringSelection("Default (2 to 12 hours)")
+
+        elif Settings["PhaseTimeBudget"] < 3600:
+            self.PhaseBudgetChoice.SetStringSelection(unicode(Settings["PhaseTimeBudget"] // 60)+" minutes")
+
+        else:
+            self.PhaseBudgetChoice.SetStringSelection(unicode(Settings["PhaseTimeBudget"] // 3600)+" hour"+("s" if Settings["PhaseTimeBudget"] > 3600 else ""))
+
+        self.SetPhases()
+
+        #Skip slow regions option, and the read rate they're slower than.
+        self.SkipSlowCB.SetValue(Settings["SkipSlowRegions"])
+        MinReadRate = Settings["SlowRegionSettings"].get("MinReadRate", 1000000)
+
+        if MinReadRate == 1000000:
+            self.MinReadRateChoice.SetStringSelection("Default (1 MB/s)")
+
+        else:
+            self.MinReadRateChoice.SetStringSelection(FormatSize(MinReadRate, "B/s").replace(".00", ""))
+
+        self.SetSkipSlow()
+
+        #Parallel copies option.
+        if Settings["ParallelCopies"] == 1:
+            self.ParallelChoice.SetStringSelection("Default (1)")
+
+        else:
+            self.ParallelChoice.SetStringSelection(unicode(Settings["ParallelCopies"]))
+
+        self.SetParallel()
+
         #ChoiceBoxes:
         #Retry bad sectors option.
         if Settings["BadSectorRetries"] == "-r 2":
@@ -1972,6 +2231,19 @@ class SettingsWindow(wx.Frame):
         else:
             self.ClustSizeChoice.SetStringSelection(Settings["ClusterSize"][3:])
 
+        #If the default hasn't been changed, use the best cluster size measured before for this model of input disk, if there is one.
+        if Settings["ClusterSize"] == "-c 128" and self.ReturnDeviceModel() != None:
+            try:
+                ClusterSize = ClusterSizeStore(Settings["ClusterSizeFile"]).Get(self.ReturnDeviceModel())
+
+            except (IOError, OSError, ValueError) as Error:
+                logger.warning("SettingsWindow().SetupOptions(): Couldn't read the measured cluster sizes: "+unicode(Error)+". Ignoring them...")
+                ClusterSize = None
+
+            if ClusterSize != None:
+                logger.info("SettingsWindow().SetupOptions(): Using the cluster size measured before for "+self.ReturnDeviceModel()+": "+unicode(ClusterSize)+"...")
+                self.SelectClusterSize(ClusterSize)
+
     def SetSoftRun(self, Event=None):
         """Set up SettingsWindow based on the value of self.NoSplitCB (the "do soft run" CheckBox)"""
         logger.debug("SettingsWindow().SetSoftRun(): Do soft run: "+unicode(self.NoSplitCB.GetValue())+". Setting up SettingsWindow accordingly...")
@@ -1984,6 +2256,55 @@ class SettingsWindow(wx.Frame):
             self.BadSectChoice.Enable()
             self.SetDefaultRec()
 
+    def SetPhases(self, Event=None):
+        """Set up SettingsWindow based on the value of self.PhasesCB. Each phase sets its own direction and whether to scrape, and the bad sector retries are used for the last one."""
+        logger.debug("SettingsWindow().SetPhases(): Recover in phases: "+unicode(self.PhasesCB.GetValue())+". Setting up SettingsWindow accordingly...")
+
+        if self.PhasesCB.IsChecked():
+            self.ReverseCB.SetValue(False)
+            self.ReverseCB.Disable()
+
+            if self.NoSplitCB.IsChecked():
+                self.NoSplitCB.SetValue(False)
+                self.SetSoftRun()
+
+            self.NoSplitCB.Disable()
+            self.PhaseBudgetChoice.Enable()
+
+        else:
+            self.ReverseCB.Enable()
+            self.NoSplitCB.Enable()
+            self.PhaseBudgetChoice.Disable()
+
+    def SetSkipSlow(self, Event=None):
+        """Set up SettingsWindow based on the value of self.SkipSlowCB"""
+        logger.debug("SettingsWindow().SetSkipSlow(): Skip slow regions: "+unicode(self.SkipSlowCB.GetValue())+". Setting up SettingsWindow accordingly...")
+
+        if self.SkipSlowCB.IsChecked():
+            self.MinReadRateChoice.Enable()
+
+        else:
+            self.MinReadRateChoice.Disable()
+
+    def SetParallel(self, Event=None):
+        """Set up SettingsWindow based on the value of self.ParallelChoice. Parallel copies always read forwards, and can't be combined with recovering in phases or skipping slow regions."""
+        logger.debug("SettingsWindow().SetParallel(): Copies to run at once: "+self.ParallelChoice.GetStringSelection()+". Setting up SettingsWindow accordingly...")
+
+        if self.ParallelChoice.GetStringSelection() != "Default (1)":
+            for CheckBox in (self.PhasesCB, self.SkipSlowCB):
+                CheckBox.SetValue(False)
+                CheckBox.Disable()
+
+            self.SetPhases()
+            self.SetSkipSlow()
+            self.ReverseCB.SetValue(False)
+            self.ReverseCB.Disable()
+
+        else:
+            self.PhasesCB.Enable()
+            self.SkipSlowCB.Enable()
+            self.SetPhases()
+
     def SetDefaultRec(self, Event=None):
         """Set selections for the Choiceboxes to default settings"""
         logger.debug("SettingsWindow().SetDefaultRec(): Setting up SettingsWindow for default recovery settings...")
@@ -2013,6 +2334,153 @@ class SettingsWindow(wx.Frame):
         self.MaxErrorsChoice.SetSelection(0)
         self.ClustSizeChoice.SetSelection(3)
 
+    def ChoosePartitions(self, Event=None):
+        """Read the input file's partition table, and let the user choose which partitions to recover. The rest of the input file is skipped, using a domain mapfile."""
+        if Settings["InputFile"] == None:
+            dlg = wx.MessageDialog(self.Panel, "Please select your input file first.", "DDRescue-GUI - Warning", wx.OK | wx.ICON_EXCLAMATION)
+            dlg.ShowModal()
+            dlg.Destroy()
+            return
+
+        logger.info("SettingsWindow().ChoosePartitions(): Reading the partition table on "+Settings["InputFile"]+"...")
+
+        try:
+            with open(Settings["InputFile"], "rb") as File:
+                try:
+                    Table = Partitions.ReadPartitionTable(File)
+
+                except ValueError:
+                    #It might be a single filesystem without a partition table (eg a partition, or an image of one).
+                    Used = Allocation.ReadAllocation(File)
+                    Table = Partitions.PartitionTable("None", 512)
+                    Table.Partitions.append(Partitions.Partition(1, 0, Used.Size, Used.Type))
+
+        except (IOError, OSError, ValueError) as Error:
+            logger.error("SettingsWindow().ChoosePartitions(): Couldn't read the partition table: "+unicode(Error)+". Warning user...")
+            dlg = wx.MessageDialog(self.Panel, "Couldn't read the partition table on your input file, so the whole of it will be recovered.\n\nThe error was:\n\n"+unicode(Error), "DDRescue-GUI - Warning", wx.OK | wx.ICON_EXCLAMATION)
+            dlg.ShowModal()
+            dlg.Destroy()
+            return
+
+        Choices = ["Partition "+unicode(Partition.Number)+": "+FormatSize(Partition.Size)+", "+Partition.GetTypeName()+(" ("+Partition.Name+")" if Partition.Name != "" else "") for Partition in Table.Partitions]
+
+        dlg = wx.MultiChoiceDialog(self.Panel, "Choose the partitions to recover. The partition table is always recovered. Choose none to recover the whole input file.", "DDRescue-GUI - Choose Partitions", Choices)
+
+        if Settings["DomainPartitions"] != None:
+            ChosenNumbers = [Partition.Number for Partition in Settings["DomainPartitions"]]
+            dlg.SetSelections([Index for Index, Partition in enumerate(Table.Partitions) if Partition.Number in ChosenNumbers])
+
+        if dlg.ShowModal() == wx.ID_OK:
+            Chosen = [Table.Partitions[Selection] for Selection in dlg.GetSelections()]
+
+            if Chosen == []:
+                logger.info("SettingsWindow().ChoosePartitions(): Recovering the whole input file...")
+                Settings["PartitionTable"] = None
+                Settings["DomainPartitions"] = None
+
+            else:
+                logger.info("SettingsWindow().ChoosePartitions(): Recovering partitions: "+', '.join(unicode(Partition.Number) for Partition in Chosen)+"...")
+                Settings["PartitionTable"] = Table
+                Settings["DomainPartitions"] = Chosen
+                Settings["DomainAllocations"] = self.ChooseAllocations(Chosen)
+
+        dlg.Destroy()
+
+    def ReturnDeviceModel(self):
+        """Return the vendor and product of the input disk, or None if it's a file, or we don't know about it"""
+        if Settings["InputFile"] not in DiskInfo:
+            return None
+
+        return DiskInfo[Settings["InputFile"]]["Vendor"]+" "+DiskInfo[Settings["InputFile"]]["Product"]
+
+    def SelectClusterSize(self, ClusterSize):
+        """Select ClusterSize (in sectors) in self.ClustSizeChoice"""
+        if ClusterSize == 128:
+            self.ClustSizeChoice.SetStringSelection("Default (128)")
+
+        else:
+            self.ClustSizeChoice.SetStringSelection(unicode(ClusterSize))
+
+    def MeasureClusterSize(self, Event=None):
+        """Time short reads from a few places on the input file at each cluster size, select the fastest, and remember it for this model of disk"""
+        if Settings["InputFile"] == None:
+            dlg = wx.MessageDialog(self.Panel, "Please select your input file first.", "DDRescue-GUI - Warning", wx.OK | wx.ICON_EXCLAMATION)
+            dlg.ShowModal()
+            dlg.Destroy()
+            return
+
+        dlg = wx.MessageDialog(self.Panel, "This will spend a few seconds reading from a few places on your input file/disk at each cluster size, and choose the fastest. If your input disk is badly damaged, you may not want to do this, as every read may make it worse. Do you want to continue?", "DDRescue-GUI - Question", wx.YES_NO | wx.ICON_QUESTION)
+        Answer = dlg.ShowModal()
+        dlg.Destroy()
+
+        if Answer != wx.ID_YES:
+            return
+
+        SectorSize = int(DevInfoTools().GetBlockSize(Settings["InputFile"]) or 512)
+        logger.info("SettingsWindow().MeasureClusterSize(): Measuring the read speed of "+Settings["InputFile"]+" at each cluster size, with "+unicode(SectorSize)+" byte sectors...")
+
+        Busy = wx.BusyCursor()
+
+        try:
+            Tuner = ClusterSizeTuner(Settings["InputFile"], SectorSize)
+            Results = Tuner.Run()
+            ClusterSize = ChooseClusterSize(Results)
+
+        except (IOError, OSError, ValueError) as Error:
+            del Busy
+            logger.error("SettingsWindow().MeasureClusterSize(): Couldn't measure the read speed: "+unicode(Error)+". Warning user...")
+            dlg = wx.MessageDialog(self.Panel, "Couldn't measure the read speed of your input file/disk, so the cluster size hasn't been changed.\n\nThe error was:\n\n"+unicode(Error), "DDRescue-GUI - Warning", wx.OK | wx.ICON_EXCLAMATION)
+            dlg.ShowModal()
+            dlg.Destroy()
+            return
+
+        del Busy
+        Speeds = '\n'.join(unicode(Size)+": "+FormatSize(Results[Size], "B/s") for Size in sorted(Results))
+        logger.info("SettingsWindow().MeasureClusterSize(): Best cluster size: "+unicode(ClusterSize)+". Read speeds: "+Speeds.replace("\n", ", ")+"...")
+        self.SelectClusterSize(ClusterSize)
+        Message = "The fastest cluster size is "+unicode(ClusterSize)+", and it has been selected. The read speeds at each cluster size were:\n\n"+Speeds
+
+        #Reads through the page cache measure memory, not the disk, so don't remember them.
+        if not Tuner.UsingDirect:
+            logger.warning("SettingsWindow().MeasureClusterSize(): Couldn't use direct reads, so the speeds may be from the page cache. Not remembering the cluster size for this model...")
+            Message += "\n\nYour input file/disk couldn't be read directly, so these speeds may come from data your computer had cached in memory rather than from the disk itself. The cluster size hasn't been remembered for this model of disk."
+
+        #Remember it for this model of disk, so it doesn't have to be measured again.
+        elif self.ReturnDeviceModel() != None:
+            try:
+                Store = ClusterSizeStore(Settings["ClusterSizeFile"])
+                Store.Set(self.ReturnDeviceModel(), ClusterSize, Results, SectorSize)
+                Store.Save()
+
+            except (IOError, OSError, ValueError) as Error:
+                logger.warning("SettingsWindow().MeasureClusterSize(): Couldn't save the measured cluster size: "+unicode(Error)+". Continuing...")
+
+        dlg = wx.MessageDialog(self.Panel, Message, "DDRescue-GUI - Information", wx.OK | wx.ICON_INFORMATION)
+        dlg.ShowModal()
+        dlg.Destroy()
+
+    def ChooseAllocations(self, Chosen):
+        """Ask the user whether to only recover the used space of any ext2/3/4 or NTFS filesystems in the Chosen partitions, and return the allocation of each one, by partition number"""
+        dlg = wx.MessageDialog(self.Panel, "Do you want to skip the free space in your chosen partitions? This is only possible for ext2/3/4 and NTFS filesystems, and means deleted files can't be recovered from the output file, but the recovery will be much faster if the filesystems aren't full.", "DDRescue-GUI - Question", wx.YES_NO | wx.ICON_QUESTION)
+        Answer = dlg.ShowModal()
+        dlg.Destroy()
+
+        if Answer != wx.ID_YES:
+            return {}
+
+        Allocations = {}
+
+        with open(Settings["InputFile"], "rb") as File:
+            for Partition in Chosen:
+                try:
+                    Allocations[Partition.Number] = Allocation.ReadAllocation(File, Partition.Start)
+                    logger.info("SettingsWindow().ChooseAllocations(): Partition "+unicode(Partition.Number)+": "+Allocations[Partition.Number].Type+", "+FormatSize(Allocations[Partition.Number].GetAllocatedBytes())+" used...")
+
+                except (IOError, OSError, ValueError) as Error:
+                    logger.warning("SettingsWindow().ChooseAllocations(): Couldn't read the used space of partition "+unicode(Partition.Number)+": "+unicode(Error)+". Recovering all of it...")
+
+        return Allocations
+
     def SaveOptions(self, Event=None):
         """Save all options, and exit SettingsWindow"""
         logger.info("SettingsWindow().SaveOptions(): Saving Options...")
@@ -2077,6 +2545,43 @@ class SettingsWindow(wx.Frame):
 
         logger.info("SettingsWindow().SaveOptions(): Split failed blocks: "+unicode(not bool(Settings["NoSplit"]))+".")
 
+        #Recover in phases option.
+        Settings["UsePhases"] = self.PhasesCB.IsChecked()
+        PhaseBudgetSelection = self.PhaseBudgetChoice.GetStringSelection()
+
+        if PhaseBudgetSelection == "Default (2 to 12 hours)":
+            Settings["PhaseTimeBudget"] = None
+
+        else:
+            Number, Unit = PhaseBudgetSelection.split()
+            Settings["PhaseTimeBudget"] = int(Number) * {"minutes": 60, "hour": 3600, "hours": 3600}[Unit]
+
+        logger.info("SettingsWindow().SaveOptions(): Recover in phases: "+unicode(Settings["UsePhases"])+", for at most "+PhaseBudgetSelection+" each.")
+
+        #Skip slow regions option.
+        Settings["SkipSlowRegions"] = self.SkipSlowCB.IsChecked()
+        MinReadRateSelection = self.MinReadRateChoice.GetStringSelection()
+
+        if MinReadRateSelection == "Default (1 MB/s)":
+            Settings["SlowRegionSettings"].pop("MinReadRate", None)
+
+        else:
+            Number, Unit = MinReadRateSelection.split()
+            Settings["SlowRegionSettings"]["MinReadRate"] = int(Number) * {"kB/s": 1000, "MB/s": 1000000}[Unit]
+
+        logger.info("SettingsWindow().SaveOptions(): Skip slow regions: "+unicode(Settings["SkipSlowRegions"])+", slower than "+MinReadRateSelection+".")
+
+        #Parallel copies option.
+        ParallelSelection = self.ParallelChoice.GetStringSelection()
+
+        if ParallelSelection == "Default (1)":
+            Settings["ParallelCopies"] = 1
+
+        else:
+            Settings["ParallelCopies"] = int(ParallelSelection)
+
+        logger.info("SettingsWindow().SaveOptions(): Copies to run at once: "+unicode(Settings["ParallelCopies"])+".")
+
         #ChoiceBoxes:
         #Retry bad sectors option.
         BadSectSelection = self.BadSectChoice.GetCurrentSelection()
@@ -2229,11 +2734,17 @@ class FinishedWindow(wx.Frame):
         """Create all buttons for FinishedWindow"""
         self.RestartButton = wx.Button(self.Panel, -1, "Reset")
         self.MountButton = wx.Button(self.Panel, -1, "Mount Image/Disk")
+        self.HashButton = wx.Button(self.Panel, -1, "Hash Image")
+        self.BadRegionsButton = wx.Button(self.Panel, -1, "Bad Regions")
         self.QuitButton = wx.Button(self.Panel, -1, "Quit")
 
     def CreateText(self):
         """Create all text for FinishedWindow"""
-        self.StatsText = wx.StaticText(self.Panel, -1, "Successfully recovered "+self.RecoveredData+" out of "+self.DiskCapacity+".")
+        if None in (self.DiskCapacity, self.RecoveredData):
+            self.StatsText = wx.StaticText(self.Panel, -1, "Recovered an unknown amount of data.")
+
+        else:
+            self.StatsText = wx.StaticText(self.Panel, -1, "Successfully recovered "+FormatSize(self.RecoveredData)+" out of "+FormatSize(self.DiskCapacity)+".")
         self.TopText = wx.StaticText(self.Panel, -1, "Your recovered data is at:")
         self.PathText = wx.StaticText(self.Panel, -1, Settings["OutputFile"])
         self.BottomText = wx.StaticText(self.Panel, -1, "What do you want to do now?")
@@ -2248,6 +2759,10 @@ class FinishedWindow(wx.Frame):
         ButtonSizer.Add((5,5), 1)
         ButtonSizer.Add(self.MountButton, 8, wx.ALIGN_CENTER_VERTICAL)
         ButtonSizer.Add((5,5), 1)
+        ButtonSizer.Add(self.HashButton, 6, wx.ALIGN_CENTER_VERTICAL)
+        ButtonSizer.Add((5,5), 1)
+        ButtonSizer.Add(self.BadRegionsButton, 6, wx.ALIGN_CENTER_VERTICAL)
+        ButtonSizer.Add((5,5), 1)
         ButtonSizer.Add(self.QuitButton, 4, wx.ALIGN_CENTER_VERTICAL|wx.RIGHT, 10)
 
         #Make a boxsizer.
@@ -2300,6 +2815,47 @@ class FinishedWindow(wx.Frame):
 
         wx.CallAfter(self.ParentWindow.UpdateStatusBar, "Finished")
 
+    def OnHashButton(self, Event=None):
+        """Hash the rescued parts of the output file in the background"""
+        logger.info("FinishedWindow().OnHashButton(): Hashing the rescued parts of the output file...")
+        self.HashButton.Disable()
+        self.RestartButton.Disable()
+        self.QuitButton.Disable()
+        wx.CallAfter(self.ParentWindow.UpdateStatusBar, "Hashing output file. This may take a while...")
+
+        HashImageThread(self)
+
+    def OnBadRegionsButton(self, Event=None):
+        """Show the bad regions in the mapfile"""
+        logger.info("FinishedWindow().OnBadRegionsButton(): Showing bad regions...")
+
+        try:
+            BadRegionsWindow(self, Mapfile.Read(Settings["LogFile"])).Show()
+
+        except (IOError, OSError, ValueError) as Error:
+            logger.error("FinishedWindow().OnBadRegionsButton(): Couldn't read mapfile: "+unicode(Error)+". Warning user...")
+            dlg = wx.MessageDialog(self.Panel, "Couldn't read your mapfile, so the bad regions can't be shown.\n\nThe error was:\n\n"+unicode(Error), "DDRescue-GUI - Error!", style=wx.OK | wx.ICON_ERROR, pos=wx.DefaultPosition)
+            dlg.ShowModal()
+            dlg.Destroy()
+
+    def HashingFinished(self, Digest, Error):
+        """Called by HashImageThread when it's finished. Tells the user the digest of the image, or what went wrong"""
+        self.HashButton.Enable()
+        self.RestartButton.Enable()
+        self.QuitButton.Enable()
+        wx.CallAfter(self.ParentWindow.UpdateStatusBar, "Finished")
+
+        if Error != None:
+            logger.error("FinishedWindow().HashingFinished(): Error hashing output file: "+unicode(Error)+". Warning user...")
+            dlg = wx.MessageDialog(self.Panel, "Your output file could not be hashed!\n\nThe error was:\n\n"+unicode(Error), "DDRescue-GUI - Error!", style=wx.OK | wx.ICON_ERROR, pos=wx.DefaultPosition)
+
+        else:
+            logger.info("FinishedWindow().HashingFinished(): Image digest: "+Digest+"...")
+            dlg = wx.MessageDialog(self.Panel, "The digest of the rescued data is:\n\n"+Digest+"\n\nThe hash of each part of it was saved to "+Settings["LogFile"]+".hashes, and the parts that weren't rescued (so weren't hashed) to "+Settings["LogFile"]+".unread.", "DDRescue-GUI - Information", style=wx.OK | wx.ICON_INFORMATION, pos=wx.DefaultPosition)
+
+        dlg.ShowModal()
+        dlg.Destroy()
+
     def MountOutputFile(self, Event=None): #*** Do we need this function any more? ***
         """Handle errors and call the platform-dependent mounter function to mount the output file"""
         logger.debug("FinishedWindow().MountOutputFile(): Preparing to mount the output file...")
@@ -2561,18 +3117,377 @@ class FinishedWindow(wx.Frame):
         """Bind all events for FinishedWindow"""
         self.Bind(wx.EVT_BUTTON, self.Restart, self.RestartButton)
         self.Bind(wx.EVT_BUTTON, self.OnMountButton, self.MountButton)
+        self.Bind(wx.EVT_BUTTON, self.OnHashButton, self.HashButton)
+        self.Bind(wx.EVT_BUTTON, self.OnBadRegionsButton, self.BadRegionsButton)
         self.Bind(wx.EVT_BUTTON, self.CloseFinished, self.QuitButton)
         self.Bind(wx.EVT_CLOSE, self.CloseFinished)
 
 #End Finished Window
+#Begin Bad Regions Window
+class BadRegionsWindow(wx.Frame):
+    def __init__(self, ParentWindow, Map):
+        """Initialize BadRegionsWindow, showing the bad regions in Map"""
+        wx.Frame.__init__(self, wx.GetApp().TopWindow, title="DDRescue-GUI - Bad Regions", size=(780,400), style=wx.DEFAULT_FRAME_STYLE)
+        self.Panel = wx.Panel(self)
+        self.SetClientSize(wx.Size(780,400))
+        self.ParentWindow = ParentWindow
+        self.Map = Map
+        wx.Frame.SetIcon(self, AppIcon)
+
+        #The gaps to join unreadable areas across, in bytes, matching the choices in self.GapChoice.
+        self.Gaps = [4096, BadRegions.DefaultMaxGap, 1024*1024, 16*1024*1024]
+
+        logger.debug("BadRegionsWindow().__init__(): Creating widgets...")
+        self.CreateWidgets()
+
+        logger.debug("BadRegionsWindow().__init__(): Setting up sizers...")
+        self.SetupSizers()
+
+        logger.debug("BadRegionsWindow().__init__(): Binding events...")
+        self.BindEvents()
+
+        self.UpdateListCtrl()
+
+        #Call Layout() on self.Panel() to ensure it displays properly.
+        self.Panel.Layout()
+
+        logger.info("BadRegionsWindow().__init__(): Ready. Waiting for events...")
+
+    def CreateWidgets(self):
+        """Create all widgets for BadRegionsWindow"""
+        self.TitleText = wx.StaticText(self.Panel, -1, "Here are the areas of your input file that couldn't be read, largest first")
+        self.SummaryText = wx.StaticText(self.Panel, -1, "")
+        self.GapText = wx.StaticText(self.Panel, -1, "Count unreadable areas closer together than this as one region:")
+        self.GapChoice = wx.Choice(self.Panel, -1, choices=["4 KiB", "Default (64 KiB)", "1 MiB", "16 MiB"])
+        self.GapChoice.SetSelection(1)
+        self.ListCtrl = wx.ListCtrl(self.Panel, -1, style=wx.LC_REPORT|wx.LC_VRULES)
+        self.OkayButton = wx.Button(self.Panel, -1, "Okay")
+
+    def SetupSizers(self):
+        """Set up the sizers for BadRegionsWindow"""
+        #Make a sizer for the gap choicebox and its text.
+        GapSizer = wx.BoxSizer(wx.HORIZONTAL)
+        GapSizer.Add(self.GapText, 1, wx.RIGHT|wx.ALIGN_CENTER, 10)
+        GapSizer.Add(self.GapChoice, 0, wx.ALIGN_CENTER)
+
+        #Make a boxsizer.
+        MainSizer = wx.BoxSizer(wx.VERTICAL)
+
+        #Add each object to the main sizer.
+        MainSizer.Add(self.TitleText, 0, wx.ALL|wx.CENTER, 10)
+        MainSizer.Add(self.SummaryText, 0, wx.ALL ^ wx.TOP|wx.EXPAND, 10)
+        MainSizer.Add(GapSizer, 0, wx.ALL ^ wx.TOP|wx.EXPAND, 10)
+        MainSizer.Add(self.ListCtrl, 1, wx.EXPAND|wx.ALL ^ wx.TOP, 10)
+        MainSizer.Add(self.OkayButton, 0, wx.ALL ^ wx.TOP|wx.ALIGN_RIGHT, 10)
+
+        #Get the sizer set up for the frame.
+        self.Panel.SetSizer(MainSizer)
+        MainSizer.SetMinSize(wx.Size(780,400))
+        MainSizer.SetSizeHints(self)
+
+    def BindEvents(self):
+        """Bind all events for BadRegionsWindow"""
+        self.Bind(wx.EVT_CHOICE, self.UpdateListCtrl, self.GapChoice)
+        self.Bind(wx.EVT_BUTTON, self.OnExit, self.OkayButton)
+        self.Bind(wx.EVT_SIZE, self.OnSize)
+        self.Bind(wx.EVT_CLOSE, self.OnExit)
+
+    def OnSize(self, Event=None):
+        """Auto resize the ListCtrl columns"""
+        Width, Height = self.ListCtrl.GetClientSizeTuple()
+
+        self.ListCtrl.SetColumnWidth(0, int(Width * 0.14))
+        self.ListCtrl.SetColumnWidth(1, int(Width * 0.11))
+        self.ListCtrl.SetColumnWidth(2, int(Width * 0.11))
+        self.ListCtrl.SetColumnWidth(3, int(Width * 0.08))
+        self.ListCtrl.SetColumnWidth(4, int(Width * 0.08))
+        self.ListCtrl.SetColumnWidth(5, int(Width * 0.13))
+        self.ListCtrl.SetColumnWidth(6, int(Width * 0.35))
+
+        if Event != None:
+            Event.Skip()
+
+    def UpdateListCtrl(self, Event=None):
+        """Find the bad regions with the chosen gap, and show them in the list control"""
+        Gap = self.Gaps[self.GapChoice.GetSelection()]
+        logger.debug("BadRegionsWindow().UpdateListCtrl(): Finding bad regions with a gap of "+unicode(Gap)+" bytes...")
+        Regions = BadRegions.ReturnBadRegions(self.Map, Gap)
+
+        #Add how each region changed during the recovery, if we kept snapshots.
+        if os.path.exists(Settings["LogFile"]+".snapshots"):
+            try:
+                BadRegions.AddHistory(Regions, Settings["LogFile"]+".snapshots")
+
+            except (IOError, OSError, ValueError) as Error:
+                logger.error("BadRegionsWindow().UpdateListCtrl(): Couldn't read snapshots: "+unicode(Error)+". Continuing without them...")
+
+        Regions.sort(key=lambda Region: Region.GetUnreadable(), reverse=True)
+        Unreadable = sum(Region.GetUnreadable() for Region in Regions)
+
+        if Regions == []:
+            self.SummaryText.SetLabel("There are no unreadable areas.")
+
+        else:
+            #Tell the user whether the unreadable data is concentrated in a few big regions (worth skipping) or spread out (worth retrying).
+            Largest = sum(Region.GetUnreadable() for Region in Regions[:max(len(Regions) // 10, 1)]) / Unreadable
+            Summary = unicode(len(Regions))+" regions hold "+FormatSize(Unreadable)+" of unreadable data. The largest 10% of them hold "+unicode(int(Largest * 100))+"% of it, so "
+
+            if Largest >= 0.8:
+                Summary += "skipping large areas (ddrescue's -K option) is likely to save more time than retrying (-r)."
+
+            else:
+                Summary += "it's spread out, and retrying (ddrescue's -r option) is likely to help more than skipping larger areas (-K)."
+
+            self.SummaryText.SetLabel(Summary)
+
+        self.ListCtrl.ClearAll()
+        self.ListCtrl.InsertColumn(col=0, heading="Position", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=1, heading="Spread", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=2, heading="Unreadable", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=3, heading="Density", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=4, heading="Fragments", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=5, heading="Nearest Good Data", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=6, heading="Unreadable After Each Phase", format=wx.LIST_FORMAT_CENTRE)
+
+        #Only show the largest regions, as a badly damaged disk can have hundreds of thousands.
+        for Number, Region in enumerate(Regions[:500]):
+            History = ', '.join(PhaseNames.get(Status, Status)+("" if Pass == None else " "+unicode(Pass))+": "+FormatSize(Bytes) for Status, Pass, Bytes in Region.History)
+
+            self.ListCtrl.InsertStringItem(index=Number, label="0x%08X" % Region.Start)
+            self.ListCtrl.SetStringItem(index=Number, col=1, label=FormatSize(Region.GetSpread()))
+            self.ListCtrl.SetStringItem(index=Number, col=2, label=FormatSize(Region.GetUnreadable()))
+            self.ListCtrl.SetStringItem(index=Number, col=3, label=unicode(int(Region.GetDensity() * 100))+"%")
+            self.ListCtrl.SetStringItem(index=Number, col=4, label=unicode(Region.Fragments))
+            self.ListCtrl.SetStringItem(index=Number, col=5, label=FormatSize(Region.GetDistanceToGood()))
+            self.ListCtrl.SetStringItem(index=Number, col=6, label=History)
+
+        #Auto Resize the columns.
+        self.OnSize()
+
+    def OnExit(self, Event=None):
+        """Close BadRegionsWindow"""
+        logger.info("BadRegionsWindow().OnExit(): Closing BadRegionsWindow...")
+        self.Destroy()
+
+#End Bad Regions Window
+#Begin Sessions Window
+class SessionsWindow(wx.Frame):
+    def __init__(self, ParentWindow):
+        """Initialize SessionsWindow"""
+        wx.Frame.__init__(self, wx.GetApp().TopWindow, title="DDRescue-GUI - Recovery Sessions", size=(780,400), style=wx.DEFAULT_FRAME_STYLE)
+        self.Panel = wx.Panel(self)
+        self.SetClientSize(wx.Size(780,400))
+        self.ParentWindow = ParentWindow
+        self.Scheduler = ParentWindow.Scheduler
+        wx.Frame.SetIcon(self, AppIcon)
+
+        logger.debug("SessionsWindow().__init__(): Creating widgets...")
+        self.CreateWidgets()
+
+        logger.debug("SessionsWindow().__init__(): Setting up sizers...")
+        self.SetupSizers()
+
+        logger.debug("SessionsWindow().__init__(): Binding events...")
+        self.BindEvents()
+
+        self.UpdateListCtrl()
+        self.Timer.Start(1000)
+
+        #Call Layout() on self.Panel() to ensure it displays properly.
+        self.Panel.Layout()
+
+        logger.info("SessionsWindow().__init__(): Ready. Waiting for events...")
+
+    def CreateWidgets(self):
+        """Create all widgets for SessionsWindow"""
+        self.TitleText = wx.StaticText(self.Panel, -1, "Here you can run several recoveries at once. Recoveries using the same disk controller or destination are queued, so they don't slow each other down.")
+        self.ListCtrl = wx.ListCtrl(self.Panel, -1, style=wx.LC_REPORT|wx.LC_VRULES)
+        self.AddButton = wx.Button(self.Panel, -1, "Add a recovery with the current settings...")
+        self.AbortButton = wx.Button(self.Panel, -1, "Abort selected")
+        self.OkayButton = wx.Button(self.Panel, -1, "Close")
+        self.Timer = wx.Timer(self)
+
+    def SetupSizers(self):
+        """Set up the sizers for SessionsWindow"""
+        #Make a sizer for the buttons.
+        ButtonSizer = wx.BoxSizer(wx.HORIZONTAL)
+        ButtonSizer.Add(self.AddButton, 0, wx.RIGHT|wx.ALIGN_CENTER, 10)
+        ButtonSizer.Add(self.AbortButton, 0, wx.RIGHT|wx.ALIGN_CENTER, 10)
+        ButtonSizer.Add((50,50), 1, wx.ALIGN_CENTER)
+        ButtonSizer.Add(self.OkayButton, 0, wx.ALIGN_CENTER)
+
+        #Make a boxsizer.
+        MainSizer = wx.BoxSizer(wx.VERTICAL)
+
+        #Add each object to the main sizer.
+        MainSizer.Add(self.TitleText, 0, wx.ALL|wx.CENTER, 10)
+        MainSizer.Add(self.ListCtrl, 1, wx.EXPAND|wx.ALL ^ wx.TOP, 10)
+        MainSizer.Add(ButtonSizer, 0, wx.ALL ^ wx.TOP|wx.EXPAND, 10)
+
+        #Get the sizer set up for the frame.
+        self.Panel.SetSizer(MainSizer)
+        MainSizer.SetMinSize(wx.Size(780,400))
+        MainSizer.SetSizeHints(self)
+
+    def BindEvents(self):
+        """Bind all events for SessionsWindow"""
+        self.Bind(wx.EVT_BUTTON, self.OnAdd, self.AddButton)
+        self.Bind(wx.EVT_BUTTON, self.OnAbort, self.AbortButton)
+        self.Bind(wx.EVT_BUTTON, self.OnExit, self.OkayButton)
+        self.Bind(wx.EVT_TIMER, self.UpdateListCtrl, self.Timer)
+        self.Bind(wx.EVT_SIZE, self.OnSize)
+        self.Bind(wx.EVT_CLOSE, self.OnExit)
+
+    def OnSize(self, Event=None):
+        """Auto resize the ListCtrl columns"""
+        Width, Height = self.ListCtrl.GetClientSizeTuple()
+
+        self.ListCtrl.SetColumnWidth(0, int(Width * 0.1))
+        self.ListCtrl.SetColumnWidth(1, int(Width * 0.2))
+        self.ListCtrl.SetColumnWidth(2, int(Width * 0.25))
+        self.ListCtrl.SetColumnWidth(3, int(Width * 0.1))
+        self.ListCtrl.SetColumnWidth(4, int(Width * 0.12))
+        self.ListCtrl.SetColumnWidth(5, int(Width * 0.11))
+        self.ListCtrl.SetColumnWidth(6, int(Width * 0.12))
+
+        if Event != None:
+            Event.Skip()
+
+    def ChooseFiles(self):
+        """Ask the user for the input, output and log files of a new recovery session. Returns them, or None if the user cancels."""
+        if Linux:
+            InputDir = "/dev"
+
+        else:
+            InputDir = "/Users"
+
+        Files = []
+
+        for Type, DefaultDir, Wildcard, Style in (("Input", InputDir, self.ParentWindow.InputWildcard, wx.OPEN), ("Output", self.ParentWindow.UserHomeDir, self.ParentWindow.OutputWildcard, wx.SAVE),
+                                                  ("Log", self.ParentWindow.UserHomeDir, "Log Files (*.log)|*.log", wx.SAVE)):
+            dlg = wx.FileDialog(self.Panel, "Select "+Type+" Path/File for the new recovery...", defaultDir=DefaultDir, wildcard=Wildcard, style=Style)
+            Answer = dlg.ShowModal()
+            File = dlg.GetPath()
+            dlg.Destroy()
+
+            if Answer != wx.ID_OK:
+                return None
+
+            Files.append(File)
+
+        return Files
+
+    def OnAdd(self, Event=None):
+        """Add a recovery session with input, output and log files chosen by the user, and the current settings.
+        The main recovery's files can't be changed while it's running, so each session has its own. The scheduler refuses any that clash with the main recovery or another session."""
+        Files = self.ChooseFiles()
+
+        if Files == None:
+            logger.info("SessionsWindow().OnAdd(): User cancelled adding a session...")
+            return
+
+        InputFile, OutputFile, LogFile = Files
+        Name = "Session "+unicode(len(self.Scheduler.Sessions) + 1)
+        logger.info("SessionsWindow().OnAdd(): Adding "+Name+" to recover "+InputFile+" to "+OutputFile+"...")
+
+        try:
+            NewSession = Session(Name, ReturnExecList(ReturnOptionsList(InputFile, OutputFile, LogFile)), InputFile, OutputFile, LogFile, Settings["DDRescueVersion"],
+                                 ReturnControllerKey(InputFile), ReturnDestinationKey(OutputFile))
+
+            self.Scheduler.Add(NewSession)
+
+        except (IOError, OSError, ValueError) as Error:
+            logger.error("SessionsWindow().OnAdd(): Couldn't add "+Name+": "+unicode(Error)+"...")
+            dlg = wx.MessageDialog(self.Panel, "Couldn't add this recovery: "+unicode(Error), "DDRescue-GUI - Error!", wx.OK | wx.ICON_ERROR)
+            dlg.ShowModal()
+            dlg.Destroy()
+
+        self.UpdateListCtrl()
+
+    def OnAbort(self, Event=None):
+        """Abort the selected session"""
+        Number = self.ListCtrl.GetFirstSelected()
+
+        if Number == -1:
+            return
+
+        logger.info("SessionsWindow().OnAbort(): Aborting "+self.Scheduler.Sessions[Number].Name+"...")
+        self.Scheduler.Sessions[Number].Abort()
+        self.UpdateListCtrl()
+
+    def UpdateListCtrl(self, Event=None):
+        """Show the latest state and progress of each session in the list control. Called every second by self.Timer."""
+        Selected = self.ListCtrl.GetFirstSelected()
+
+        self.ListCtrl.ClearAll()
+        self.ListCtrl.InsertColumn(col=0, heading="Name", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=1, heading="Input", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=2, heading="Output", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=3, heading="State", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=4, heading="Recovered", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=5, heading="Errors", format=wx.LIST_FORMAT_CENTRE)
+        self.ListCtrl.InsertColumn(col=6, heading="Current Rate", format=wx.LIST_FORMAT_CENTRE)
+
+        for Number, ThisSession in enumerate(self.Scheduler.Sessions):
+            Status = ThisSession.Status.Collect()[0]
+
+            self.ListCtrl.InsertStringItem(index=Number, label=ThisSession.Name)
+            self.ListCtrl.SetStringItem(index=Number, col=1, label=ThisSession.InputFile)
+            self.ListCtrl.SetStringItem(index=Number, col=2, label=ThisSession.OutputFile)
+            self.ListCtrl.SetStringItem(index=Number, col=3, label=ThisSession.State)
+            self.ListCtrl.SetStringItem(index=Number, col=4, label="Unknown" if Status.RecoveredData == None else FormatSize(Status.RecoveredData))
+            self.ListCtrl.SetStringItem(index=Number, col=5, label="Unknown" if Status.ErrorSize == None else FormatSize(Status.ErrorSize))
+            self.ListCtrl.SetStringItem(index=Number, col=6, label="Unknown" if Status.CurrentReadRate == None else FormatSize(Status.CurrentReadRate, "B/s"))
+
+        if Selected != -1 and Selected < self.ListCtrl.GetItemCount():
+            self.ListCtrl.Select(Selected)
+
+        #Auto Resize the columns.
+        self.OnSize()
+
+    def OnExit(self, Event=None):
+        """Close SessionsWindow. The sessions carry on running."""
+        logger.info("SessionsWindow().OnExit(): Closing SessionsWindow...")
+        self.Timer.Stop()
+        self.Destroy()
+
+#End Sessions Window
+#Begin Hash Image Thread.
+class HashImageThread(threading.Thread):
+    def __init__(self, ParentWindow):
+        """Initialize and start the thread"""
+        self.ParentWindow = ParentWindow
+
+        threading.Thread.__init__(self)
+        self.start()
+
+    def run(self):
+        """Main body of the thread, started with self.start()"""
+        try:
+            Map = Mapfile.Read(Settings["LogFile"])
+            Comments = ["Hashes of the rescued data in "+Settings["OutputFile"]+", using mapfile "+Settings["LogFile"], "Created by DDRescue-GUI "+Version]
+
+            Result = ImageHasher(Settings["OutputFile"], Map).Run()
+            Result.WriteManifest(Settings["LogFile"]+".hashes", Comments)
+            Result.WriteUnreadBlocks(Settings["LogFile"]+".unread", ["Parts of "+Settings["OutputFile"]+" that weren't rescued, so weren't hashed", "Created by DDRescue-GUI "+Version])
+            Digest = Result.GetDigest()
+
+        except Exception as Error:
+            #Report anything that goes wrong, even unexpected errors, so the finished window's buttons are enabled again.
+            logger.error("HashImageThread().run(): Error hashing output file: "+unicode(traceback.format_exc()))
+            wx.CallAfter(self.ParentWindow.HashingFinished, None, Error)
+            return
+
+        wx.CallAfter(self.ParentWindow.HashingFinished, Digest, None)
+
+#End Hash Image Thread
 #Begin Elapsed Time Thread.
 class ElapsedTimeThread(threading.Thread):
     def __init__(self, ParentWindow):
         """Initialize and start the thread"""
         self.ParentWindow = ParentWindow
 
-        #This starts a little after ddrescue, so start at 2 seconds.
-        self.RunTimeSecs = 2
+        self.RunTimeSecs = 0
 
         threading.Thread.__init__(self)
         self.start()
@@ -2580,42 +3495,92 @@ class ElapsedTimeThread(threading.Thread):
     def run(self):
         """Main body of the thread, started with self.start()"""
         while Settings["RecoveringData"]:
+            #Update the text.
+            self.ParentWindow.Status.Set(TimeElapsed=self.RunTimeSecs)
+
+            #Wait for a second.
+            time.sleep(1)
+
             #Elapsed time.
             self.RunTimeSecs += 1
 
-            #Convert between Seconds, Minutes, Hours, and Days to make the value as understandable as possible.
-            if self.RunTimeSecs <= 60:
-                RunTime = self.RunTimeSecs
-                Unit = " seconds"
-
-            elif self.RunTimeSecs >= 60 and self.RunTimeSecs <= 3600: 
-                RunTime = self.RunTimeSecs//60
-                Unit = " minutes"
+#End Elapsed Time Thread
+#Begin Recovery Command Functions
+def ReturnOptionsList(InputFile, OutputFile, LogFile):
+    """Return ddrescue's options for the current settings, and the given file names. If the recovery of the main input file is limited to some partitions, this writes the domain mapfile too."""
+    OptionsList = [Settings["DirectAccess"], Settings["OverwriteOutputFile"], Settings["DiskSize"], Settings["Reverse"], Settings["Preallocate"], Settings["NoSplit"], Settings["BadSectorRetries"], Settings["MaxErrors"], Settings["ClusterSize"], Settings["InputFileBlockSize"], InputFile, OutputFile, LogFile]
+
+    #Limit the recovery to the chosen partitions (and the partition table) with a domain mapfile. ddrescue accepts options after the file names.
+    #The partitions were read from the main input file, so they don't apply to any other.
+    if Settings["DomainPartitions"] != None and InputFile == Settings["InputFile"]:
+        DomainMapfile = LogFile+".domain"
+        logger.info("ReturnOptionsList(): Writing domain mapfile "+DomainMapfile+" for partitions: "+', '.join(unicode(Partition.Number) for Partition in Settings["DomainPartitions"])+"...")
+        #Gaps smaller than ddrescue's cluster size are quicker to read than to skip.
+        MinGap = int(Settings["ClusterSize"][3:]) * int(Settings["InputFileBlockSize"][3:] or "512")
+        Partitions.WriteDomainMapfile(DomainMapfile, Settings["PartitionTable"], Settings["DomainPartitions"], ["Domain mapfile. Created by DDRescue-GUI "+Version], Settings["DomainAllocations"], MinGap)
+        OptionsList.append("-m"+DomainMapfile)
+
+    return OptionsList
+
+def ReturnExecList(OptionsList):
+    """Return the command line to run ddrescue with the given options"""
+    if Linux:
+        ExecList = ["ddrescue", "-v"]
 
-            elif self.RunTimeSecs > 3600 and self.RunTimeSecs <= 86400:
-                RunTime = round(self.RunTimeSecs/3600,2)
-                Unit = " hours"
+    else:
+        ExecList = [ResourcePath+"/ddrescue", "-v"]
 
-            elif self.RunTimeSecs > 86400:
-                RunTime = round(self.RunTimeSecs/86400,2)
-                Unit = " days"
+    for Option in OptionsList:
+        #Handle direct disk access on OS X.
+        if Linux == False and OptionsList.index(Option) == 0 and Option != "":
+            #If we're recovering from a file, don't enable direct disk access (it won't work).
+            if OptionsList[10][0:5] == "/dev/":
+                #Remove InputFile and switch it with a string that uses /dev/rdisk (raw disk) instead of /dev/disk.
+                InputFile = OptionsList.pop(10)
+                OptionsList.insert(10, "/dev/r" + InputFile.split("/dev/")[1])
 
-            #Update the text.
-            wx.CallAfter(self.ParentWindow.UpdateTimeElapsed, "Time Elapsed: "+unicode(RunTime)+Unit)
+            else:
+                #Make sure "-d" isn't added to the ExecList (continue to next iteration of loop).
+                continue
+ 
+        elif Option != "":
+            ExecList.append(Option)
 
-            #Wait for a second.
-            time.sleep(1)
+    return ExecList
 
-#End Elapsed Time Thread
+#End Recovery Command Functions
 #Begin Backend Thread
 class BackendThread(threading.Thread):
     def __init__(self, ParentWindow):
         """Initialize and start the thread."""
         self.ParentWindow = ParentWindow
-        self.OldStatus = ""
-        self.GotInitialStatus = False
-        self.UnitList = ['null', 'B', 'k', 'M', 'G', 'T', 'P', 'E', 'Z', 'Y']
-        self.InputPos = "0 B"
+
+        #All status updates go through the snapshot, rather than one wx.CallAfter() per update, and output goes through the output buffer.
+        self.Status = ParentWindow.Status
+        self.Output = ParentWindow.Output
+
+        #ddrescue, once it's started. Only ever signalled through Abort().
+        self.DDRescue = None
+        self.Aborted = False
+        self.AbortLock = threading.Lock()
+
+        #The totals from the latest mapfile, and the phase engine, if we're recovering in phases.
+        self.Totals = None
+        self.Phases = None
+        self.EndingPhase = False
+        self.StartedTimer = False
+
+        #The slow region controller, if we're skipping slow regions, and whether it's watching ddrescue at the moment.
+        self.SlowRegions = None
+        self.WatchingSlowRegions = False
+        self.Restarting = False
+        self.CurrentStatus = None
+        self.MapSize = 0
+        self.DomainMapfile = None
+
+        #The parallel imager, if we're running several copies at once.
+        self.Imager = None
+        self.ImagerResult = False
 
         threading.Thread.__init__(self)
         self.start()
@@ -2624,265 +3589,307 @@ class BackendThread(threading.Thread):
         """Main body of the thread, started with self.start()"""
         logger.debug("MainBackendThread(): Setting up ddrescue tools...")
 
-        #Find suitable functions.
-        SuitableFunctions = DDRescueTools.SetupForCorrectDDRescueVersion(Settings["DDRescueVersion"])
+        #Set up to process the output for this version of ddrescue.
+        self.Processor = OutputProcessor(Settings["DDRescueVersion"], self.Status, Settings["InputFile"])
+
+        #Watch the mapfile, which gives exact sizes for any version of ddrescue. It may already exist, if we're resuming a recovery.
+        self.Tailer = MapfileTailer(Settings["LogFile"])
+
+        #Keep snapshots of the mapfile, to see how the recovery went afterwards. These carry on from any earlier ones when resuming.
+        try:
+            self.Snapshots = SnapshotWriter(Settings["LogFile"]+".snapshots")
+
+        except (IOError, OSError, ValueError) as Error:
+            logger.error("MainBackendThread(): Couldn't open snapshot file: "+unicode(Error)+". Not keeping snapshots...")
+            self.Snapshots = None
 
-        #Define all of these functions under their correct names.
-        for Function in SuitableFunctions:
-            vars(self)[Function.__name__] = Function
+        self.PollMapfile()
 
         #Prepare to start ddrescue.
         logger.debug("MainBackendThread(): Preparing to start ddrescue...")
-        OptionsList = [Settings["DirectAccess"], Settings["OverwriteOutputFile"], Settings["DiskSize"], Settings["Reverse"], Settings["Preallocate"], Settings["NoSplit"], Settings["BadSectorRetries"], Settings["MaxErrors"], Settings["ClusterSize"], Settings["InputFileBlockSize"], Settings["InputFile"], Settings["OutputFile"], Settings["LogFile"]]
+        OptionsList = ReturnOptionsList(Settings["InputFile"], Settings["OutputFile"], Settings["LogFile"])
 
-        if Linux:
-            ExecList = ["ddrescue", "-v"]
+        if Settings["DomainPartitions"] != None:
+            self.DomainMapfile = Settings["LogFile"]+".domain"
+
+        if Settings["SkipSlowRegions"]:
+            self.SlowRegions = SlowRegionController(**Settings["SlowRegionSettings"])
+
+        #Recovering in phases runs ddrescue once for each phase, with the phase's options instead of the direction, scraping and retry settings.
+        if Settings["UsePhases"]:
+            self.Phases = PhaseEngine(ReturnDefaultPlan(Settings["DDRescueVersion"], Settings["BadSectorRetries"], Settings["PhaseTimeBudget"]))
+            OptionsList[3] = OptionsList[5] = OptionsList[6] = ""
+
+        #Parallel copies always read forwards, as each range is split where its ddrescue has got to.
+        if Settings["ParallelCopies"] > 1:
+            OptionsList[3] = ""
+
+        #Ensure the rest of the program knows we are recovering data.
+        Settings["RecoveringData"] = True
+
+        if Settings["ParallelCopies"] > 1:
+            ReturnCode = self.RunParallel(OptionsList)
+
+        elif self.Phases == None:
+            ReturnCode = self.RunSkippingSlowRegions(OptionsList, LaterPass=True)
 
         else:
-            ExecList = [ResourcePath+"/ddrescue", "-v"]
+            ReturnCode = self.RunPhases(OptionsList)
 
-        for Option in OptionsList:
-            #Handle direct disk access on OS X.
-            if Linux == False and OptionsList.index(Option) == 0 and Option != "":
-                #If we're recovering from a file, don't enable direct disk access (it won't work).
-                if Settings["InputFile"][0:5] == "/dev/":
-                    #Remove InputFile and switch it with a string that uses /dev/rdisk (raw disk) instead of /dev/disk.
-                    OptionsList.pop(10)
-                    OptionsList.insert(10, "/dev/r" + Settings["InputFile"].split("/dev/")[1])
+        self.Output.Close()
 
-                else:
-                    #Make sure "-d" isn't added to the ExecList (continue to next iteration of loop).
-                    continue
- 
-            elif Option != "":
-                ExecList.append(Option)
+        #Let the GUI know that we are no longer recovering any data.
+        Settings["RecoveringData"] = False
 
-        #Set initial values for some variables.
-        self.DiskCapacity = "An unknown amount of"
-        self.DiskCapacityUnit = "data"
-        self.RecoveredData = 0
-        self.RecoveredDataUnit = "B"
+        #Check if we got ddrescue's init status, and if ddrescue exited with a status other than 0. Handle errors in case someone is running DDRescue-GUI on an unsupported version of ddrescue.
+        if self.Processor.GotInitialStatus == False:
+            logger.error("MainBackendThread(): We didn't get the initial status before ddrescue exited! Something has gone wrong. Telling MainWindow and exiting...")
 
-        #Start ddrescue.
-        logger.debug("MainBackendThread(): Running ddrescue with: '"+' '.join(ExecList)+"'...")
+            wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity=self.Processor.DiskCapacity, RecoveredData=self.Processor.RecoveredData, Result="NoInitialStatus", ReturnCode=ReturnCode)
 
-        #Ensure the rest of the program knows we are recovering data.
-        Settings["RecoveringData"] = True
+        elif ReturnCode != 0:
+            logger.error("MainBackendThread(): ddrescue exited with exit status "+unicode(ReturnCode)+"! Something has gone wrong. Telling MainWindow and exiting...")
 
-        cmd = subprocess.Popen(ExecList, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        Line = ""
-        Char = " " #Set this so the while loop exeutes at least once.
-        LineList = []
-        counter = 0
+            wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity=self.Processor.DiskCapacity, RecoveredData=self.Processor.RecoveredData, Result="BadReturnCode", ReturnCode=ReturnCode)
+        else:
+            logger.info("MainBackendThread(): ddrescue finished recovering data. Telling MainWindow and exiting...")
 
-        #Give ddrescue plenty of time to start.
-        time.sleep(2)
+            wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity=self.Processor.DiskCapacity, RecoveredData=self.Processor.RecoveredData, Result="Success", ReturnCode=ReturnCode)
 
-        #Grab information from ddrescue. (After ddrescue exits, attempt to keep reading chars until the last attempt gave an empty string)
-        while cmd.poll() == None or Char != "":
-            Char = cmd.stdout.read(1)
-            Line += Char
+    def RunPhases(self, OptionsList):
+        """Run ddrescue once for each phase of the plan that has anything left to do, ending each one early if the phase engine says so, and return the exit code of the last run"""
+        ReturnCode = 0
 
-            #If this is the end of the line, process it, and send the results to the GUI thread.
-            if Char == "\n":
-                TidyLine = Line.replace("\n", "").replace("\r", "").replace("\x1b[A", "")
+        while not self.Aborted:
+            Phase = self.Phases.StartNext(time.time(), self.Totals)
 
-                if TidyLine != "":
-                    try:
-                        self.ProcessLine(TidyLine)
+            if Phase == None:
+                logger.info("MainBackendThread().RunPhases(): No phases left...")
+                break
 
-                    except Exception as e:
-                        #Handle unexpected errors. Can happen once in normal operation on ddrescue v1.22.
-                        logger.warning("MainBackendThread(): Unexpected error parsing ddrescue's output! Can happen once on newer versions in normal operation. Are you running a newer/older version of ddrescue than we support?")
+            logger.info("MainBackendThread().RunPhases(): Starting phase "+unicode(self.Phases.Number+1)+" of "+unicode(len(self.Phases.Plan))+": "+Phase.Name+"...")
+            self.Output.Write("DDRescue-GUI: Phase "+unicode(self.Phases.Number+1)+" of "+unicode(len(self.Phases.Plan))+": "+Phase.Name+"...", "\n")
 
-                wx.CallAfter(self.ParentWindow.UpdateOutputBox, Line.replace("\x1b[A", "¬"))
+            self.EndingPhase = False
 
-                #Reset Line.
-                Line = ""
+            #Only skip slow regions while copying. The later phases go back for them.
+            if Phase.Statuses == "?":
+                ReturnCode = self.RunSkippingSlowRegions(OptionsList + Phase.Options, LaterPass=False)
 
-        #Parse any remaining lines afterwards.
-        if Line != "":
-            TidyLine = Line.replace("\n", "").replace("\r", "").replace("\x1b[A", "")
-            self.ProcessLine(TidyLine)
+            else:
+                ReturnCode = self.RunDDRescue(ReturnExecList(OptionsList + Phase.Options))
 
-        #Let the GUI know that we are no longer recovering any data.
-        Settings["RecoveringData"] = False
+            #ddrescue exits as if interrupted when we end a phase early.
+            if self.EndingPhase and not self.Aborted:
+                ReturnCode = 0
 
-        #Check if we got ddrescue's init status, and if ddrescue exited with a status other than 0. Handle errors in case someone is running DDRescue-GUI on an unsupported version of ddrescue.
-        if self.GotInitialStatus == False:
-            logger.error("MainBackendThread(): We didn't get the initial status before ddrescue exited! Something has gone wrong. Telling MainWindow and exiting...")
+            elif ReturnCode != 0:
+                break
 
-            try:
-                wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity=unicode(self.DiskCapacity)+" "+self.DiskCapacityUnit, RecoveredData=unicode(int(self.RecoveredData))+" "+self.RecoveredDataUnit, Result="NoInitialStatus", ReturnCode=int(cmd.returncode))
+        return ReturnCode
 
-            except:
-                logger.error("MainBackendThread(): Unexpected error while trying to send recovery information to RecoveryEnded()! Continuing anyway. Are you running a newer/older version of ddrescue than we support?")
-                wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity="Unknown Size", RecoveredData="Unknown Size", Result="NoInitialStatus", ReturnCode=int(cmd.returncode))
+    def RunSkippingSlowRegions(self, OptionsList, LaterPass):
+        """Run ddrescue with the given options, starting it again to skip each slow region the slow region controller finds while it's copying, and return its last exit code.
+        If LaterPass is True, go back for the regions that were skipped afterwards."""
+        if self.SlowRegions == None:
+            return self.RunDDRescue(ReturnExecList(OptionsList))
 
-        elif int(cmd.returncode) != 0:
-            logger.error("MainBackendThread(): ddrescue exited with exit status "+unicode(cmd.returncode)+"! Something has gone wrong. Telling MainWindow and exiting...")
+        while True:
+            Options = list(OptionsList)
+            self.SlowRegions.Reverse = ("-R" in Options)
 
-            try:
-                wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity=unicode(self.DiskCapacity)+" "+self.DiskCapacityUnit, RecoveredData=unicode(int(self.RecoveredData))+" "+self.RecoveredDataUnit, Result="BadReturnCode", ReturnCode=int(cmd.returncode))
+            #Leave out the regions marked so far with a domain mapfile, which replaces any other one.
+            if self.SlowRegions.Regions != []:
+                Options = [Option for Option in Options if not Option.startswith("-m")] + self.SlowRegions.ReturnOptions(Settings["DDRescueVersion"]) + ["-m"+self.WriteSlowRegionDomain()]
 
-            except:
-                logger.error("MainBackendThread(): Unexpected error while trying to send recovery information to RecoveryEnded()! Continuing anyway. Are you running a newer/older version of ddrescue than we support?")
-                wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity="Unknown Size", RecoveredData="Unknown Size", Result="BadReturnCode", ReturnCode=int(cmd.returncode))
-        else:
-            logger.info("MainBackendThread(): ddrescue finished recovering data. Telling MainWindow and exiting...")
+            self.Restarting = False
+            self.WatchingSlowRegions = True
+            self.SlowRegions.Reset(time.time())
+            ReturnCode = self.RunDDRescue(ReturnExecList(Options))
+            self.WatchingSlowRegions = False
 
-            try:
-                wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity=unicode(self.DiskCapacity)+" "+self.DiskCapacityUnit, RecoveredData=unicode(int(self.RecoveredData))+" "+self.RecoveredDataUnit, Result="Success", ReturnCode=int(cmd.returncode))
+            if not self.Restarting or self.Aborted:
+                break
 
-            except:
-                logger.error("MainBackendThread(): Unexpected error while trying to send recovery information to RecoveryEnded()! Continuing anyway. Are you running a newer/older version of ddrescue than we support?")
-                wx.CallAfter(self.ParentWindow.RecoveryEnded, DiskCapacity="Unknown Size", RecoveredData="Unknown Size", Result="Success", ReturnCode=int(cmd.returncode))
+            logger.info("MainBackendThread().RunSkippingSlowRegions(): Starting ddrescue again to skip the slow region...")
 
-    def ProcessLine(self, Line):
-        """Process a given line to get ddrescue's current status and recovery information and send it to the GUI Thread""" 
-        SplitLine = Line.split()
+        if LaterPass and self.SlowRegions.Regions != [] and ReturnCode == 0 and not self.Aborted:
+            logger.info("MainBackendThread().RunSkippingSlowRegions(): Going back for the "+unicode(len(self.SlowRegions.Regions))+" slow regions that were skipped...")
+            self.Output.Write("DDRescue-GUI: Going back for the slow regions that were skipped...", "\n")
+            ReturnCode = self.RunDDRescue(ReturnExecList(OptionsList))
 
-        if SplitLine[0] == "About": #All versions of ddrescue (1.14 - 1.22).
-            #Initial status.
-            logger.info("MainBackendThread().Processline(): Got Initial Status... Setting up the progressbar...")
-            self.GotInitialStatus = True
+        return ReturnCode
 
-            self.DiskCapacity, self.DiskCapacityUnit = self.GetInitialStatus(SplitLine)
+    def RunParallel(self, OptionsList):
+        """Copy the input with several ddrescue processes at once, each on its own range, showing their combined progress, and return 0 if every range was copied"""
+        try:
+            Size = ReturnInputSize(Settings["InputFile"])
 
-            wx.CallAfter(self.ParentWindow.SetProgressBarRange, self.DiskCapacity)
+        except (IOError, OSError) as Error:
+            logger.error("MainBackendThread().RunParallel(): Couldn't get the size of the input file: "+unicode(Error)+". Copying with one ddrescue instead...")
+            return self.RunSkippingSlowRegions(OptionsList, LaterPass=True)
 
-            #Start time elapsed thread.
-            ElapsedTimeThread(self.ParentWindow)
+        logger.info("MainBackendThread().RunParallel(): Copying "+unicode(Size)+" bytes with "+unicode(Settings["ParallelCopies"])+" ddrescue processes at once...")
 
-        elif SplitLine[0] == "ipos:" and Settings["DDRescueVersion"] not in ("1.21", "1.22"): #Versions 1.14 - 1.20.
-            self.InputPos, self.NumErrors, self.AverageReadRate, self.AverageReadRateUnit = self.GetIPosNumErrorsandAverageReadRate(SplitLine)
+        with self.AbortLock:
+            self.Imager = ParallelImager(ReturnExecList(OptionsList), Settings["InputFile"], Settings["OutputFile"], Settings["LogFile"], Settings["DDRescueVersion"], Size, Workers=Settings["ParallelCopies"])
 
-            wx.CallAfter(self.ParentWindow.UpdateIpos, self.InputPos)
-            wx.CallAfter(self.ParentWindow.UpdateNumErrors, self.NumErrors)
-            wx.CallAfter(self.ParentWindow.UpdateAverageReadRate, unicode(self.AverageReadRate)+" "+self.AverageReadRateUnit)
+            #Handle the user aborting before the copies started.
+            if self.Aborted:
+                self.Imager.Abort()
 
-        elif SplitLine[0] == "opos:": #Versions 1.14 - 1.20 & 1.21 - 1.22.
-            if Settings["DDRescueVersion"] in ("1.21", "1.22"):
-                #Get average read rate (ddrescue 1.21 & 1.22).
-                self.OutputPos, self.AverageReadRate, self.AverageReadRateUnit = self.GetOPosAndAverageReadRate(SplitLine)
-                wx.CallAfter(self.ParentWindow.UpdateAverageReadRate, unicode(self.AverageReadRate)+" "+self.AverageReadRateUnit)
+        Thread = threading.Thread(target=self.RunImager)
+        Thread.start()
 
-            else:
-                #Output Pos and time since last read (1.14 - 1.20).
-                self.OutputPos, self.TimeSinceLastRead = self.GetOPosandTimeSinceLastRead(SplitLine)
+        #Each ddrescue has its own output, so show the totals for all of them instead.
+        ElapsedTimeThread(self.ParentWindow)
+        self.StartedTimer = True
+
+        while Thread.is_alive():
+            self.Status.Set(DiskCapacity=Size, RecoveredData=self.Imager.GetRescued(), CurrentReadRate=self.Imager.GetReadRate())
+            Thread.join(1)
 
-                wx.CallAfter(self.ParentWindow.UpdateTimeSinceLastRead, self.TimeSinceLastRead)
+        #Get the final totals from the merged mapfile.
+        self.PollMapfile()
+        self.Processor.GotInitialStatus = any(Range.Session.Processor.GotInitialStatus for Range in self.Imager.Ranges if Range.Session != None)
 
-            wx.CallAfter(self.ParentWindow.UpdateOpos, self.OutputPos)
+        if self.ImagerResult:
+            return 0
 
-        elif SplitLine[0] == "non-tried:":
-            #Unreadable data (ddrescue 1.21 & 1.22).
-            self.ErrorSize = self.GetUnreadableData(SplitLine)
+        ReturnCodes = [Range.Session.ReturnCode for Range in self.Imager.Failed if Range.Session.ReturnCode not in (None, 0)]
+        return ReturnCodes[0] if ReturnCodes != [] else 1
 
-            wx.CallAfter(self.ParentWindow.UpdateErrorSize, self.ErrorSize)
+    def RunImager(self):
+        """Run the parallel imager, and keep whether every range was copied. Runs in its own thread."""
+        try:
+            self.ImagerResult = self.Imager.Run()
 
-        elif SplitLine[0] in ("time", "percent"): #Time since last read (ddrescue v1.20 - 1.22).
-            self.TimeSinceLastRead = self.GetTimeSinceLastRead(SplitLine)
+        except (IOError, OSError, ValueError) as Error:
+            logger.error("MainBackendThread().RunImager(): Couldn't merge the mapfiles of the parallel copies: "+unicode(Error)+"! Each range's mapfile is still in the same folder as the mapfile...")
+            self.ImagerResult = False
 
-            wx.CallAfter(self.ParentWindow.UpdateTimeSinceLastRead, self.TimeSinceLastRead)
+    def WriteSlowRegionDomain(self):
+        """Write a domain mapfile that leaves out the slow regions that have been marked, and anything outside the domain chosen by the user, and return its name"""
+        FileName = Settings["LogFile"]+".slowdomain"
+        Domain = None
 
-        elif SplitLine[0] == "rescued:" and Settings["DDRescueVersion"] in ("1.21", "1.22"): #Versions 1.21 & 1.22
-            #Recovered data and number of errors (ddrescue 1.21 & 1.22).
-            #Don't crash if we're reading the initial status from the logfile.
-            try:
-                self.RecoveredData, self.RecoveredDataUnit, self.NumErrors = self.GetRecoveredDataAndNumErrors(SplitLine)
+        if self.DomainMapfile != None:
+            Domain = Mapfile.Read(self.DomainMapfile)
 
-                #Change the unit of measurement of the current amount of recovered data if needed.
-                self.RecoveredData, self.RecoveredDataUnit = self.ChangeUnits(float(self.RecoveredData), self.RecoveredDataUnit, self.DiskCapacityUnit)
-                self.RecoveredData = round(self.RecoveredData,3)
+        #ddrescue may not have written the mapfile yet, but it has told us the size of the input file.
+        Blocks = SlowRegions.ReturnDomainBlocks(self.SlowRegions.Regions, self.MapSize or self.Processor.DiskCapacity or 0, Domain)
+        Mapfile.Write(Mapfile.Mapfile(), FileName, ["Domain mapfile without slow regions. Created by DDRescue-GUI "+Version], Blocks)
+        return FileName
 
-                self.TimeRemaining = self.CalculateTimeRemaining()
+    def RunDDRescue(self, ExecList):
+        """Run ddrescue with the given command line, processing its output and watching the mapfile until it exits, and return its exit code"""
+        logger.debug("MainBackendThread(): Running ddrescue with: '"+' '.join(ExecList)+"'...")
 
-                wx.CallAfter(self.ParentWindow.UpdateRecoveredData, unicode(self.RecoveredData)+" "+self.RecoveredDataUnit)
-                wx.CallAfter(self.ParentWindow.UpdateNumErrors, self.NumErrors)
-                wx.CallAfter(self.ParentWindow.UpdateProgress, self.RecoveredData, self.DiskCapacity)
-                wx.CallAfter(self.ParentWindow.UpdateTimeRemaining, self.TimeRemaining)
+        with self.AbortLock:
+            self.DDRescue = DDRescueProcess(ExecList)
 
-            except AttributeError:
-                pass
+            #Handle the user aborting before ddrescue started.
+            if self.Aborted:
+                self.DDRescue.Interrupt()
 
-        elif ("rescued:" in Line and SplitLine[0] not in ("rescued:", "pct")) or "ipos:" in Line: #Versions 1.14 - 1.20 & 1.21 - 1.22
-            if Settings["DDRescueVersion"] in ("1.21", "1.22"):
-                Status, Info = Line.split("ipos:")
+        #Grab information from ddrescue as soon as it's available, until it closes its output.
+        for Text, Terminator in self.DDRescue.ReadRecords():
+            #Process each record, and send the results to the GUI thread.
+            if Text.strip() != "":
+                try:
+                    self.ProcessLine(Text)
 
-            else:
-                Status, Info = Line.split("rescued:")
+                except Exception as e:
+                    #Handle unexpected errors. Can happen once in normal operation on ddrescue v1.22.
+                    logger.warning("MainBackendThread(): Unexpected error parsing ddrescue's output! Can happen once on newer versions in normal operation. Are you running a newer/older version of ddrescue than we support?")
 
-            #Status Line.
-            if Status != self.OldStatus:
-                wx.CallAfter(self.ParentWindow.UpdateStatusBar, Status)
-                self.OldStatus = Status
+            self.Output.Write(Text, Terminator)
 
-            SplitLine = Info.split()
+            #Checking the mapfile is cheap unless ddrescue has updated it.
+            self.PollMapfile()
 
-            if Settings["DDRescueVersion"] in ("1.21", "1.22"):
-                self.CurrentReadRate, self.InputPos = self.GetCurrentReadRateAndIPos(SplitLine)
+            if self.Phases != None:
+                self.CheckPhase()
 
-                wx.CallAfter(self.ParentWindow.UpdateIpos, self.InputPos)
+        #Wait for ddrescue to exit, and get the final totals from the mapfile it writes as it does.
+        ReturnCode = self.DDRescue.Wait()
+        self.PollMapfile()
 
-            else:
-                self.CurrentReadRate, self.ErrorSize, self.RecoveredData, self.RecoveredDataUnit = self.GetCurrentReadRateErrorSizeandRecoveredData(SplitLine)
+        return ReturnCode
+
+    def Abort(self):
+        """Ask ddrescue to exit, escalating if it doesn't. Doesn't block. Other ddrescue processes are never touched."""
+        with self.AbortLock:
+            self.Aborted = True
 
-                #Change the unit of measurement of the current amount of recovered data if needed.
-                self.RecoveredData, self.RecoveredDataUnit = self.ChangeUnits(float(self.RecoveredData), self.RecoveredDataUnit, self.DiskCapacityUnit)
-                self.RecoveredData = round(self.RecoveredData,3)
+            if self.DDRescue != None:
+                logger.info("MainBackendThread().Abort(): Sending SIGINT to ddrescue (PID "+unicode(self.DDRescue.PID)+")...")
+                self.DDRescue.Interrupt()
 
-                self.TimeRemaining = self.CalculateTimeRemaining()
+            if self.Imager != None:
+                logger.info("MainBackendThread().Abort(): Stopping the parallel copies...")
+                self.Imager.Abort()
 
-                wx.CallAfter(self.ParentWindow.UpdateErrorSize, self.ErrorSize)
-                wx.CallAfter(self.ParentWindow.UpdateRecoveredData, unicode(self.RecoveredData)+" "+self.RecoveredDataUnit)
-                wx.CallAfter(self.ParentWindow.UpdateProgress, self.RecoveredData, self.DiskCapacity)
-                wx.CallAfter(self.ParentWindow.UpdateTimeRemaining, self.TimeRemaining)
+    def ProcessLine(self, Line):
+        """Process a given line to get ddrescue's current status and recovery information and send it to the GUI Thread""" 
+        Fields = self.Processor.ProcessLine(Line)
 
-            wx.CallAfter(self.ParentWindow.UpdateCurrentReadRate, self.CurrentReadRate)
+        if self.WatchingSlowRegions and self.CurrentStatus == "?":
+            self.CheckSlowRegion(Fields)
 
-        elif ("pct" not in Line):
-            #Probably a status line (maybe the initial one).
-            Status = Line
+        if "DiskCapacity" in Fields and not self.StartedTimer:
+            logger.info("MainBackendThread().Processline(): Got Initial Status...")
 
-            if Status != self.OldStatus:
-                wx.CallAfter(self.ParentWindow.UpdateStatusBar, Status)
-                self.OldStatus = Status
-            
-    def ChangeUnits(self, NumberToChange, CurrentUnit, RequiredUnit):
-        """Convert data so it uses the correct unit of measurement"""
-        #Prepare for the change.
-        CurrentUnitNumber = self.UnitList.index(CurrentUnit[0])
-        RequiredUnitNumber = self.UnitList.index(RequiredUnit[0])
-        ChangeInUnitNumber = RequiredUnitNumber - CurrentUnitNumber
-        Power = -ChangeInUnitNumber * 3
+            #Start time elapsed thread. Only once, as ddrescue is started again for each phase if we're recovering in phases.
+            ElapsedTimeThread(self.ParentWindow)
+            self.StartedTimer = True
 
-        #Do it.
-        return NumberToChange * 10**Power, RequiredUnit[:2]
+    def CheckSlowRegion(self, Fields):
+        """Ask ddrescue to exit if the slow region controller says it has got into a slow region, so it can be started again without it"""
+        if self.Restarting or self.EndingPhase:
+            return
 
-    def CalculateTimeRemaining(self):
-        """Calculate remaining time based on the average read rate and the current amount of data recovered"""
-        #Make sure everything's in the correct units.
-        NewAverageReadRate = self.ChangeUnits(float(self.AverageReadRate), self.AverageReadRateUnit, self.DiskCapacityUnit)[0]
+        Region = self.SlowRegions.Update(time.time(), Fields)
 
-        try:
-            #Perform the calculation and round it.
-            Result = (int(self.DiskCapacity) - self.RecoveredData) / NewAverageReadRate
-
-            #Convert between Seconds, Minutes, Hours, and Days to make the value as understandable as possible.
-            if Result <= 60:
-                return unicode(int(round(Result)))+" seconds"
-            elif Result >= 60 and Result <= 3600: 
-                return unicode(round(Result/60,1))+" minutes"
-            elif Result > 3600 and Result <= 86400:
-                return unicode(round(Result/3600,2))+" hours"
-            elif Result > 86400:
-                return unicode(round(Result/86400,2))+" days"
-
-        except ZeroDivisionError as Error:
-            #We can't divide by zero!
-            logger.warning("MainBackendThread().CalculateTimeRemaining(): Attempted to divide by zero! Error: "+unicode(Error)+". Returning 'Unknown'")
-            return "Unknown"
+        if Region != None:
+            logger.info("MainBackendThread().CheckSlowRegion(): ddrescue is reading slowly from "+unicode(Region[0])+" to "+unicode(Region[1])+". Asking ddrescue to exit so it can skip it for now...")
+            self.Restarting = True
+
+            with self.AbortLock:
+                self.DDRescue.Interrupt()
+
+    def CheckPhase(self):
+        """Ask ddrescue to exit if the phase engine says the current phase should end, so the next one can start"""
+        if self.EndingPhase or self.Restarting:
+            return
+
+        Reason = self.Phases.Update(time.time(), self.Totals)
+
+        if Reason != None:
+            logger.info("MainBackendThread().CheckPhase(): Phase "+self.Phases.Current.Name+" "+EndReasons[Reason]+". Asking ddrescue to exit so the next phase can start...")
+            self.EndingPhase = True
+
+            with self.AbortLock:
+                self.DDRescue.Interrupt()
+
+    def PollMapfile(self):
+        """Send the totals from the mapfile to the GUI thread, if ddrescue has updated it"""
+        Map = self.Tailer.Poll()
+
+        if Map != None:
+            logger.debug("MainBackendThread().PollMapfile(): Read updated mapfile with "+unicode(len(Map))+" blocks...")
+            self.Processor.ProcessMapfile(Map)
+            self.Totals = dict(Map.Totals)
+            self.CurrentStatus = Map.CurrentStatus
+            self.MapSize = Map.GetEnd()
+
+            if self.Snapshots != None:
+                try:
+                    self.Snapshots.Add(Map, time.time())
+
+                except (IOError, OSError) as Error:
+                    logger.error("MainBackendThread().PollMapfile(): Couldn't write snapshot: "+unicode(Error)+". Not keeping any more snapshots...")
+                    self.Snapshots = None
 
 #End Backend thread
 
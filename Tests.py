@@ -49,6 +49,8 @@ import Tests
 
 from Tests import GetDevInfoTests
 from Tests import BackendToolsTests
+from Tests import DDRescueToolsTests
+from Tests import MapfileToolsTests
 
 def usage():
     print("\nUsage: Tests.py [OPTION]\n\n")
@@ -57,6 +59,8 @@ def usage():
     print("       -d, --debug:                  Set logging level to debug, to show all logging messages. Default: show only critical logging messages.")
     print("       -g, --getdevinfo:             Run tests for GetDevInfo module.")
     print("       -b, --backendtools:           Run tests for BackendTools module.")
+    print("       -r, --ddrescuetools:          Run tests for DDRescueTools package.")
+    print("       -f, --mapfiletools:           Run tests for MapfileTools package.")
     print("       -m, --main:                   Run tests for main file (DDRescue-GUI.py).")
     print("       -a, --all:                    Run all the tests. The default.\n")
     print("       -t, --tests:                  Ignored.")
@@ -69,7 +73,7 @@ if os.geteuid() != 0:
 
 #Check all cmdline options are valid.
 try:
-    opts, args = getopt.getopt(sys.argv[1:], "hdgbmat", ["help", "debug", "getdevinfo", "backendtools", "main", "all", "tests"])
+    opts, args = getopt.getopt(sys.argv[1:], "hdgbrfmat", ["help", "debug", "getdevinfo", "backendtools", "ddrescuetools", "mapfiletools", "main", "all", "tests"])
 
 except getopt.GetoptError as err:
     #Invalid option. Show the help message and then exit.
@@ -79,7 +83,7 @@ except getopt.GetoptError as err:
     sys.exit(2)
 
 #Set up which tests to run based on options given.
-TestSuites = [GetDevInfoTests, BackendToolsTests] #*** Set up full defaults when finished ***
+TestSuites = [GetDevInfoTests, BackendToolsTests, DDRescueToolsTests, MapfileToolsTests] #*** Set up full defaults when finished ***
 
 #Log only critical message by default.
 loggerLevel = logging.CRITICAL
@@ -89,11 +93,15 @@ for o, a in opts:
         TestSuites = [GetDevInfoTests]
     elif o in ["-b", "--backendtools"]:
         TestSuites = [BackendToolsTests]
+    elif o in ["-r", "--ddrescuetools"]:
+        TestSuites = [DDRescueToolsTests]
+    elif o in ["-f", "--mapfiletools"]:
+        TestSuites = [MapfileToolsTests]
     elif o in ["-m", "--main"]:
         #TestSuites = [MainTests]
         assert False, "Not implemented yet"
     elif o in ["-a", "--all"]:
-        TestSuites = [GetDevInfoTests, BackendToolsTests]
+        TestSuites = [GetDevInfoTests, BackendToolsTests, DDRescueToolsTests, MapfileToolsTests]
         #TestSuites.append(MainTests)
     elif o in ["-t", "--tests"]:
         pass
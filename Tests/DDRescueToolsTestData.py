@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*- 
+# DDRescueTools test data for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Functions to return test data.
+def ReturnFakeDDRescueOutput():
+    """Return a short sample of ddrescue v1.22's output, and the records it should be split into"""
+    Output = "GNU ddrescue 1.22\nPress Ctrl-C to interrupt\n     ipos:        0 B, non-trimmed:        0 B,  current rate:       0 B/s\nCopying non-tried blocks... Pass 1 (forwards)\r\x1b[A\x1b[A     ipos:   65536 B, non-trimmed:        0 B,  current rate:   65536 B/s\n\nFinished"
+
+    Records = [("GNU ddrescue 1.22", "\n"), ("Press Ctrl-C to interrupt", "\n"), ("     ipos:        0 B, non-trimmed:        0 B,  current rate:       0 B/s", "\n"),
+               ("Copying non-tried blocks... Pass 1 (forwards)", "\r"), ("", "\x1b[A"), ("", "\x1b[A"), ("     ipos:   65536 B, non-trimmed:        0 B,  current rate:   65536 B/s", "\n"),
+               ("", "\n"), ("Finished", "")]
+
+    return Output, Records
+
+def ReturnFakeProcessorLines():
+    """Return the lines ddrescue v1.22 gives BackendThread at the start of a recovery"""
+    return ["GNU ddrescue 1.22", "About to copy 500 MBytes from /dev/sdb to /tmp/out.img", "Press Ctrl-C to interrupt",
+            "     ipos:   10485 kB, non-trimmed:        0 B,  current rate:  10485 kB/s", "     opos:   10485 kB, non-scraped:        0 B,  average rate:  10485 kB/s",
+            "non-tried:   94371 kB,  bad-sector:     4096 B,    error rate:       0 B/s", "  rescued:   10485 kB,   bad areas:        3,        run time:          1s",
+            "pct rescued:    2.09%, read errors:        0,  remaining time:         n/a", "                              time since last successful read:         n/a",
+            "Copying non-tried blocks... Pass 1 (forwards)"]
+
+def ReturnFakeParsedLines():
+    """Return sample lines of ddrescue's output for various versions, and the fields the parser should get from them"""
+    Dict = {}
+
+    Dict["1.14"] = {}
+    Dict["1.14"]["About to copy 500 MBytes from /dev/sdb to /tmp/out.img"] = {"DiskCapacity": 500000000}
+    Dict["1.14"]["rescued:    99614 kB,  errsize:       0 B,  current rate:   99614 kB/s"] = {"CurrentReadRate": 99614000, "ErrorSize": 0, "RecoveredData": 99614000}
+    Dict["1.14"]["   ipos:    99614 kB,   errors:       0,    average rate:   99614 kB/s"] = {"InputPos": 99614000, "NumErrors": 0, "AverageReadRate": 99614000}
+    Dict["1.14"]["   opos:    99614 kB,     time from last successful read:       0 s"] = {"OutputPos": 99614000, "TimeSinceLastRead": "0 s"}
+    Dict["1.14"]["Copying non-tried blocks..."] = {"Status": "Copying non-tried blocks..."}
+
+    Dict["1.18"] = {}
+    Dict["1.18"]["   opos:    99614 kB, run time:       1 s,  successful read:       0 s ago"] = {"OutputPos": 99614000, "TimeSinceLastRead": "0 s"}
+    Dict["1.18"]["time since last successful read: 0 s"] = {"Status": "time since last successful read: 0 s"}
+
+    Dict["1.20"] = {}
+    Dict["1.20"]["percent rescued:  53.08%      time since last successful read:         n/a"] = {"TimeSinceLastRead": "n/a"}
+
+    Dict["1.21"] = {}
+    Dict["1.21"]["     ipos:   10485 kB, non-trimmed:        0 B,  current rate:  10485 kB/s"] = {"CurrentReadRate": 10485000, "InputPos": 10485000}
+    Dict["1.21"]["     opos:   10485 kB, non-scraped:        0 B,  average rate:  10485 kB/s"] = {"OutputPos": 10485000, "AverageReadRate": 10485000}
+    Dict["1.21"]["non-tried:   94371 kB,  bad-sector:     4096 B,    error rate:       0 B/s"] = {"ErrorSize": 4096}
+    Dict["1.21"]["  rescued:   10485 kB,      errors:        3,        run time:          1s"] = {"RecoveredData": 10485000, "NumErrors": 3}
+    Dict["1.21"]["pct rescued:   10.00%, read errors:        0,  remaining time:         n/a"] = {}
+    Dict["1.21"]["                              time since last successful read:         n/a"] = {"TimeSinceLastRead": "n/a"}
+
+    Dict["1.22"] = {}
+    Dict["1.22"]["  rescued:   10485 kB,   bad areas:        3,        run time:          1s"] = {"RecoveredData": 10485000, "NumErrors": 3}
+    Dict["1.22"]["Copying non-tried blocks... Pass 1 (forwards)"] = {"Status": "Copying non-tried blocks... Pass 1 (forwards)"}
+    Dict["1.22"]["   "] = {}
+
+    return Dict
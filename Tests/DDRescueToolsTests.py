@@ -0,0 +1,807 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*- 
+# DDRescueTools tests for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules
+import unittest
+import os
+import errno
+import mmap
+import random
+import signal
+import time
+import shutil
+import tempfile
+import threading
+
+from Tools.DDRescueTools import outputreader as OutputReader
+from Tools.DDRescueTools import outputparser as OutputParser
+from Tools.DDRescueTools.status import StatusSnapshot, FormatSize
+from Tools.DDRescueTools.processor import OutputProcessor
+from Tools.DDRescueTools.process import DDRescueProcess
+from Tools.DDRescueTools.outputbuffer import OutputBuffer, OutputHistory
+from Tools.DDRescueTools.terminal import Screen, LineIndex
+from Tools.DDRescueTools.phases import Phase, PhaseEngine, ReturnDefaultPlan
+from Tools.DDRescueTools import slowregions as SlowRegions
+from Tools.DDRescueTools import tuning as Tuning
+from Tools.DDRescueTools import sessions as Sessions
+from Tools.DDRescueTools import parallel as Parallel
+from Tools.MapfileTools import mapfile as Mapfile
+
+#Import test data.
+from . import DDRescueToolsTestData as Data
+
+class TestReadRecords(unittest.TestCase):
+    def setUp(self):
+        self.Output, self.Records = Data.ReturnFakeDDRescueOutput()
+        self.ReadEnd, self.WriteEnd = os.pipe()
+
+    def tearDown(self):
+        os.close(self.ReadEnd)
+        del self.Output
+        del self.Records
+        del self.ReadEnd
+        del self.WriteEnd
+
+    def ReadOutput(self, Output, ChunkSize):
+        os.write(self.WriteEnd, Output)
+        os.close(self.WriteEnd)
+        return list(OutputReader.ReadRecords(self.ReadEnd, ChunkSize))
+
+    def testReadRecords(self):
+        self.assertEqual(self.ReadOutput(self.Output.encode("UTF-8"), 65536), self.Records)
+
+    def testReadRecordsTinyChunks(self):
+        #Control sequences and characters split across reads must still come out whole.
+        self.assertEqual(self.ReadOutput(self.Output.encode("UTF-8"), 1), self.Records)
+
+    def testReadRecordsMultibyte(self):
+        self.assertEqual(self.ReadOutput("Test ¬ char\n".encode("UTF-8"), 1), [("Test ¬ char", "\n")])
+
+    def testReadRecordsEmpty(self):
+        self.assertEqual(self.ReadOutput(b"", 65536), [])
+
+class TestStatusSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.Status = StatusSnapshot()
+
+    def tearDown(self):
+        del self.Status
+
+    def testCoalescing(self):
+        #Only the latest value of each field should be collected.
+        for InputPos in range(100):
+            self.Status.Set(InputPos=InputPos, NumErrors=0)
+
+        self.Status.Set(NumErrors=5)
+        Status, Changed = self.Status.Collect()
+        self.assertEqual((Status.InputPos, Status.NumErrors, Status.RecoveredData), (99, 5, None))
+        self.assertEqual(Changed, set(["InputPos", "NumErrors"]))
+
+        #And nothing after that until something changes again, though the values are kept.
+        Status, Changed = self.Status.Collect()
+        self.assertEqual((Status.InputPos, Changed), (99, set()))
+
+    def testFormatSize(self):
+        self.assertEqual(FormatSize(None), "Unknown")
+        self.assertEqual(FormatSize(512), "512 B")
+        self.assertEqual(FormatSize(99614000, "B/s"), "99.61 MB/s")
+        self.assertEqual(FormatSize(500107862016), "500.11 GB")
+
+class TestParser(unittest.TestCase):
+    def setUp(self):
+        self.Lines = Data.ReturnFakeParsedLines()
+
+    def tearDown(self):
+        del self.Lines
+
+    def testParse(self):
+        for Version in self.Lines:
+            Parser = OutputParser.GetParser(Version)
+
+            for Line in self.Lines[Version]:
+                self.assertEqual(Parser.Parse(Line), self.Lines[Version][Line])
+
+    def testGetParserCaches(self):
+        self.assertTrue(OutputParser.GetParser("1.22") is OutputParser.GetParser("1.22"))
+
+    def testUnsupportedVersions(self):
+        #These should use the closest supported version's handlers.
+        self.assertEqual(OutputParser.Parser("1.13").Parse("   opos:    99614 kB,     time from last successful read:       0 s"), {"OutputPos": 99614000, "TimeSinceLastRead": "0 s"})
+        self.assertEqual(OutputParser.Parser("1.23").Parse("  rescued:   10485 kB,   bad areas:        3,        run time:          1s"), {"RecoveredData": 10485000, "NumErrors": 3})
+
+    def testParseSize(self):
+        #Sizes should be exact, whatever the units.
+        self.assertEqual(OutputParser.ParseSize("53.08", "GB"), 53080000000)
+        self.assertEqual(OutputParser.ParseSize("1.5", "MiB"), 1572864)
+        self.assertEqual(OutputParser.ParseSize(500, "MBytes"), 500000000)
+        self.assertEqual(OutputParser.ParseSizeText("99614 kB/s"), 99614000)
+
+    def testFuzz(self):
+        #Garbage should either parse, or raise IndexError or ValueError, which BackendThread handles.
+        Random = random.Random(0)
+        Words = ["About", "ipos:", "opos:", "rescued:", "non-tried:", "time", "percent", "pct", "kB,", "0", "B", "x"]
+
+        for Version in ("1.14", "1.18", "1.20", "1.21", "1.22"):
+            Parser = OutputParser.GetParser(Version)
+
+            for Attempt in range(2000):
+                Line = ' '.join(Random.choice(Words) for Word in range(Random.randint(0, 12)))
+
+                try:
+                    self.assertTrue(isinstance(Parser.Parse(Line), dict))
+
+                except (IndexError, ValueError):
+                    pass
+
+class TestOutputProcessor(unittest.TestCase):
+    def setUp(self):
+        self.Status = StatusSnapshot()
+        self.Processor = OutputProcessor("1.22", self.Status)
+
+    def tearDown(self):
+        del self.Status
+        del self.Processor
+
+    def testProcessLines(self):
+        for Line in Data.ReturnFakeProcessorLines():
+            self.Processor.ProcessLine(Line)
+
+        Status, Changed = self.Status.Collect()
+
+        self.assertTrue(self.Processor.GotInitialStatus)
+        self.assertEqual((Status.DiskCapacity, Status.RecoveredData, Status.AverageReadRate, Status.NumErrors), (500000000, 10485000, 10485000, 3))
+        self.assertEqual(Status.TimeRemaining, 46)
+        self.assertEqual(Status.Status, "Copying non-tried blocks... Pass 1 (forwards)")
+
+    def testProcessMapfile(self):
+        Map = Mapfile.Mapfile()
+        Map.AddBlocks((0, 100000000, 100004096, 100008192, 100012288), (100000000, 4096, 4096, 4096, 399987712), "+-/*?")
+
+        for Line in Data.ReturnFakeProcessorLines():
+            self.Processor.ProcessLine(Line)
+
+            #Once we've read the mapfile, the sizes in the output should be ignored, as the mapfile's are exact.
+            if Line.startswith("About to copy"):
+                self.Processor.ProcessMapfile(Map)
+
+        Status, Changed = self.Status.Collect()
+
+        self.assertEqual((Status.DiskCapacity, Status.RecoveredData, Status.ErrorSize), (500000000, 100000000, 12288))
+        self.assertEqual((Status.NonTried, Status.NonTrimmed, Status.NonScraped, Status.BadSectorSize), (399987712, 4096, 4096, 4096))
+        self.assertEqual(Status.TimeRemaining, 38)
+
+    def testTimeRemainingUnknown(self):
+        #We can't work out the time remaining until we know the disk's capacity.
+        self.Processor.ProcessLine("     opos:   10485 kB, non-scraped:        0 B,  average rate:  10485 kB/s")
+        self.assertEqual(self.Status.Collect()[0].TimeRemaining, None)
+
+class TestDDRescueProcess(unittest.TestCase):
+    def testReadAndWait(self):
+        Process = DDRescueProcess(["sh", "-c", "printf 'rescued: 1 B\\nFinished'; exit 3"])
+        self.assertEqual(list(Process.ReadRecords()), [("rescued: 1 B", "\n"), ("Finished", "")])
+        self.assertEqual(Process.Wait(), 3)
+
+        #It has exited, so its PID must not be signalled again.
+        self.assertFalse(Process.Signal(signal.SIGINT))
+
+    def testInterrupt(self):
+        Process = DDRescueProcess(["sleep", "30"])
+        StartTime = time.time()
+        Process.Interrupt()
+
+        self.assertEqual(Process.Wait(), -signal.SIGINT)
+        self.assertTrue(time.time() - StartTime < 5)
+
+    def testInterruptEscalates(self):
+        #This ignores SIGINT, so it should get SIGTERM after the timeout.
+        Process = DDRescueProcess(["sh", "-c", "trap '' INT; exec sleep 30"])
+        time.sleep(0.5)
+        Process.Interrupt(Timeout=0.5)
+
+        self.assertEqual(Process.Wait(), -signal.SIGTERM)
+
+class TestOutputBuffer(unittest.TestCase):
+    def setUp(self):
+        self.Output, self.Records = Data.ReturnFakeDDRescueOutput()
+        self.Directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Output
+        del self.Records
+        del self.Directory
+
+    def testWrite(self):
+        #Text should be overwritten in place, like on a terminal.
+        Buffer = OutputBuffer()
+
+        for Text, Terminator in self.Records:
+            Buffer.Write(Text, Terminator)
+
+        self.assertEqual(Buffer.GetText(), "GNU ddrescue 1.22\n     ipos:   65536 B, non-trimmed:        0 B,  current rate:   65536 B/s\n     ipos:        0 B, non-trimmed:        0 B,  current rate:       0 B/s\nFinishednon-tried blocks... Pass 1 (forwards)")
+
+        #Every line has changed, and then nothing has changed since.
+        self.assertEqual(Buffer.Collect(), (0, dict(enumerate(Buffer.GetText().split("\n")))))
+        self.assertEqual(Buffer.Collect(), None)
+
+    def testMaxLines(self):
+        Buffer = OutputBuffer(MaxLines=3)
+
+        for Number in range(100):
+            Buffer.Write("Line %d" % Number, "\n")
+
+        Buffer.Write("", "\x1b[A")
+        Buffer.Write("Last", "")
+        self.assertEqual(Buffer.GetText(), "Line 98\nLast 99\n")
+
+    def testHistoryPermissions(self):
+        #The history file is only readable by us, and a symlink put in its place is removed, not written through.
+        FileName = os.path.join(self.Directory, "output.log")
+        Target = os.path.join(self.Directory, "target")
+
+        with open(Target, "wb") as File:
+            File.write(b"Important")
+
+        os.symlink(Target, FileName)
+        History = OutputHistory(FileName)
+        History.Write("Line")
+        History.Close()
+
+        self.assertFalse(os.path.islink(FileName))
+        self.assertEqual(os.stat(FileName).st_mode & 0o777, 0o600)
+
+        with open(Target, "rb") as File:
+            self.assertEqual(File.read(), b"Important")
+
+    def testHistory(self):
+        #Everything should be kept on disk, spread over the rotated files.
+        FileName = os.path.join(self.Directory, "output.log")
+        Buffer = OutputBuffer(MaxLines=1, History=OutputHistory(FileName, MaxBytes=100, BackupCount=100))
+
+        for Number in range(100):
+            Buffer.Write("Line %d" % Number, "\n")
+
+        Buffer.Close()
+
+        History = b""
+
+        for Number in range(len(os.listdir(self.Directory))-1, 0, -1):
+            with open(FileName+".%d" % Number, "rb") as File:
+                History += File.read()
+
+        with open(FileName, "rb") as File:
+            History += File.read()
+
+        self.assertEqual(History.decode("UTF-8"), ''.join("Line %d\n" % Number for Number in range(100)))
+
+class TestScreen(unittest.TestCase):
+    def setUp(self):
+        self.Screen = Screen(MaxLines=5)
+
+    def tearDown(self):
+        del self.Screen
+
+    def testCursorMovement(self):
+        self.Screen.Feed("abc\ndef\nghi\x1b[2AX\rY\x1b[BZ\x1b[3G!\tT")
+        self.assertEqual(self.Screen.GetText(), "YbcX\ndZ!     T\nghi")
+
+    def testEraseInLine(self):
+        self.Screen.Feed("abcdef\x1b[3G\x1b[K\nabcdef\x1b[3G\x1b[1K\nabcdef\x1b[2K")
+        self.assertEqual(self.Screen.GetText(), "ab\n   def\n")
+
+    def testSplitSequence(self):
+        #Escape sequences split across two chunks should still work.
+        self.Screen.Feed("abc\ndef\x1b")
+        self.Screen.Feed("[")
+        self.Screen.Feed("AX")
+        self.assertEqual(self.Screen.GetText(), "abcX\ndef")
+
+    def testDirtyLines(self):
+        self.Screen.Feed("1\n2\n3\n4\n5\n6")
+        self.assertEqual(self.Screen.Collect(), (1, {1: "2", 2: "3", 3: "4", 4: "5", 5: "6"}))
+
+        #Only the lines we changed should be returned.
+        self.Screen.Feed("\x1b[2AX")
+        self.assertEqual(self.Screen.Collect(), (1, {3: "4X"}))
+        self.assertEqual(self.Screen.Collect(), None)
+
+        #The cursor can't go above the first line we still have.
+        self.Screen.Feed("\x1b[99AY")
+        self.assertEqual(self.Screen.Collect(), (1, {1: "2 Y"}))
+
+class TestLineIndex(unittest.TestCase):
+    def ReturnSlowXY(self, Text, Position):
+        """Find the column and row of Position by scanning the whole text, as CustomTextCtrl used to"""
+        Before = Text[:Position]
+        return (len(Before) - (Before.rfind("\n") + 1), Before.count("\n"))
+
+    def testConversions(self):
+        Index = LineIndex("abc\n\ndef\ng")
+        self.assertEqual([Index.PositionToXY(Position) for Position in (0, 3, 4, 5, 8, 9, 10)], [(0, 0), (3, 0), (0, 1), (0, 2), (3, 2), (0, 3), (1, 3)])
+        self.assertEqual([Index.XYToPosition(0, Row) for Row in range(4)], [0, 4, 5, 9])
+        self.assertEqual(Index.XYToPosition(0, 4), -1)
+
+    def testRandomEdits(self):
+        #Check the index against a full rescan after lots of random edits.
+        Random = random.Random(0)
+        Text = ""
+        Index = LineIndex()
+
+        for Edit in range(500):
+            Start = Random.randint(0, len(Text))
+            End = Random.randint(Start, min(Start+10, len(Text)))
+            New = ''.join(Random.choice("ab\n") for Char in range(Random.randint(0, 10)))
+
+            Text = Text[:Start]+New+Text[End:]
+            Index.Replace(Start, End, New)
+
+            self.assertEqual(Index.Length, len(Text))
+            self.assertEqual(Index.NewLines, [Position for Position, Char in enumerate(Text) if Char == "\n"])
+
+            Position = Random.randint(0, len(Text))
+            self.assertEqual(Index.PositionToXY(Position), self.ReturnSlowXY(Text, Position))
+            self.assertEqual(Index.XYToPosition(*Index.PositionToXY(Position)), Position)
+
+class TestPhaseEngine(unittest.TestCase):
+    def setUp(self):
+        self.Plan = [Phase("Copying", ["-n"], "?", MinYield=1000, YieldWindow=60), Phase("Trimming", [], "?*", TimeBudget=3600), Phase("Retrying", ["-r 2"], "?*/-", TimeBudget=20)]
+        self.Engine = PhaseEngine(self.Plan)
+
+    def tearDown(self):
+        del self.Plan
+        del self.Engine
+
+    def ReturnTotals(self, Rescued, NonTried=0, NonTrimmed=0, NonScraped=0, Bad=0):
+        return {"+": Rescued, "?": NonTried, "*": NonTrimmed, "/": NonScraped, "-": Bad}
+
+    def testDefaultPlan(self):
+        self.assertEqual([Phase.Options for Phase in ReturnDefaultPlan("1.22")], [["-n", "-N"], ["-n", "-N", "-R"], ["-n"], ["-r 0"], ["-r 2"]])
+        self.assertEqual([Phase.Options for Phase in ReturnDefaultPlan("1.18", "-r 0")], [["-n"], ["-n", "-R"], ["-r 0"]])
+
+        #Every phase has a time budget, and the user's replaces them all.
+        self.assertEqual([Phase.TimeBudget for Phase in ReturnDefaultPlan("1.22")], [43200, 21600, 7200, 14400, 14400])
+        self.assertEqual([Phase.TimeBudget for Phase in ReturnDefaultPlan("1.18")], [43200, 21600, 21600, 14400])
+        self.assertEqual([Phase.TimeBudget for Phase in ReturnDefaultPlan("1.22", "-r 0", 3600)], [3600] * 4)
+
+    def testYield(self):
+        self.assertEqual(self.Engine.StartNext(0, self.ReturnTotals(0, NonTried=10**9)).Name, "Copying")
+
+        #Nothing is decided until the phase has run for the whole yield window.
+        self.assertEqual(self.Engine.Update(30, self.ReturnTotals(0, NonTried=10**9)), None)
+        self.assertEqual(self.Engine.GetYield(30), None)
+
+        #Fast to start with, then it slows to 1 byte a second after 100 seconds. It ends once the fast samples have dropped out of the window.
+        for Time in range(31, 161):
+            Rescued = min(Time, 100) * 10**6 + Time
+            self.assertEqual(self.Engine.Update(Time, self.ReturnTotals(Rescued, NonTried=10**9 - Rescued)), "Yield" if Time == 160 else None)
+
+        self.assertEqual(self.Engine.GetYield(160), 1)
+
+    def testBudgetsAndSkipping(self):
+        self.Engine.StartNext(0, self.ReturnTotals(0, NonTried=8192))
+
+        #The copying phase dealt with everything it works on, so the trimming phase is next.
+        self.assertEqual(self.Engine.StartNext(10, self.ReturnTotals(4096, NonTrimmed=4096)).Name, "Trimming")
+        self.assertEqual(self.Engine.Update(3609, self.ReturnTotals(4096, NonTrimmed=4096)), None)
+        self.assertEqual(self.Engine.Update(3610, self.ReturnTotals(4096, NonTrimmed=4096)), "Time")
+
+        self.assertEqual(self.Engine.StartNext(3610, self.ReturnTotals(4096, NonTrimmed=2048, Bad=8192)).Name, "Retrying")
+        self.assertEqual(self.Engine.Update(3620, self.ReturnTotals(6144, NonTrimmed=2048, Bad=6144)), None)
+        self.assertEqual(self.Engine.Update(3630, self.ReturnTotals(8192, NonTrimmed=2048, Bad=4096)), "Time")
+        self.assertEqual(self.Engine.StartNext(3630, self.ReturnTotals(8192, NonTrimmed=2048, Bad=4096)), None)
+
+    def testSkipEverything(self):
+        self.assertEqual(self.Engine.StartNext(0, self.ReturnTotals(8192)), None)
+
+    def testNoMapfileYet(self):
+        self.assertEqual(self.Engine.StartNext(0, None).Name, "Copying")
+        self.assertEqual(self.Engine.Update(1, None), None)
+        self.assertEqual(self.Engine.Update(2, self.ReturnTotals(0, NonTried=10**9)), None)
+        self.assertEqual(self.Engine.Update(62, self.ReturnTotals(0, NonTried=10**9)), "Yield")
+
+class TestSlowRegions(unittest.TestCase):
+    def setUp(self):
+        self.Controller = SlowRegions.SlowRegionController(MinReadRate=1000000, MaxTimeSinceRead=10, Window=30, SkipSize=1000, Backoff=4, MaxSkipSize=20000)
+
+    def tearDown(self):
+        del self.Controller
+
+    def testParseTimeText(self):
+        self.assertEqual([SlowRegions.ParseTimeText(Text) for Text in ("0 s", "12s", "1m 3s", "2h", "1d 1h", "n/a")], [0, 12, 63, 7200, 90000, None])
+        self.assertRaises(ValueError, SlowRegions.ParseTimeText, "soon")
+
+    def testSlowReadRate(self):
+        #Fast reads never trigger it, and slow ones only do once they've been slow for the whole window.
+        for Time in range(100):
+            self.assertEqual(self.Controller.Update(Time, {"InputPos": Time * 10**7, "CurrentReadRate": 10**8, "TimeSinceLastRead": "0 s"}), None)
+
+        for Time in range(100, 129):
+            self.assertEqual(self.Controller.Update(Time, {"InputPos": 10**9 + Time, "CurrentReadRate": 1000, "TimeSinceLastRead": "0 s"}), None)
+
+        self.assertEqual(self.Controller.Update(130, {"InputPos": 10**9 + 130, "CurrentReadRate": 1000, "TimeSinceLastRead": "0 s"}), (10**9 + 100, 10**9 + 1130))
+        self.assertEqual(self.Controller.Regions, [(10**9 + 100, 10**9 + 1130)])
+
+        #It starts watching again from scratch.
+        self.assertEqual(self.Controller.Update(131, {"InputPos": 10**9 + 131, "CurrentReadRate": 1000, "TimeSinceLastRead": "0 s"}), None)
+
+    def testTimeSinceLastReadAndBackoff(self):
+        self.assertEqual(self.Controller.Update(0, {"InputPos": 5000, "CurrentReadRate": 0, "TimeSinceLastRead": "n/a"}), None)
+        self.assertEqual(self.Controller.Update(10, {"InputPos": 5000, "CurrentReadRate": 0, "TimeSinceLastRead": "10 s"}), (5000, 6000))
+
+        #Each region next to the last one is bigger, up to the maximum, and they're joined together.
+        for Number, SkipSize in enumerate((4000, 16000, 20000, 20000)):
+            Start = self.Controller.Regions[-1][1]
+            self.assertEqual(self.Controller.Update(20 + Number, {"InputPos": Start, "CurrentReadRate": 0, "TimeSinceLastRead": "1m 2s"}), (Start, Start + SkipSize))
+
+        self.assertEqual(self.Controller.Regions, [(5000, 66000)])
+        self.assertEqual(self.Controller.ReturnOptions("1.22"), ["-a 1000000", "-K 20000"])
+        self.assertEqual(self.Controller.ReturnOptions("1.18"), ["-a 1000000"])
+
+        #A region far away from the last one starts small again. Reading backwards, it's before the position.
+        self.Controller.Reverse = True
+        self.assertEqual(self.Controller.Update(30, {"InputPos": 10**6, "CurrentReadRate": 0, "TimeSinceLastRead": "15s"}), (10**6 - 1000, 10**6))
+        self.assertEqual(self.Controller.Regions, [(5000, 66000), (10**6 - 1000, 10**6)])
+
+    def testReturnDomainBlocks(self):
+        self.assertEqual(SlowRegions.ReturnDomainBlocks([(100, 200), (300, 400)], 1000), [(0, 100, "+"), (100, 100, "?"), (200, 100, "+"), (300, 100, "?"), (400, 600, "+")])
+        self.assertEqual(SlowRegions.ReturnDomainBlocks([(0, 1000)], 1000), [(0, 1000, "?")])
+
+        #With an existing domain, regions are only taken out of the parts of it that are finished.
+        Domain = Mapfile.Mapfile()
+        Domain.AddBlocks([0, 50, 250, 600], [50, 200, 350, 400], "+?+?")
+        self.assertEqual(SlowRegions.ReturnDomainBlocks([(10, 20), (200, 300), (550, 700)], 1000, Domain), [(0, 10, "+"), (10, 10, "?"), (20, 30, "+"), (50, 250, "?"), (300, 250, "+"), (550, 450, "?")])
+
+class SimulatedTuner(Tuning.ClusterSizeTuner):
+    """Times reads from a simulated disk, where each read takes a fixed latency plus the time to transfer it"""
+    def __init__(self, FileName, Latency, BytesPerSecond, **Options):
+        Tuning.ClusterSizeTuner.__init__(self, FileName, **Options)
+        self.Latency = Latency
+        self.BytesPerSecond = BytesPerSecond
+        self.Time = 0
+        self.Positions = []
+
+    def GetTime(self):
+        return self.Time
+
+    def Read(self, FileDescriptor, Position, Size):
+        self.Time += self.Latency + Size / self.BytesPerSecond
+        self.Positions.append(Position)
+        return Size
+
+class TestClusterSizeTuner(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+        self.FileName = os.path.join(self.Directory, "image.img")
+
+        with open(self.FileName, "wb") as File:
+            File.truncate(64*1024*1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Directory
+        del self.FileName
+
+    def testSimulatedDisk(self):
+        #With a high latency for each read, bigger clusters are faster.
+        Tuner = SimulatedTuner(self.FileName, 0.001, 100*10**6, TimeLimit=0.05)
+        Results = Tuner.Run()
+        self.assertEqual(sorted(Results), [32, 64, 128, 256])
+        self.assertTrue(Results[32] < Results[64] < Results[128] < Results[256])
+        self.assertEqual(Tuning.ChooseClusterSize(Results), 256)
+
+        #Each cluster size reads its own parts of the file, so none of them are read twice.
+        self.assertEqual(len(Tuner.Positions), len(set(Tuner.Positions)))
+        self.assertTrue(max(Tuner.Positions) < 64*1024*1024)
+
+    def testReadInto(self):
+        #Reads into aligned buffers without os.preadv(), for direct reads on older versions of Python.
+        if Tuning.PRead == None:
+            return
+
+        Data = os.urandom(8192)
+
+        with open(self.FileName, "r+b") as File:
+            File.write(Data)
+
+        FileDescriptor = os.open(self.FileName, os.O_RDONLY)
+
+        try:
+            Buffer = mmap.mmap(-1, 4096)
+            self.assertEqual(Tuning.ReadInto(FileDescriptor, Buffer, 4096), 4096)
+            self.assertEqual(Buffer[:], Data[4096:])
+            self.assertEqual(Tuning.ReadInto(FileDescriptor, Buffer, 64*1024*1024), 0)
+
+        finally:
+            os.close(FileDescriptor)
+
+        self.assertRaises(OSError, Tuning.ReadInto, -1, Buffer, 0)
+
+    def testDirectReadsRefused(self):
+        #Direct reads that are refused as invalid are tried again without them, rather than being taken as a failing disk.
+        Tuner = SimulatedTuner(self.FileName, 0.001, 100*10**6, TimeLimit=0.05)
+        Open = Tuner.Open
+        Read = Tuner.Read
+
+        def OpenDirect():
+            #Pretend direct reads are always possible when opening the file.
+            FileDescriptor = Open()
+            Tuner.UsingDirect = Tuner.Direct
+            return FileDescriptor
+
+        def RefuseDirectReads(FileDescriptor, Position, Size):
+            if Tuner.UsingDirect:
+                raise OSError(errno.EINVAL, "Invalid argument")
+
+            return Read(FileDescriptor, Position, Size)
+
+        Tuner.Open = OpenDirect
+        Tuner.Read = RefuseDirectReads
+        Results = Tuner.Run()
+        self.assertFalse(Tuner.UsingDirect)
+        self.assertEqual(Tuning.ChooseClusterSize(Results), 256)
+
+        #Other errors still stop the measurement.
+        Tuner = SimulatedTuner(self.FileName, 0.001, 100*10**6, TimeLimit=0.05, Direct=False)
+
+        def FailReads(FileDescriptor, Position, Size):
+            raise OSError(errno.EIO, "Input/output error")
+
+        Tuner.Read = FailReads
+        self.assertEqual(set(Tuner.Run().values()), set([0]))
+
+    def testChooseClusterSize(self):
+        self.assertEqual(Tuning.ChooseClusterSize({32: 50, 64: 96, 128: 100, 256: 99}), 64)
+        self.assertEqual(Tuning.ChooseClusterSize({32: 50, 64: 90, 128: 100}, Tolerance=0), 128)
+        self.assertRaises(ValueError, Tuning.ChooseClusterSize, {32: 0, 64: 0})
+
+    def testImageFile(self):
+        Results = Tuning.ClusterSizeTuner(self.FileName, TimeLimit=0.01, MaxBytes=1024*1024).Run()
+        self.assertTrue(all(Rate > 0 for Rate in Results.values()))
+        self.assertTrue(Tuning.ChooseClusterSize(Results) in Tuning.ClusterSizes)
+
+    def testStore(self):
+        FileName = os.path.join(self.Directory, "config", "clustersizes.json")
+        Store = Tuning.ClusterSizeStore(FileName)
+        self.assertEqual(Store.Get("ATA Example Disk"), None)
+
+        Store.Set("ATA Example Disk", 64, {32: 1000.5, 64: 2000})
+        Store.Save()
+
+        Store = Tuning.ClusterSizeStore(FileName)
+        self.assertEqual(Store.Get("ATA Example Disk"), 64)
+        self.assertEqual(Store.Models["ATA Example Disk"]["BytesPerSecond"], {"32": 1000, "64": 2000})
+
+        with open(FileName, "w") as File:
+            File.write("[]")
+
+        self.assertRaises(ValueError, Tuning.ClusterSizeStore, FileName)
+
+class TestSessions(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Directory
+
+    def MakeSession(self, Name, Script, Controller, Destination="filesystem:1", InputFile=None):
+        MapfileName = os.path.join(self.Directory, Name+".map")
+        ExecList = ["sh", "-c", Script.replace("MAPFILE", MapfileName)]
+        return Sessions.Session(Name, ExecList, InputFile or "/dev/"+Name, os.path.join(self.Directory, Name+".img"), MapfileName, "1.22", Controller, Destination)
+
+    def testControllerKeys(self):
+        #A fake sysfs, with two disks on one SATA controller, an NVMe disk, and a loop device.
+        Devices = {"sda": "pci0000:00/0000:00:1f.2/ata1/host0/target0:0:0/0:0:0:0/block/sda", "sdb": "pci0000:00/0000:00:1f.2/ata2/host1/target1:0:0/1:0:0:0/block/sdb",
+                   "nvme0n1": "pci0000:00/0000:00:1d.0/0000:3d:00.0/nvme/nvme0/nvme0n1", "loop0": "virtual/block/loop0"}
+        SysBlock = os.path.join(self.Directory, "block")
+        os.mkdir(SysBlock)
+
+        for Name, Path in Devices.items():
+            os.makedirs(os.path.join(self.Directory, "devices", Path))
+            os.symlink(os.path.join(self.Directory, "devices", Path), os.path.join(SysBlock, Name))
+
+        os.mkdir(os.path.join(self.Directory, "devices", Devices["sda"], "sda1"))
+
+        Keys = dict((Name, Sessions.ReturnControllerKey("/dev/"+Name, SysBlock)) for Name in ("sda", "sda1", "sdb", "nvme0n1", "loop0"))
+        self.assertEqual(Keys["sda"], "controller:"+os.path.join(self.Directory, "devices", "pci0000:00", "0000:00:1f.2"))
+        self.assertEqual(Keys["sda"], Keys["sda1"])
+        self.assertEqual(Keys["sda"], Keys["sdb"])
+        self.assertTrue(Keys["nvme0n1"].endswith("0000:3d:00.0"))
+        self.assertEqual(Keys["loop0"], "device:loop0")
+
+        #Image files are keyed by their filesystem, whether they're read or written.
+        FileName = os.path.join(self.Directory, "image.img")
+        open(FileName, "wb").close()
+        self.assertEqual(Sessions.ReturnControllerKey(FileName, SysBlock), "filesystem:%d" % os.stat(self.Directory).st_dev)
+        self.assertEqual(Sessions.ReturnDestinationKey(os.path.join(self.Directory, "new.img"), SysBlock), "filesystem:%d" % os.stat(self.Directory).st_dev)
+
+    def testScheduling(self):
+        Scheduler = Sessions.SessionScheduler(MaxPerController=1, MaxPerDestination=2)
+        Script = "sleep 0.5; printf '0x0 +\\n0x0 0x200 +\\n' > MAPFILE; printf '     ipos:        0 B, non-trimmed:        0 B,  current rate:     512 B/s\\n'"
+        First, Second, Third, Fourth = [self.MakeSession(Name, Script, Controller) for Name, Controller in (("sda", "c1"), ("sdb", "c1"), ("sdc", "c2"), ("sdd", "c3"))]
+
+        for Session in (First, Second, Third, Fourth):
+            Scheduler.Add(Session)
+
+        #The second has to wait for the first, as they're on the same controller, and the fourth has to wait too, as two are already writing to the destination.
+        self.assertEqual([Session.State for Session in (First, Second, Third, Fourth)], ["Running", "Queued", "Running", "Queued"])
+        self.assertTrue(Scheduler.IsBusy())
+
+        Scheduler.Wait()
+        self.assertEqual([Session.State for Session in (First, Second, Third, Fourth)], ["Finished"] * 4)
+        self.assertEqual([Session.Status.Collect()[0].RecoveredData for Session in (First, Second, Third, Fourth)], [512] * 4)
+        self.assertEqual([Session.Status.Collect()[0].CurrentReadRate for Session in (First, Second, Third, Fourth)], [512] * 4)
+
+    def testConflictsAndFailures(self):
+        Scheduler = Sessions.SessionScheduler()
+        Running = self.MakeSession("sda", "sleep 30", "c1")
+        Scheduler.Add(Running)
+
+        self.assertRaises(ValueError, Scheduler.Add, self.MakeSession("sda", "true", "c2"))
+        self.assertRaises(ValueError, Scheduler.Add, self.MakeSession("sdb", "true", "c2", InputFile=Running.OutputFile))
+
+        Failing = self.MakeSession("sdc", "exit 3", "c3")
+        Missing = Sessions.Session("sdd", [os.path.join(self.Directory, "no-ddrescue")], "/dev/sdd", "sdd.img", "sdd.map", "1.22", "c4", "filesystem:2")
+        Scheduler.Add(Failing)
+        Scheduler.Add(Missing)
+
+        time.sleep(0.5)
+        Scheduler.AbortAll()
+        Scheduler.Wait()
+        self.assertEqual([Session.State for Session in (Running, Failing, Missing)], ["Aborted", "Failed", "Failed"])
+        self.assertEqual(Failing.ReturnCode, 3)
+
+    def testUnexpectedErrors(self):
+        Scheduler = Sessions.SessionScheduler(MaxPerController=1)
+        Broken = self.MakeSession("sda", "sleep 30", "c1")
+        Waiting = self.MakeSession("sdb", "true", "c1")
+
+        #Something goes wrong while watching ddrescue.
+        def ProcessLine(Line):
+            raise RuntimeError("Unexpected")
+
+        Broken.Processor.ProcessLine = ProcessLine
+        Broken.ExecList = ["sh", "-c", "echo Hello; sleep 30"]
+
+        Scheduler.Add(Broken)
+        Scheduler.Add(Waiting)
+        Scheduler.Wait()
+
+        self.assertEqual([Broken.State, Waiting.State], ["Failed", "Finished"])
+        self.assertTrue(isinstance(Broken.Error, RuntimeError))
+
+    def testExternalSessions(self):
+        #Something else is recovering sda, on the same controller as sdb.
+        Scheduler = Sessions.SessionScheduler(MaxPerController=1)
+        External = self.MakeSession("sda", "", "c1")
+        Scheduler.AddExternal(External)
+
+        self.assertRaises(ValueError, Scheduler.Add, self.MakeSession("sda", "true", "c2"))
+        self.assertRaises(ValueError, Scheduler.AddExternal, self.MakeSession("sda", "", "c2"))
+
+        Waiting = self.MakeSession("sdb", "true", "c1")
+        Scheduler.Add(Waiting)
+        self.assertEqual(Waiting.State, "Queued")
+
+        Scheduler.RemoveExternal(External)
+        Scheduler.Wait()
+        self.assertEqual(Waiting.State, "Finished")
+
+class SimulatedSession(Sessions.Session):
+    """Copies a range of a simulated disk at a fixed number of bytes every 10 ms, resuming from its mapfile, and writes the mapfile when it stops"""
+    def __init__(self, ExecList, MapfileName, Speed):
+        Sessions.Session.__init__(self, "Simulated", ExecList, "/dev/sda", "sda.img", MapfileName, "1.22", None, None)
+        self.Start = int(ExecList[-2][3:])
+        self.End = self.Start + int(ExecList[-1][3:])
+        self.Speed = Speed
+        self.Stopping = False
+
+    def Run(self):
+        Position = self.Start
+
+        if os.path.exists(self.MapfileName):
+            for Start, Size, Status in Mapfile.ReadBlocks(self.MapfileName):
+                if Status == "+" and Start <= Position < Start + Size:
+                    Position = min(Start + Size, self.End)
+
+        while Position < self.End and not self.Stopping:
+            Position = min(Position + self.Speed, self.End)
+            self.Status.Set(InputPos=Position)
+            time.sleep(0.01)
+
+        Map = Mapfile.Mapfile()
+        Map.AddBlocks([0, self.Start, Position], [self.Start, Position - self.Start, self.End - Position], "?+?")
+        Mapfile.Write(Map, self.MapfileName)
+        self.Processor.ProcessMapfile(Map)
+
+        with self.Lock:
+            if self.State != "Aborted":
+                self.State = "Finished"
+
+    def Abort(self):
+        Sessions.Session.Abort(self)
+        self.Stopping = True
+
+class SimulatedImager(Parallel.ParallelImager):
+    """Copies with simulated sessions. The first range is much slower than the rest, like a worker stuck behind the others."""
+    def CreateSession(self, Range):
+        return SimulatedSession(self.ReturnExecList(Range), Range.MapfileName, 1024 if Range.Start == 0 else 64*1024)
+
+class TestParallelImager(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+        self.MapfileName = os.path.join(self.Directory, "sda.map")
+        self.ExecList = ["ddrescue", "-v", "-c 128", "/dev/sda", "sda.img", self.MapfileName]
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Directory
+        del self.MapfileName
+        del self.ExecList
+
+    def testMergeRanges(self):
+        #Each mapfile covers the whole disk, but only its own range counts.
+        Ranges = [Parallel.Range(0, 4096, os.path.join(self.Directory, "0.map")), Parallel.Range(4096, 8192, os.path.join(self.Directory, "1.map")),
+                  Parallel.Range(8192, 12288, os.path.join(self.Directory, "2.map"))]
+
+        for Range, Statuses in zip(Ranges[:2], ("+-?", "?+?")):
+            Map = Mapfile.Mapfile()
+            Map.AddBlocks([0, 1024, 6144], [1024, 5120, 10240], Statuses)
+            Mapfile.Write(Map, Range.MapfileName)
+
+        Parallel.MergeRanges(Ranges, self.MapfileName, 16384)
+        Map = Mapfile.Read(self.MapfileName)
+        self.assertEqual(list(Map.GetBlocks()), [(0, 1024, "+"), (1024, 3072, "-"), (4096, 2048, "+"), (6144, 10240, "?")])
+        self.assertEqual(Map.CurrentPass, 1)
+
+        #Each range is copied with its own mapfile.
+        Imager = Parallel.ParallelImager(self.ExecList, "/dev/sda", "sda.img", self.MapfileName, "1.22", 10*1024*1024, Workers=2, Alignment=4096)
+        self.assertEqual([(Range.Start, Range.End) for Range in Imager.Ranges][:2], [(0, 1310720), (1310720, 2621440)])
+        self.assertEqual(Imager.ReturnExecList(Imager.Ranges[1]), ["ddrescue", "-v", "-c 128", "/dev/sda", "sda.img", self.MapfileName+".part1", "-i 1310720", "-s 1310720"])
+        self.assertRaises(ValueError, Parallel.ParallelImager, self.ExecList[:-1], "/dev/sda", "sda.img", self.MapfileName, "1.22", 1024)
+
+    def testRebalancing(self):
+        Size = 8*1024*1024
+        Imager = SimulatedImager(self.ExecList, "/dev/sda", "sda.img", self.MapfileName, "1.22", Size, Workers=2, Pieces=2, MinSplit=64*1024, Alignment=4096, Interval=0.01)
+        self.assertTrue(Imager.Run())
+
+        #The slow first range was split as the second finished, and then split again, so it didn't hold everything up.
+        self.assertTrue(len(Imager.Ranges) > 3)
+        self.assertTrue(Imager.Ranges[0].End < Size // 4)
+        self.assertEqual(list(Mapfile.Read(self.MapfileName).GetBlocks()), [(0, Size, "+")])
+        self.assertEqual(Imager.GetRescued(), Size)
+        self.assertFalse(any(os.path.exists(Range.MapfileName) for Range in Imager.Ranges))
+
+    def testAbortAndResume(self):
+        Size = 8*1024*1024
+        Imager = SimulatedImager(self.ExecList, "/dev/sda", "sda.img", self.MapfileName, "1.22", Size, Workers=2, Pieces=2, MinSplit=64*1024, Alignment=4096, Interval=0.01)
+        threading.Timer(0.2, Imager.Abort).start()
+        self.assertFalse(Imager.Run())
+
+        Rescued = Mapfile.Read(self.MapfileName).Totals["+"]
+        self.assertTrue(0 < Rescued < Size)
+
+        #Resuming starts each range from the merged mapfile.
+        Imager = SimulatedImager(self.ExecList, "/dev/sda", "sda.img", self.MapfileName, "1.22", Size, Workers=2, Pieces=2, MinSplit=64*1024, Alignment=4096, Interval=0.01)
+        self.assertTrue(Imager.Run())
+        self.assertEqual(Mapfile.Read(self.MapfileName).Totals["+"], Size)
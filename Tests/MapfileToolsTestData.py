@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*- 
+# MapfileTools test data for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import zlib
+import uuid
+import struct
+
+#Functions to return test data.
+def ReturnFakeMapfile():
+    """Return a small mapfile from ddrescue 1.22 (with an extra comment in the middle, which ddrescue allows), and the blocks in it"""
+    Text = ("# Mapfile. Created by GNU ddrescue version 1.22\n"
+            "# Command line: ddrescue -d /dev/sdb /mnt/backup/sdb.img /mnt/backup/sdb.map\n"
+            "# Start time:   2017-06-01 12:00:00\n"
+            "# Current time: 2017-06-01 13:00:00\n"
+            "# Scraping failed blocks... (forwards)\n"
+            "# current_pos  current_status  current_pass\n"
+            "0x00130000     /               1\n"
+            "#      pos        size  status\n"
+            "0x00000000  0x00100000  +\n"
+            "0x00100000  0x00010000  -\n"
+            "0x00110000  0x00020000  /\n"
+            "\n"
+            "# Not scraped yet.\n"
+            "0x00130000  0x00001000  *\n"
+            "0x00131000  0x000CF000  +\n"
+            "0x00200000  0x00600000  ?\n")
+
+    Blocks = [(0, 1048576, "+"), (1048576, 65536, "-"), (1114112, 131072, "/"), (1245184, 4096, "*"), (1249280, 847872, "+"), (2097152, 6291456, "?")]
+
+    return Text, Blocks
+
+def ReturnOldFakeMapfile():
+    """Return a small logfile from ddrescue 1.19, which has no current pass, and uses decimal positions and sizes (which ddrescue also accepts)"""
+    Text = ("# Rescue Logfile. Created by GNU ddrescue version 1.19\n"
+            "# current_pos  current_status\n"
+            "4096     ?\n"
+            "#      pos        size  status\n"
+            "0  4096  +\n"
+            "4096  8192  ?\n")
+
+    Blocks = [(0, 4096, "+"), (4096, 8192, "?")]
+
+    return Text, Blocks
+
+def ReturnMBRSector(Entries):
+    """Return an MBR or EBR sector with the given (type, start sector, number of sectors) entries"""
+    Sector = bytearray(512)
+
+    for Number, (Type, Start, Count) in enumerate(Entries):
+        Sector[446+Number*16:462+Number*16] = struct.pack(str("<4xB3xII"), Type, Start, Count)
+
+    Sector[510:512] = b"\x55\xaa"
+    return Sector
+
+def ReturnFakeMBRDisk():
+    """Return an 8 MiB disk with an MBR, one primary partition, and an extended partition with two logical partitions, and the (number, start, size, type) of each partition"""
+    Disk = bytearray(8*1024*1024)
+    Disk[0:512] = ReturnMBRSector([(0x83, 2048, 4096), (0x05, 8192, 8192)])
+    Disk[8192*512:8193*512] = ReturnMBRSector([(0x07, 2048, 2048), (0x05, 4096, 4096)])
+    Disk[12288*512:12289*512] = ReturnMBRSector([(0x0B, 2048, 2048)])
+
+    Partitions = [(1, 1048576, 2097152, 0x83), (5, 5242880, 1048576, 0x07), (6, 7340032, 1048576, 0x0B)]
+
+    return bytes(Disk), Partitions
+
+def ReturnGPTHeader(MyLBA, AlternateLBA, EntriesLBA, Entries):
+    """Return a GPT header sector for a disk with 16384 sectors, and the given partition entries"""
+    Header = bytearray(struct.pack(str("<8sIII4xQQQQ16sQIII"), b"EFI PART", 0x10000, 92, 0, MyLBA, AlternateLBA, 34, 16350, b"\x01"*16, EntriesLBA, 128, 128,
+                                   zlib.crc32(bytes(Entries)) & 0xFFFFFFFF))
+
+    Header[16:20] = struct.pack(str("<I"), zlib.crc32(bytes(Header)) & 0xFFFFFFFF)
+    return Header + bytearray(420)
+
+def ReturnFakeGPTDisk():
+    """Return an 8 MiB disk with a GPT (and its backup) and two partitions, and the (number, start, size, type) of each partition"""
+    Disk = bytearray(8*1024*1024)
+    Entries = bytearray(128*128)
+
+    for Number, (Type, First, Last, Name) in enumerate([("C12A7328-F81F-11D2-BA4B-00A0C93EC93B", 2048, 4095, "EFI"), ("0FC63DAF-8483-4772-8E79-3D69D8477DE4", 4096, 16350, "root")]):
+        Entries[Number*128:(Number+1)*128] = uuid.UUID(Type).bytes_le + b"\x02"*16 + struct.pack(str("<QQQ"), First, Last, 0) + Name.encode("utf-16-le").ljust(72, b"\0")
+
+    Disk[0:512] = ReturnMBRSector([(0xEE, 1, 16383)])
+    Disk[512:1024] = ReturnGPTHeader(1, 16383, 2, Entries)
+    Disk[1024:17408] = Entries
+    Disk[16351*512:16383*512] = Entries
+    Disk[16383*512:] = ReturnGPTHeader(16383, 1, 16351, Entries)
+
+    Partitions = [(1, 1048576, 1048576, "C12A7328-F81F-11D2-BA4B-00A0C93EC93B"), (2, 2097152, 6274560, "0FC63DAF-8483-4772-8E79-3D69D8477DE4")]
+
+    return bytes(Disk), Partitions
+
+def ReturnFakeExtFilesystem():
+    """Return the start of an ext4 filesystem with 1 KiB blocks and 3 groups (the last one with BLOCK_UNINIT set), and the (position, size) of each allocated range"""
+    Filesystem = bytearray(8192)
+
+    #Superblock: 20000 blocks, first data block 1, 8192 blocks and 64 inodes per group, revision 1, 256-byte inodes, and 4 reserved GDT blocks.
+    Superblock = bytearray(1024)
+    Superblock[0x04:0x08] = struct.pack(str("<I"), 20000)
+    Superblock[0x14:0x2C] = struct.pack(str("<IIIIII"), 1, 0, 0, 8192, 8192, 64)
+    Superblock[0x38:0x3A] = struct.pack(str("<H"), 0xEF53)
+    Superblock[0x4C:0x50] = struct.pack(str("<I"), 1)
+    Superblock[0x58:0x5A] = struct.pack(str("<H"), 256)
+    Superblock[0xCE:0xD0] = struct.pack(str("<H"), 4)
+    Filesystem[1024:2048] = Superblock
+
+    #Group descriptors, in block 2. The first two groups have their bitmaps next to each other, in blocks 5 and 6.
+    for Group, (Bitmap, InodeBitmap, InodeTable, Flags) in enumerate([(5, 9, 20, 0), (6, 10, 36, 0), (7, 8, 100, 0x2)]):
+        Filesystem[2048+Group*32:2048+Group*32+20] = struct.pack(str("<IIIHHHH"), Bitmap, InodeBitmap, InodeTable, 0, 0, 0, Flags)
+
+    #Blocks 1-200 and 1001 are in use in group 0, and 8193-8200 and 8209-8216 in group 1.
+    Filesystem[5120:5145] = b"\xff"*25
+    Filesystem[5120+125] = 0x01
+    Filesystem[6144:6147] = b"\xff\x00\xff"
+
+    Ranges = [(0, 2048), (1024, 204800), (1025024, 1024), (8389632, 8192), (8406016, 8192), (16778240, 6144), (7168, 1024), (8192, 1024), (102400, 16384)]
+
+    return bytes(Filesystem), Ranges
+
+def ReturnFakeNTFSFilesystem():
+    """Return a 100-cluster NTFS filesystem with 4 KiB clusters and only the boot sector and $Bitmap filled in, and the (position, size) of each allocated range"""
+    Filesystem = bytearray(409600)
+
+    #Boot sector: 512-byte sectors, 8 sectors per cluster, 799 sectors, the MFT at cluster 4, and 1 KiB MFT records.
+    Filesystem[3:11] = b"NTFS    "
+    Filesystem[0x0B:0x0E] = struct.pack(str("<HB"), 512, 8)
+    Filesystem[0x28:0x38] = struct.pack(str("<QQ"), 799, 4)
+    Filesystem[0x40:0x41] = struct.pack(str("<b"), -10)
+
+    #MFT record 6 ($Bitmap), with a non-resident $DATA attribute of 13 bytes in cluster 20.
+    Record = bytearray(1024)
+    Record[0:8] = b"FILE" + struct.pack(str("<HH"), 0x30, 3)
+    Record[0x14:0x16] = struct.pack(str("<H"), 0x38)
+    Record[0x38:0x48] = struct.pack(str("<IIBB6x"), 0x80, 0x48, 1, 0)
+    Record[0x38+0x20:0x38+0x22] = struct.pack(str("<H"), 0x40)
+    Record[0x38+0x30:0x38+0x38] = struct.pack(str("<Q"), 13)
+    Record[0x38+0x40:0x38+0x44] = b"\x11\x01\x14\x00"
+    Record[0x80:0x84] = b"\xff\xff\xff\xff"
+
+    #Update sequence fixups: the last two bytes of each sector are saved, and replaced with the check value.
+    Record[0x30:0x36] = b"\x01\x00" + bytes(Record[510:512]) + bytes(Record[1022:1024])
+    Record[510:512] = Record[1022:1024] = b"\x01\x00"
+
+    Filesystem[4*4096+6*1024:4*4096+7*1024] = Record
+
+    #Clusters 0-7, 20, 40-55 and 98 are in use. The bits after the last cluster are set, as Windows does.
+    Filesystem[20*4096:20*4096+13] = b"\xff\x00\x10\x00\x00\xff\xff" + b"\x00"*5 + b"\xfc"
+
+    Ranges = [(0, 32768), (81920, 4096), (163840, 65536), (401408, 4096), (409088, 512)]
+
+    return bytes(Filesystem), Ranges
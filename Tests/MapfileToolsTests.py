@@ -0,0 +1,709 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*- 
+# MapfileTools tests for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules
+import unittest
+import io
+import random
+import os
+import shutil
+import hashlib
+import tempfile
+import struct
+
+from Tools.MapfileTools import mapfile as Mapfile
+from Tools.MapfileTools.tailer import MapfileTailer
+from Tools.MapfileTools.blockmap import BlockMap, ReturnCellStatuses
+from Tools.MapfileTools.index import IntervalIndex
+from Tools.MapfileTools import merge as Merge
+from Tools.MapfileTools.hashing import ImageHasher
+from Tools.MapfileTools import partitions as Partitions
+from Tools.MapfileTools import allocation as Allocation
+from Tools.MapfileTools import snapshots as Snapshots
+from Tools.MapfileTools import badregions as BadRegions
+
+#Import test data.
+from . import MapfileToolsTestData as Data
+
+class TestMapfile(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+        self.FileName = os.path.join(self.Directory, "test.map")
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        Mapfile.ChunkSize = 1024*1024
+        del self.Directory
+        del self.FileName
+
+    def ReadMapfile(self, Text):
+        with io.open(self.FileName, "w", encoding="UTF-8") as File:
+            File.write(Text)
+
+        return Mapfile.Read(self.FileName)
+
+    def testRead(self):
+        Text, Blocks = Data.ReturnFakeMapfile()
+        Map = self.ReadMapfile(Text)
+
+        self.assertEqual(list(Map.GetBlocks()), Blocks)
+        self.assertEqual((Map.CurrentPos, Map.CurrentStatus, Map.CurrentPass), (1245184, "/", 1))
+        self.assertEqual(Map.Totals, {"?": 6291456, "*": 4096, "/": 131072, "-": 65536, "+": 1896448})
+        self.assertEqual(Map.GetEnd(), 8388608)
+
+    def testReadSmallChunks(self):
+        #Blocks and comments split between chunks should still be read properly.
+        Mapfile.ChunkSize = 7
+        Text, Blocks = Data.ReturnFakeMapfile()
+        self.assertEqual(list(self.ReadMapfile(Text).GetBlocks()), Blocks)
+
+    def testReadOld(self):
+        Text, Blocks = Data.ReturnOldFakeMapfile()
+        Map = self.ReadMapfile(Text)
+
+        self.assertEqual(list(Map.GetBlocks()), Blocks)
+        self.assertEqual((Map.CurrentPos, Map.CurrentStatus, Map.CurrentPass), (4096, "?", None))
+
+    def testReadInvalid(self):
+        for Text in ("", "# Only comments\n", "0x0 ?\n0x0 0x1000\n", "0x0 ?\n0x0 0x1000 X\n", "0x0 ?\n0x0 size +\n", "0x0 ? 1 2\n"):
+            self.assertRaises(ValueError, self.ReadMapfile, Text)
+
+    def testParseNumbers(self):
+        #Columns of hex numbers the same width are converted all at once, and anything else one at a time.
+        for Tokens, Numbers in (([b"0x00001000", b"0x0ABCDEF0"], [4096, 180150000]), ([b"0x0FFFFFFFFFFFFFFF"], [2**60 - 1]),
+                                ([b"0xFFFFFFFFFFFFFFFF", b"0x00000001"], [2**64 - 1, 1]), ([b"4096", b"0x1000"], [4096, 4096])):
+            self.assertEqual(list(Mapfile.ParseNumbers(Tokens)), Numbers)
+
+        self.assertEqual(Mapfile.ParseNumbers([b"0x00001000"]).typecode, Mapfile.SignedPositionType)
+        self.assertRaises(ValueError, Mapfile.ParseNumbers, [b"0x0000100G"])
+
+    def testWrite(self):
+        Text, Blocks = Data.ReturnFakeMapfile()
+        Map = self.ReadMapfile(Text)
+        Mapfile.Write(Map, self.FileName, ["Written by the tests"])
+
+        Copy = Mapfile.Read(self.FileName)
+        self.assertEqual(list(Copy.GetBlocks()), Blocks)
+        self.assertEqual((Copy.CurrentPos, Copy.CurrentStatus, Copy.CurrentPass), (1245184, "/", 1))
+        self.assertEqual(os.listdir(self.Directory), ["test.map"])
+
+class TestMapfileTailer(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+        self.FileName = os.path.join(self.Directory, "test.map")
+        self.Tailer = MapfileTailer(self.FileName)
+        self.ParseBlocks = Mapfile.ParseBlocks
+
+    def tearDown(self):
+        Mapfile.ChunkSize = 1024*1024
+        Mapfile.ParseBlocks = self.ParseBlocks
+        shutil.rmtree(self.Directory)
+        del self.Directory
+        del self.FileName
+        del self.Tailer
+
+    def WriteMapfile(self, Text):
+        with io.open(self.FileName, "w", encoding="UTF-8") as File:
+            File.write(Text)
+
+    def testPoll(self):
+        Text, Blocks = Data.ReturnFakeMapfile()
+
+        #Nothing to read until ddrescue creates the mapfile.
+        self.assertEqual(self.Tailer.Poll(), None)
+
+        self.WriteMapfile(Text)
+        self.assertEqual(list(self.Tailer.Poll().GetBlocks()), Blocks)
+
+        #It shouldn't be read again until it changes.
+        self.assertEqual(self.Tailer.Poll(), None)
+
+        self.WriteMapfile(Text.replace("0x00200000  0x00600000  ?", "0x00200000  0x00100000  +\n0x00300000  0x00500000  ?"))
+        self.assertEqual(self.Tailer.Poll().Totals["+"], 1896448 + 1048576)
+
+    def testPollPartial(self):
+        Text, Blocks = Data.ReturnFakeMapfile()
+        self.WriteMapfile(Text)
+        self.Tailer.Poll()
+
+        #Half-written mapfiles should be ignored, whether or not they end at the end of a line.
+        for Length in (len(Text) - 2, Text.rindex("0x00200000")):
+            self.WriteMapfile(Text[:Length])
+            self.assertEqual(self.Tailer.Poll(), None)
+
+        self.assertEqual(list(self.Tailer.Map.GetBlocks()), Blocks)
+
+    def testPollChanges(self):
+        #Use tiny chunks, and count the block lines parsed.
+        Mapfile.ChunkSize = 30
+        Parsed = []
+
+        def ParseBlocks(Text):
+            Parsed.append(Text)
+            return self.ParseBlocks(Text)
+
+        Mapfile.ParseBlocks = ParseBlocks
+
+        Text, Blocks = Data.ReturnFakeMapfile()
+        self.WriteMapfile(Text)
+        self.Tailer.Poll()
+        Chunks = len(Parsed)
+
+        #Only the current position has changed, so no blocks should be parsed again.
+        self.WriteMapfile(Text.replace("0x00130000     /", "0x00131000     /"))
+        self.assertEqual(self.Tailer.Poll().CurrentPos, 1249280)
+        self.assertEqual(len(Parsed), Chunks)
+        self.assertEqual(list(self.Tailer.Map.GetBlocks()), Blocks)
+
+        #Only the chunks from the one that changed onwards should be parsed again, and the result should be the same as reading it all.
+        del Parsed[:]
+        self.WriteMapfile(Text.replace("0x00130000  0x00001000  *", "0x00130000  0x00001000  -"))
+        Map = self.Tailer.Poll()
+        self.assertTrue(0 < len(Parsed) < Chunks)
+        self.assertEqual(list(Map.GetBlocks()), list(Mapfile.Read(self.FileName).GetBlocks()))
+        self.assertEqual(Map.Totals, Mapfile.Read(self.FileName).Totals)
+
+class TestBlockMap(unittest.TestCase):
+    def setUp(self):
+        self.Map = Mapfile.Mapfile()
+        Text, Blocks = Data.ReturnFakeMapfile()
+        self.Map.AddBlocks(*zip(*Blocks))
+
+    def tearDown(self):
+        del self.Map
+
+    def testCellStatuses(self):
+        #Each cell is 1 MiB. The second one has all the bad areas, and blocks that start right at the end of a cell aren't in it.
+        self.assertEqual(ReturnCellStatuses(self.Map, 8), bytearray(b"+-??????"))
+
+        #More cells than bytes.
+        self.assertEqual(ReturnCellStatuses(self.Map, 4, 1048575, 1048577), bytearray(b"\0+\0-"))
+
+    def testDirtyCells(self):
+        Cells = BlockMap(16)
+        self.assertEqual(Cells.Update(self.Map), list(range(16)))
+        self.assertEqual(Cells.Update(self.Map), [])
+
+        #Finish the first half of the non-tried area.
+        Map = Mapfile.Mapfile()
+        Map.AddBlocks(self.Map.Positions[:-1], self.Map.Sizes[:-1], bytearray(self.Map.Codes[:-1]).decode("ascii"))
+        Map.AddBlocks((2097152, 5242880), (3145728, 3145728), "+?")
+
+        self.assertEqual(Cells.Update(Map), [4, 5, 6, 7, 8, 9])
+        self.assertEqual((Cells.GetStatus(9), Cells.GetStatus(10)), ("+", "?"))
+
+class TestIntervalIndex(unittest.TestCase):
+    def setUp(self):
+        self.Map = Mapfile.Mapfile()
+        Text, self.Blocks = Data.ReturnFakeMapfile()
+        self.Map.AddBlocks(*zip(*self.Blocks))
+        self.Index = IntervalIndex(self.Map)
+
+    def tearDown(self):
+        del self.Map
+        del self.Blocks
+        del self.Index
+
+    def ReturnSlowBytes(self, Start, End, Statuses="+"):
+        """Count the bytes in a range with the given statuses by checking every block"""
+        return sum(max(min(End, Pos+Size) - max(Start, Pos), 0) for Pos, Size, Status in self.Blocks if Status in Statuses)
+
+    def testGetBytes(self):
+        self.assertEqual(self.Index.GetBytes(0, 8388608), 1896448)
+        self.assertEqual(self.Index.GetBytes(1048000, 1250000), 576 + 720)
+
+        self.assertTrue(self.Index.IsCovered(4096, 1048576))
+        self.assertFalse(self.Index.IsCovered(4096, 1048577))
+
+        #Past the end of the mapfile doesn't count.
+        self.assertEqual(self.Index.GetBytes(1249280, 9000000), 847872)
+
+    def testRandomRanges(self):
+        Random = random.Random(0)
+        Ranges = []
+
+        for Range in range(200):
+            Start = Random.randint(0, 8388608)
+            Ranges.append((Start, Start + Random.randint(0, 2000000)))
+
+        Index = IntervalIndex(self.Map, "-/*")
+        self.assertEqual([Index.GetBytes(Start, End) for Start, End in Ranges], [self.ReturnSlowBytes(Start, End, "-/*") for Start, End in Ranges])
+
+    def testGetOverlapping(self):
+        self.assertEqual(self.Index.GetOverlapping(0, 8388608), [(1048576, 65536, "-")])
+        self.assertEqual(self.Index.GetOverlapping(1050000, 1248000, "-/*"), [(1050000, 64112, "-"), (1114112, 131072, "/"), (1245184, 2816, "*")])
+        self.assertEqual(self.Index.GetOverlapping(0, 1048576), [])
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Directory
+
+    def ReturnRandomBlocks(self, Random):
+        """Return some random sorted blocks, sometimes with gaps"""
+        Blocks = []
+        Position = Random.randint(0, 3)
+
+        for Block in range(Random.randint(0, 10)):
+            Size = Random.randint(1, 10)
+            Blocks.append((Position, Size, Random.choice(Mapfile.Statuses)))
+            Position += Size + Random.choice((0, 0, 0, 2))
+
+        return Blocks
+
+    def ReturnBytes(self, Blocks, Length):
+        """Return the status of each byte, with non-tried for any bytes that aren't in a block"""
+        Bytes = ["?"] * Length
+
+        for Position, Size, Status in Blocks:
+            Bytes[Position:Position+Size] = [Status] * Size
+
+        return Bytes
+
+    def testMergeBlocks(self):
+        #Check against combining every byte separately.
+        Random = random.Random(0)
+
+        for Test in range(200):
+            First = self.ReturnRandomBlocks(Random)
+            Second = self.ReturnRandomBlocks(Random)
+            Length = max([Position+Size for Position, Size, Status in First+Second] or [0])
+
+            for Operation, Combine in Merge.Operations.items():
+                Merged = list(Merge.MergeBlocks(iter(First), iter(Second), Operation))
+                Expected = [Combine(Status1, Status2) for Status1, Status2 in zip(self.ReturnBytes(First, Length), self.ReturnBytes(Second, Length))]
+
+                self.assertEqual(self.ReturnBytes(Merged, Length), Expected)
+                self.assertEqual(Merged, list(Merge.Coalesce(Merged)))
+                self.assertEqual(sum(Size for Position, Size, Status in Merged), Length)
+
+    def testMergeFiles(self):
+        FileNames = []
+
+        for Number, Blocks in enumerate(([(0, 4096, "+"), (4096, 4096, "-"), (8192, 8192, "?")], [(0, 8192, "?"), (8192, 4096, "+"), (12288, 4096, "/")])):
+            Map = Mapfile.Mapfile()
+            Map.AddBlocks(*zip(*Blocks))
+            FileNames.append(os.path.join(self.Directory, "%d.map" % Number))
+            Mapfile.Write(Map, FileNames[-1])
+
+        Output = os.path.join(self.Directory, "merged.map")
+        Summary = Merge.MergeFiles(FileNames, Output, "or")
+
+        self.assertEqual(list(Mapfile.Read(Output).GetBlocks()), [(0, 4096, "+"), (4096, 4096, "-"), (8192, 4096, "+"), (12288, 4096, "?")])
+        self.assertEqual((Summary.Blocks, Summary.Totals["+"], Summary.Totals["-"]), (4, 8192, 4096))
+
+        #A bad mapfile shouldn't leave anything behind.
+        with io.open(FileNames[1], "w", encoding="UTF-8") as File:
+            File.write("0x0 ?\n0x0 0x1000 X\n")
+
+        self.assertRaises(ValueError, Merge.MergeFiles, FileNames, os.path.join(self.Directory, "bad.map"))
+        self.assertEqual(sorted(os.listdir(self.Directory)), ["0.map", "1.map", "merged.map"])
+
+class TestImageHasher(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+        self.ImageFileName = os.path.join(self.Directory, "image.img")
+        self.Map = Mapfile.Mapfile()
+        self.Map.AddBlocks(*zip(*[(0, 6144, "+"), (6144, 1024, "-"), (7168, 9216, "+"), (16384, 4096, "?"), (20480, 2048, "+")]))
+
+        Random = random.Random(0)
+        self.Data = bytearray(Random.randint(0, 255) for Byte in range(22528))
+
+        with open(self.ImageFileName, "wb") as File:
+            File.write(self.Data)
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Directory
+        del self.ImageFileName
+        del self.Map
+        del self.Data
+
+    def ReturnDigest(self, Ranges):
+        """Hash the given ranges of the test data as ImageHasher should"""
+        Hash = hashlib.sha256()
+
+        for Position, Size in Ranges:
+            Hash.update(("%d %d\n" % (Position, Size)).encode("ascii"))
+            Hash.update(bytes(self.Data[Position:Position+Size]))
+
+        return Hash.hexdigest()
+
+    def testRun(self):
+        Result = ImageHasher(self.ImageFileName, self.Map, ChunkSize=8192, Threads=3).Run()
+
+        self.assertEqual(Result.Chunks, [(0, 8192, 7168, self.ReturnDigest([(0, 6144), (7168, 1024)])), (8192, 8192, 8192, self.ReturnDigest([(8192, 8192)])),
+                                         (16384, 6144, 2048, self.ReturnDigest([(20480, 2048)]))])
+
+        self.assertEqual(Result.UnreadBlocks, [(6144, 1024, "-"), (16384, 4096, "?")])
+
+        #The result shouldn't depend on the number of threads, or on data that wasn't rescued.
+        self.Data[6144:7168] = bytearray(1024)
+
+        with open(self.ImageFileName, "r+b") as File:
+            File.seek(6144)
+            File.write(bytes(self.Data[6144:7168]))
+
+        self.assertEqual(ImageHasher(self.ImageFileName, self.Map, ChunkSize=8192, Threads=1).Run().GetDigest(), Result.GetDigest())
+
+        #But it should depend on data that was.
+        with open(self.ImageFileName, "r+b") as File:
+            File.write(b"\xff"*16)
+
+        self.assertNotEqual(ImageHasher(self.ImageFileName, self.Map, ChunkSize=8192, Threads=1).Run().GetDigest(), Result.GetDigest())
+
+    def testShortImage(self):
+        with open(self.ImageFileName, "r+b") as File:
+            File.truncate(20000)
+
+        self.assertRaises(IOError, ImageHasher(self.ImageFileName, self.Map, ChunkSize=8192).Run)
+
+    def testWrite(self):
+        Result = ImageHasher(self.ImageFileName, self.Map, ChunkSize=4096).Run()
+        Manifest = os.path.join(self.Directory, "image.img.hashes")
+        Unread = os.path.join(self.Directory, "image.img.unread")
+
+        Result.WriteManifest(Manifest)
+        Result.WriteUnreadBlocks(Unread)
+
+        with io.open(Manifest, "r", encoding="UTF-8") as File:
+            Lines = File.readlines()
+
+        self.assertEqual(Lines[-1], "# Image digest: "+Result.GetDigest()+"\n")
+        self.assertEqual(Lines[-2], "0x00005000  0x00000800  0x00000800  "+Result.Chunks[5][3]+"\n")
+        self.assertEqual(Lines[-3], "0x00004000  0x00001000  0x00000000  -\n")
+        self.assertEqual(list(Mapfile.Read(Unread).GetBlocks()), [(6144, 1024, "-"), (16384, 4096, "?")])
+
+class TestPartitions(unittest.TestCase):
+    def ReturnPartitions(self, Table):
+        """Return the (number, start, size, type) of each partition in Table"""
+        return [(Partition.Number, Partition.Start, Partition.Size, Partition.Type) for Partition in Table.Partitions]
+
+    def testReadMBR(self):
+        Disk, Expected = Data.ReturnFakeMBRDisk()
+        Table = Partitions.ReadPartitionTable(io.BytesIO(Disk))
+
+        self.assertEqual((Table.Scheme, Table.SectorSize), ("MBR", 512))
+        self.assertEqual(self.ReturnPartitions(Table), Expected)
+        self.assertEqual(sorted(Table.TableRanges), [(0, 512), (4194304, 512), (6291456, 512)])
+        self.assertEqual(Table.Partitions[1].GetTypeName(), "NTFS/exFAT")
+
+        #Partitions are numbered by their slot, even if an earlier one is empty.
+        Disk = bytes(Data.ReturnMBRSector([(0, 0, 0), (0x83, 2048, 4096), (0, 0, 0), (0x07, 8192, 2048)])) + b"\0"*(8*1024*1024 - 512)
+        self.assertEqual(self.ReturnPartitions(Partitions.ReadPartitionTable(io.BytesIO(Disk))), [(2, 1048576, 2097152, 0x83), (4, 4194304, 1048576, 0x07)])
+
+    def testReadGPT(self):
+        Disk, Expected = Data.ReturnFakeGPTDisk()
+        Table = Partitions.ReadPartitionTable(io.BytesIO(Disk))
+
+        self.assertEqual((Table.Scheme, Table.SectorSize), ("GPT", 512))
+        self.assertEqual(self.ReturnPartitions(Table), Expected)
+        self.assertEqual([Partition.Name for Partition in Table.Partitions], ["EFI", "root"])
+        self.assertEqual(Table.TableRanges, [(0, 17408), (8371712, 16896)])
+        self.assertEqual(Table.Partitions[1].GetTypeName(), "Linux filesystem")
+
+        #Corrupt partition entries.
+        Disk = Disk[:1024]+b"\xff"+Disk[1025:]
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(Disk))
+
+    def testNoPartitionTable(self):
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(b"\0"*4096))
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(b"\0"*100))
+
+        #An MBR with no partitions.
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(bytes(Data.ReturnMBRSector([])) + b"\0"*4096))
+
+    def testFilesystemBootSector(self):
+        #NTFS boot sectors end with the MBR boot signature, whether the table area is empty or holds boot code.
+        Filesystem = bytearray(Data.ReturnFakeNTFSFilesystem()[0])
+        Filesystem[510:512] = b"\x55\xaa"
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(bytes(Filesystem)))
+
+        Filesystem[446:510] = b"A disk read error occurred\r\nBOOTMGR is missing\r\n".ljust(64, b"\0")
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(bytes(Filesystem)))
+
+        #It can still be read as a filesystem without a partition table.
+        self.assertEqual(Allocation.ReadAllocation(io.BytesIO(bytes(Filesystem))).Type, "NTFS")
+
+        #FAT32 and ext.
+        Sector = Data.ReturnMBRSector([(0x83, 2048, 4096)])
+        Sector[0x52:0x5A] = b"FAT32   "
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(bytes(Sector) + b"\0"*(8*1024*1024)))
+
+        Filesystem = bytearray(Data.ReturnFakeExtFilesystem()[0])
+        Filesystem[0:512] = Data.ReturnMBRSector([(0x83, 2, 4)])
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(bytes(Filesystem)))
+
+    def testInvalidMBREntries(self):
+        for Entries, Flag in (([(0x83, 2048, 4096)], 0x41), ([(0x83, 2048, 16384)], 0), ([(0x83, 0, 4096)], 0), ([(0x83, 2048, 4096), (0x07, 4096, 2048)], 0)):
+            Sector = Data.ReturnMBRSector(Entries)
+            Sector[446] = Flag
+            self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(bytes(Sector) + b"\0"*(4*1024*1024 - 512)))
+
+        #Logical partitions are checked too.
+        Disk = bytearray(Data.ReturnFakeMBRDisk()[0])
+        Disk[12288*512:12289*512] = Data.ReturnMBRSector([(0x0B, 2048, 8192)])
+        self.assertRaises(ValueError, Partitions.ReadPartitionTable, io.BytesIO(bytes(Disk)))
+
+    def testReturnDomainBlocks(self):
+        Table = Partitions.ReadPartitionTable(io.BytesIO(Data.ReturnFakeMBRDisk()[0]))
+
+        self.assertEqual(Partitions.ReturnDomainBlocks(Table, [Table.Partitions[1]]), [(0, 512, "+"), (512, 4193792, "?"), (4194304, 512, "+"), (4194816, 1048064, "?"),
+                                                                                        (5242880, 1049088, "+")])
+
+        Table = Partitions.ReadPartitionTable(io.BytesIO(Data.ReturnFakeGPTDisk()[0]))
+
+        self.assertEqual(Partitions.ReturnDomainBlocks(Table, Table.Partitions), [(0, 17408, "+"), (17408, 1031168, "?"), (1048576, 7340032, "+")])
+
+    def testReturnDomainBlocksWithAllocations(self):
+        Table = Partitions.ReadPartitionTable(io.BytesIO(Data.ReturnFakeMBRDisk()[0]))
+        Used = Allocation.Allocation("ext", 4096, 1048576)
+        Used.Ranges = [(5242880, 4096), (5255168, 8192), (5267456, 4096)]
+
+        self.assertEqual(Partitions.ReturnDomainBlocks(Table, [Table.Partitions[1]], {5: Used}), [(0, 512, "+"), (512, 4193792, "?"), (4194304, 512, "+"), (4194816, 1048064, "?"),
+                                                                                                  (5242880, 4096, "+"), (5246976, 8192, "?"), (5255168, 8192, "+"),
+                                                                                                  (5263360, 4096, "?"), (5267456, 4096, "+"), (5271552, 1019904, "?"),
+                                                                                                  (6291456, 512, "+")])
+
+        #Small gaps are read rather than skipped.
+        self.assertEqual(Partitions.ReturnDomainBlocks(Table, [Table.Partitions[1]], {5: Used}, 16384), [(0, 512, "+"), (512, 4193792, "?"), (4194304, 512, "+"),
+                                                                                                         (4194816, 1048064, "?"), (5242880, 28672, "+"), (5271552, 1019904, "?"),
+                                                                                                         (6291456, 512, "+")])
+
+class CountingFile(io.BytesIO):
+    """A file in memory that counts how many times it's read"""
+    Reads = 0
+
+    def read(self, *Args):
+        self.Reads += 1
+        return io.BytesIO.read(self, *Args)
+
+class TestAllocation(unittest.TestCase):
+    def testReturnBitmapRuns(self):
+        #Check against testing every bit separately.
+        Random = random.Random(0)
+
+        for Test in range(200):
+            Bitmap = bytearray(Random.choice([0, 0xFF, Random.randint(0, 255)]) for Byte in range(Random.randint(0, 40)))
+            Bits = Random.randint(0, len(Bitmap) * 8)
+            Runs = Allocation.ReturnBitmapRuns(bytes(Bitmap), Bits, 100)
+            Expected = [Bit for Bit in range(Bits) if Bitmap[Bit // 8] >> (Bit % 8) & 1]
+
+            self.assertEqual([Bit - 100 for Start, Count in Runs for Bit in range(Start, Start+Count)], Expected)
+
+            #Runs that touch should be joined.
+            self.assertFalse(any(First[0] + First[1] == Second[0] for First, Second in zip(Runs, Runs[1:])))
+
+    def testReadExt(self):
+        Filesystem, Expected = Data.ReturnFakeExtFilesystem()
+        File = CountingFile(b"\0"*4096 + Filesystem)
+        Result = Allocation.ReadAllocation(File, 4096)
+
+        self.assertEqual((Result.Type, Result.BlockSize, Result.Size), ("ext", 1024, 20480000))
+        self.assertEqual(sorted(Result.Ranges), sorted((Position + 4096, Size) for Position, Size in Expected))
+
+        #The superblock, the group descriptors, and both bitmaps together.
+        self.assertEqual(File.Reads, 3)
+
+        #With meta_bg, the group descriptors aren't all after the superblock, and a journal that needs recovering may not match the bitmaps.
+        for Incompat in (0x10, 0x04, 0x01):
+            Superblock = bytearray(Filesystem[1024:2048])
+            Superblock[0x60:0x64] = struct.pack(str("<I"), 0x2C2 | Incompat)
+            self.assertRaises(ValueError, Allocation.ReadAllocation, io.BytesIO(b"\0"*4096 + Filesystem[:1024] + bytes(Superblock) + Filesystem[2048:]), 4096)
+
+        #Supported incompatible features (filetype, extents, flex_bg) don't matter.
+        Superblock = bytearray(Filesystem[1024:2048])
+        Superblock[0x60:0x64] = struct.pack(str("<I"), 0x242)
+        self.assertEqual(sorted(Allocation.ReadAllocation(io.BytesIO(Filesystem[:1024] + bytes(Superblock) + Filesystem[2048:])).Ranges), sorted(Expected))
+
+    def testReadNTFS(self):
+        Filesystem, Expected = Data.ReturnFakeNTFSFilesystem()
+        Result = Allocation.ReadAllocation(io.BytesIO(Filesystem))
+
+        self.assertEqual((Result.Type, Result.BlockSize, Result.Size), ("NTFS", 4096, 409600))
+        self.assertEqual(Result.Ranges, Expected)
+        self.assertEqual(Result.GetAllocatedBytes(), 4096 * 26 + 512)
+
+        #A torn $Bitmap record.
+        Filesystem = Filesystem[:16384+6*1024+510] + b"\0\0" + Filesystem[16384+6*1024+512:]
+        self.assertRaises(ValueError, Allocation.ReadAllocation, io.BytesIO(Filesystem))
+
+    def testUnsupported(self):
+        self.assertRaises(ValueError, Allocation.ReadAllocation, io.BytesIO(b"\0"*4096))
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+        self.FileName = os.path.join(self.Directory, "test.map.snapshots")
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Directory
+        del self.FileName
+
+    def ReturnMaps(self, Random, Count):
+        """Return Count mapfiles, each with a random part of a random block of the last one changed, as ddrescue would"""
+        Blocks = [(0, 1048576, "?")]
+        Maps = []
+
+        for Number in range(Count):
+            Index = Random.randrange(len(Blocks))
+            Position, Size, Status = Blocks[Index]
+            Cut = Random.randint(0, Size)
+            Blocks[Index:Index+1] = [Block for Block in [(Position, Cut, Random.choice("?*/-+")), (Position + Cut, Size - Cut, Status)] if Block[1] > 0]
+            Blocks = list(Merge.Coalesce(Blocks))
+
+            Map = Mapfile.Mapfile()
+            Map.AddBlocks(*zip(*Blocks))
+            Map.CurrentPos = Position + Cut
+            Map.CurrentStatus = Random.choice("?*/-")
+            Map.CurrentPass = Random.choice([None, 1, 2])
+            Maps.append(Map)
+
+        return Maps
+
+    def ReturnState(self, Map):
+        """Return everything in Map, to compare"""
+        return (list(Map.GetBlocks()), dict(Map.Totals), Map.CurrentPos, Map.CurrentStatus, Map.CurrentPass)
+
+    def testReplay(self):
+        Random = random.Random(0)
+        Maps = self.ReturnMaps(Random, 300)
+        Writer = Snapshots.SnapshotWriter(self.FileName)
+
+        for Number, Map in enumerate(Maps[:200]):
+            self.assertNotEqual(Writer.Add(Map, 1000000 + Number * 2.5), 0)
+
+        #Nothing changed.
+        self.assertEqual(Writer.Add(Maps[199], 1000600), 0)
+
+        #Carry on after a crash part way through writing a snapshot.
+        with open(self.FileName, "ab") as File:
+            File.write(b"\x20\x01\x02")
+
+        Writer = Snapshots.SnapshotWriter(self.FileName)
+
+        for Number, Map in enumerate(Maps[200:]):
+            Writer.Add(Map, 1000500 + Number * 2.5)
+
+        Replayed = [(Time, self.ReturnState(Map)) for Time, Map, Offset in Snapshots.Replay(self.FileName)]
+        self.assertEqual(Replayed, [(1000000 + Number * 2.5, self.ReturnState(Map)) for Number, Map in enumerate(Maps)])
+
+        #Only the changes should be stored.
+        self.assertTrue(os.path.getsize(self.FileName) < 300 * 40)
+
+    def testFindChange(self):
+        Random = random.Random(1)
+
+        for Test in range(30):
+            Blocks = [(Position * 512, 512, Random.choice("?+-")) for Position in range(Random.randint(1, 10000))]
+            Old = Mapfile.Mapfile()
+            Old.AddBlocks(*zip(*Blocks))
+
+            #Mark a random range of blocks non-scraped.
+            Start = Random.randint(0, len(Blocks))
+            End = Random.randint(Start, len(Blocks))
+            New = Mapfile.Mapfile()
+            New.AddBlocks(*zip(*(Blocks[:Start] + [(Position, Size, "/") for Position, Size, Status in Blocks[Start:End]] + Blocks[End:])))
+
+            #Only the blocks with a new status should count as changed.
+            First, Common = Snapshots.FindChange(Old, New)
+            Changed = [Index for Index in range(Start, End) if Blocks[Index][2] != "/"]
+
+            if Changed == []:
+                self.assertEqual(First + Common, len(Blocks))
+
+            else:
+                self.assertEqual((First, len(Blocks) - Common), (Changed[0], Changed[-1] + 1))
+
+    def testReturnPhases(self):
+        Writer = Snapshots.SnapshotWriter(self.FileName)
+
+        for Time, Blocks, Status, Pass in [(0, [(0, 4096, "?")], "?", 1), (10, [(0, 2048, "+"), (2048, 2048, "?")], "?", 1), (20, [(0, 3072, "+"), (3072, 1024, "*")], "*", 1),
+                                           (60, [(0, 3584, "+"), (3584, 512, "-")], "/", 1), (70, [(0, 3584, "+"), (3584, 512, "-")], "+", 1)]:
+            Map = Mapfile.Mapfile()
+            Map.AddBlocks(*zip(*Blocks))
+            Map.CurrentStatus = Status
+            Map.CurrentPass = Pass
+            Writer.Add(Map, Time)
+
+        Phases = Snapshots.ReturnPhases(self.FileName)
+
+        self.assertEqual([(Phase.Status, Phase.StartTime, Phase.EndTime, Phase.GetRescued()) for Phase in Phases], [("?", 0, 20, 3072), ("*", 20, 60, 512), ("/", 60, 70, 0), ("+", 70, 70, 0)])
+        self.assertEqual(Phases[0].GetRate(), 153.6)
+        self.assertEqual(Phases[-1].GetRate(), None)
+
+    def testNotSnapshots(self):
+        with open(self.FileName, "wb") as File:
+            File.write(b"0x0 ?\n")
+
+        self.assertRaises(ValueError, Snapshots.SnapshotWriter, self.FileName)
+
+class TestBadRegions(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.mkdtemp()
+        self.Map = Mapfile.Mapfile()
+        self.Map.AddBlocks(*zip(*[(0, 1048576, "+"), (1048576, 4096, "-"), (1052672, 8192, "+"), (1060864, 4096, "/"), (1064960, 983040, "?"), (2048000, 512, "-"),
+                                  (2048512, 1048576, "+"), (3097088, 1024, "-")]))
+
+    def tearDown(self):
+        shutil.rmtree(self.Directory)
+        del self.Directory
+        del self.Map
+
+    def ReturnRegions(self, Regions):
+        """Return the details of each of Regions, to compare"""
+        return [(Region.Start, Region.GetSpread(), Region.Bad, Region.NonScraped, Region.Fragments, Region.GoodBefore, Region.GoodAfter) for Region in Regions]
+
+    def testReturnBadRegions(self):
+        self.assertEqual(self.ReturnRegions(BadRegions.ReturnBadRegions(self.Map)), [(1048576, 16384, 4096, 4096, 2, 0, 983552), (2048000, 512, 512, 0, 1, 987136, 0),
+                                                                                   (3097088, 1024, 1024, 0, 1, 0, None)])
+
+        #With a bigger gap, the first two join.
+        Regions = BadRegions.ReturnBadRegions(self.Map, 1000000)
+        self.assertEqual(self.ReturnRegions(Regions), [(1048576, 999936, 4608, 4096, 3, 0, 0), (3097088, 1024, 1024, 0, 1, 0, None)])
+        self.assertEqual((Regions[0].GetUnreadable(), Regions[1].GetDensity(), Regions[1].GetDistanceToGood()), (8704, 1, 0))
+
+        self.assertEqual(BadRegions.ReturnBadRegions(Mapfile.Mapfile()), [])
+
+    def testAddHistory(self):
+        FileName = os.path.join(self.Directory, "test.map.snapshots")
+        Writer = Snapshots.SnapshotWriter(FileName)
+
+        for Time, Blocks, Status in [(0, [(0, 8192, "?")], "?"), (10, [(0, 2048, "+"), (2048, 4096, "*"), (6144, 2048, "+")], "?"),
+                                     (20, [(0, 2048, "+"), (2048, 1024, "/"), (3072, 3072, "+"), (6144, 2048, "+")], "*"),
+                                     (30, [(0, 2048, "+"), (2048, 512, "-"), (2560, 5632, "+")], "/")]:
+            Map = Mapfile.Mapfile()
+            Map.AddBlocks(*zip(*Blocks))
+            Map.CurrentStatus = Status
+            Map.CurrentPass = 1
+            Writer.Add(Map, Time)
+
+        Regions = BadRegions.ReturnBadRegions(Map)
+        BadRegions.AddHistory(Regions, FileName)
+
+        self.assertEqual(self.ReturnRegions(Regions), [(2048, 512, 512, 0, 1, 0, 0)])
+        self.assertEqual(Regions[0].History, [("?", 1, 0), ("*", 1, 512), ("/", 1, 512)])
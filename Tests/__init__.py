@@ -19,3 +19,7 @@ from . import GetDevInfoTests
 from . import GetDevInfoTestData
 from . import BackendToolsTests
 from . import BackendToolsTestData
+from . import DDRescueToolsTests
+from . import DDRescueToolsTestData
+from . import MapfileToolsTests
+from . import MapfileToolsTestData
@@ -21,3 +21,15 @@ from . import onePointForteen
 from . import onePointEighteen
 from . import onePointTwenty
 from . import onePointTwentyOne
+from . import outputreader
+from . import outputparser
+from . import status
+from . import processor
+from . import process
+from . import outputbuffer
+from . import terminal
+from . import phases
+from . import slowregions
+from . import tuning
+from . import sessions
+from . import parallel
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (output buffer) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import threading
+
+#Import tools modules.
+from . import terminal
+
+class OutputHistory():
+    """Streams all of ddrescue's output, control sequences included, to a file on disk.
+    When the file reaches MaxBytes, it's renamed to FileName.1 (and any older ones to .2, .3...), keeping at most BackupCount old files."""
+    def __init__(self, FileName, MaxBytes=10*1024*1024, BackupCount=5):
+        """Open the history file, replacing any old history"""
+        self.FileName = FileName
+        self.MaxBytes = MaxBytes
+        self.BackupCount = BackupCount
+        self.File = self.Open()
+        self.Size = 0
+
+    def Open(self):
+        """Open a new, empty history file that only we can read, and return it. Any old one is removed first. Raises OSError if something
+        else (like a symlink to another file) is put in its place before it's created, rather than writing through it, as we run as root."""
+        if os.path.lexists(self.FileName):
+            os.remove(self.FileName)
+
+        Flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0)
+        return os.fdopen(os.open(self.FileName, Flags, 0o600), "wb")
+
+    def Write(self, Text):
+        """Add Text to the history"""
+        Data = Text.encode("UTF-8")
+
+        if self.Size + len(Data) > self.MaxBytes and self.Size != 0:
+            self.Rotate()
+
+        self.File.write(Data)
+        self.Size += len(Data)
+
+    def Rotate(self):
+        """Move the current file out of the way, and start a new one"""
+        self.File.close()
+
+        for Number in range(self.BackupCount-1, 0, -1):
+            if os.path.exists(self.FileName+".%d" % Number):
+                os.rename(self.FileName+".%d" % Number, self.FileName+".%d" % (Number+1))
+
+        if self.BackupCount > 0:
+            os.rename(self.FileName, self.FileName+".1")
+
+        self.File = self.Open()
+        self.Size = 0
+
+    def Close(self):
+        """Close the history file"""
+        self.File.close()
+
+class OutputBuffer():
+    """Keeps the last MaxLines lines of ddrescue's output on a terminal.Screen, so memory use doesn't grow with the length of the recovery.
+    Everything is also written to History (an OutputHistory), if one is given. Safe to write from one thread, and collect from another."""
+    def __init__(self, MaxLines=1000, History=None):
+        """Initialise the buffer"""
+        self.Lock = threading.Lock()
+        self.Screen = terminal.Screen(MaxLines)
+        self.History = History
+
+    def Write(self, Text, Terminator=""):
+        """Write a record (as returned by outputreader.ReadRecords()), or any other text, to the screen"""
+        if self.History != None:
+            self.History.Write(Text+Terminator)
+
+        with self.Lock:
+            self.Screen.Feed(Text+Terminator)
+
+    def Collect(self):
+        """Return the lines that have changed since the last call, as terminal.Screen.Collect() does"""
+        with self.Lock:
+            return self.Screen.Collect()
+
+    def GetText(self):
+        """Return all the text in the buffer"""
+        with self.Lock:
+            return self.Screen.GetText()
+
+    def Close(self):
+        """Close the history file, if there is one"""
+        if self.History != None:
+            self.History.Close()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (output parser) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+from decimal import Decimal, InvalidOperation
+
+#Import tools modules.
+from . import setup
+
+#For each ddrescue tools function: the first words of the lines it parses, the names of the fields it returns, and how many words to skip before passing the line to it.
+Handlers = {
+    "GetInitialStatus": (("About",), ("DiskCapacity", "DiskCapacityUnit"), 0),
+    "GetIPosNumErrorsandAverageReadRate": (("ipos:",), ("InputPos", "NumErrors", "AverageReadRate", "AverageReadRateUnit"), 0),
+    "GetOPosandTimeSinceLastRead": (("opos:",), ("OutputPos", "TimeSinceLastRead"), 0),
+    "GetCurrentReadRateErrorSizeandRecoveredData": (("rescued:",), ("CurrentReadRate", "ErrorSize", "RecoveredData", "RecoveredDataUnit"), 1),
+    "GetTimeSinceLastRead": (("time", "percent"), ("TimeSinceLastRead",), 0),
+    "GetOPosAndAverageReadRate": (("opos:",), ("OutputPos", "AverageReadRate", "AverageReadRateUnit"), 0),
+    "GetUnreadableData": (("non-tried:",), ("ErrorSize",), 0),
+    "GetRecoveredDataAndNumErrors": (("rescued:",), ("RecoveredData", "RecoveredDataUnit", "NumErrors"), 0),
+    "GetCurrentReadRateAndIPos": (("ipos:",), ("CurrentReadRate", "InputPos"), 1),
+}
+
+#Lines starting with these words carry nothing we display, but aren't status messages either.
+IgnoredWords = ("pct",)
+
+#What each unit prefix ddrescue uses multiplies by. ddrescue uses SI prefixes, unless it's run with --binary-prefixes.
+Multipliers = {"": 1, "k": 10**3, "K": 10**3, "M": 10**6, "G": 10**9, "T": 10**12, "P": 10**15, "E": 10**18, "Z": 10**21, "Y": 10**24,
+               "Ki": 2**10, "Mi": 2**20, "Gi": 2**30, "Ti": 2**40, "Pi": 2**50, "Ei": 2**60, "Zi": 2**70, "Yi": 2**80}
+
+def ParseSize(Number, Unit):
+    """Convert a number with a unit like "B", "kB", "MBytes" or "kB/s" into an exact integer number of bytes (or bytes per second).
+    Raises ValueError if either isn't valid."""
+    try:
+        Multiplier = Multipliers[Unit.split("B")[0]]
+
+    except KeyError:
+        raise ValueError("Unknown unit: "+Unit)
+
+    #Decimals like "53.08" are converted exactly, not via a float.
+    if "." in "%s" % Number:
+        try:
+            return int(Decimal(Number) * Multiplier)
+
+        except InvalidOperation:
+            raise ValueError("Invalid number: "+Number)
+
+    return int(Number) * Multiplier
+
+def ParseSizeText(Text):
+    """Convert text like "99614 kB" or "99614 kB/s" into an exact integer number of bytes (or bytes per second)"""
+    Number, Unit = Text.split()
+    return ParseSize(Number, Unit)
+
+#How to convert fields that aren't text. Fields with a matching "Unit" field are sizes, and are always converted with ParseSize().
+Converters = {"InputPos": ParseSizeText, "OutputPos": ParseSizeText, "ErrorSize": ParseSizeText, "CurrentReadRate": ParseSizeText, "NumErrors": int}
+
+#Parsers that have already been built, by ddrescue version.
+Parsers = {}
+
+def MakeHandler(Function, Fields, Skip):
+    """Return a function that calls Function with a split line, and returns its results as a dictionary of exact values keyed by Fields"""
+    #Work out how to convert each field ahead of time. Sizes that come with a separate unit are combined with it.
+    Conversions = []
+
+    for Index, Field in enumerate(Fields):
+        if Field.endswith("Unit"):
+            continue
+
+        elif Field+"Unit" in Fields:
+            Conversions.append((Field, Index, Fields.index(Field+"Unit"), ParseSize))
+
+        else:
+            Conversions.append((Field, Index, None, Converters.get(Field)))
+
+    #Some functions return a single value, rather than a tuple.
+    Single = (len(Fields) == 1)
+
+    def Handler(SplitLine):
+        Values = Function(SplitLine[Skip:])
+
+        if Single:
+            Values = (Values,)
+
+        Result = {}
+
+        for Field, Index, UnitIndex, Converter in Conversions:
+            if UnitIndex != None:
+                Result[Field] = Converter(Values[Index], Values[UnitIndex])
+
+            elif Converter != None:
+                Result[Field] = Converter(Values[Index])
+
+            else:
+                Result[Field] = Values[Index]
+
+        return Result
+
+    return Handler
+
+class Parser():
+    def __init__(self, DDRescueVersion):
+        """Build the table of handlers for the given version of ddrescue"""
+        self.DDRescueVersion = DDRescueVersion
+        self.Handlers = {}
+
+        for Function in setup.SetupForCorrectDDRescueVersion(DDRescueVersion):
+            Words, Fields, Skip = Handlers[Function.__name__]
+
+            for Word in Words:
+                if Word in self.Handlers:
+                    raise ValueError("Two functions handle lines starting with '"+Word+"' for ddrescue "+DDRescueVersion+"!")
+
+                self.Handlers[Word] = MakeHandler(Function, Fields, Skip)
+
+        for Word in IgnoredWords:
+            self.Handlers[Word] = lambda SplitLine: {}
+
+    def Parse(self, Line):
+        """Parse a line (without control characters) of ddrescue's output, and return a dictionary of the information in it, with sizes in bytes and rates in bytes per second.
+        Lines we don't recognise are status messages, and are returned as {"Status": Line}.
+        May raise IndexError or ValueError if the line is in an unexpected format."""
+        SplitLine = Line.split()
+
+        if SplitLine == []:
+            return {}
+
+        try:
+            Handler = self.Handlers[SplitLine[0]]
+
+        except KeyError:
+            return {"Status": Line}
+
+        return Handler(SplitLine)
+
+def GetParser(DDRescueVersion):
+    """Return the parser for the given version of ddrescue, building it the first time it's needed"""
+    if DDRescueVersion not in Parsers:
+        Parsers[DDRescueVersion] = Parser(DDRescueVersion)
+
+    return Parsers[DDRescueVersion]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (output reader) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import re
+import codecs
+
+#The control sequences that end a record in ddrescue's output: carriage return, newline, and up one line.
+CR = "\r"
+LF = "\n"
+UpOneLine = "\x1b[A"
+
+RecordSeparators = re.compile("(\r|\n|\x1b\\[A)")
+
+#Read this much at a time. ddrescue never writes more than a few hundred bytes per update, so one read usually gets everything that's waiting.
+ChunkSize = 65536
+
+def SplitRecords(Text):
+    """Split Text into records, and return a list of (Text, Terminator) tuples, and the text after the last terminator"""
+    Pieces = RecordSeparators.split(Text)
+
+    #The last piece has no terminator (yet).
+    Remainder = Pieces.pop()
+
+    return list(zip(Pieces[0::2], Pieces[1::2])), Remainder
+
+def ReadRecords(FileDescriptor, ChunkSize=ChunkSize):
+    """Read ddrescue's output from FileDescriptor in large chunks until it's closed, and yield a (Text, Terminator) tuple for each complete record.
+    Terminator is the control sequence that ended the record (CR, LF or UpOneLine), or "" for any text that was left over when the output closed."""
+    #Decode incrementally, so multibyte characters split across two reads are handled properly.
+    Decoder = codecs.getincrementaldecoder("UTF-8")(errors="ignore")
+    Remainder = ""
+
+    while True:
+        #os.read() returns as soon as anything is available, so this doesn't wait for a whole chunk.
+        Chunk = os.read(FileDescriptor, ChunkSize)
+
+        if not Chunk:
+            #End of file.
+            break
+
+        Records, Remainder = SplitRecords(Remainder+Decoder.decode(Chunk))
+
+        for Record in Records:
+            yield Record
+
+    Remainder += Decoder.decode(b"", True)
+
+    if Remainder != "":
+        yield Remainder, ""
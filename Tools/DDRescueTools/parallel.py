@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (parallel) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import shutil
+import threading
+import time
+
+#Import tools modules.
+from . import sessions
+from ..MapfileTools import mapfile
+from ..MapfileTools import merge
+from ..MapfileTools.index import IntervalIndex
+
+def ReturnInputSize(FileName):
+    """Return the size of FileName in bytes, whether it's a disk or a file. Raises IOError/OSError if it can't be opened."""
+    Descriptor = os.open(FileName, os.O_RDONLY)
+
+    try:
+        return os.lseek(Descriptor, 0, os.SEEK_END)
+
+    finally:
+        os.close(Descriptor)
+
+class Range():
+    """A part of the input, from Start up to (but not including) End, copied by its own ddrescue with its own mapfile"""
+    def __init__(self, Start, End, MapfileName):
+        """Initialise the range, which hasn't been started yet"""
+        self.Start = Start
+        self.End = End
+        self.MapfileName = MapfileName
+
+        #The session copying it at the moment (or the last one that did), its thread, and whether it's done.
+        self.Session = None
+        self.Thread = None
+        self.Done = False
+
+    def IsRunning(self):
+        """Return True if ddrescue is copying the range, or still stopping"""
+        return self.Thread != None and self.Thread.is_alive()
+
+    def GetRemaining(self):
+        """Return the number of bytes ddrescue hasn't got to yet, going by the input position it last reported, or 0 if it hasn't reported one"""
+        if self.Done or self.Session == None:
+            return 0
+
+        Position = self.Session.Status.Collect()[0].InputPos
+
+        if Position == None:
+            return 0
+
+        return max(self.End - max(Position, self.Start), 0)
+
+    def GetRescued(self):
+        """Return the number of bytes in the range that are finished in its mapfile, as of the last time it was read"""
+        if self.Session == None:
+            return 0
+
+        Map = self.Session.Status.Collect()[0].Mapfile
+
+        if Map == None:
+            return 0
+
+        return IntervalIndex(Map).GetBytes(self.Start, self.End)
+
+def ReturnRangeBlocks(Ranges):
+    """Yield the (position, size, status) of each block in the mapfiles of Ranges, cut to fit each range, in order.
+    Parts of the input that aren't in any range, or whose mapfile doesn't exist yet, are left out."""
+    for Range in sorted(Ranges, key=lambda Range: Range.Start):
+        if not os.path.exists(Range.MapfileName):
+            continue
+
+        for Position, Size, Status in mapfile.ReadBlocks(Range.MapfileName):
+            Start = max(Position, Range.Start)
+            End = min(Position + Size, Range.End)
+
+            if End > Start:
+                yield Start, End - Start, Status
+
+def MergeRanges(Ranges, OutputFileName, Size):
+    """Write the mapfile for the whole input, Size bytes, to OutputFileName, taking each range's part from its own mapfile. Anything not covered is non-tried.
+    Raises ValueError if a range's mapfile isn't valid, or IOError/OSError if it can't be read, in which case OutputFileName isn't touched."""
+    Blocks = list(merge.FillGaps(ReturnRangeBlocks(Ranges)))
+    End = Blocks[-1][0] + Blocks[-1][1] if Blocks != [] else 0
+
+    if End < Size:
+        Blocks.append((End, Size - End, "?"))
+
+    #Start ddrescue from the beginning if the result is used to resume a recovery.
+    Map = mapfile.Mapfile()
+    Map.CurrentPass = 1
+
+    try:
+        mapfile.Write(Map, OutputFileName, ["Mapfile. Created by DDRescue-GUI", "Merged from %d parallel ranges" % len(Ranges)], merge.Coalesce(iter(Blocks)))
+
+    finally:
+        if os.path.exists(OutputFileName+".tmp"):
+            os.remove(OutputFileName+".tmp")
+
+class ParallelImager():
+    """Copies a healthy input with several ddrescue processes at once, each working on its own range with its own mapfile, which keeps more requests in flight than one process can.
+    ExecList is the command line for copying the whole input with MapfileName; each range gets a copy with its own mapfile and -i/-s options.
+    The input is split into Pieces ranges, which Workers processes work through in order. When there are no more to start, the range with the most left
+    is split in two (if each half would be at least MinSplit bytes): its ddrescue is stopped and resumed from its mapfile on the first half, and the second half is queued.
+    Finally, the ranges' mapfiles are merged into MapfileName."""
+    def __init__(self, ExecList, InputFile, OutputFile, MapfileName, DDRescueVersion, Size, Workers=4, Pieces=None, MinSplit=64*1024*1024, Alignment=1024*1024, Interval=1):
+        """Split the input into ranges. Raises ValueError if MapfileName isn't in ExecList."""
+        if MapfileName not in ExecList:
+            raise ValueError("The mapfile isn't in the command line")
+
+        self.ExecList = ExecList
+        self.InputFile = InputFile
+        self.OutputFile = OutputFile
+        self.MapfileName = MapfileName
+        self.DDRescueVersion = DDRescueVersion
+        self.Size = Size
+        self.Workers = Workers
+        self.MinSplit = MinSplit
+        self.Alignment = Alignment
+        self.Interval = Interval
+
+        self.Lock = threading.Lock()
+        self.Aborted = False
+        self.Failed = []
+        self.Ranges = []
+        self.Queue = []
+
+        if Pieces == None:
+            Pieces = Workers * 4
+
+        #Aligned boundaries, so no two ddrescues share a sector or a cluster.
+        Boundaries = sorted(set([0, Size] + [min(Size * Piece // Pieces // Alignment * Alignment, Size) for Piece in range(1, Pieces)]))
+
+        for Start, End in zip(Boundaries, Boundaries[1:]):
+            self.AddRange(Start, End)
+
+    def AddRange(self, Start, End):
+        """Add a new range to the end of the queue, and return it. Its mapfile starts out as a copy of the main one, if there is one, so a resumed recovery skips what's already done."""
+        New = Range(Start, End, self.MapfileName+".part%d" % len(self.Ranges))
+
+        if os.path.exists(self.MapfileName):
+            shutil.copyfile(self.MapfileName, New.MapfileName)
+
+        elif os.path.exists(New.MapfileName):
+            #Left over from an earlier recovery.
+            os.remove(New.MapfileName)
+
+        self.Ranges.append(New)
+        self.Queue.append(New)
+        return New
+
+    def ReturnExecList(self, Range):
+        """Return the command line to copy Range"""
+        ExecList = [Range.MapfileName if Option == self.MapfileName else Option for Option in self.ExecList]
+        return ExecList + ["-i %d" % Range.Start, "-s %d" % (Range.End - Range.Start)]
+
+    def CreateSession(self, Range):
+        """Return a new session to copy Range"""
+        return sessions.Session("Range %d" % self.Ranges.index(Range), self.ReturnExecList(Range), self.InputFile, self.OutputFile, Range.MapfileName, self.DDRescueVersion, None, None)
+
+    def GetRunning(self):
+        """Return the ranges that are being copied now, including any that are stopping"""
+        return [Range for Range in self.Ranges if Range.IsRunning()]
+
+    def StartRange(self, Range):
+        """Start copying Range in a new thread"""
+        Range.Session = self.CreateSession(Range)
+        Range.Session.State = "Running"
+
+        Range.Thread = threading.Thread(target=self.RunRange, args=(Range, Range.Session))
+        Range.Thread.daemon = True
+        Range.Thread.start()
+
+    def RunRange(self, Range, Session):
+        """Run Session until ddrescue exits, then queue Range again if it was stopped to split it"""
+        try:
+            Session.Run()
+
+        except (IOError, OSError):
+            #ddrescue couldn't be started.
+            with Session.Lock:
+                Session.State = "Failed"
+
+        with self.Lock:
+            if Session.State == "Finished":
+                Range.Done = True
+
+            elif Session.State == "Aborted" and not self.Aborted:
+                #Stopped to split it. Resume it from its mapfile.
+                self.Queue.insert(0, Range)
+
+            elif Session.State == "Failed":
+                self.Failed.append(Range)
+
+    def SplitLargest(self):
+        """Split the running range with the most left to copy in two, and return True, or return False if none has enough left"""
+        Ranges = sorted([Range for Range in self.GetRunning() if Range.Session.State == "Running"], key=lambda Range: Range.GetRemaining(), reverse=True)
+
+        if Ranges == [] or Ranges[0].GetRemaining() < self.MinSplit * 2:
+            return False
+
+        Range = Ranges[0]
+        Split = (Range.End - Range.GetRemaining() // 2) // self.Alignment * self.Alignment
+        End, Range.End = Range.End, Split
+
+        self.AddRange(Split, End)
+        Range.Session.Abort()
+        return True
+
+    def Update(self):
+        """Start as many queued ranges as there's room for, and split the largest one if a worker would be idle. Returns False once every range is done, or can't be done."""
+        with self.Lock:
+            Running = self.GetRunning()
+
+            if self.Aborted or self.Failed != []:
+                return Running != []
+
+            while len(Running) < self.Workers and self.Queue != []:
+                Range = self.Queue.pop(0)
+                self.StartRange(Range)
+                Running.append(Range)
+
+            #Only split when no range is waiting to resume, so each split is finished before the next.
+            if len(Running) < self.Workers and not any(Range.Session.State != "Running" for Range in Running):
+                self.SplitLargest()
+
+            return Running != [] or self.Queue != []
+
+    def Run(self):
+        """Copy the whole input, then merge the ranges' mapfiles into the main one, and delete them. Blocks.
+        Returns True if every range was copied, or False if any ddrescue failed, or the copy was aborted. The mapfile is merged either way, so it can be resumed."""
+        while self.Update():
+            time.sleep(self.Interval)
+
+        MergeRanges(self.Ranges, self.MapfileName, self.Size)
+
+        for Range in self.Ranges:
+            if os.path.exists(Range.MapfileName):
+                os.remove(Range.MapfileName)
+
+        return not self.Aborted and self.Failed == [] and all(Range.Done for Range in self.Ranges)
+
+    def GetRescued(self):
+        """Return the number of bytes rescued so far in all the ranges"""
+        return sum(Range.GetRescued() for Range in self.Ranges)
+
+    def GetReadRate(self):
+        """Return the total current read rate of the running ranges, in bytes per second"""
+        return sum(Range.Session.Status.Collect()[0].CurrentReadRate or 0 for Range in self.GetRunning())
+
+    def Abort(self):
+        """Stop every range. Run() returns once they've all stopped. Doesn't block."""
+        with self.Lock:
+            self.Aborted = True
+
+            for Range in self.Ranges:
+                if Range.Session != None:
+                    Range.Session.Abort()
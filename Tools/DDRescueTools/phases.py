@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (phases) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import collections
+
+#Why a phase was ended early.
+EndReasons = {"Time": "used up its time budget", "Yield": "stopped rescuing enough data"}
+
+class Phase():
+    """One run of ddrescue in a plan, with the options to add to the command line for it. Statuses are the mapfile statuses of the areas it works on.
+    It ends early after TimeBudget seconds, or if it rescues less than MinYield bytes a second over YieldWindow seconds. A budget of None means no limit."""
+    def __init__(self, Name, Options, Statuses, TimeBudget=None, MinYield=0, YieldWindow=300):
+        """Initialise the phase"""
+        self.Name = Name
+        self.Options = Options
+        self.Statuses = Statuses
+        self.TimeBudget = TimeBudget
+        self.MinYield = MinYield
+        self.YieldWindow = YieldWindow
+
+    def GetRemaining(self, Totals):
+        """Return the number of bytes left for this phase to work on, given the totals of a mapfile"""
+        return sum(Totals[Status] for Status in self.Statuses)
+
+def ReturnDefaultPlan(DDRescueVersion, Retries="-r 2", TimeBudget=None):
+    """Return the usual plan: a fast copy that skips anything hard, a reverse pass to get to the other side of bad areas, then trimming, scraping and the given retries.
+    ddrescue always finishes the earlier phases first, so each one also works on the areas the earlier ones left behind.
+    Every phase has a time budget, so no one phase can use up all the time the disk has left. TimeBudget, in seconds, replaces each phase's default if it's given."""
+    Plan = []
+
+    #ddrescue 1.19 renamed --no-split to --no-scrape, and added --no-trim. Before that, trimming and splitting were one phase.
+    #The copying phases get the most time, as they rescue the most, and whatever they don't get to is still copied by the later phases.
+    if int(DDRescueVersion.split(".")[1]) >= 19:
+        Plan.append(Phase("Copying", ["-n", "-N"], "?", TimeBudget=12*60*60, MinYield=1024*1024, YieldWindow=120))
+        Plan.append(Phase("Reverse copying", ["-n", "-N", "-R"], "?", TimeBudget=6*60*60, MinYield=1024*1024, YieldWindow=120))
+        Plan.append(Phase("Trimming", ["-n"], "?*", TimeBudget=2*60*60, MinYield=4096, YieldWindow=600))
+        Plan.append(Phase("Scraping", ["-r 0"], "?*/", TimeBudget=4*60*60, MinYield=512, YieldWindow=600))
+
+    else:
+        Plan.append(Phase("Copying", ["-n"], "?", TimeBudget=12*60*60, MinYield=1024*1024, YieldWindow=120))
+        Plan.append(Phase("Reverse copying", ["-n", "-R"], "?", TimeBudget=6*60*60, MinYield=1024*1024, YieldWindow=120))
+        Plan.append(Phase("Splitting", ["-r 0"], "?*/", TimeBudget=6*60*60, MinYield=512, YieldWindow=600))
+
+    if Retries != "-r 0":
+        Plan.append(Phase("Retrying", [Retries], "?*/-", TimeBudget=4*60*60))
+
+    if TimeBudget != None:
+        for Planned in Plan:
+            Planned.TimeBudget = TimeBudget
+
+    return Plan
+
+class PhaseEngine():
+    """Works through a plan of phases, deciding when each one should end, from the totals in the mapfile as ddrescue updates it.
+    Phases with nothing left to work on are skipped."""
+    def __init__(self, Plan):
+        """Initialise the engine, before the first phase"""
+        self.Plan = Plan
+        self.Number = -1
+        self.Current = None
+
+    def StartNext(self, Time, Totals):
+        """Move on to the next phase with anything left to work on, given the time and the totals of the mapfile, and return it. Returns None when there are none left.
+        Totals is None if ddrescue hasn't written the mapfile yet, in which case nothing is skipped."""
+        self.Current = None
+
+        while self.Number + 1 < len(self.Plan):
+            self.Number += 1
+
+            if Totals == None or self.Plan[self.Number].GetRemaining(Totals) != 0:
+                self.Current = self.Plan[self.Number]
+                break
+
+        if self.Current != None:
+            self.StartTime = Time
+
+            #The (time, rescued bytes) samples in the yield window, and the last one before it.
+            self.Samples = collections.deque()
+
+            if Totals != None:
+                self.Samples.append((Time, Totals["+"]))
+
+        return self.Current
+
+    def GetYield(self, Time):
+        """Return the average number of bytes a second the current phase has rescued over its yield window, up to Time, or None if it hasn't been running that long"""
+        if Time - self.StartTime < self.Current.YieldWindow:
+            return None
+
+        OldTime, OldRescued = self.Samples[0]
+        NewTime, NewRescued = self.Samples[-1]
+        return (NewRescued - OldRescued) / max(NewTime - OldTime, 1)
+
+    def Update(self, Time, Totals):
+        """Record the totals of the mapfile at Time (None if there isn't one yet), and return the key in EndReasons of the reason the current phase should end, or None if it should carry on"""
+        Phase = self.Current
+
+        if Phase.TimeBudget != None and Time - self.StartTime >= Phase.TimeBudget:
+            return "Time"
+
+        if Totals == None:
+            return None
+
+        self.Samples.append((Time, Totals["+"]))
+
+        while len(self.Samples) > 2 and self.Samples[1][0] <= Time - Phase.YieldWindow:
+            self.Samples.popleft()
+
+        Yield = self.GetYield(Time)
+
+        if Yield != None and Yield < Phase.MinYield:
+            return "Yield"
+
+        return None
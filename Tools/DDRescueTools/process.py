@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (process) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import signal
+import subprocess
+import threading
+
+#Import tools modules.
+from . import outputreader
+
+#How long to wait after each signal before sending a stronger one, in seconds.
+InterruptTimeout = 10
+
+class DDRescueProcess():
+    """Runs one ddrescue process, and owns its PID. Signals are only ever sent to that PID, and only while it can't have been reused."""
+    def __init__(self, ExecList):
+        """Start ddrescue with the given command line"""
+        self.Lock = threading.Lock()
+        self.Exited = False
+        self.ReturnCode = None
+        self.Timers = []
+
+        #Start ddrescue in the C locale, so its output is in the format we expect.
+        self.Process = subprocess.Popen(ExecList, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=dict(os.environ, LC_ALL="C"))
+        self.PID = self.Process.pid
+
+    def ReadRecords(self):
+        """Yield each (Text, Terminator) record of ddrescue's output as soon as it arrives. Stops when ddrescue closes its output, which it does when it exits."""
+        for Record in outputreader.ReadRecords(self.Process.stdout.fileno()):
+            yield Record
+
+        self.Process.stdout.close()
+
+    def Wait(self):
+        """Block until ddrescue exits, and return its exit code. This is negative if it was killed by a signal, like subprocess."""
+        #Where possible, wait without reaping ddrescue, so Interrupt() can never signal a reused PID.
+        if hasattr(os, "waitid"):
+            os.waitid(os.P_PID, self.PID, os.WEXITED | os.WNOWAIT)
+
+            with self.Lock:
+                self.ReturnCode = self.Process.wait()
+                self.Exited = True
+
+        else:
+            ReturnCode = self.Process.wait()
+
+            with self.Lock:
+                self.ReturnCode = ReturnCode
+                self.Exited = True
+
+        for Timer in self.Timers:
+            Timer.cancel()
+
+        return self.ReturnCode
+
+    def Signal(self, Signal):
+        """Send Signal to ddrescue, if it's still running. Returns True if it was sent."""
+        with self.Lock:
+            if self.Exited:
+                return False
+
+            os.kill(self.PID, Signal)
+            return True
+
+    def Interrupt(self, Timeout=InterruptTimeout):
+        """Ask ddrescue to exit with SIGINT (like pressing Ctrl-C), which lets it write its mapfile. Doesn't block.
+        If it's still running Timeout seconds later, send SIGTERM, and then SIGKILL after the same time again."""
+        if not self.Signal(signal.SIGINT):
+            return
+
+        for Number, Signal in enumerate((signal.SIGTERM, signal.SIGKILL), 1):
+            Timer = threading.Timer(Timeout * Number, self.Signal, [Signal])
+            Timer.daemon = True
+            self.Timers.append(Timer)
+            Timer.start()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (output processor) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+
+#Import tools modules.
+from . import outputparser
+
+def GetExactSize(FileName, Estimate):
+    """Return the exact size of FileName in bytes if it's within 1% of Estimate (ddrescue's rounded size), otherwise return Estimate.
+    Also returns Estimate if FileName can't be opened."""
+    try:
+        FileDescriptor = os.open(FileName, os.O_RDONLY)
+
+        try:
+            ExactSize = os.lseek(FileDescriptor, 0, os.SEEK_END)
+
+        finally:
+            os.close(FileDescriptor)
+
+    except OSError:
+        return Estimate
+
+    #If they're too different, ddrescue isn't copying the whole file (eg --size was used).
+    if abs(ExactSize - Estimate) * 100 > Estimate:
+        return Estimate
+
+    return ExactSize
+
+class OutputProcessor():
+    def __init__(self, DDRescueVersion, Status, InputFile=None):
+        """Set up to process ddrescue's output for the given version, putting the results in Status (a StatusSnapshot)"""
+        self.Parser = outputparser.GetParser(DDRescueVersion)
+        self.Status = Status
+        self.InputFile = InputFile
+
+        self.OldStatus = ""
+        self.GotInitialStatus = False
+
+        #Once we've read the mapfile, its totals are used instead of the ones in ddrescue's output.
+        self.UsingMapfile = False
+
+        #Sizes are in bytes, and are None until ddrescue tells us them.
+        self.DiskCapacity = None
+        self.RecoveredData = None
+        self.AverageReadRate = None
+
+    def ProcessLine(self, Line):
+        """Process a given line to get ddrescue's current status and recovery information, and put it in the status snapshot.
+        Returns the fields parsed from the line. May raise IndexError or ValueError if the line is in an unexpected format."""
+        Fields = self.Parser.Parse(Line)
+
+        if "DiskCapacity" in Fields: #All versions of ddrescue (1.14 - 1.22).
+            #Initial status.
+            self.GotInitialStatus = True
+
+            #ddrescue rounds the size it reports, so use the exact size of the input file instead, if it's close enough to be the same thing.
+            if self.InputFile != None:
+                Fields["DiskCapacity"] = GetExactSize(self.InputFile, Fields["DiskCapacity"])
+
+            if not self.UsingMapfile:
+                self.DiskCapacity = Fields["DiskCapacity"]
+                self.Status.Set(DiskCapacity=self.DiskCapacity)
+
+            return Fields
+
+        if "Status" in Fields:
+            #Probably a status line (maybe the initial one).
+            if Fields["Status"] != self.OldStatus:
+                self.Status.Set(Status=Fields["Status"])
+                self.OldStatus = Fields["Status"]
+
+            return Fields
+
+        if self.UsingMapfile:
+            Fields.pop("RecoveredData", None)
+            Fields.pop("ErrorSize", None)
+
+        if "RecoveredData" in Fields:
+            self.RecoveredData = Fields["RecoveredData"]
+
+        if "AverageReadRate" in Fields:
+            self.AverageReadRate = Fields["AverageReadRate"]
+
+        if "RecoveredData" in Fields or "AverageReadRate" in Fields:
+            Fields["TimeRemaining"] = self.CalculateTimeRemaining()
+
+        #The parser's fields have the same names as the status fields.
+        self.Status.Set(**Fields)
+        return Fields
+
+    def ProcessMapfile(self, Map):
+        """Put the totals from Map (a mapfile.Mapfile, read while ddrescue is running) in the status snapshot.
+        From now on, these are used instead of the sizes in ddrescue's output, as they're exact, and don't depend on the version of ddrescue."""
+        self.UsingMapfile = True
+
+        Totals = Map.Totals
+        self.DiskCapacity = sum(Totals.values())
+        self.RecoveredData = Totals["+"]
+
+        #ddrescue counts everything it has tried and failed to read as an error.
+        self.Status.Set(DiskCapacity=self.DiskCapacity, RecoveredData=self.RecoveredData, ErrorSize=Totals["*"]+Totals["/"]+Totals["-"], NonTried=Totals["?"],
+                        NonTrimmed=Totals["*"], NonScraped=Totals["/"], BadSectorSize=Totals["-"], TimeRemaining=self.CalculateTimeRemaining(), Mapfile=Map)
+
+    def CalculateTimeRemaining(self):
+        """Calculate remaining time in seconds based on the average read rate and the current amount of data recovered. Returns None if it can't be worked out yet."""
+        if None in (self.DiskCapacity, self.RecoveredData, self.AverageReadRate) or self.AverageReadRate == 0:
+            return None
+
+        return max(self.DiskCapacity - self.RecoveredData, 0) // self.AverageReadRate
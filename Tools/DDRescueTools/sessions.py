@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (sessions) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import re
+import stat
+import logging
+import threading
+import traceback
+
+#Import tools modules.
+from . import process
+from . import processor
+from . import status
+from ..MapfileTools.tailer import MapfileTailer
+
+#Where unexpected errors in sessions are logged. DDRescue-GUI replaces this with its own logger.
+logger = logging.getLogger("DDRescue-GUI")
+
+#The states a session goes through. Finished, Failed and Aborted are final.
+States = ("Queued", "Running", "Finished", "Failed", "Aborted")
+
+#A PCI device address in sysfs, eg "0000:00:1f.2".
+PCIAddress = re.compile(r"^[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-7]$")
+
+def ReturnControllerKey(FileName, SysBlock="/sys/block"):
+    """Return a key for the disk controller FileName is on: the PCI device of the controller that a disk (or one of its partitions) is attached to,
+    or the filesystem that an image file is on. Anything else gets a key of its own."""
+    Name = os.path.basename(os.path.realpath(FileName))
+    Disk = None
+
+    if os.path.isdir(SysBlock):
+        if os.path.exists(os.path.join(SysBlock, Name)):
+            Disk = Name
+
+        else:
+            #Partitions are in the directories of their disks.
+            for Other in os.listdir(SysBlock):
+                if os.path.exists(os.path.join(SysBlock, Other, Name)):
+                    Disk = Other
+                    break
+
+    if Disk != None:
+        Parts = os.path.realpath(os.path.join(SysBlock, Disk)).split(os.sep)
+        Controllers = [Number for Number, Part in enumerate(Parts) if PCIAddress.match(Part)]
+
+        if Controllers != []:
+            return "controller:"+os.sep.join(Parts[:Controllers[-1]+1])
+
+        return "device:"+Disk
+
+    if os.path.isfile(FileName):
+        return "filesystem:%d" % os.stat(FileName).st_dev
+
+    return "device:"+os.path.realpath(FileName)
+
+def ReturnDestinationKey(FileName, SysBlock="/sys/block"):
+    """Return a key for where FileName is written to: its disk controller if it's a device, or the filesystem it's on (or will be on, if it doesn't exist yet)"""
+    if os.path.exists(FileName) and stat.S_ISBLK(os.stat(FileName).st_mode):
+        return ReturnControllerKey(FileName, SysBlock)
+
+    return "filesystem:%d" % os.stat(os.path.dirname(os.path.abspath(FileName))).st_dev
+
+class Session():
+    """One recovery, with its own command line, mapfile, output processor and status. Controller and Destination are the keys of the resources it uses, for the scheduler."""
+    def __init__(self, Name, ExecList, InputFile, OutputFile, MapfileName, DDRescueVersion, Controller, Destination):
+        """Initialise the session, which starts out queued"""
+        self.Name = Name
+        self.ExecList = ExecList
+        self.InputFile = InputFile
+        self.OutputFile = OutputFile
+        self.MapfileName = MapfileName
+        self.DDRescueVersion = DDRescueVersion
+        self.Controller = Controller
+        self.Destination = Destination
+
+        self.Lock = threading.Lock()
+        self.State = "Queued"
+        self.DDRescue = None
+        self.ReturnCode = None
+        self.Error = None
+
+        #The latest status, from ddrescue's output and the mapfile, as for the main recovery.
+        self.Status = status.StatusSnapshot()
+        self.Processor = processor.OutputProcessor(DDRescueVersion, self.Status, InputFile)
+
+    def GetControllers(self):
+        """Return the keys of the disk controllers the session uses. Reading and writing both use the controller, if the output is a disk."""
+        if self.Destination.startswith("controller:"):
+            return set((self.Controller, self.Destination))
+
+        return set((self.Controller,))
+
+    def IsActive(self):
+        """Return True if the session is queued or running"""
+        return self.State in ("Queued", "Running")
+
+    def Run(self):
+        """Run ddrescue until it exits, keeping the status up to date, then set the final state. Blocks."""
+        Tailer = MapfileTailer(self.MapfileName)
+
+        with self.Lock:
+            if self.State == "Aborted":
+                return
+
+            self.DDRescue = process.DDRescueProcess(self.ExecList)
+
+        for Text, Terminator in self.DDRescue.ReadRecords():
+            if Text.strip() != "":
+                try:
+                    self.Processor.ProcessLine(Text)
+
+                except (IndexError, ValueError):
+                    #Not a line we understand. The mapfile has the important numbers anyway.
+                    pass
+
+            Map = Tailer.Poll()
+
+            if Map != None:
+                self.Processor.ProcessMapfile(Map)
+
+        self.ReturnCode = self.DDRescue.Wait()
+        Map = Tailer.Poll()
+
+        if Map != None:
+            self.Processor.ProcessMapfile(Map)
+
+        with self.Lock:
+            if self.State != "Aborted":
+                self.State = "Finished" if self.ReturnCode == 0 else "Failed"
+
+    def Abort(self):
+        """Stop the session: ask ddrescue to exit if it's running, or make sure it never starts if it's queued. Doesn't block."""
+        with self.Lock:
+            if not self.IsActive():
+                return
+
+            self.State = "Aborted"
+
+            if self.DDRescue != None:
+                self.DDRescue.Interrupt()
+
+class SessionScheduler():
+    """Runs several sessions at once, each in its own thread, but no more than MaxPerController at once on the same disk controller (counting both the input and output),
+    no more than MaxPerDestination writing to the same filesystem or device, and no more than MaxRunning in all. The rest are queued, and started in order as others finish.
+    External sessions are run by something else (like the main recovery), but count towards the limits, and block conflicting sessions, while they're added."""
+    def __init__(self, MaxPerController=4, MaxPerDestination=2, MaxRunning=8):
+        """Initialise the scheduler, with no sessions"""
+        self.MaxPerController = MaxPerController
+        self.MaxPerDestination = MaxPerDestination
+        self.MaxRunning = MaxRunning
+
+        self.Lock = threading.Lock()
+        self.Sessions = []
+        self.External = []
+        self.Threads = []
+
+    def FindConflict(self, New):
+        """Return the reason New can't be added alongside the active sessions, including external ones (they'd use the same files), or None if it can"""
+        for Session in self.Sessions + self.External:
+            if not Session.IsActive():
+                continue
+
+            if New.InputFile == Session.InputFile:
+                return "Its input file is already being recovered by "+Session.Name
+
+            if New.OutputFile in (Session.OutputFile, Session.InputFile) or New.InputFile == Session.OutputFile:
+                return "Its output file is used by "+Session.Name
+
+            if New.MapfileName == Session.MapfileName:
+                return "Its mapfile is used by "+Session.Name
+
+        return None
+
+    def Add(self, Session):
+        """Queue Session, and start it if there's room. Raises ValueError if it conflicts with an active session."""
+        with self.Lock:
+            Conflict = self.FindConflict(Session)
+
+            if Conflict != None:
+                raise ValueError(Conflict)
+
+            self.Sessions.append(Session)
+
+        self.StartQueued()
+
+    def AddExternal(self, Session):
+        """Count Session, which is run by something else, as running until RemoveExternal() is called. Raises ValueError if it conflicts with an active session."""
+        with self.Lock:
+            Conflict = self.FindConflict(Session)
+
+            if Conflict != None:
+                raise ValueError(Conflict)
+
+            Session.State = "Running"
+            self.External.append(Session)
+
+    def RemoveExternal(self, Session):
+        """Stop counting the external Session, and start any queued sessions there's now room for"""
+        with self.Lock:
+            if Session in self.External:
+                self.External.remove(Session)
+
+        self.StartQueued()
+
+    def CanStart(self, New, Running):
+        """Return True if New can start alongside the Running sessions"""
+        if len(Running) >= self.MaxRunning:
+            return False
+
+        Controllers = [Key for Session in Running for Key in Session.GetControllers()]
+
+        for Key in New.GetControllers():
+            if Controllers.count(Key) >= self.MaxPerController:
+                return False
+
+        return [Session.Destination for Session in Running].count(New.Destination) < self.MaxPerDestination
+
+    def StartQueued(self):
+        """Start each queued session that there's room for now, in the order they were added"""
+        with self.Lock:
+            Running = [Session for Session in self.Sessions + self.External if Session.State == "Running"]
+
+            for Session in self.Sessions:
+                if Session.State == "Queued" and self.CanStart(Session, Running):
+                    Session.State = "Running"
+                    Running.append(Session)
+
+                    Thread = threading.Thread(target=self.RunSession, args=(Session,))
+                    Thread.daemon = True
+                    self.Threads.append(Thread)
+                    Thread.start()
+
+    def RunSession(self, Session):
+        """Run Session, then start any queued ones there's now room for. If anything goes wrong, the session fails, rather than holding its place forever."""
+        try:
+            Session.Run()
+
+        except Exception as Error:
+            #Usually because ddrescue couldn't be started, but handle unexpected errors too.
+            if not isinstance(Error, (IOError, OSError)):
+                logger.error("SessionScheduler().RunSession(): Unexpected error in "+Session.Name+": \n\n"+traceback.format_exc()+"\n\nStopping it...")
+
+            with Session.Lock:
+                Session.Error = Error
+
+                if Session.State == "Running":
+                    Session.State = "Failed"
+
+                #Don't leave ddrescue running on its own.
+                if Session.DDRescue != None:
+                    Session.DDRescue.Interrupt()
+
+        self.StartQueued()
+
+    def AbortAll(self):
+        """Abort every session, queued or running. Doesn't block."""
+        for Session in list(self.Sessions):
+            Session.Abort()
+
+    def IsBusy(self):
+        """Return True if any session is queued or running"""
+        return any(Session.IsActive() for Session in self.Sessions)
+
+    def Wait(self):
+        """Block until every session has finished"""
+        while self.IsBusy():
+            for Thread in list(self.Threads):
+                Thread.join()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (slowregions) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import re
+import collections
+
+#How many seconds each unit ddrescue uses for times is.
+TimeUnits = {"s": 1, "m": 60, "h": 60*60, "d": 24*60*60}
+
+#A number followed by a unit, eg "12s", "1 m" or "3h".
+TimeParts = re.compile(r"(\d+)\s*([smhd])")
+
+def ParseTimeText(Text):
+    """Convert a time from ddrescue's output, like "0 s", "12s" or "1h 3m", into a number of seconds. Returns None if it's "n/a" (nothing has been read yet)."""
+    Parts = TimeParts.findall(Text)
+
+    if Parts == []:
+        if Text.strip() == "n/a":
+            return None
+
+        raise ValueError("Invalid time: "+Text)
+
+    return sum(int(Number) * TimeUnits[Unit] for Number, Unit in Parts)
+
+class SlowRegionController():
+    """Watches the read rate and the time since the last successful read in ddrescue's output while it's copying, to tell when it has got into a slow region of the disk.
+    It's in one once the read rate has averaged less than MinReadRate (bytes a second) over Window seconds, or nothing has been read for MaxTimeSinceRead seconds.
+    The region that is marked runs from where the slowdown began to SkipSize bytes past where ddrescue has got to. If the next one starts in or near the last one,
+    it's probably part of the same degraded zone, so the size is multiplied by Backoff each time, up to MaxSkipSize. Otherwise it goes back to SkipSize."""
+    def __init__(self, MinReadRate=1000000, MaxTimeSinceRead=10, Window=30, SkipSize=16*1024*1024, Backoff=4, MaxSkipSize=1024*1024*1024):
+        """Initialise the controller"""
+        self.MinReadRate = MinReadRate
+        self.MaxTimeSinceRead = MaxTimeSinceRead
+        self.Window = Window
+        self.InitialSkipSize = SkipSize
+        self.Backoff = Backoff
+        self.MaxSkipSize = MaxSkipSize
+
+        #Whether ddrescue is reading backwards.
+        self.Reverse = False
+
+        #The (start, end) of each region marked so far, sorted, with overlapping ones joined.
+        self.Regions = []
+        self.SkipSize = SkipSize
+        self.Reset(0)
+
+    def Reset(self, Time):
+        """Forget what ddrescue was doing, eg because it has been started again at Time"""
+        self.StartTime = Time
+        self.InputPos = None
+
+        #The (time, input position, read rate) samples in the window.
+        self.Samples = collections.deque()
+
+    def ReturnOptions(self, DDRescueVersion):
+        """Return the options that make ddrescue skip slow areas itself, and try them in later passes. ddrescue 1.21 and later can also be told how far to skip."""
+        Options = ["-a "+"%d" % self.MinReadRate]
+
+        if int(DDRescueVersion.split(".")[1]) >= 21:
+            Options.append("-K "+"%d" % self.SkipSize)
+
+        return Options
+
+    def Update(self, Time, Fields):
+        """Record the fields from a line of ddrescue's output at Time. If ddrescue has just got into a slow region, mark it, and return its (start, end). Otherwise return None."""
+        if "InputPos" in Fields:
+            self.InputPos = Fields["InputPos"]
+
+        if "CurrentReadRate" in Fields and self.InputPos != None:
+            self.Samples.append((Time, self.InputPos, Fields["CurrentReadRate"]))
+
+            while self.Samples[0][0] < Time - self.Window:
+                self.Samples.popleft()
+
+        Slow = False
+
+        if Fields.get("TimeSinceLastRead") not in (None, "n/a") and self.Samples:
+            Slow = ParseTimeText(Fields["TimeSinceLastRead"]) >= self.MaxTimeSinceRead
+
+        if Time - self.StartTime >= self.Window and self.Samples:
+            Slow = Slow or sum(Sample[2] for Sample in self.Samples) / len(self.Samples) < self.MinReadRate
+
+        if not Slow:
+            return None
+
+        #The slowdown began after the last fast read in the window.
+        First = 0
+
+        for Number, Sample in enumerate(self.Samples):
+            if Sample[2] >= self.MinReadRate:
+                First = min(Number + 1, len(self.Samples) - 1)
+
+        Region = self.MarkRegion(self.Samples[First][1], self.Samples[-1][1])
+        self.Reset(Time)
+        return Region
+
+    def MarkRegion(self, FirstPos, LastPos):
+        """Mark the region that ddrescue slowed down in, from FirstPos to LastPos, plus the skip size ahead of it, and return its (start, end)"""
+        #Carry on backing off if this is inside or near the last region.
+        if self.Regions != [] and max(self.LastRegion[0] - FirstPos, FirstPos - self.LastRegion[1], 0) <= self.SkipSize:
+            self.SkipSize = min(self.SkipSize * self.Backoff, self.MaxSkipSize)
+
+        else:
+            self.SkipSize = self.InitialSkipSize
+
+        if self.Reverse:
+            Region = (max(min(FirstPos, LastPos) - self.SkipSize, 0), max(FirstPos, LastPos))
+
+        else:
+            Region = (min(FirstPos, LastPos), max(FirstPos, LastPos) + self.SkipSize)
+
+        self.LastRegion = Region
+        self.Regions = JoinRegions(self.Regions + [Region])
+        return Region
+
+def JoinRegions(Regions):
+    """Return the (start, end) regions sorted, with any that overlap or touch joined"""
+    Joined = []
+
+    for Start, End in sorted(Regions):
+        if Joined != [] and Start <= Joined[-1][1]:
+            Joined[-1] = (Joined[-1][0], max(Joined[-1][1], End))
+
+        else:
+            Joined.append((Start, End))
+
+    return Joined
+
+def ReturnDomainBlocks(Regions, Size, Domain=None):
+    """Return the (position, size, status) blocks of a domain mapfile covering Size bytes, which has everything in Domain (a mapfile.Mapfile, or everything if it's None)
+    finished except the sorted, non-overlapping (start, end) Regions, so ddrescue skips them"""
+    if Domain == None:
+        Included = [(0, Size)]
+
+    else:
+        Included = [(Position, Position + BlockSize) for Position, BlockSize, Status in Domain.GetBlocks() if Status == "+"]
+
+    Blocks = []
+
+    def Add(Start, End, Status):
+        if Blocks != [] and Blocks[-1][2] == Status:
+            Blocks[-1] = (Blocks[-1][0], End - Blocks[-1][0], Status)
+
+        elif End > Start:
+            Blocks.append((Start, End - Start, Status))
+
+    Position = 0
+    Region = 0
+
+    for Start, End in Included:
+        while Start < End:
+            #Skip the regions that end before this part of the domain.
+            while Region < len(Regions) and Regions[Region][1] <= Start:
+                Region += 1
+
+            if Region < len(Regions) and Regions[Region][0] < End:
+                PartEnd = max(Regions[Region][0], Start)
+
+            else:
+                PartEnd = End
+
+            if PartEnd > Start:
+                Add(Position, Start, "?")
+                Add(Start, PartEnd, "+")
+                Position = PartEnd
+
+            if PartEnd == End:
+                break
+
+            Start = min(Regions[Region][1], End)
+
+    Add(Position, max(Size, Position), "?")
+    return Blocks
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (status snapshot) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import threading
+
+#SI unit prefixes, used when displaying sizes and rates.
+UnitPrefixes = ("", "k", "M", "G", "T", "P", "E", "Z", "Y")
+
+class RecoveryStatus(object):
+    """The state of a recovery as exact numbers: sizes and positions are in bytes, rates are in bytes per second, and times are in seconds.
+    TimeSinceLastRead and Status are text, exactly as ddrescue gave them. Fields are None until ddrescue has told us about them.
+    NonTried, NonTrimmed, NonScraped and BadSectorSize only come from the mapfile, and Mapfile is the latest mapfile.Mapfile that was read."""
+    __slots__ = ("DiskCapacity", "RecoveredData", "ErrorSize", "CurrentReadRate", "AverageReadRate", "NumErrors", "InputPos", "OutputPos", "TimeSinceLastRead", "TimeRemaining", "TimeElapsed", "Status",
+                 "NonTried", "NonTrimmed", "NonScraped", "BadSectorSize", "Mapfile")
+
+    def __init__(self):
+        """Initialise all fields to None"""
+        for Field in self.__slots__:
+            setattr(self, Field, None)
+
+    def Copy(self):
+        """Return a copy of this record"""
+        Copy = RecoveryStatus()
+
+        for Field in self.__slots__:
+            setattr(Copy, Field, getattr(self, Field))
+
+        return Copy
+
+class StatusSnapshot():
+    """Holds the latest recovery information from BackendThread, so MainWindow can collect and display it at its own rate.
+    Each field is overwritten in place, so if ddrescue updates faster than the display, the intermediate states are just dropped."""
+    def __init__(self):
+        """Initialise the snapshot"""
+        self.Lock = threading.Lock()
+        self.Current = RecoveryStatus()
+        self.Changed = set()
+
+    def Set(self, **Fields):
+        """Overwrite the given fields of the current status with their new values"""
+        with self.Lock:
+            for Field, Value in Fields.items():
+                setattr(self.Current, Field, Value)
+
+            self.Changed.update(Fields)
+
+    def Collect(self):
+        """Return a copy of the current status, and the set of fields that have changed since the last call"""
+        with self.Lock:
+            Status = self.Current.Copy()
+            Changed, self.Changed = self.Changed, set()
+
+        return Status, Changed
+
+def FormatSize(Bytes, Unit="B"):
+    """Format a number of bytes (or bytes per second, with Unit="B/s") for display, like ddrescue does, using SI units"""
+    if Bytes == None:
+        return "Unknown"
+
+    if Bytes < 1000:
+        return "%d %s" % (Bytes, Unit)
+
+    #Find the largest prefix that keeps the number at or above 1.
+    Power = 0
+
+    while Bytes >= 1000**(Power+1) and Power+1 < len(UnitPrefixes):
+        Power += 1
+
+    return "%.2f %s%s" % (Bytes / 1000**Power, UnitPrefixes[Power], Unit)
+
+def FormatTime(Seconds):
+    """Format a number of seconds for display, using the most understandable unit"""
+    if Seconds == None:
+        return "Unknown"
+
+    #Convert between Seconds, Minutes, Hours, and Days to make the value as understandable as possible.
+    if Seconds <= 60:
+        return "%d seconds" % round(Seconds)
+    elif Seconds <= 3600:
+        return "%s minutes" % round(Seconds/60,1)
+    elif Seconds <= 86400:
+        return "%s hours" % round(Seconds/3600,2)
+    else:
+        return "%s days" % round(Seconds/86400,2)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (terminal) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import re
+import bisect
+import collections
+
+#Control characters and complete CSI escape sequences (eg "\x1b[A", "\x1b[3A", "\x1b[K"). Lone escapes, and C0 controls we don't handle, are dropped.
+ControlSequences = re.compile("(\r|\n|\b|\t|\x1b\\[[0-9;]*[@-~]|\x1b(?!\\[)|[\x00-\x07\x0b\x0c\x0e-\x1a\x1c-\x1f])")
+
+#An escape sequence cut off at the end of a chunk, to be finished by the next one.
+IncompleteSequence = re.compile("\x1b(\\[[0-9;]*)?$")
+
+class Screen():
+    """A headless model of the small subset of a VT100 terminal that ddrescue uses: CR, LF, backspace, tab, and the CSI cursor movement (A, B, C, D, G)
+    and erase in line (K) sequences. Each control character or sequence costs O(1), apart from writing the text itself.
+    Only the last MaxLines lines are kept. Lines are numbered from the start of the output, so they keep their numbers as old lines are dropped.
+    LF also returns to the start of the line, as a terminal does by default."""
+    def __init__(self, MaxLines=1000):
+        """Initialise an empty screen"""
+        self.Lines = collections.deque([""], maxlen=MaxLines)
+        self.FirstLine = 0
+
+        #The cursor.
+        self.Row = 0
+        self.Column = 0
+
+        #Lines changed since the last call to Collect().
+        self.Dirty = set([0])
+
+        #Any incomplete escape sequence from the end of the last chunk.
+        self.Pending = ""
+
+    def Feed(self, Text):
+        """Apply Text, which may contain control characters and escape sequences, to the screen"""
+        Text = self.Pending+Text
+        Match = IncompleteSequence.search(Text)
+
+        if Match != None:
+            self.Pending = Match.group()
+            Text = Text[:Match.start()]
+
+        else:
+            self.Pending = ""
+
+        Pieces = ControlSequences.split(Text)
+
+        #Pieces alternates between text and control sequences.
+        for Index, Piece in enumerate(Pieces):
+            if Piece == "":
+                continue
+
+            elif Index % 2 == 0:
+                self.Write(Piece)
+
+            else:
+                self.Control(Piece)
+
+    def Write(self, Text):
+        """Write plain Text at the cursor, overwriting anything already there"""
+        Index = self.Row - self.FirstLine
+        Line = self.Lines[Index].ljust(self.Column)
+        self.Lines[Index] = Line[:self.Column]+Text+Line[self.Column+len(Text):]
+        self.Column += len(Text)
+        self.Dirty.add(self.Row)
+
+    def Control(self, Sequence):
+        """Apply a single control character or escape sequence"""
+        if Sequence == "\n":
+            if self.Row == self.FirstLine + len(self.Lines) - 1:
+                #Add a line, which might drop the oldest one.
+                if len(self.Lines) == self.Lines.maxlen:
+                    self.FirstLine += 1
+
+                self.Lines.append("")
+
+            self.Row += 1
+            self.Column = 0
+            self.Dirty.add(self.Row)
+
+        elif Sequence == "\r":
+            self.Column = 0
+
+        elif Sequence == "\b":
+            self.Column = max(self.Column - 1, 0)
+
+        elif Sequence == "\t":
+            self.Column = (self.Column // 8 + 1) * 8
+
+        elif Sequence.startswith("\x1b["):
+            self.CSI(Sequence[2:-1], Sequence[-1])
+
+    def CSI(self, Parameters, Command):
+        """Apply a CSI escape sequence"""
+        try:
+            Count = max(int(Parameters.split(";")[0] or "1"), 1)
+
+        except ValueError:
+            return
+
+        if Command == "A":
+            self.Row = max(self.Row - Count, self.FirstLine)
+
+        elif Command == "B":
+            self.Row = min(self.Row + Count, self.FirstLine + len(self.Lines) - 1)
+
+        elif Command == "C":
+            self.Column += Count
+
+        elif Command == "D":
+            self.Column = max(self.Column - Count, 0)
+
+        elif Command == "G":
+            self.Column = Count - 1
+
+        elif Command == "K":
+            Index = self.Row - self.FirstLine
+            Line = self.Lines[Index]
+
+            #0 (the default) erases to the end of the line, 1 to the start, and 2 the whole line.
+            Mode = Parameters or "0"
+
+            if Mode == "0":
+                self.Lines[Index] = Line[:self.Column]
+
+            elif Mode == "1":
+                self.Lines[Index] = " "*min(self.Column + 1, len(Line)) + Line[self.Column+1:]
+
+            elif Mode == "2":
+                self.Lines[Index] = ""
+
+            self.Dirty.add(self.Row)
+
+    def GetText(self):
+        """Return all the text on the screen"""
+        return '\n'.join(self.Lines)
+
+    def Collect(self):
+        """Return the number of the first line on the screen, and a dictionary of the text of each line that has changed since the last call.
+        New lines always count as changed. Returns None if nothing has changed."""
+        if not self.Dirty:
+            return None
+
+        Lines = {}
+
+        for Line in self.Dirty:
+            if Line >= self.FirstLine:
+                Lines[Line] = self.Lines[Line - self.FirstLine]
+
+        self.Dirty = set()
+        return self.FirstLine, Lines
+
+class LineIndex():
+    """The sorted offsets of the newlines in some text, kept up to date as the text is edited, for converting between positions and (column, row) quickly.
+    Edits cost O(number of newlines after the edit), so edits near the end (where ddrescue's status is) are cheap, and conversions are O(log n)."""
+    def __init__(self, Text=""):
+        """Index Text"""
+        self.NewLines = []
+        self.Length = 0
+        self.Replace(0, 0, Text)
+
+    def Replace(self, Start, End, Text):
+        """Update the index after the text between Start and End was replaced with Text"""
+        Low = bisect.bisect_left(self.NewLines, Start)
+        High = bisect.bisect_left(self.NewLines, End)
+        Shift = len(Text) - (End - Start)
+
+        #Find the newlines in the new text.
+        Added = []
+        Offset = Text.find("\n")
+
+        while Offset != -1:
+            Added.append(Start+Offset)
+            Offset = Text.find("\n", Offset+1)
+
+        if Shift == 0:
+            self.NewLines[Low:High] = Added
+
+        else:
+            self.NewLines[Low:] = Added+[NewLine+Shift for NewLine in self.NewLines[High:]]
+
+        self.Length += Shift
+
+    def PositionToXY(self, Position):
+        """Return the (column, row) of Position"""
+        Row = bisect.bisect_left(self.NewLines, Position)
+
+        if Row == 0:
+            return (Position, 0)
+
+        return (Position - self.NewLines[Row-1] - 1, Row)
+
+    def XYToPosition(self, Column, Row):
+        """Return the position of the given column and row, or -1 if there's no such row"""
+        if Row == 0:
+            return Column
+
+        if Row < 0 or Row > len(self.NewLines):
+            return -1
+
+        return self.NewLines[Row-1] + 1 + Column
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# DDRescue Tools (tuning) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import io
+import os
+import errno
+import json
+import mmap
+import time
+import ctypes
+import ctypes.util
+
+#os.preadv() (for direct reads into an aligned buffer) needs Python 3.7 or later, so use the C library's pread() on older versions.
+#pread64() is the 64-bit offset version on 32-bit Linux systems.
+try:
+    LibC = ctypes.CDLL(ctypes.util.find_library(str("c")), use_errno=True)
+    PRead = getattr(LibC, "pread64", None) or LibC.pread
+    PRead.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int64]
+    PRead.restype = ctypes.c_ssize_t
+
+except (OSError, AttributeError):
+    PRead = None
+
+#The cluster sizes to try, in sectors. These are the ones in the settings window.
+ClusterSizes = (32, 64, 128, 256)
+
+#Direct reads have to be aligned to the logical block size, which is never more than this.
+Alignment = 4096
+
+#Cluster sizes within this fraction of the fastest are as good, and the smallest of them is chosen, as smaller clusters lose less data around bad sectors.
+Tolerance = 0.05
+
+class ClusterSizeTuner():
+    """Measures how fast the input file reads at each cluster size (the number of sectors ddrescue reads at a time, set with -c), with short timed reads spread over a few regions of it.
+    Each cluster size reads different parts of each region, and the sizes take turns in each region, so the page cache and the drive warming up don't favour any of them.
+    Where possible, the reads are direct (O_DIRECT), so they bypass the page cache. This works on disks, loop devices and image files alike.
+    If direct reads are refused once the file is open, it's opened again without them. Check UsingDirect after Run(), as reads that go through the page cache
+    measure the cache, not the disk."""
+    def __init__(self, FileName, SectorSize=512, ClusterSizes=ClusterSizes, Regions=4, TimeLimit=0.2, MaxBytes=8*1024*1024, Direct=True):
+        """Initialise the tuner. At most MaxBytes are read for each cluster size in each region, for at most TimeLimit seconds."""
+        self.FileName = FileName
+        self.SectorSize = SectorSize
+        self.ClusterSizes = ClusterSizes
+        self.Regions = Regions
+        self.TimeLimit = TimeLimit
+        self.MaxBytes = MaxBytes
+        self.Direct = Direct
+
+        #Buffers for direct reads, by size. Anonymous maps are page-aligned, as direct reads need.
+        self.Buffers = {}
+
+    def Open(self):
+        """Open the input file, with direct reads if they're wanted and possible, and return its file descriptor. Sets self.UsingDirect."""
+        #Reading straight into an aligned buffer needs os.preadv() or pread().
+        if self.Direct and hasattr(os, "O_DIRECT") and (hasattr(os, "preadv") or PRead != None):
+            try:
+                self.UsingDirect = True
+                return os.open(self.FileName, os.O_RDONLY | os.O_DIRECT)
+
+            except OSError:
+                #Some filesystems, like tmpfs, don't support it.
+                pass
+
+        self.UsingDirect = False
+        return os.open(self.FileName, os.O_RDONLY)
+
+    def GetTime(self):
+        """Return the current time, in seconds"""
+        return time.time()
+
+    def Read(self, FileDescriptor, Position, Size):
+        """Read Size bytes at Position, and return how many were read"""
+        if self.UsingDirect:
+            if Size not in self.Buffers:
+                self.Buffers[Size] = mmap.mmap(-1, Size)
+
+            if hasattr(os, "preadv"):
+                return os.preadv(FileDescriptor, [self.Buffers[Size]], Position)
+
+            return ReadInto(FileDescriptor, self.Buffers[Size], Position)
+
+        if hasattr(os, "pread"):
+            return len(os.pread(FileDescriptor, Size, Position))
+
+        os.lseek(FileDescriptor, Position, os.SEEK_SET)
+        return len(os.read(FileDescriptor, Size))
+
+    def ReadCluster(self, Position, Size):
+        """Read Size bytes at Position from self.FileDescriptor, and return how many were read. If the read is direct and it's refused as invalid, the file
+        is opened again without direct reads and it's tried again, as some drivers and filesystems accept O_DIRECT but not direct reads."""
+        try:
+            return self.Read(self.FileDescriptor, Position, Size)
+
+        except (IOError, OSError) as Error:
+            if not self.UsingDirect or Error.errno != errno.EINVAL:
+                raise
+
+        os.close(self.FileDescriptor)
+        self.FileDescriptor = None
+        self.Direct = False
+        self.FileDescriptor = self.Open()
+        return self.Read(self.FileDescriptor, Position, Size)
+
+    def MeasureRegion(self, Start, End, ClusterSize):
+        """Read from Start to End one cluster at a time, until the time limit, and return the number of bytes read and the time taken. Stops at the first read error, as the disk may be failing."""
+        Size = ClusterSize * self.SectorSize
+        Bytes = 0
+        StartTime = self.GetTime()
+        Elapsed = 0
+
+        for Position in range(Start, End, Size):
+            try:
+                Read = self.ReadCluster(Position, min(Size, End - Position))
+
+            except (IOError, OSError):
+                break
+
+            Bytes += Read
+            Elapsed = self.GetTime() - StartTime
+
+            if Read == 0 or Elapsed >= self.TimeLimit:
+                break
+
+        return Bytes, Elapsed
+
+    def Run(self):
+        """Measure each cluster size, and return the number of bytes a second each one read, by cluster size. Raises IOError/OSError if the input file can't be opened."""
+        self.FileDescriptor = self.Open()
+
+        try:
+            FileSize = os.lseek(self.FileDescriptor, 0, os.SEEK_END)
+
+            #Split each region into a part for each cluster size, aligned for direct reads.
+            RegionSize = FileSize // self.Regions
+            PartSize = min(self.MaxBytes, RegionSize // len(self.ClusterSizes)) // Alignment * Alignment
+
+            Bytes = dict((ClusterSize, 0) for ClusterSize in self.ClusterSizes)
+            Times = dict((ClusterSize, 0) for ClusterSize in self.ClusterSizes)
+
+            for Region in range(self.Regions):
+                RegionStart = RegionSize * Region // Alignment * Alignment
+
+                for Number, ClusterSize in enumerate(self.ClusterSizes):
+                    Start = RegionStart + PartSize * Number
+                    Read, Elapsed = self.MeasureRegion(Start, Start + PartSize, ClusterSize)
+                    Bytes[ClusterSize] += Read
+                    Times[ClusterSize] += Elapsed
+
+        finally:
+            #It may have been closed if opening it again without direct reads failed.
+            if self.FileDescriptor != None:
+                os.close(self.FileDescriptor)
+
+        return dict((ClusterSize, Bytes[ClusterSize] / max(Times[ClusterSize], 1e-6)) for ClusterSize in self.ClusterSizes)
+
+def ReadInto(FileDescriptor, Buffer, Position):
+    """Read len(Buffer) bytes at Position into the writable Buffer with pread(), and return how many were read. Raises OSError if the read fails."""
+    Read = PRead(FileDescriptor, ctypes.addressof(ctypes.c_char.from_buffer(Buffer)), len(Buffer), Position)
+
+    if Read < 0:
+        Errno = ctypes.get_errno()
+        raise OSError(Errno, os.strerror(Errno))
+
+    return Read
+
+def ChooseClusterSize(Results, Tolerance=Tolerance):
+    """Return the best cluster size from the results of ClusterSizeTuner.Run(): the smallest one that reads within Tolerance of the fastest. Raises ValueError if nothing could be read."""
+    Fastest = max(Results.values())
+
+    if Fastest == 0:
+        raise ValueError("Nothing could be read at any cluster size")
+
+    return min(ClusterSize for ClusterSize, Rate in Results.items() if Rate >= Fastest * (1 - Tolerance))
+
+class ClusterSizeStore():
+    """The best cluster size measured for each model of device, kept in a JSON file, so each model only has to be measured once"""
+    def __init__(self, FileName):
+        """Load the file, if there is one. Raises ValueError if it isn't valid, or IOError/OSError if it can't be read."""
+        self.FileName = FileName
+        self.Models = {}
+
+        if os.path.exists(FileName):
+            with io.open(FileName, "r", encoding="UTF-8") as File:
+                self.Models = json.load(File)
+
+            if not isinstance(self.Models, dict):
+                raise ValueError("Not a cluster size file: "+FileName)
+
+    def Get(self, Model):
+        """Return the best cluster size measured for Model, or None if it hasn't been measured"""
+        return self.Models.get(Model, {}).get("ClusterSize")
+
+    def Set(self, Model, ClusterSize, Results, SectorSize=512):
+        """Remember the best cluster size for Model, and the results it was chosen from"""
+        self.Models[Model] = {"ClusterSize": ClusterSize, "SectorSize": SectorSize, "BytesPerSecond": dict(("%d" % Size, int(Rate)) for Size, Rate in Results.items())}
+
+    def Save(self):
+        """Write the file. It's replaced in one step, so it's never left half-written."""
+        Directory = os.path.dirname(self.FileName)
+
+        if Directory != "" and not os.path.isdir(Directory):
+            os.makedirs(Directory)
+
+        with io.open(self.FileName+".tmp", "w", encoding="UTF-8") as File:
+            File.write("%s" % json.dumps(self.Models, indent=4, sort_keys=True))
+
+        os.rename(self.FileName+".tmp", self.FileName)
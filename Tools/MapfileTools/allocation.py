@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (allocation) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import re
+import struct
+
+#Runs of bytes in a bitmap with every bit set, or single bytes with only some set. Bytes with no bits set are skipped in C.
+SetBytes = re.compile(b"\xff+|[^\x00\xff]")
+
+#ext2/3/4 superblock values.
+Ext4Magic = 0xEF53
+Ext4Incompat64Bit = 0x80
+Ext4IncompatMetaBG = 0x10
+
+#The incompatible features that don't change where the group descriptors and block bitmaps are, or what they mean: filetype, extents, 64bit,
+#mmp, flex_bg, ea_inode, dirdata, csum_seed, largedir, inline_data, encrypt and casefold. Anything else (like compression, a journal that needs
+#recovering, an external journal device or meta_bg) means the bitmaps can't be trusted or found, so the whole partition is recovered instead.
+Ext4SupportedIncompat = 0x02 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x1000 | 0x2000 | 0x4000 | 0x8000 | 0x10000 | 0x20000
+Ext4BlockUninit = 0x2
+
+#The most bytes of bitmap we'll read at once. Bitmaps next to each other on the disk (as with ext4's flex_bg) are read together, up to this size.
+MaxReadSize = 4*1024*1024
+
+class Allocation():
+    """The parts of a filesystem that are in use. Type is "ext" (ext2/3/4) or "NTFS", and Size is the size of the filesystem in bytes.
+    Ranges holds the (position, size) of each allocated part, in bytes from the start of the disk, including the filesystem's own metadata."""
+    def __init__(self, Type, BlockSize, Size):
+        """Initialise an empty allocation"""
+        self.Type = Type
+        self.BlockSize = BlockSize
+        self.Size = Size
+        self.Ranges = []
+
+    def AddRuns(self, Runs, Offset):
+        """Add the (first block, number of blocks) Runs of a filesystem starting at Offset bytes into the disk"""
+        self.Ranges.extend((Offset + First * self.BlockSize, Count * self.BlockSize) for First, Count in Runs)
+
+    def GetAllocatedBytes(self):
+        """Return the number of bytes in use"""
+        return sum(Size for Position, Size in self.Ranges)
+
+def ReadAt(File, Position, Size):
+    """Return Size bytes from Position in the open file File. Raises ValueError if the file ends first."""
+    File.seek(Position)
+    Data = File.read(Size)
+
+    if len(Data) != Size:
+        raise ValueError("The disk ends at %d, before the end of the filesystem's metadata" % (Position + len(Data)))
+
+    return Data
+
+def ReturnBitmapRuns(Bitmap, Bits, FirstBit=0):
+    """Return the (first bit, number of bits) of each run of set bits in the first Bits bits of Bitmap (least significant bit first), numbered from FirstBit"""
+    Runs = []
+    Bytes = bytearray(Bitmap)
+
+    def AddRun(Start, Count):
+        """Add a run, joining it to the last one if they touch"""
+        if Runs != [] and Runs[-1][0] + Runs[-1][1] == Start:
+            Runs[-1] = (Runs[-1][0], Runs[-1][1] + Count)
+
+        else:
+            Runs.append((Start, Count))
+
+    for Match in SetBytes.finditer(bytes(Bitmap[:(Bits + 7) // 8])):
+        if Match.end() - Match.start() > 1 or Bytes[Match.start()] == 0xFF:
+            AddRun(Match.start() * 8, (Match.end() - Match.start()) * 8)
+
+        else:
+            for Bit in range(8):
+                if Bytes[Match.start()] >> Bit & 1:
+                    AddRun(Match.start() * 8 + Bit, 1)
+
+    #Cut off any bits past the end, and renumber.
+    return [(FirstBit + Start, min(Count, Bits - Start)) for Start, Count in Runs if Start < Bits]
+
+def ReadExtents(File, Extents):
+    """Read the given (position, size) extents of File, joining extents that touch into single reads of up to MaxReadSize bytes. Returns a dictionary of the data at each position."""
+    Data = {}
+    Extents = sorted(set(Extents))
+    Index = 0
+
+    while Index < len(Extents):
+        #Find the extents that can be read along with this one.
+        Start, End = Extents[Index][0], sum(Extents[Index])
+        Last = Index
+
+        while Last + 1 < len(Extents) and Extents[Last+1][0] == End and sum(Extents[Last+1]) - Start <= MaxReadSize:
+            Last += 1
+            End = sum(Extents[Last])
+
+        Chunk = ReadAt(File, Start, End - Start)
+
+        for Position, Size in Extents[Index:Last+1]:
+            Data[Position] = Chunk[Position - Start:Position - Start + Size]
+
+        Index = Last + 1
+
+    return Data
+
+def ReadExt(File, Offset=0):
+    """Read the block bitmaps of the ext2/3/4 filesystem starting at Offset bytes into File. Returns an Allocation, or None if there's no ext superblock.
+    Raises ValueError if the filesystem is corrupt or uses features we can't read."""
+    Superblock = ReadAt(File, Offset + 1024, 1024)
+
+    if struct.unpack(str("<H"), Superblock[0x38:0x3A])[0] != Ext4Magic:
+        return None
+
+    BlocksCount, = struct.unpack(str("<I"), Superblock[0x04:0x08])
+    FirstDataBlock, LogBlockSize, LogClusterSize, BlocksPerGroup = struct.unpack(str("<IIII"), Superblock[0x14:0x24])
+    InodesPerGroup, = struct.unpack(str("<I"), Superblock[0x28:0x2C])
+    Revision, = struct.unpack(str("<I"), Superblock[0x4C:0x50])
+    Incompat, = struct.unpack(str("<I"), Superblock[0x60:0x64])
+    ReservedGDTBlocks, = struct.unpack(str("<H"), Superblock[0xCE:0xD0])
+    DescriptorSize = 32
+    InodeSize = 128
+
+    if Revision >= 1:
+        InodeSize, = struct.unpack(str("<H"), Superblock[0x58:0x5A])
+
+    if LogBlockSize > 6 or BlocksPerGroup == 0:
+        raise ValueError("The ext superblock is corrupt")
+
+    if LogClusterSize != LogBlockSize:
+        raise ValueError("ext4 filesystems with bigalloc aren't supported")
+
+    if Incompat & Ext4IncompatMetaBG:
+        raise ValueError("ext4 filesystems with meta_bg aren't supported")
+
+    if Incompat & ~Ext4SupportedIncompat:
+        raise ValueError("The ext filesystem uses unsupported incompatible features (0x%X)" % (Incompat & ~Ext4SupportedIncompat))
+
+    if Incompat & Ext4Incompat64Bit:
+        BlocksCount += struct.unpack(str("<I"), Superblock[0x150:0x154])[0] << 32
+        DescriptorSize = struct.unpack(str("<H"), Superblock[0xFE:0x100])[0]
+
+    BlockSize = 1024 << LogBlockSize
+    Groups = (BlocksCount - FirstDataBlock + BlocksPerGroup - 1) // BlocksPerGroup
+    GDTBlocks = (Groups * DescriptorSize + BlockSize - 1) // BlockSize
+    InodeTableBlocks = (InodesPerGroup * InodeSize + BlockSize - 1) // BlockSize
+
+    Result = Allocation("ext", BlockSize, BlocksCount * BlockSize)
+
+    #The boot sectors and superblock come before the first group with 1 KiB blocks, so aren't in any bitmap.
+    Result.AddRuns([(0, FirstDataBlock + 1)], Offset)
+
+    Descriptors = ReadAt(File, Offset + (FirstDataBlock + 1) * BlockSize, GDTBlocks * BlockSize)
+    Bitmaps = []
+
+    for Group in range(Groups):
+        Descriptor = Descriptors[Group*DescriptorSize:(Group+1)*DescriptorSize]
+        Bitmap, = struct.unpack(str("<I"), Descriptor[0x00:0x04])
+        Flags, = struct.unpack(str("<H"), Descriptor[0x12:0x14])
+
+        if DescriptorSize >= 64:
+            Bitmap += struct.unpack(str("<I"), Descriptor[0x20:0x24])[0] << 32
+
+        GroupStart = FirstDataBlock + Group * BlocksPerGroup
+
+        if Flags & Ext4BlockUninit:
+            #The bitmap was never written, and the group only holds metadata: a backup superblock and descriptors (if any) at the start, and maybe its bitmaps and inode table.
+            Result.AddRuns([(GroupStart, min(1 + GDTBlocks + ReservedGDTBlocks, BlocksCount - GroupStart))], Offset)
+            Result.AddRuns(ReturnExtMetadata(Descriptor, DescriptorSize, InodeTableBlocks), Offset)
+
+        else:
+            Bitmaps.append((Group, GroupStart, Bitmap))
+
+    Data = ReadExtents(File, [(Offset + Bitmap * BlockSize, BlockSize) for Group, GroupStart, Bitmap in Bitmaps])
+
+    for Group, GroupStart, Bitmap in Bitmaps:
+        Result.AddRuns(ReturnBitmapRuns(Data[Offset + Bitmap * BlockSize], min(BlocksPerGroup, BlocksCount - GroupStart), GroupStart), Offset)
+
+    return Result
+
+def ReturnExtMetadata(Descriptor, DescriptorSize, InodeTableBlocks):
+    """Return the (first block, number of blocks) of the block bitmap, inode bitmap and inode table of an ext group descriptor"""
+    Blocks = list(struct.unpack(str("<III"), Descriptor[0x00:0x0C]))
+
+    if DescriptorSize >= 64:
+        for Index, High in enumerate(struct.unpack(str("<III"), Descriptor[0x20:0x2C])):
+            Blocks[Index] += High << 32
+
+    return [(Blocks[0], 1), (Blocks[1], 1), (Blocks[2], InodeTableBlocks)]
+
+def ApplyFixups(Record, SectorSize=512):
+    """Return an NTFS FILE record with its update sequence fixups applied. Raises ValueError if they don't match (a torn or corrupt record)."""
+    Record = bytearray(Record)
+    ArrayOffset, ArrayCount = struct.unpack(str("<HH"), bytes(Record[4:8]))
+    Check = Record[ArrayOffset:ArrayOffset+2]
+
+    for Sector in range(1, ArrayCount):
+        End = Sector * SectorSize
+
+        if Record[End-2:End] != Check:
+            raise ValueError("The NTFS $Bitmap record is corrupt (bad fixup)")
+
+        Record[End-2:End] = Record[ArrayOffset+Sector*2:ArrayOffset+Sector*2+2]
+
+    return bytes(Record)
+
+def ParseDataRuns(Runs):
+    """Return the (first cluster, number of clusters) of each extent in an NTFS data run list. Sparse extents are left out."""
+    Extents = []
+    Runs = bytearray(Runs)
+    Index = 0
+    Cluster = 0
+
+    while Index < len(Runs) and Runs[Index] != 0:
+        LengthSize = Runs[Index] & 0x0F
+        OffsetSize = Runs[Index] >> 4
+        Index += 1
+
+        Length = sum(Runs[Index+Byte] << (8 * Byte) for Byte in range(LengthSize))
+        Index += LengthSize
+
+        if OffsetSize == 0:
+            #Sparse.
+            continue
+
+        Delta = sum(Runs[Index+Byte] << (8 * Byte) for Byte in range(OffsetSize))
+        Index += OffsetSize
+
+        #The offset is signed, and relative to the last extent.
+        if Delta >= 1 << (8 * OffsetSize - 1):
+            Delta -= 1 << (8 * OffsetSize)
+
+        Cluster += Delta
+        Extents.append((Cluster, Length))
+
+    return Extents
+
+def ReadNTFS(File, Offset=0):
+    """Read $Bitmap from the NTFS filesystem starting at Offset bytes into File. Returns an Allocation, or None if there's no NTFS boot sector.
+    Raises ValueError if the filesystem is corrupt."""
+    Boot = ReadAt(File, Offset, 512)
+
+    if Boot[3:11] != b"NTFS    ":
+        return None
+
+    BytesPerSector, SectorsPerCluster = struct.unpack(str("<HB"), Boot[0x0B:0x0E])
+    TotalSectors, MFTCluster = struct.unpack(str("<QQ"), Boot[0x28:0x38])
+    ClustersPerRecord, = struct.unpack(str("<b"), Boot[0x40:0x41])
+
+    #Large clusters and small records are stored as negative powers of two.
+    if SectorsPerCluster > 0x80:
+        SectorsPerCluster = 1 << (256 - SectorsPerCluster)
+
+    ClusterSize = BytesPerSector * SectorsPerCluster
+
+    if ClusterSize == 0 or BytesPerSector % 512 != 0:
+        raise ValueError("The NTFS boot sector is corrupt")
+
+    RecordSize = ClusterSize * ClustersPerRecord if ClustersPerRecord > 0 else 1 << -ClustersPerRecord
+    Clusters = TotalSectors * BytesPerSector // ClusterSize
+
+    #$Bitmap is always record 6, which is always in the first extent of the MFT.
+    Record = ReadAt(File, Offset + MFTCluster * ClusterSize + 6 * RecordSize, RecordSize)
+
+    if Record[0:4] != b"FILE":
+        raise ValueError("The NTFS $Bitmap record is corrupt")
+
+    Record = ApplyFixups(Record)
+    Attribute, = struct.unpack(str("<H"), Record[0x14:0x16])
+
+    while Attribute + 16 <= len(Record):
+        Type, Length, NonResident, NameLength = struct.unpack(str("<IIBB"), Record[Attribute:Attribute+10])
+
+        if Type == 0xFFFFFFFF or Length == 0:
+            break
+
+        #The unnamed $DATA attribute holds the bitmap.
+        if Type == 0x80 and NameLength == 0:
+            break
+
+        Attribute += Length
+
+    else:
+        Type = None
+
+    if Type != 0x80:
+        raise ValueError("The NTFS $Bitmap record has no data")
+
+    Result = Allocation("NTFS", ClusterSize, (TotalSectors + 1) * BytesPerSector)
+
+    if NonResident:
+        RunsOffset, = struct.unpack(str("<H"), Record[Attribute+0x20:Attribute+0x22])
+        DataSize, = struct.unpack(str("<Q"), Record[Attribute+0x30:Attribute+0x38])
+        Extents = ParseDataRuns(Record[Attribute+RunsOffset:Attribute+Length])
+        Data = ReadExtents(File, [(Offset + Cluster * ClusterSize, Count * ClusterSize) for Cluster, Count in Extents])
+        Bitmap = b"".join(Data[Offset + Cluster * ClusterSize] for Cluster, Count in Extents)[:DataSize]
+
+    else:
+        ValueLength, ValueOffset = struct.unpack(str("<IH"), Record[Attribute+0x10:Attribute+0x16])
+        Bitmap = Record[Attribute+ValueOffset:Attribute+ValueOffset+ValueLength]
+
+    Result.AddRuns(ReturnBitmapRuns(Bitmap, Clusters), Offset)
+
+    #The backup boot sector is in the last sector, after the last cluster.
+    Result.Ranges.append((Offset + TotalSectors * BytesPerSector, BytesPerSector))
+
+    return Result
+
+def ReadAllocation(File, Offset=0):
+    """Read the allocation bitmap of the ext2/3/4 or NTFS filesystem starting at Offset bytes into the open disk (or image) File, opened in binary mode.
+    Returns an Allocation. Raises ValueError if there isn't a supported filesystem there, or IOError/OSError if the disk can't be read."""
+    for Reader in (ReadExt, ReadNTFS):
+        Result = Reader(File, Offset)
+
+        if Result != None:
+            return Result
+
+    raise ValueError("No ext2/3/4 or NTFS filesystem found")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (badregions) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import tools modules.
+from . import snapshots
+from .index import IntervalIndex
+
+#Bad sectors, and blocks that failed but haven't been scraped yet.
+UnreadableStatuses = "-/"
+
+#Unreadable blocks closer together than this (in bytes) are counted as one region. This is ddrescue's default cluster size.
+DefaultMaxGap = 64*1024
+
+class BadRegion():
+    """A run of unreadable blocks, with gaps of at most the maximum gap between them. Bad and NonScraped are the bytes with each status.
+    GoodBefore and GoodAfter are the distances to the nearest finished data on either side, or None if there isn't any.
+    History holds the (current status, current pass, unreadable bytes) at the end of each phase of the recovery, if it's known."""
+    def __init__(self, Start):
+        """Start a region at Start"""
+        self.Start = Start
+        self.End = Start
+        self.Bad = 0
+        self.NonScraped = 0
+        self.Fragments = 0
+        self.GoodBefore = None
+        self.GoodAfter = None
+        self.History = []
+
+    def GetSpread(self):
+        """Return the distance from the start of the first unreadable block to the end of the last one"""
+        return self.End - self.Start
+
+    def GetUnreadable(self):
+        """Return the number of unreadable bytes"""
+        return self.Bad + self.NonScraped
+
+    def GetDensity(self):
+        """Return the fraction of the region that's unreadable"""
+        return self.GetUnreadable() / self.GetSpread()
+
+    def GetDistanceToGood(self):
+        """Return the distance to the nearest finished data, or None if there isn't any"""
+        Distances = [Distance for Distance in (self.GoodBefore, self.GoodAfter) if Distance != None]
+        return min(Distances) if Distances != [] else None
+
+def ReturnBadRegions(Map, MaxGap=DefaultMaxGap):
+    """Return a list of the BadRegions in Map, in order, joining unreadable blocks less than MaxGap bytes apart"""
+    Index = IntervalIndex(Map)
+    Regions = []
+
+    for Position, Size, Status in Index.GetOverlapping(0, Map.GetEnd(), UnreadableStatuses):
+        if Regions == [] or Position - Regions[-1].End > MaxGap:
+            Regions.append(BadRegion(Position))
+
+        Region = Regions[-1]
+        Region.End = Position + Size
+        Region.Fragments += 1
+
+        if Status == "-":
+            Region.Bad += Size
+
+        else:
+            Region.NonScraped += Size
+
+    #Find the nearest finished blocks on either side of each region in C.
+    Codes = bytearray(Map.Codes)
+    Low = 0
+
+    for Region in Regions:
+        First = Index.FindBlock(Region.Start, Low)
+        Last = Index.FindBlock(Region.End - 1, First)
+        Low = Last
+
+        Before = Codes.rfind(b"+", 0, First)
+        After = Codes.find(b"+", Last + 1)
+
+        if Before != -1:
+            Region.GoodBefore = Region.Start - (Map.Positions[Before] + Map.Sizes[Before])
+
+        if After != -1:
+            Region.GoodAfter = Map.Positions[After] - Region.End
+
+    return Regions
+
+def AddHistory(Regions, SnapshotFileName):
+    """Fill in the History of each of Regions from the snapshot file SnapshotFileName. Raises ValueError if it isn't a snapshot file, or IOError/OSError if it can't be read."""
+    def Measure(Map, Phase):
+        """Add the unreadable bytes in each region of Map to its history"""
+        Index = IntervalIndex(Map, UnreadableStatuses)
+
+        for Region in Regions:
+            Region.History.append(Phase + (Index.GetBytes(Region.Start, Region.End),))
+
+    Phase = None
+    Map = None
+
+    for Change, Map, Offset in snapshots.ReadChanges(SnapshotFileName):
+        #Measure each phase just before the next one starts.
+        if Phase != None and Phase != (Change.CurrentStatus, Change.CurrentPass):
+            Measure(Map, Phase)
+
+        Change.Apply(Map)
+        Phase = (Map.CurrentStatus, Map.CurrentPass)
+
+    if Map != None:
+        Measure(Map, Phase)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (blockmap) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import bisect
+
+#The statuses, from least to most important. A cell shows the most important status in the part of the disk it covers, like ddrescueview.
+PriorityStatuses = "+?*/-"
+
+#A table for bytearray.translate(), to turn status codes into priorities (1 to 5). Anything else becomes 0.
+PriorityTable = bytearray(256)
+
+for Priority, Status in enumerate(PriorityStatuses, 1):
+    PriorityTable[ord(Status)] = Priority
+
+PriorityTable = bytes(PriorityTable)
+
+#And the other way round. 0 (no blocks) stays 0.
+PriorityCodes = bytearray(b"\0"+PriorityStatuses.encode("ascii"))
+
+#Each priority as a byte string to search for, and the status code it stands for, from the highest priority to the lowest.
+PrioritySearches = [(bytes(bytearray([Priority])), PriorityCodes[Priority]) for Priority in range(len(PriorityStatuses), 0, -1)]
+
+def ReturnCellStatuses(Map, Cells, Start=0, End=None):
+    """Divide the part of the disk between Start and End (by default, all of it) into Cells equal cells, and return a bytearray of the status code for each one.
+    Each cell gets the most important status of any block that overlaps it, or 0 if there are none. This takes one binary search, and at most
+    five searches of a slice of the block table (which run in C), per cell, so the time taken hardly depends on how many blocks there are."""
+    if End == None:
+        End = Map.GetEnd()
+
+    Positions = Map.Positions
+    Priorities = bytearray(Map.Codes).translate(PriorityTable)
+    Statuses = bytearray(Cells)
+
+    #The position of the start of each cell, and of the end of the last one.
+    Boundaries = [Start + (End - Start) * Cell // Cells for Cell in range(Cells + 1)]
+
+    #The index of the first block that starts after each boundary.
+    After = []
+    Index = 0
+
+    for Boundary in Boundaries:
+        Index = bisect.bisect_right(Positions, Boundary, Index)
+        After.append(Index)
+
+    for Cell in range(Cells):
+        if Boundaries[Cell] == Boundaries[Cell + 1]:
+            #An empty cell, because there are more cells than bytes.
+            continue
+
+        #The block containing the start of the cell, and the first block that starts at or after the end of it.
+        First = max(After[Cell] - 1, 0)
+        Last = After[Cell + 1]
+
+        if Last > 0 and Positions[Last - 1] == Boundaries[Cell + 1]:
+            Last -= 1
+
+        if First == Last - 1:
+            Statuses[Cell] = PriorityCodes[Priorities[First]]
+
+        elif First < Last:
+            #Search for each priority in turn, starting with the highest, rather than copying the slice to find its maximum.
+            for Needle, Code in PrioritySearches:
+                if Priorities.find(Needle, First, Last) != -1:
+                    Statuses[Cell] = Code
+                    break
+
+    return Statuses
+
+class BlockMap():
+    """The statuses of a fixed number of cells covering the whole disk, for drawing a map of it. Keeps the statuses from the last update,
+    so only the cells that have changed need to be drawn again."""
+    def __init__(self, Cells):
+        """Initialise the map with every cell empty"""
+        self.Cells = Cells
+        self.Statuses = bytearray(Cells)
+
+    def Update(self, Map):
+        """Update the cells from Map (a mapfile.Mapfile), and return a list of the cells that have changed"""
+        Statuses = ReturnCellStatuses(Map, self.Cells)
+        Dirty = [Cell for Cell, (Old, New) in enumerate(zip(self.Statuses, Statuses)) if Old != New]
+        self.Statuses = Statuses
+        return Dirty
+
+    def GetStatus(self, Cell):
+        """Return the status of the given cell, or None if it's empty"""
+        if self.Statuses[Cell] == 0:
+            return None
+
+        return chr(self.Statuses[Cell])
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (hashing) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import io
+import os
+import hashlib
+import threading
+
+#The queue module is called Queue on python 2.
+try:
+    import queue
+
+except ImportError:
+    import Queue as queue
+
+#Import tools modules.
+from . import mapfile
+from .index import IntervalIndex
+
+#The image is hashed in chunks of this many bytes, starting at 0, each read this many bytes at a time.
+ChunkSize = 64*1024*1024
+ReadSize = 4*1024*1024
+
+#How many chunks to hash at once. Hashing releases the GIL, so threads help with fast disks.
+Threads = 4
+
+def HashRanges(FileDescriptor, Ranges, Algorithm):
+    """Hash the data at each (position, size) range in the open file FileDescriptor, and return the hex digest. The position and size of each range
+    are hashed before its data, so the digest also depends on where the data is. Raises IOError if the file ends before the end of a range."""
+    Hash = hashlib.new(Algorithm)
+
+    for Position, Size in Ranges:
+        Hash.update(("%d %d\n" % (Position, Size)).encode("ascii"))
+        End = Position + Size
+
+        while Position < End:
+            if hasattr(os, "pread"):
+                Data = os.pread(FileDescriptor, min(ReadSize, End - Position), Position)
+
+            else:
+                os.lseek(FileDescriptor, Position, os.SEEK_SET)
+                Data = os.read(FileDescriptor, min(ReadSize, End - Position))
+
+            if len(Data) == 0:
+                raise IOError("The image ends at %d, before the end of the rescued data at %d" % (Position, End))
+
+            Hash.update(Data)
+            Position += len(Data)
+
+    return Hash.hexdigest()
+
+class HashResult():
+    """The hashes of each chunk of an image, and the parts of it that weren't rescued (so weren't hashed).
+    Chunks holds the (position, size, rescued bytes, hex digest) of each chunk. Chunks with nothing rescued have a digest of None.
+    The digest of the whole image is the hash of the manifest lines for all the chunks, so it can be checked from the manifest alone."""
+    def __init__(self, Algorithm, ChunkSize, Chunks, UnreadBlocks):
+        """Store the results"""
+        self.Algorithm = Algorithm
+        self.ChunkSize = ChunkSize
+        self.Chunks = Chunks
+        self.UnreadBlocks = UnreadBlocks
+
+    def FormatChunks(self):
+        """Yield the manifest line for each chunk"""
+        for Position, Size, Rescued, Digest in self.Chunks:
+            yield "0x%08X  0x%08X  0x%08X  %s\n" % (Position, Size, Rescued, Digest or "-")
+
+    def GetDigest(self):
+        """Return the hex digest of the whole image"""
+        Hash = hashlib.new(self.Algorithm)
+
+        for Line in self.FormatChunks():
+            Hash.update(Line.encode("ascii"))
+
+        return Hash.hexdigest()
+
+    def WriteManifest(self, FileName, Comments=()):
+        """Write the hash of each chunk, and of the whole image, to FileName, after the given comment lines"""
+        with io.open(FileName+".tmp", "w", encoding="UTF-8") as File:
+            for Comment in Comments:
+                File.write("# "+Comment+"\n")
+
+            File.write("# Algorithm: %s\n# Chunk size: %d\n#      pos        size     rescued  digest\n" % (self.Algorithm, self.ChunkSize))
+            File.writelines(self.FormatChunks())
+            File.write("# Image digest: %s\n" % self.GetDigest())
+
+        os.rename(FileName+".tmp", FileName)
+
+    def WriteUnreadBlocks(self, FileName, Comments=()):
+        """Write the blocks that weren't rescued to FileName, in mapfile format"""
+        mapfile.Write(mapfile.Mapfile(), FileName, Comments, self.UnreadBlocks)
+
+class ImageHasher():
+    """Hashes only the rescued parts of an image, using its mapfile, in chunks spread across several threads"""
+    def __init__(self, ImageFileName, Map, Algorithm="sha256", ChunkSize=ChunkSize, Threads=Threads):
+        """Set up to hash ImageFileName, using Map (a mapfile.Mapfile) to tell which parts were rescued"""
+        self.ImageFileName = ImageFileName
+        self.Map = Map
+        self.Algorithm = Algorithm
+        self.ChunkSize = ChunkSize
+        self.Threads = Threads
+
+        #Check the algorithm now, rather than in every thread.
+        hashlib.new(Algorithm)
+
+        self.Index = IntervalIndex(Map)
+
+    def HashChunk(self, FileDescriptor, Position):
+        """Return the (position, size, rescued bytes, hex digest) of the chunk starting at Position"""
+        Size = min(self.ChunkSize, self.Map.GetEnd() - Position)
+        Ranges = [(Start, Length) for Start, Length, Status in self.Index.GetOverlapping(Position, Position + Size, "+")]
+
+        if Ranges == []:
+            return (Position, Size, 0, None)
+
+        return (Position, Size, sum(Length for Start, Length in Ranges), HashRanges(FileDescriptor, Ranges, self.Algorithm))
+
+    def Worker(self, Chunks, Results, Errors):
+        """Hash chunks from the queue Chunks until it's empty, putting the results in Results, and any exception in Errors"""
+        try:
+            FileDescriptor = os.open(self.ImageFileName, os.O_RDONLY)
+
+        except (IOError, OSError) as Error:
+            Errors.append(Error)
+            return
+
+        try:
+            while not Errors:
+                try:
+                    Number, Position = Chunks.get_nowait()
+
+                except queue.Empty:
+                    break
+
+                Results[Number] = self.HashChunk(FileDescriptor, Position)
+
+        except Exception as Error:
+            Errors.append(Error)
+
+        finally:
+            os.close(FileDescriptor)
+
+    def Run(self):
+        """Hash the image, and return a HashResult. Raises IOError or OSError if the image can't be read, or is shorter than the mapfile."""
+        Positions = list(range(0, self.Map.GetEnd(), self.ChunkSize))
+        Chunks = queue.Queue()
+
+        for Number, Position in enumerate(Positions):
+            Chunks.put((Number, Position))
+
+        Results = [None] * len(Positions)
+        Errors = []
+
+        Workers = [threading.Thread(target=self.Worker, args=(Chunks, Results, Errors)) for Worker in range(max(min(self.Threads, len(Positions)), 1))]
+
+        for Worker in Workers:
+            Worker.start()
+
+        for Worker in Workers:
+            Worker.join()
+
+        if Errors:
+            raise Errors[0]
+
+        return HashResult(self.Algorithm, self.ChunkSize, Results, self.Index.GetOverlapping(0, self.Map.GetEnd(), "?*/-"))
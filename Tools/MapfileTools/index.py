@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (index) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import bisect
+
+#Import tools modules.
+from . import mapfile
+
+class IntervalIndex():
+    """Answers questions about byte ranges of a mapfile.Mapfile, such as how much of a range has been rescued, or which bad areas overlap it.
+    Built once in O(n), with a prefix sum of the sizes of the blocks with the given statuses (by default, finished), then each query takes O(log n).
+    The mapfile's blocks must be sorted and not overlap, as they always are in ddrescue's mapfiles."""
+    def __init__(self, Map, Statuses="+"):
+        """Index Map, counting bytes with the given statuses"""
+        self.Map = Map
+        self.Statuses = Statuses
+        self.Positions = Map.Positions
+        self.Sizes = Map.Sizes
+
+        #Whether each status code counts, as a table indexed by the code.
+        self.Counted = bytearray(256)
+
+        for Status in Statuses:
+            self.Counted[ord(Status)] = 1
+
+        #The number of counted bytes before each block, and in all of them.
+        self.Prefix = mapfile.NewPositionArray([0])
+        Total = 0
+
+        for Size, Code in zip(Map.Sizes, Map.Codes):
+            if self.Counted[Code]:
+                Total += Size
+
+            self.Prefix.append(Total)
+
+    def FindBlock(self, Position, Low=0):
+        """Return the number of the block containing Position (or the last one before it), or -1 if it's before the first block.
+        If it's known to be at or after block number Low, searching from there is faster."""
+        return bisect.bisect_right(self.Positions, Position, Low) - 1
+
+    def GetBytesBefore(self, Position, Block=None):
+        """Return the number of counted bytes before Position. Block is the number of the block containing it, if it's already known."""
+        if Block == None:
+            Block = self.FindBlock(Position)
+
+        if Block < 0:
+            return 0
+
+        Bytes = self.Prefix[Block]
+
+        if self.Counted[self.Map.Codes[Block]]:
+            Bytes += min(Position - self.Positions[Block], self.Sizes[Block])
+
+        return Bytes
+
+    def GetBytes(self, Start, End):
+        """Return the number of counted bytes between Start and End"""
+        return self.GetBytesBefore(End) - self.GetBytesBefore(Start)
+
+    def IsCovered(self, Start, End):
+        """Return True if every byte between Start and End has one of the counted statuses, eg to check if a range has been fully rescued"""
+        return self.GetBytes(Start, End) == End - Start
+
+    def GetOverlapping(self, Start, End, Statuses="-"):
+        """Return the (position, size, status) of each part of a block with one of the given statuses (by default, bad sectors) between Start and End.
+        Blocks are cut to fit the range. Takes O(log n) to find the range, then the blocks in it are searched in C, so ranges with few matching blocks are fast."""
+        First = max(bisect.bisect_right(self.Positions, Start) - 1, 0)
+        Last = bisect.bisect_left(self.Positions, End)
+
+        #Search for the blocks with each status in the range's part of the block table.
+        Codes = bytearray(self.Map.Codes[First:Last])
+        Blocks = []
+
+        for Status in Statuses:
+            Block = Codes.find(Status.encode("ascii"))
+
+            while Block != -1:
+                Position = self.Positions[First+Block]
+                BlockEnd = Position + self.Sizes[First+Block]
+
+                if BlockEnd > Start:
+                    Blocks.append((max(Position, Start), min(BlockEnd, End) - max(Position, Start), Status))
+
+                Block = Codes.find(Status.encode("ascii"), Block+1)
+
+        Blocks.sort()
+        return Blocks
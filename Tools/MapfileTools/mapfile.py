@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (mapfile) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import io
+import os
+import re
+import sys
+import array
+import binascii
+import itertools
+
+#The status of each block in a mapfile, in the order ddrescue works through them.
+Statuses = "?*/-+"
+
+#The ASCII code of each status, and a translation table for each one that turns that code into 1 and every other byte into 0.
+StatusBytes = Statuses.encode("ascii")
+StatusCodes = bytearray(StatusBytes)
+SelectTables = dict((Code, bytes(bytearray(int(Byte == Code) for Byte in range(256)))) for Code in StatusCodes)
+
+StatusNames = {"?": "non-tried", "*": "non-trimmed", "/": "non-scraped", "-": "bad sector", "+": "finished"}
+
+#Unsigned 64-bit integers. Python 2's array module doesn't have "Q", but "L" is 64 bits on 64-bit Linux and OS X.
+if hasattr(array, "typecodes") and "Q" in array.typecodes:
+    PositionType = str("Q")
+    SignedPositionType = str("q")
+
+else:
+    PositionType = str("L")
+    SignedPositionType = str("l")
+
+#The characters in hex numbers as ddrescue writes them ("0x" and then at least 8 digits), and the widest ones ParseNumbers() converts in one go (up to 2**60).
+HexCharacters = b"0123456789ABCDEFabcdefx"
+MaxHexWidth = 17
+
+#Comment lines. ddrescue ignores these wherever they are.
+Comments = re.compile(b"^#.*$", re.MULTILINE)
+
+#How much of the file to read at once, in bytes. This bounds the memory used while parsing, on top of the arrays.
+ChunkSize = 1024*1024
+
+def NewPositionArray(Values=()):
+    """Return an array of unsigned 64-bit positions or sizes"""
+    return array.array(PositionType, Values)
+
+def AppendBytes(Array, Data):
+    """Append the raw bytes in Data (bytes, a bytearray or another array) to Array, which is much faster than appending them one at a time.
+    fromstring() and tostring() are the python 2 names for frombytes() and tobytes()."""
+    if isinstance(Data, array.array):
+        Data = getattr(Data, "tobytes", getattr(Data, "tostring", None))()
+
+    getattr(Array, "frombytes", getattr(Array, "fromstring", None))(bytes(Data))
+
+class Mapfile():
+    """A parsed ddrescue mapfile (called a logfile before ddrescue 1.20). The blocks are kept in three parallel arrays, rather than a list of tuples,
+    so even a mapfile with millions of fragments only takes 17 bytes per block: Positions and Sizes (unsigned 64-bit), and Codes (the ASCII code of each status).
+    Totals holds the number of bytes with each status."""
+    def __init__(self):
+        """Initialise an empty mapfile"""
+        self.Positions = NewPositionArray()
+        self.Sizes = NewPositionArray()
+        self.Codes = array.array(str("B"))
+
+        #The current position line. CurrentPass is only in mapfiles from ddrescue 1.20 and later.
+        self.CurrentPos = 0
+        self.CurrentStatus = "?"
+        self.CurrentPass = None
+
+        self.Totals = dict((Status, 0) for Status in Statuses)
+
+    def __len__(self):
+        """Return the number of blocks"""
+        return len(self.Positions)
+
+    def GetBlock(self, Index):
+        """Return the (position, size, status) of the block with the given index"""
+        return (self.Positions[Index], self.Sizes[Index], chr(self.Codes[Index]))
+
+    def GetBlocks(self):
+        """Yield the (position, size, status) of each block"""
+        for Index in range(len(self.Positions)):
+            yield self.GetBlock(Index)
+
+    def GetStatus(self, Index):
+        """Return the status of the block with the given index"""
+        return chr(self.Codes[Index])
+
+    def GetEnd(self):
+        """Return the position just after the last block, which is the size of the domain the mapfile covers"""
+        if len(self.Positions) == 0:
+            return 0
+
+        return self.Positions[-1] + self.Sizes[-1]
+
+    def AddBlocks(self, Positions, Sizes, Statuses):
+        """Add blocks from parallel sequences of positions, sizes and statuses (a string, a sequence of one-character strings, or bytes of status codes)"""
+        Codes = ReturnCodes(Statuses)
+
+        if not len(Positions) == len(Sizes) == len(Codes):
+            raise ValueError("Different numbers of positions, sizes and statuses")
+
+        #fromlist() is several times faster than extend() for lists, and signed arrays from ParseNumbers() never hold negative numbers, so can be copied straight in.
+        for Array, Values in ((self.Positions, Positions), (self.Sizes, Sizes)):
+            if isinstance(Values, list):
+                Array.fromlist(Values)
+
+            elif isinstance(Values, array.array) and Values.typecode == SignedPositionType:
+                AppendBytes(Array, Values)
+
+            else:
+                Array.extend(Values)
+
+        AppendBytes(self.Codes, Codes)
+
+        #Add up the sizes with each status in C, which is much faster than looping over the blocks.
+        for Code in StatusCodes:
+            self.Totals[chr(Code)] += sum(itertools.compress(Sizes, bytearray(Codes.translate(SelectTables[Code]))))
+
+    def AddBlock(self, Position, Size, Status):
+        """Add a single block"""
+        self.AddBlocks((Position,), (Size,), Status)
+
+    def ReplaceBlocks(self, Start, End, Positions, Sizes, Statuses):
+        """Replace the blocks with indexes from Start up to (but not including) End with blocks from parallel sequences of positions, sizes and statuses (as for AddBlocks())"""
+        Codes = ReturnCodes(Statuses)
+
+        if not len(Positions) == len(Sizes) == len(Codes):
+            raise ValueError("Different numbers of positions, sizes and statuses")
+
+        for Index in range(Start, End):
+            self.Totals[chr(self.Codes[Index])] -= self.Sizes[Index]
+
+        self.Positions[Start:End] = NewPositionArray(Positions)
+        self.Sizes[Start:End] = NewPositionArray(Sizes)
+        self.Codes[Start:End] = array.array(str("B"), Codes)
+
+        for Size, Code in zip(Sizes, Codes):
+            self.Totals[chr(Code)] += Size
+
+def ReturnCodes(Statuses):
+    """Return the status codes for Statuses (a string, a sequence of one-character strings, or bytes of status codes) as a bytearray. Raises ValueError if any aren't valid."""
+    if isinstance(Statuses, (bytes, bytearray)):
+        Codes = bytearray(Statuses)
+
+    else:
+        Codes = bytearray(''.join(Statuses).encode("ascii"))
+
+    if Codes.translate(None, StatusBytes) != b"":
+        raise ValueError("Unknown block status: "+chr(Codes.translate(None, StatusBytes)[0]))
+
+    return Codes
+
+def ParseNumbers(Tokens):
+    """Return the numbers in Tokens (a list of bytes), as a signed array or a list. Raises ValueError if any of them aren't valid.
+    ddrescue writes every number in hex with the same number of digits, unless it's too big, so columns of numbers that all look like that are
+    converted all at once in C, by padding them to 16 digits and unhexlifying them. Anything else (like decimal numbers) is converted with int().
+    The array is signed because python 2 turns unsigned 64-bit numbers into longs, which are much slower to add up."""
+    Width = len(Tokens[0]) if Tokens != [] else 0
+    Joined = b"".join(Tokens)
+    Count = len(Tokens)
+
+    if (2 < Width <= MaxHexWidth and NewPositionArray().itemsize == 8 and len(Joined) == Width * Count and len(set(map(len, Tokens))) == 1
+            and Joined[0::Width] == b"0" * Count and Joined[1::Width] == b"x" * Count and Joined.count(b"x") == Count and Joined.translate(None, HexCharacters) == b""):
+        #Removing the "x" from each number leaves 16 digits with its padding.
+        Padding = b"0" * (MaxHexWidth - Width)
+        Numbers = array.array(SignedPositionType)
+        AppendBytes(Numbers, binascii.unhexlify((Padding + Padding.join(Tokens)).translate(None, b"x")))
+
+        if sys.byteorder == "little":
+            Numbers.byteswap()
+
+        return Numbers
+
+    #The positions and sizes are normally in hex, but ddrescue accepts decimal too.
+    return list(map(int, Tokens, [0] * Count))
+
+def ParseBlocks(Data):
+    """Return the positions, sizes and status codes (as a bytearray) of the blocks in Data (bytes, with comments already removed). Raises ValueError
+    if any of them aren't valid. The tokens are never decoded, and each column is converted in one go, as converting them one at a time in python is slow."""
+    Tokens = Data.split()
+
+    if len(Tokens) % 3 != 0:
+        raise ValueError("Block line without a position, size and status")
+
+    Positions = ParseNumbers(Tokens[0::3])
+    Sizes = ParseNumbers(Tokens[1::3])
+    Codes = b"".join(Tokens[2::3])
+
+    if len(Codes) != len(Sizes):
+        raise ValueError("Unknown block status: "+[Token for Token in Tokens[2::3] if len(Token) != 1][0].decode("UTF-8", "replace"))
+
+    return Positions, Sizes, ReturnCodes(Codes)
+
+def ParseCurrentPosition(Map, Line):
+    """Parse the current position line, which comes before the blocks. Raises ValueError if it isn't valid."""
+    Tokens = Line.split()
+
+    if len(Tokens) not in (2, 3) or Tokens[1] not in Statuses + "F":
+        raise ValueError("Invalid current position line: "+Line.strip())
+
+    Map.CurrentPos = int(Tokens[0], 0)
+    Map.CurrentStatus = Tokens[1]
+
+    if len(Tokens) == 3:
+        Map.CurrentPass = int(Tokens[2])
+
+def ParseChunks(File, Map):
+    """Parse the open mapfile File (opened in binary mode) about ChunkSize bytes at a time, putting the current position in Map, and yielding
+    the positions, sizes and statuses of the blocks in each chunk. Raises ValueError if it isn't a valid mapfile."""
+    GotCurrentPosition = False
+
+    while True:
+        #Read whole lines only.
+        Chunk = File.read(ChunkSize)
+
+        if Chunk == b"":
+            break
+
+        Chunk += File.readline()
+
+        #Comments can be anywhere, but they're almost always only in the header.
+        if b"#" in Chunk:
+            Chunk = Comments.sub(b"", Chunk)
+
+        if not GotCurrentPosition and not Chunk.isspace():
+            Line, Chunk = (Chunk.lstrip()+b"\n").split(b"\n", 1)
+            ParseCurrentPosition(Map, Line.decode("UTF-8", "replace"))
+            GotCurrentPosition = True
+
+        yield ParseBlocks(Chunk)
+
+    if not GotCurrentPosition:
+        raise ValueError("No current position line")
+
+def Parse(File):
+    """Parse the open mapfile File (opened in binary mode), and return a Mapfile. Raises ValueError if it isn't a valid mapfile.
+    The file is read about ChunkSize bytes at a time, so memory use is bounded by the size of the block arrays."""
+    Map = Mapfile()
+
+    for Positions, Sizes, Codes in ParseChunks(File, Map):
+        Map.AddBlocks(Positions, Sizes, Codes)
+
+    return Map
+
+def Read(FileName):
+    """Read and parse the mapfile FileName. Raises ValueError if it isn't a valid mapfile, or IOError/OSError if it can't be read."""
+    with open(FileName, "rb") as File:
+        return Parse(File)
+
+def ReadBlocks(FileName, Map=None):
+    """Yield the (position, size, status) of each block in the mapfile FileName, without keeping them all in memory. The current position is put in Map, if given.
+    Raises ValueError if it isn't a valid mapfile (possibly after yielding some blocks), or IOError/OSError if it can't be read."""
+    if Map == None:
+        Map = Mapfile()
+
+    with open(FileName, "rb") as File:
+        for Positions, Sizes, Codes in ParseChunks(File, Map):
+            for Block in zip(Positions, Sizes, Codes.decode("ascii")):
+                yield Block
+
+def Format(Map, Comments=(), Blocks=None):
+    """Yield the lines of a mapfile with the current position from Map, and either the blocks in Map, or the (position, size, status) of each block in Blocks.
+    It's in the format ddrescue 1.20 and later writes, after the given comment lines."""
+    for Comment in Comments:
+        yield "# "+Comment+"\n"
+
+    if Map.CurrentPass != None:
+        yield "# current_pos  current_status  current_pass\n"
+        yield "0x%08X     %s               %d\n" % (Map.CurrentPos, Map.CurrentStatus, Map.CurrentPass)
+
+    else:
+        yield "# current_pos  current_status\n"
+        yield "0x%08X     %s\n" % (Map.CurrentPos, Map.CurrentStatus)
+
+    yield "#      pos        size  status\n"
+
+    if Blocks == None:
+        Blocks = Map.GetBlocks()
+
+    for Position, Size, Status in Blocks:
+        yield "0x%08X  0x%08X  %s\n" % (Position, Size, Status)
+
+def Write(Map, FileName, Comments=(), Blocks=None):
+    """Write Map (or Blocks, as for Format()) to FileName. The file is replaced in one step, so ddrescue and other readers never see half a mapfile."""
+    with io.open(FileName+".tmp", "w", encoding="UTF-8") as File:
+        File.writelines(Format(Map, Comments, Blocks))
+
+    os.rename(FileName+".tmp", FileName)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (merge) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+
+#Import tools modules.
+from . import mapfile
+
+#How to combine the statuses of the same byte in two mapfiles, like ddrescuelog. Bytes that aren't in a mapfile count as non-tried.
+#or:         Finished if it's finished in either, otherwise the status in the first mapfile.
+#and:        Finished if it's finished in both, otherwise the status in whichever mapfile it isn't finished in (the first, if neither).
+#difference: Finished if it's finished in the first, but not in the second, otherwise non-tried. Use this as a domain mapfile (ddrescue -m) to copy
+#            only what one image is missing from another.
+def CombineOr(First, Second):
+    """Combine two statuses with logical OR"""
+    if First == "+" or Second == "+":
+        return "+"
+
+    return First
+
+def CombineAnd(First, Second):
+    """Combine two statuses with logical AND"""
+    if First == "+":
+        return Second
+
+    return First
+
+def CombineDifference(First, Second):
+    """Combine two statuses, keeping only what's finished in the first and not the second"""
+    if First == "+" and Second != "+":
+        return "+"
+
+    return "?"
+
+Operations = {"or": CombineOr, "and": CombineAnd, "difference": CombineDifference}
+
+def FillGaps(Blocks):
+    """Yield Blocks, adding non-tried blocks in any gaps between them (including before the first one), so they cover everything from 0 to the end"""
+    End = 0
+
+    for Position, Size, Status in Blocks:
+        if Position < End:
+            raise ValueError("Overlapping or unsorted blocks at position %d" % Position)
+
+        if Position > End:
+            yield End, Position - End, "?"
+
+        yield Position, Size, Status
+        End = Position + Size
+
+def Coalesce(Blocks):
+    """Yield Blocks, joining neighbouring blocks with the same status, and leaving out empty ones, as ddrescue does"""
+    Current = None
+
+    for Position, Size, Status in Blocks:
+        if Size == 0:
+            continue
+
+        if Current != None and Current[2] == Status and Current[0] + Current[1] == Position:
+            Current = (Current[0], Current[1] + Size, Status)
+
+        else:
+            if Current != None:
+                yield Current
+
+            Current = (Position, Size, Status)
+
+    if Current != None:
+        yield Current
+
+def Sweep(First, Second, Combine):
+    """Yield the combined status of every part of two sequences of blocks with no gaps, using the function Combine"""
+    Block1 = next(First, None)
+    Block2 = next(Second, None)
+
+    while Block1 != None or Block2 != None:
+        if Block2 == None:
+            #Only the first has any blocks left.
+            yield Block1[0], Block1[1], Combine(Block1[2], "?")
+            Block1 = next(First, None)
+
+        elif Block1 == None:
+            yield Block2[0], Block2[1], Combine("?", Block2[2])
+            Block2 = next(Second, None)
+
+        else:
+            #Both blocks start at the same position, because there are no gaps. Yield the part they share, and keep the rest for next time.
+            Size = min(Block1[1], Block2[1])
+            yield Block1[0], Size, Combine(Block1[2], Block2[2])
+
+            Block1 = (Block1[0] + Size, Block1[1] - Size, Block1[2])
+            Block2 = (Block2[0] + Size, Block2[1] - Size, Block2[2])
+
+            if Block1[1] == 0:
+                Block1 = next(First, None)
+
+            if Block2[1] == 0:
+                Block2 = next(Second, None)
+
+def MergeBlocks(First, Second, Operation="or"):
+    """Combine two sorted sequences of (position, size, status) blocks with the given operation (see Operations), and yield the result.
+    This is a single sweep over both, so it only holds one block from each at a time, however big they are."""
+    if Operation not in Operations:
+        raise ValueError("Unknown operation: "+Operation)
+
+    return Coalesce(Sweep(FillGaps(First), FillGaps(Second), Operations[Operation]))
+
+class MergeSummary():
+    """Counts the blocks and bytes of each status in a sequence of blocks as it goes past"""
+    def __init__(self):
+        """Initialise the counts"""
+        self.Blocks = 0
+        self.Totals = dict((Status, 0) for Status in mapfile.Statuses)
+
+    def Count(self, Blocks):
+        """Yield Blocks, counting each one"""
+        for Block in Blocks:
+            self.Blocks += 1
+            self.Totals[Block[2]] += Block[1]
+            yield Block
+
+def MergeFiles(FileNames, OutputFileName, Operation="or"):
+    """Combine the mapfiles FileNames (two or more) with the given operation, in order, writing the result to OutputFileName.
+    The mapfiles are read and written a chunk at a time, so memory use doesn't depend on their size. Returns a MergeSummary of the result.
+    Raises ValueError if any of them isn't a valid mapfile, or IOError/OSError if it can't be read, in which case OutputFileName isn't touched."""
+    if len(FileNames) < 2:
+        raise ValueError("At least two mapfiles are needed")
+
+    Blocks = mapfile.ReadBlocks(FileNames[0])
+
+    for FileName in FileNames[1:]:
+        Blocks = MergeBlocks(Blocks, mapfile.ReadBlocks(FileName), Operation)
+
+    Summary = MergeSummary()
+
+    #Start ddrescue from the beginning if the result is used to resume a recovery.
+    Map = mapfile.Mapfile()
+    Map.CurrentPass = 1
+
+    try:
+        mapfile.Write(Map, OutputFileName, ["Mapfile. Created by DDRescue-GUI", "Merged ("+Operation+"): "+", ".join(FileNames)], Summary.Count(Blocks))
+
+    finally:
+        #Don't leave a half-written mapfile behind if one of the inputs was bad.
+        if os.path.exists(OutputFileName+".tmp"):
+            os.remove(OutputFileName+".tmp")
+
+    return Summary
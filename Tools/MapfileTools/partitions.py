@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (partitions) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import zlib
+import uuid
+import struct
+
+#Import tools modules.
+from . import mapfile
+
+#MBR partition types for extended partitions, which hold a chain of EBRs (extended boot records), and the protective partition in front of a GPT.
+ExtendedTypes = (0x05, 0x0F, 0x85)
+ProtectiveType = 0xEE
+
+#Where the signatures of filesystems that can start at the first sector of a disk are, instead of a partition table. FAT, exFAT and NTFS
+#boot sectors end with the same 0x55AA signature as an MBR, so their boot code mustn't be taken as partition entries.
+BootSectorSignatures = ((3, b"NTFS    ", "NTFS"), (3, b"EXFAT   ", "exFAT"), (0x36, b"FAT", "FAT12/16"), (0x52, b"FAT32   ", "FAT32"))
+ExtMagicOffset = 1080
+ExtMagic = b"\x53\xef"
+
+#The most logical partitions we'll follow in an EBR chain, so a corrupt chain that loops can't hang us.
+MaxLogicalPartitions = 128
+
+#The most bytes of GPT partition entries we'll read. The usual 128 entries of 128 bytes take 16 KiB.
+MaxEntriesSize = 1024*1024
+
+#Names of common partition types, to show the user.
+MBRTypeNames = {0x01: "FAT12", 0x04: "FAT16", 0x06: "FAT16", 0x07: "NTFS/exFAT", 0x0B: "FAT32", 0x0C: "FAT32", 0x0E: "FAT16", 0x82: "Linux swap",
+                0x83: "Linux", 0x8E: "Linux LVM", 0xA5: "FreeBSD", 0xAF: "HFS+", 0xEF: "EFI System", 0xFD: "Linux RAID"}
+
+GPTTypeNames = {"C12A7328-F81F-11D2-BA4B-00A0C93EC93B": "EFI System", "E3C9E316-0B5C-4DB8-817D-F92DF00215AE": "Microsoft reserved",
+                "EBD0A0A2-B9E5-4433-87C0-68B6B72699C7": "Microsoft basic data", "DE94BBA4-06D1-4D40-A16A-BFD50179D6AC": "Windows recovery",
+                "0FC63DAF-8483-4772-8E79-3D69D8477DE4": "Linux filesystem", "0657FD6D-A4AB-43C4-84E5-0933C84B4F4F": "Linux swap",
+                "E6D6D379-F507-44C2-A23C-238F2A3DF928": "Linux LVM", "A19D880F-05FC-4D3B-A006-743F0F84911E": "Linux RAID",
+                "48465300-0000-11AA-AA11-00306543ECAC": "HFS+", "7C3457EF-0000-11AA-AA11-00306543ECAC": "APFS", "21686148-6449-6E6F-744E-656564454649": "BIOS boot"}
+
+class Partition():
+    """A partition. Start and Size are in bytes. Type is the MBR type (an int) or the GPT type GUID (a string)."""
+    def __init__(self, Number, Start, Size, Type, Name=""):
+        """Store the partition's details"""
+        self.Number = Number
+        self.Start = Start
+        self.Size = Size
+        self.Type = Type
+        self.Name = Name
+
+    def GetTypeName(self):
+        """Return a readable name for the partition's type"""
+        if isinstance(self.Type, int):
+            return MBRTypeNames.get(self.Type, "Type 0x%02X" % self.Type)
+
+        return GPTTypeNames.get(self.Type, self.Type)
+
+class PartitionTable():
+    """The partitions on a disk, and the byte ranges holding the partition table itself. Scheme is "MBR" or "GPT"."""
+    def __init__(self, Scheme, SectorSize):
+        """Initialise an empty partition table"""
+        self.Scheme = Scheme
+        self.SectorSize = SectorSize
+        self.Partitions = []
+
+        #The (position, size) of each part of the disk holding the partition table (the MBR, EBRs, or GPT headers and entries).
+        self.TableRanges = []
+
+def ReadAt(File, Position, Size):
+    """Return Size bytes from Position in the open file File. Raises ValueError if the file ends first."""
+    File.seek(Position)
+    Data = File.read(Size)
+
+    if len(Data) != Size:
+        raise ValueError("The disk ends at %d, before the end of its partition table" % (Position + len(Data)))
+
+    return Data
+
+def ReturnBootSectorFilesystem(File, Sector):
+    """Return the name of the filesystem that starts at the beginning of the open disk (or image) File, whose first sector is Sector, or None if there isn't one there"""
+    for Offset, Signature, Name in BootSectorSignatures:
+        if Sector[Offset:Offset+len(Signature)] == Signature:
+            return Name
+
+    #The ext superblock is after the first sector. The disk may end before it.
+    File.seek(ExtMagicOffset)
+
+    if File.read(2) == ExtMagic:
+        return "ext2/3/4"
+
+    return None
+
+def ParseMBREntries(Sector):
+    """Return the (slot, type, start sector, number of sectors) of each used entry in the MBR or EBR Sector, where slot is the entry's index (0-3), as empty entries are left out.
+    Raises ValueError if it doesn't have a boot signature, or if any entry has an invalid boot flag."""
+    if Sector[510:512] != b"\x55\xaa":
+        raise ValueError("No MBR boot signature")
+
+    Entries = []
+
+    for Slot, Offset in enumerate(range(446, 510, 16)):
+        Flag, Type, Start, Count = struct.unpack(str("<B3xB3xII"), Sector[Offset:Offset+16])
+
+        if Flag not in (0x00, 0x80):
+            raise ValueError("Partition entry %d has an invalid boot flag (0x%02X), so this isn't an MBR" % (Slot + 1, Flag))
+
+        if Type != 0 and Count != 0:
+            Entries.append((Slot, Type, Start, Count))
+
+    return Entries
+
+def ReadLogicalPartitions(File, Table, ExtendedStart):
+    """Follow the chain of EBRs in the extended partition starting at sector ExtendedStart, adding the logical partitions and EBRs to Table"""
+    EBRStart = ExtendedStart
+    Number = 5
+
+    while Number < 5 + MaxLogicalPartitions:
+        Table.TableRanges.append((EBRStart * Table.SectorSize, Table.SectorSize))
+        Entries = ParseMBREntries(ReadAt(File, EBRStart * Table.SectorSize, Table.SectorSize))
+        Next = None
+
+        #The first entry is the logical partition, relative to this EBR. The second (if any) points to the next EBR, relative to the extended partition.
+        for Slot, Type, Start, Count in Entries:
+            if Type in ExtendedTypes:
+                Next = ExtendedStart + Start
+
+            else:
+                Table.Partitions.append(Partition(Number, (EBRStart + Start) * Table.SectorSize, Count * Table.SectorSize, Type))
+                Number += 1
+
+        if Next == None:
+            return
+
+        EBRStart = Next
+
+    raise ValueError("Too many logical partitions. The EBR chain is probably corrupt")
+
+def ReadGPT(File, SectorSize):
+    """Read the GPT whose header is at the second sector, if sectors are SectorSize bytes. Returns None if there's no GPT header there, or raises ValueError if it's corrupt."""
+    Header = ReadAt(File, SectorSize, 92)
+
+    if Header[0:8] != b"EFI PART":
+        return None
+
+    HeaderSize, HeaderCRC = struct.unpack(str("<II"), Header[12:20])
+    Header = ReadAt(File, SectorSize, HeaderSize)
+
+    if zlib.crc32(Header[0:16]+b"\0\0\0\0"+Header[20:]) & 0xFFFFFFFF != HeaderCRC:
+        raise ValueError("The GPT header is corrupt (bad checksum)")
+
+    AlternateLBA, = struct.unpack(str("<Q"), Header[32:40])
+    EntriesLBA, EntryCount, EntrySize, EntriesCRC = struct.unpack(str("<QIII"), Header[72:92])
+
+    if EntrySize < 128 or EntryCount * EntrySize > MaxEntriesSize:
+        raise ValueError("The GPT header is corrupt (bad partition entry size)")
+
+    Entries = ReadAt(File, EntriesLBA * SectorSize, EntryCount * EntrySize)
+
+    if zlib.crc32(Entries) & 0xFFFFFFFF != EntriesCRC:
+        raise ValueError("The GPT partition entries are corrupt (bad checksum)")
+
+    Table = PartitionTable("GPT", SectorSize)
+
+    #Keep everything from the protective MBR to the end of the primary entries, and the backup entries and header at the end of the disk.
+    EntriesSectors = (EntryCount * EntrySize + SectorSize - 1) // SectorSize
+    Table.TableRanges.append((0, (EntriesLBA + EntriesSectors) * SectorSize))
+
+    if AlternateLBA > EntriesSectors:
+        Table.TableRanges.append(((AlternateLBA - EntriesSectors) * SectorSize, (EntriesSectors + 1) * SectorSize))
+
+    for Number in range(EntryCount):
+        Entry = Entries[Number*EntrySize:(Number+1)*EntrySize]
+
+        if Entry[0:16] == b"\0"*16:
+            continue
+
+        FirstLBA, LastLBA = struct.unpack(str("<QQ"), Entry[32:48])
+        Name = Entry[56:128].decode("utf-16-le", "replace").split("\0")[0]
+        Table.Partitions.append(Partition(Number + 1, FirstLBA * SectorSize, (LastLBA - FirstLBA + 1) * SectorSize, str(uuid.UUID(bytes_le=bytes(Entry[0:16]))).upper(), Name))
+
+    return Table
+
+def CheckPartitions(Table, DiskSize):
+    """Raise ValueError if there are no partitions in Table, or if any of them overlap the MBR or each other, or go past the end of the disk (DiskSize bytes)"""
+    if Table.Partitions == []:
+        raise ValueError("The MBR has no partitions")
+
+    End = Table.SectorSize
+
+    for Partition in sorted(Table.Partitions, key=lambda Partition: Partition.Start):
+        if Partition.Start < End:
+            raise ValueError("Partition %d overlaps the MBR or another partition" % Partition.Number)
+
+        if Partition.Start + Partition.Size > DiskSize:
+            raise ValueError("Partition %d goes past the end of the disk" % Partition.Number)
+
+        End = Partition.Start + Partition.Size
+
+def ReadPartitionTable(File):
+    """Read the MBR or GPT partition table from the open disk (or image) File, opened in binary mode, in as few small reads as possible.
+    Returns a PartitionTable. Raises ValueError if there isn't a valid partition table (including if the disk starts with a filesystem instead), or IOError/OSError if the disk can't be read."""
+    Sector = ReadAt(File, 0, 512)
+    Filesystem = ReturnBootSectorFilesystem(File, Sector)
+
+    if Filesystem != None:
+        raise ValueError("The disk starts with a "+Filesystem+" filesystem, not a partition table")
+
+    Entries = ParseMBREntries(Sector)
+
+    if ProtectiveType in [Type for Slot, Type, Start, Count in Entries]:
+        #The sector size of the disk isn't stored anywhere, so look for the GPT header at the second sector of either size.
+        for SectorSize in (512, 4096):
+            Table = ReadGPT(File, SectorSize)
+
+            if Table != None:
+                return Table
+
+        raise ValueError("The disk has a protective MBR, but no GPT")
+
+    Table = PartitionTable("MBR", 512)
+    Table.TableRanges.append((0, 512))
+
+    #Primary partitions are numbered by their slot in the MBR, even if earlier slots are empty.
+    for Slot, Type, Start, Count in Entries:
+        if Type in ExtendedTypes:
+            ReadLogicalPartitions(File, Table, Start)
+
+        else:
+            Table.Partitions.append(Partition(Slot + 1, Start * 512, Count * 512, Type))
+
+    File.seek(0, 2)
+    CheckPartitions(Table, File.tell())
+
+    Table.Partitions.sort(key=lambda Partition: Partition.Number)
+    return Table
+
+def ReturnDomainBlocks(Table, Partitions, Allocations={}, MinGap=0):
+    """Return the (position, size, status) of the blocks of a domain mapfile covering the partition table and the given partitions.
+    Allocations can map partition numbers to the allocation.Allocation of the filesystem in them, so only the used parts of those partitions are covered.
+    Gaps smaller than MinGap bytes are covered too, as reading them is quicker than seeking past them.
+    The parts to read are finished ("+"), and the gaps between them are non-tried ("?"), so ddrescue -m skips them."""
+    Ranges = list(Table.TableRanges)
+
+    for Partition in Partitions:
+        if Partition.Number in Allocations:
+            Ranges.extend(Allocations[Partition.Number].Ranges)
+
+        else:
+            Ranges.append((Partition.Start, Partition.Size))
+
+    Ranges.sort()
+    Blocks = []
+    End = 0
+
+    for Position, Size in Ranges:
+        RangeEnd = max(Position + Size, End)
+
+        if Position - End >= MinGap and Position > End:
+            Blocks.append((End, Position - End, "?"))
+
+        elif Blocks != []:
+            #Join ranges that overlap, touch, or are less than MinGap apart.
+            Position = Blocks.pop()[0]
+
+        else:
+            #Cover any small gap at the start too.
+            Position = 0
+
+        Blocks.append((Position, RangeEnd - Position, "+"))
+        End = RangeEnd
+
+    return Blocks
+
+def WriteDomainMapfile(FileName, Table, Partitions, Comments=(), Allocations={}, MinGap=0):
+    """Write a domain mapfile to FileName, for ddrescue -m, that limits the recovery to the partition table and the given partitions (as for ReturnDomainBlocks())"""
+    mapfile.Write(mapfile.Mapfile(), FileName, Comments, ReturnDomainBlocks(Table, Partitions, Allocations, MinGap))
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (snapshots) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import io
+import os
+import zlib
+import struct
+
+#Import tools modules.
+from . import mapfile
+
+#The start of every snapshot file.
+Magic = b"DDRescue-GUI snapshots 1\n"
+
+#What ddrescue is doing with each current status.
+PhaseNames = {"?": "copying", "*": "trimming", "/": "scraping", "-": "retrying", "F": "filling", "G": "generating", "+": "finished"}
+
+#How many blocks to compare at once when looking for the part of a mapfile that changed.
+CompareSize = 4096
+
+#Each snapshot is stored as a record with the length of its data, the data, and a CRC32 of the data, so a record cut short by a crash can be detected and dropped.
+#The data is a list of variable-length integers (7 bits per byte, least significant first), with:
+#   The time since the last snapshot in milliseconds (zigzag encoded, in case the clock goes backwards), the current position,
+#   the current status (as its ASCII code), the current pass plus one (0 if the mapfile doesn't have one), the index of the first block that changed,
+#   how many blocks were removed, and how many were added. Then, for each added block:
+#       The gap between it and the end of the last block (zigzag encoded, normally 0), its size, and its status (as its ASCII code).
+
+def EncodeNumber(Data, Number):
+    """Append Number (which must not be negative) to the bytearray Data as a variable-length integer"""
+    while Number >= 0x80:
+        Data.append((Number & 0x7F) | 0x80)
+        Number >>= 7
+
+    Data.append(Number)
+
+def EncodeSigned(Data, Number):
+    """Append Number (which may be negative) to the bytearray Data as a zigzag encoded variable-length integer"""
+    EncodeNumber(Data, Number * 2 if Number >= 0 else -Number * 2 - 1)
+
+def DecodeNumber(Data, Offset):
+    """Return the variable-length integer at Offset in the bytearray Data, and the offset after it. Raises IndexError if Data ends first."""
+    Number = 0
+    Shift = 0
+
+    while True:
+        Byte = Data[Offset]
+        Number |= (Byte & 0x7F) << Shift
+        Offset += 1
+        Shift += 7
+
+        if Byte < 0x80:
+            return Number, Offset
+
+def DecodeSigned(Data, Offset):
+    """Return the zigzag encoded variable-length integer at Offset in the bytearray Data, and the offset after it"""
+    Number, Offset = DecodeNumber(Data, Offset)
+    return (Number // 2 if Number % 2 == 0 else -(Number + 1) // 2), Offset
+
+def BlocksEqual(First, FirstIndex, Second, SecondIndex, Count):
+    """Return True if Count blocks from FirstIndex in the mapfile First are the same as Count blocks from SecondIndex in the mapfile Second"""
+    for Name in ("Sizes", "Codes", "Positions"):
+        if getattr(First, Name)[FirstIndex:FirstIndex+Count] != getattr(Second, Name)[SecondIndex:SecondIndex+Count]:
+            return False
+
+    return True
+
+def FindChange(Old, New):
+    """Return the index of the first block that differs between the mapfiles Old and New, and the number of blocks at the end they have in common.
+    The blocks are compared CompareSize at a time in C, so finding a small change in a big mapfile is fast."""
+    Length = min(len(Old), len(New))
+    Start = 0
+
+    while Start < Length:
+        Count = min(CompareSize, Length - Start)
+
+        if BlocksEqual(Old, Start, New, Start, Count):
+            Start += Count
+            continue
+
+        while BlocksEqual(Old, Start, New, Start, 1):
+            Start += 1
+
+        break
+
+    Common = 0
+
+    while Common < Length - Start:
+        Count = min(CompareSize, Length - Start - Common)
+
+        if BlocksEqual(Old, len(Old) - Common - Count, New, len(New) - Common - Count, Count):
+            Common += Count
+            continue
+
+        while BlocksEqual(Old, len(Old) - Common - 1, New, len(New) - Common - 1, 1):
+            Common += 1
+
+        break
+
+    return Start, Common
+
+class Snapshot():
+    """The change to a mapfile since the last snapshot"""
+    def __init__(self, Time, CurrentPos, CurrentStatus, CurrentPass, Start, Removed, Positions, Sizes, Statuses):
+        """Store the change. Time is in milliseconds since the epoch, and the blocks from Start up to Start+Removed were replaced by the given blocks."""
+        self.Time = Time
+        self.CurrentPos = CurrentPos
+        self.CurrentStatus = CurrentStatus
+        self.CurrentPass = CurrentPass
+        self.Start = Start
+        self.Removed = Removed
+        self.Positions = Positions
+        self.Sizes = Sizes
+        self.Statuses = Statuses
+
+    def Apply(self, Map):
+        """Apply the change to Map"""
+        Map.ReplaceBlocks(self.Start, self.Start + self.Removed, self.Positions, self.Sizes, self.Statuses)
+        Map.CurrentPos = self.CurrentPos
+        Map.CurrentStatus = self.CurrentStatus
+        Map.CurrentPass = self.CurrentPass
+
+def Encode(Change, LastTime, LastEnd):
+    """Return the data of the record for Change, given the time of the last snapshot, and the end of the block before the first changed one"""
+    Data = bytearray()
+    EncodeSigned(Data, Change.Time - LastTime)
+    EncodeNumber(Data, Change.CurrentPos)
+    Data.append(ord(Change.CurrentStatus))
+    EncodeNumber(Data, 0 if Change.CurrentPass == None else Change.CurrentPass + 1)
+
+    for Number in (Change.Start, Change.Removed, len(Change.Sizes)):
+        EncodeNumber(Data, Number)
+
+    for Position, Size, Status in zip(Change.Positions, Change.Sizes, Change.Statuses):
+        EncodeSigned(Data, Position - LastEnd)
+        EncodeNumber(Data, Size)
+        Data.append(ord(Status))
+        LastEnd = Position + Size
+
+    return Data
+
+def Decode(Data, Map, LastTime):
+    """Return the Snapshot in the record data Data, given the mapfile it applies to, and the time of the last snapshot. Raises ValueError if it isn't valid."""
+    try:
+        TimeDelta, Offset = DecodeSigned(Data, 0)
+        CurrentPos, Offset = DecodeNumber(Data, Offset)
+        CurrentStatus = chr(Data[Offset])
+        CurrentPass, Offset = DecodeNumber(Data, Offset + 1)
+        Start, Offset = DecodeNumber(Data, Offset)
+        Removed, Offset = DecodeNumber(Data, Offset)
+        Added, Offset = DecodeNumber(Data, Offset)
+
+        if Start + Removed > len(Map):
+            raise ValueError("Snapshot removes blocks that don't exist")
+
+        LastEnd = 0 if Start == 0 else Map.Positions[Start-1] + Map.Sizes[Start-1]
+        Positions = mapfile.NewPositionArray()
+        Sizes = mapfile.NewPositionArray()
+        Statuses = []
+
+        for Block in range(Added):
+            Gap, Offset = DecodeSigned(Data, Offset)
+            Size, Offset = DecodeNumber(Data, Offset)
+            Positions.append(LastEnd + Gap)
+            Sizes.append(Size)
+            Statuses.append(chr(Data[Offset]))
+            Offset += 1
+            LastEnd += Gap + Size
+
+    except IndexError:
+        raise ValueError("Snapshot record is too short")
+
+    if Offset != len(Data) or not set(Statuses).issubset(mapfile.Statuses):
+        raise ValueError("Snapshot record is corrupt")
+
+    return Snapshot(LastTime + TimeDelta, CurrentPos, CurrentStatus, None if CurrentPass == 0 else CurrentPass - 1, Start, Removed, Positions, Sizes, Statuses)
+
+def ReadRecords(Data):
+    """Yield the data of each complete, undamaged record in the contents of a snapshot file, and the offset after it. Stops at the first damaged or incomplete record."""
+    Offset = len(Magic)
+
+    while Offset < len(Data):
+        try:
+            Length, Start = DecodeNumber(Data, Offset)
+
+        except IndexError:
+            return
+
+        Record = Data[Start:Start+Length]
+        Check = Data[Start+Length:Start+Length+4]
+
+        if len(Check) != 4 or struct.unpack(str("<I"), bytes(Check))[0] != zlib.crc32(bytes(Record)) & 0xFFFFFFFF:
+            return
+
+        Offset = Start + Length + 4
+        yield Record, Offset
+
+def ReadChanges(FileName):
+    """Yield each Snapshot in the snapshot file FileName, the Mapfile it applies to (as of the last snapshot), and the offset after the snapshot.
+    Each change must be applied to the mapfile before getting the next one. Raises ValueError if it isn't a snapshot file, or IOError/OSError if it can't be read.
+    Anything after a damaged or incomplete snapshot (eg if DDRescue-GUI crashed while writing it) is ignored."""
+    with open(FileName, "rb") as File:
+        Data = bytearray(File.read())
+
+    if Data[:len(Magic)] != Magic:
+        raise ValueError("Not a snapshot file")
+
+    Map = mapfile.Mapfile()
+    Time = 0
+
+    for Record, Offset in ReadRecords(Data):
+        try:
+            Change = Decode(Record, Map, Time)
+
+        except ValueError:
+            return
+
+        Time = Change.Time
+        yield Change, Map, Offset
+
+def Replay(FileName):
+    """Yield the time (in seconds since the epoch) and state of the mapfile at each snapshot in the snapshot file FileName, and the offset after the snapshot.
+    The same Mapfile is updated and yielded each time, so copy anything that's needed later. Raises ValueError and IOError/OSError as ReadChanges() does."""
+    for Change, Map, Offset in ReadChanges(FileName):
+        Change.Apply(Map)
+        yield Change.Time / 1000, Map, Offset
+
+class SnapshotWriter():
+    """Appends snapshots of a mapfile to a snapshot file, storing only the blocks that changed since the last snapshot.
+    If the file already exists (eg when resuming a recovery), new snapshots follow on from the ones in it."""
+    def __init__(self, FileName):
+        """Prepare to add snapshots to FileName. Raises ValueError if it exists but isn't a snapshot file, or IOError/OSError if it can't be read."""
+        self.FileName = FileName
+
+        #A copy of the mapfile as of the last snapshot, to compare the next one with.
+        self.Last = mapfile.Mapfile()
+        self.LastTime = 0
+        self.End = 0
+
+        if os.path.exists(FileName):
+            self.End = len(Magic)
+
+            for Time, Map, Offset in Replay(FileName):
+                self.Last = Map
+                self.LastTime = int(round(Time * 1000))
+                self.End = Offset
+
+    def Add(self, Map, Time):
+        """Add a snapshot of Map at Time (in seconds since the epoch). Returns the number of bytes written, which is 0 if nothing changed.
+        Raises IOError/OSError if the file can't be written."""
+        Start, Common = FindChange(self.Last, Map)
+        Removed = len(self.Last) - Common - Start
+        Added = len(Map) - Common - Start
+
+        if Removed == 0 and Added == 0 and (Map.CurrentPos, Map.CurrentStatus, Map.CurrentPass) == (self.Last.CurrentPos, self.Last.CurrentStatus, self.Last.CurrentPass):
+            return 0
+
+        Change = Snapshot(int(round(Time * 1000)), Map.CurrentPos, Map.CurrentStatus, Map.CurrentPass, Start, Removed, Map.Positions[Start:Start+Added], Map.Sizes[Start:Start+Added],
+                          [chr(Code) for Code in Map.Codes[Start:Start+Added]])
+
+        LastEnd = 0 if Start == 0 else self.Last.Positions[Start-1] + self.Last.Sizes[Start-1]
+        Record = Encode(Change, self.LastTime, LastEnd)
+        Data = bytearray()
+        EncodeNumber(Data, len(Record))
+        Data += Record + struct.pack(str("<I"), zlib.crc32(bytes(Record)) & 0xFFFFFFFF)
+
+        #Drop anything left after the last good snapshot by a crash, before adding this one.
+        with io.open(self.FileName, "r+b" if self.End != 0 else "wb") as File:
+            if self.End == 0:
+                File.write(Magic)
+                self.End = len(Magic)
+
+            File.seek(self.End)
+            File.truncate()
+            File.write(bytes(Data))
+
+        self.End += len(Data)
+
+        Change.Apply(self.Last)
+        self.LastTime = Change.Time
+        return len(Data)
+
+class Phase():
+    """A stretch of a recovery with the same current status and pass, with the bytes rescued in it"""
+    def __init__(self, Status, Pass, StartTime, Finished):
+        """Start a phase at StartTime (in seconds since the epoch), when Finished bytes had been rescued"""
+        self.Status = Status
+        self.Pass = Pass
+        self.StartTime = StartTime
+        self.EndTime = StartTime
+        self.StartFinished = Finished
+        self.EndFinished = Finished
+
+    def GetRescued(self):
+        """Return the number of bytes rescued in the phase"""
+        return self.EndFinished - self.StartFinished
+
+    def GetRate(self):
+        """Return the average number of bytes rescued per second in the phase, or None if it didn't last long enough to tell"""
+        if self.EndTime <= self.StartTime:
+            return None
+
+        return self.GetRescued() / (self.EndTime - self.StartTime)
+
+def ReturnPhases(FileName):
+    """Return a list of the Phases in the snapshot file FileName, in order. Each phase ends where the next starts.
+    Raises ValueError if it isn't a snapshot file, or IOError/OSError if it can't be read."""
+    Phases = []
+
+    for Time, Map, Offset in Replay(FileName):
+        if Phases != []:
+            Phases[-1].EndTime = Time
+            Phases[-1].EndFinished = Map.Totals["+"]
+
+        if Phases == [] or (Phases[-1].Status, Phases[-1].Pass) != (Map.CurrentStatus, Map.CurrentPass):
+            Phases.append(Phase(Map.CurrentStatus, Map.CurrentPass, Time, Map.Totals["+"]))
+
+    return Phases
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Mapfile Tools (tailer) in the Tools Package for DDRescue-GUI Version 1.7.1
+# This file is part of DDRescue-GUI.
+# Copyright (C) 2013-2017 Hamish McIntyre-Bhatty
+# DDRescue-GUI is free software: you can redistribute it and/or modify it
+# under the terms of the GNU General Public License version 3 or,
+# at your option, any later version.
+#
+# DDRescue-GUI is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with DDRescue-GUI.  If not, see <http://www.gnu.org/licenses/>.
+
+#Do future imports to prepare to support python 3. Use unicode strings rather than ASCII strings, as they fix potential problems.
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+#Import modules.
+import os
+import zlib
+
+#Import tools modules.
+from . import mapfile
+
+class MapfileTailer():
+    """Watches a mapfile while ddrescue updates it. The file is only read again when its modification time, size or inode changes, so polling it often is cheap.
+    When it has changed, only the blocks from the first chunk that differs onwards are parsed again."""
+    def __init__(self, FileName):
+        """Set up to watch FileName, which doesn't have to exist yet"""
+        self.FileName = FileName
+
+        #The (modification time, size, inode) of the file when we last read it, and what we read.
+        self.Signature = None
+        self.Map = None
+
+        #The (checksum, number of blocks, totals) of each chunk of block lines in what we read.
+        self.Chunks = []
+
+    def Poll(self):
+        """Read the mapfile again if it has changed since the last call. Returns the new mapfile.Mapfile if it was read, or None if not."""
+        try:
+            Stat = os.stat(self.FileName)
+
+        except OSError:
+            #ddrescue hasn't created it yet.
+            return None
+
+        Signature = (Stat.st_mtime, Stat.st_size, Stat.st_ino)
+
+        if Signature == self.Signature:
+            return None
+
+        #Even if this version can't be read, don't try again until it changes.
+        self.Signature = Signature
+
+        try:
+            Map, Chunks = self.Read()
+
+        except (IOError, OSError, ValueError):
+            #Probably half-written. ddrescue will finish writing it soon.
+            return None
+
+        #ddrescue rewrites the mapfile in place, so if it now covers less of the disk, we've read part of it.
+        if self.Map != None and Map.GetEnd() < self.Map.GetEnd():
+            return None
+
+        self.Map = Map
+        self.Chunks = Chunks
+        return Map
+
+    def Read(self):
+        """Read the mapfile, reusing the blocks we already have for every chunk up to the first one that has changed. Returns the new mapfile.Mapfile and its chunks.
+        Raises ValueError if it isn't a valid mapfile, or IOError/OSError if it can't be read."""
+        Map = mapfile.Mapfile()
+        Chunks = []
+        Unchanged = self.Map != None
+
+        with open(self.FileName, "rb") as File:
+            #ddrescue updates the current position every time, so it's always parsed again.
+            Line = File.readline()
+
+            while Line.strip() == b"" or Line.startswith(b"#"):
+                if Line == b"":
+                    raise ValueError("No current position line")
+
+                Line = File.readline()
+
+            mapfile.ParseCurrentPosition(Map, Line.decode("UTF-8", "replace"))
+
+            #Chunks always end at the end of a line, so they line up with the last read until something changes.
+            while True:
+                Chunk = File.read(mapfile.ChunkSize)
+
+                if Chunk == b"":
+                    break
+
+                Chunk += File.readline()
+                Checksum = zlib.crc32(Chunk)
+                Index = len(Chunks)
+
+                if Unchanged and Index < len(self.Chunks) and self.Chunks[Index][0] == Checksum:
+                    Chunks.append(self.Chunks[Index])
+                    continue
+
+                if Unchanged:
+                    #Keep the blocks from the chunks before this one.
+                    Unchanged = False
+                    self.CopyBlocks(Map, Chunks)
+
+                if b"#" in Chunk:
+                    Chunk = mapfile.Comments.sub(b"", Chunk)
+
+                Positions, Sizes, Codes = mapfile.ParseBlocks(Chunk)
+                Totals = dict(Map.Totals)
+                Map.AddBlocks(Positions, Sizes, Codes)
+                Chunks.append((Checksum, len(Positions), dict((Status, Map.Totals[Status] - Totals[Status]) for Status in Totals)))
+
+        if Unchanged:
+            #Only the current position has changed, or the file has been cut short.
+            self.CopyBlocks(Map, Chunks)
+
+        return Map, Chunks
+
+    def CopyBlocks(self, Map, Chunks):
+        """Copy the blocks in the given chunks, which are the first chunks of the last mapfile we read, into Map"""
+        Count = sum(Chunk[1] for Chunk in Chunks)
+        Map.Positions = self.Map.Positions[:Count]
+        Map.Sizes = self.Map.Sizes[:Count]
+        Map.Codes = self.Map.Codes[:Count]
+
+        for Chunk in Chunks:
+            for Status, Total in Chunk[2].items():
+                Map.Totals[Status] += Total